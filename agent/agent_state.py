@@ -96,8 +96,9 @@ def get_event_listener():
     """Lazy-initialize Docker event listener."""
     global _event_listener
     if _event_listener is None:
-        from agent.events import DockerEventListener
-        _event_listener = DockerEventListener()
+        from agent.events import DockerEventListener, get_container_inventory
+        inventory = get_container_inventory() if settings.container_inventory_enabled else None
+        _event_listener = DockerEventListener(inventory=inventory)
     return _event_listener
 
 
@@ -0,0 +1,246 @@
+"""Persistent cache of verified file SHA256 digests.
+
+Backing images are multi-GB files the agent used to hash in full on every
+check: before each overlay disk is created (twice around a page-cache drop
+on a mismatch) and when backfilling checksum sidecars. Starting 20 VMs
+from one image read the whole image 20 times.
+
+A digest is recorded whenever the agent writes or fully hashes a file,
+keyed by the file's identity at that moment: (device, inode, size,
+mtime_ns). A lookup returns the digest only while the file still has
+that identity, so an unchanged image verifies with a single ``stat`` and
+any rewrite, replacement or truncation forces a full hash again.
+
+Corruption that leaves the identity alone (bit rot, a bad page cache) is
+caught by ``reverify_loop``: entries older than
+``checksum_reverify_interval`` are re-hashed in the background at idle
+I/O priority, and entries that no longer match are dropped so the next
+verification hashes the file in full.
+
+Storage lives at ``{workspace_path}/checksum-cache.json``. Writes are
+serialized with ``fcntl.flock`` on a lock file and use ``os.replace`` for
+atomicity.
+"""
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from agent.config import settings
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Longest sleep between re-verification passes
+_REVERIFY_POLL_SECONDS = 3600
+
+
+def _cache_path() -> Path:
+    return Path(settings.workspace_path) / "checksum-cache.json"
+
+
+def _key(st: os.stat_result) -> str:
+    return f"{st.st_dev}:{st.st_ino}"
+
+
+def _matches(entry: object, st: os.stat_result) -> bool:
+    return (
+        isinstance(entry, dict)
+        and entry.get("size") == st.st_size
+        and entry.get("mtime_ns") == st.st_mtime_ns
+    )
+
+
+def _read_entries() -> dict:
+    """Read entries from disk. Returns an empty dict on missing/corrupt."""
+    try:
+        data = json.loads(_cache_path().read_text())
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, OSError, ValueError) as e:
+        logger.warning(f"Failed to read checksum cache: {e}")
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_entries(entries: dict) -> None:
+    """Atomic write: temp file + os.replace()."""
+    path = _cache_path()
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp, str(path))
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _update(fn) -> None:
+    """Apply ``fn`` to the entries under the file lock and write them back."""
+    path = _cache_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), "w") as lock_fd:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        try:
+            entries = _read_entries()
+            fn(entries)
+            _write_entries(entries)
+        finally:
+            fcntl.flock(lock_fd, fcntl.LOCK_UN)
+
+
+def lookup(path: str | Path) -> str | None:
+    """Return the recorded digest of ``path`` if the file is unchanged since."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    entry = _read_entries().get(_key(st))
+    if not _matches(entry, st):
+        return None
+    return entry.get("sha256")
+
+
+def record(path: str | Path, sha256: str, hashed: os.stat_result | None = None) -> None:
+    """Remember that ``path``, as it is now, has digest ``sha256``.
+
+    ``hashed`` is the file's stat from before it was hashed; the digest is
+    not recorded if the file changed since.
+    """
+    try:
+        st = os.stat(path)
+        if hashed is not None and (_key(hashed), hashed.st_size, hashed.st_mtime_ns) != (
+            _key(st), st.st_size, st.st_mtime_ns,
+        ):
+            return
+
+        def _set(entries: dict) -> None:
+            entries[_key(st)] = {
+                "path": str(path),
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": sha256,
+                "verified_at": time.time(),
+            }
+
+        _update(_set)
+    except OSError as e:
+        logger.warning(f"Could not record checksum of {path}: {e}")
+
+
+def forget(path: str | Path) -> None:
+    """Drop every entry recorded for ``path``."""
+    path = str(path)
+
+    def _drop(entries: dict) -> None:
+        for key in [k for k, v in entries.items() if isinstance(v, dict) and v.get("path") == path]:
+            del entries[key]
+
+    try:
+        _update(_drop)
+    except OSError as e:
+        logger.warning(f"Could not drop checksum of {path}: {e}")
+
+
+def _hash_file(path: str | Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def compute_sha256(path: str | Path) -> str:
+    """Hash ``path`` in full and record the digest."""
+    before = os.stat(path)
+    digest = _hash_file(path)
+    record(path, digest, before)
+    return digest
+
+
+def file_sha256(path: str | Path) -> str:
+    """Return the digest of ``path``, hashing it only if it changed since the last hash."""
+    return lookup(path) or compute_sha256(path)
+
+
+def _hash_file_idle(path: str) -> str:
+    """Hash ``path`` at idle I/O and lowest CPU priority when the tools exist."""
+    if shutil.which("ionice") and shutil.which("sha256sum"):
+        result = subprocess.run(
+            ["ionice", "-c", "3", "nice", "-n", "19", "sha256sum", "--", path],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.split()[0]
+    return _hash_file(path)
+
+
+def reverify_stale(max_age: float) -> dict:
+    """Re-hash entries verified more than ``max_age`` seconds ago.
+
+    Entries whose file is gone, changed or no longer hashes to the recorded
+    digest are dropped. Returns ``{"checked": n, "dropped": n}``.
+    """
+    now = time.time()
+    checked = 0
+    dropped = 0
+    for key, entry in list(_read_entries().items()):
+        if not isinstance(entry, dict) or now - entry.get("verified_at", 0) < max_age:
+            continue
+        path = entry.get("path", "")
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is None or _key(st) != key or not _matches(entry, st):
+            _update(lambda entries: entries.pop(key, None))
+            dropped += 1
+            continue
+
+        try:
+            digest = _hash_file_idle(path)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"Could not re-verify {path}: {e}")
+            continue
+        checked += 1
+        if digest == entry.get("sha256"):
+            record(path, digest, st)
+        else:
+            logger.warning(
+                f"{path} no longer matches its recorded SHA256 "
+                f"({entry.get('sha256', '')[:16]}..., now {digest[:16]}...); "
+                f"it will be fully verified on next use"
+            )
+            _update(lambda entries: entries.pop(key, None))
+            dropped += 1
+    return {"checked": checked, "dropped": dropped}
+
+
+async def reverify_loop() -> None:
+    """Periodically re-hash cached checksums older than ``checksum_reverify_interval``."""
+    interval = settings.checksum_reverify_interval
+    while True:
+        await asyncio.sleep(min(interval, _REVERIFY_POLL_SECONDS))
+        try:
+            result = await asyncio.to_thread(reverify_stale, interval)
+            if result["checked"] or result["dropped"]:
+                logger.info(
+                    f"Checksum re-verification: {result['checked']} checked, "
+                    f"{result['dropped']} dropped"
+                )
+        except Exception:
+            logger.warning("Checksum re-verification failed", exc_info=True)
@@ -58,6 +58,15 @@ class Settings(BaseSettings):
     # Image store path (shared with API for file-based images)
     image_store_path: str = "/var/lib/archetype/images"
 
+    # Peer image seeding: serve local images to other agents at the
+    # controller's direction (GET /images/seed)
+    image_seed_enabled: bool = True
+    # Concurrent seed uploads before further peers get 503
+    image_seed_max_uploads: int = 2
+    # Seconds between background re-hashes of cached image checksums
+    # (checksum-cache.json); 0 disables deep re-verification
+    checksum_reverify_interval: int = 7 * 24 * 3600
+
     # Communication timeouts (seconds)
     registration_timeout: float = 10.0
     heartbeat_timeout: float = 5.0
@@ -67,6 +76,10 @@ class Settings(BaseSettings):
     console_read_timeout: float = 0.005  # 5ms fallback (primary is event-driven)
     console_input_timeout: float = 0.01  # 10ms input check interval
 
+    # Event-maintained container inventory (answers status/discovery from memory)
+    container_inventory_enabled: bool = True
+    container_inventory_resync_interval: float = 300.0  # Periodic consistency check
+
     # Container operations
     container_stop_timeout: int = 3
 
@@ -114,6 +127,9 @@ class Settings(BaseSettings):
     ovs_bridge_name: str = "arch-ovs"  # Name of OVS bridge
     ovs_vlan_start: int = 100  # Starting VLAN for port isolation
     ovs_vlan_end: int = 4000  # Ending VLAN for port isolation
+    # Native OVSDB client (falls back to ovs-vsctl when the socket is unavailable)
+    ovsdb_enabled: bool = True
+    ovsdb_remote: str = "unix:/var/run/openvswitch/db.sock"
 
     # Network backend selection
     network_backend: str = "ovs"  # Backend name (default: ovs)
@@ -150,13 +166,18 @@ class Settings(BaseSettings):
     plugin_vxlan_vni_max: int = 299999
     plugin_vxlan_dst_port: int = 4789
 
+    # State file batching: mutations within this window share one save
+    plugin_state_flush_delay: float = 0.25
+
     # Lab TTL cleanup settings
     lab_ttl_enabled: bool = False  # Disabled by default for safety
     lab_ttl_seconds: int = 86400  # 24 hours
     lab_ttl_check_interval: int = 3600  # Check every hour
 
-    # Carrier state monitoring (OVS link_state polling)
-    carrier_monitor_interval: float = 3.0  # Seconds between OVS poll cycles
+    # Carrier state monitoring (OVSDB link_state updates, polling fallback)
+    carrier_monitor_interval: float = 3.0  # Seconds between polls while OVSDB is unavailable
+    carrier_monitor_resync_interval: float = 30.0  # Seconds between resync polls with OVSDB
+    carrier_monitor_debounce: float = 0.2  # Seconds a pushed transition must hold
 
     # Endpoint binding audit (container iface -> host veth) drift detection.
     endpoint_binding_audit_enabled: bool = True
@@ -6,12 +6,19 @@ for real-time state synchronization.
 
 Currently implemented:
 - DockerEventListener: Listens to Docker Events API for container state changes
+- ContainerInventory: Event-maintained in-memory view of managed containers
 
 Future listeners:
 - LibvirtEventListener: For VM state changes via libvirt
 """
 
 from agent.events.base import NodeEvent, NodeEventListener, NodeEventType
+from agent.events.container_inventory import (
+    ContainerInventory,
+    ContainerRecord,
+    get_container_inventory,
+    get_ready_inventory,
+)
 from agent.events.docker_events import DockerEventListener
 
 __all__ = [
@@ -19,4 +26,8 @@ __all__ = [
     "NodeEventListener",
     "NodeEventType",
     "DockerEventListener",
+    "ContainerInventory",
+    "ContainerRecord",
+    "get_container_inventory",
+    "get_ready_inventory",
 ]
@@ -0,0 +1,344 @@
+"""In-memory, label-indexed inventory of Archetype-managed containers.
+
+Listing containers through docker-py (``containers.list(all=True)``) performs
+a full inspect per container, and resolving ``container.image.tags`` costs
+one more image inspect per node. On hosts with hundreds of containers a
+single reconciliation sweep turns into thousands of Docker API round trips.
+
+This module keeps a summary record for every managed container in memory:
+
+1. Seeded with ONE sparse ``/containers/json`` call (no per-container inspect)
+2. Kept current from the Docker events stream owned by DockerEventListener
+3. Re-seeded periodically as a consistency check (drift is logged + counted)
+
+While the events stream is disconnected the inventory is marked not ready
+and callers fall back to querying Docker directly, so a missed event can
+never be served as truth.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from agent.labels import LABEL_LAB_ID, LABEL_NODE_NAME, LABEL_PROVIDER
+
+logger = logging.getLogger(__name__)
+
+# Event actions that change state in a way we can apply without calling Docker
+_STATE_FROM_ACTION = {
+    "die": "exited",
+    "pause": "paused",
+    "unpause": "running",
+}
+
+# Event actions that require re-reading the container summary
+# (new container, network attachments assigned on start, name change)
+_REFRESH_ACTIONS = {"create", "start", "restart", "rename"}
+
+# Additional event actions the inventory needs beyond DOCKER_ACTION_MAP
+INVENTORY_EVENT_ACTIONS = ("pause", "unpause", "restart", "rename")
+
+
+@dataclass
+class ContainerRecord:
+    """Summary of a managed container as reported by ``/containers/json``."""
+
+    id: str
+    name: str
+    state: str
+    labels: dict[str, str] = field(default_factory=dict)
+    image: str = ""
+    image_id: str = ""
+    ip_addresses: list[str] = field(default_factory=list)
+
+    @property
+    def short_id(self) -> str:
+        return self.id[:12]
+
+    @property
+    def status(self) -> str:
+        """Alias matching docker-py's ``Container.status``."""
+        return self.state
+
+    @property
+    def lab_id(self) -> str | None:
+        return self.labels.get(LABEL_LAB_ID)
+
+    @property
+    def node_name(self) -> str | None:
+        return self.labels.get(LABEL_NODE_NAME)
+
+    @property
+    def image_ref(self) -> str:
+        """Image reference for display (tag if known, else short image ID)."""
+        if self.image and not self.image.startswith("sha256:"):
+            return self.image
+        return (self.image_id or self.image)[:12]
+
+    @classmethod
+    def from_summary(cls, summary: dict[str, Any]) -> ContainerRecord:
+        """Build a record from one entry of the low-level ``containers()`` list."""
+        names = summary.get("Names") or []
+        name = names[0].lstrip("/") if names else ""
+        networks = (summary.get("NetworkSettings") or {}).get("Networks") or {}
+        ips = [
+            net.get("IPAddress")
+            for net in networks.values()
+            if isinstance(net, dict) and net.get("IPAddress")
+        ]
+        return cls(
+            id=summary.get("Id", ""),
+            name=name,
+            state=(summary.get("State") or "").lower(),
+            labels=dict(summary.get("Labels") or {}),
+            image=summary.get("Image") or "",
+            image_id=summary.get("ImageID") or "",
+            ip_addresses=ips,
+        )
+
+
+class ContainerInventory:
+    """Event-maintained cache of managed container summaries.
+
+    All mutations happen on the event loop thread; Docker calls are pushed to
+    worker threads with ``asyncio.to_thread``.
+    """
+
+    def __init__(self, client_factory: Callable[[], Any] | None = None):
+        self._client_factory = client_factory
+        self._records: dict[str, ContainerRecord] = {}
+        self._by_lab: dict[str, set[str]] = {}
+        self._ready = False
+        # Bumped on every observed change; lets callers detect "nothing changed"
+        self._generation = 0
+        # Container IDs touched by events while a resync listing is in flight
+        self._touched_during_resync: set[str] | None = None
+        self._consistency_task: asyncio.Task | None = None
+
+    # ------------------------------------------------------------------
+    # Read side
+    # ------------------------------------------------------------------
+
+    @property
+    def is_ready(self) -> bool:
+        """True when seeded and the events stream is connected."""
+        return self._ready
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def all(self, provider: str | None = None) -> list[ContainerRecord]:
+        """Return all records, optionally filtered by provider label."""
+        records = list(self._records.values())
+        if provider is None:
+            return records
+        return [r for r in records if r.labels.get(LABEL_PROVIDER) == provider]
+
+    def for_lab(self, lab_id: str) -> list[ContainerRecord]:
+        """Return the records for one lab."""
+        ids = self._by_lab.get(lab_id)
+        if not ids:
+            return []
+        return [self._records[cid] for cid in ids if cid in self._records]
+
+    def lab_ids(self) -> set[str]:
+        return set(self._by_lab)
+
+    def get(self, container_id: str) -> ContainerRecord | None:
+        return self._records.get(container_id)
+
+    # ------------------------------------------------------------------
+    # Write side
+    # ------------------------------------------------------------------
+
+    def _client(self):
+        if self._client_factory is None:
+            from agent.docker_client import get_docker_client
+            self._client_factory = get_docker_client
+        return self._client_factory()
+
+    async def _list_summaries(self, container_id: str | None = None) -> list[dict]:
+        filters: dict[str, Any] = {"label": LABEL_LAB_ID}
+        if container_id:
+            filters["id"] = container_id
+        client = self._client()
+        return await asyncio.to_thread(client.api.containers, all=True, filters=filters)
+
+    def _put(self, record: ContainerRecord) -> bool:
+        """Insert or replace a record. Returns True if anything changed."""
+        previous = self._records.get(record.id)
+        if previous == record:
+            return False
+        if previous is not None and previous.lab_id != record.lab_id:
+            self._unindex(previous)
+        self._records[record.id] = record
+        if record.lab_id:
+            self._by_lab.setdefault(record.lab_id, set()).add(record.id)
+        self._generation += 1
+        return True
+
+    def _unindex(self, record: ContainerRecord) -> None:
+        if not record.lab_id:
+            return
+        ids = self._by_lab.get(record.lab_id)
+        if ids is None:
+            return
+        ids.discard(record.id)
+        if not ids:
+            del self._by_lab[record.lab_id]
+
+    def discard(self, container_id: str) -> bool:
+        """Drop a record. Returns True if it existed."""
+        record = self._records.pop(container_id, None)
+        if record is None:
+            return False
+        self._unindex(record)
+        self._generation += 1
+        return True
+
+    async def refresh(self, container_id: str) -> None:
+        """Re-read a single container summary from Docker."""
+        summaries = await self._list_summaries(container_id)
+        match = next((s for s in summaries if s.get("Id") == container_id), None)
+        if match is None:
+            self.discard(container_id)
+        else:
+            self._put(ContainerRecord.from_summary(match))
+
+    async def resync(self) -> int:
+        """Re-seed from a single sparse listing and mark the inventory ready.
+
+        Returns the number of records that were added, removed or changed
+        relative to the previous in-memory view (0 on first seed).
+        """
+        seeded = self._ready
+        self._touched_during_resync = set()
+        try:
+            summaries = await self._list_summaries()
+        except BaseException:
+            self._touched_during_resync = None
+            raise
+
+        touched = self._touched_during_resync
+        self._touched_during_resync = None
+
+        fresh = {s.get("Id"): ContainerRecord.from_summary(s) for s in summaries if s.get("Id")}
+        drift = 0
+        for cid in list(self._records):
+            if cid not in fresh and cid not in touched:
+                self.discard(cid)
+                drift += 1
+        for cid, record in fresh.items():
+            # Events observed mid-listing are newer than the snapshot
+            if cid in touched:
+                continue
+            if self._put(record):
+                drift += 1
+
+        self._ready = True
+        if seeded and drift:
+            logger.warning(f"Container inventory drift corrected: {drift} record(s)")
+            from agent.metrics import container_inventory_drift
+            container_inventory_drift.inc(drift)
+        logger.debug(f"Container inventory synced: {len(self._records)} containers")
+        return drift if seeded else 0
+
+    def invalidate(self) -> None:
+        """Mark the inventory stale (events stream lost)."""
+        if self._ready:
+            logger.info("Container inventory invalidated; falling back to Docker queries")
+        self._ready = False
+
+    async def apply_event(self, event: dict) -> None:
+        """Apply a raw Docker event dict to the inventory."""
+        if event.get("Type") != "container":
+            return
+        actor = event.get("Actor") or {}
+        attributes = actor.get("Attributes") or {}
+        if LABEL_LAB_ID not in attributes:
+            return
+        container_id = actor.get("ID") or event.get("id")
+        if not container_id:
+            return
+
+        if self._touched_during_resync is not None:
+            self._touched_during_resync.add(container_id)
+
+        action = (event.get("Action") or "").split(":")[0]
+        if action == "destroy":
+            self.discard(container_id)
+            return
+
+        record = self._records.get(container_id)
+        new_state = _STATE_FROM_ACTION.get(action)
+        if record is not None and new_state is not None:
+            if record.state != new_state:
+                record.state = new_state
+                self._generation += 1
+            return
+
+        if action in _REFRESH_ACTIONS or record is None:
+            try:
+                await self.refresh(container_id)
+            except Exception as e:
+                # Can't trust the view for this container any more
+                logger.warning(f"Container inventory refresh failed for {container_id[:12]}: {e}")
+                self.invalidate()
+
+    # ------------------------------------------------------------------
+    # Periodic consistency check
+    # ------------------------------------------------------------------
+
+    async def _consistency_loop(self, interval_seconds: float) -> None:
+        while True:
+            try:
+                await asyncio.sleep(interval_seconds)
+                # Only check while live; the listener re-seeds on reconnect
+                if self._ready:
+                    await self.resync()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"Container inventory consistency check failed: {e}")
+
+    def start_consistency_check(self, interval_seconds: float) -> None:
+        """Start the periodic consistency check task."""
+        if self._consistency_task is not None and not self._consistency_task.done():
+            return
+        self._consistency_task = asyncio.create_task(self._consistency_loop(interval_seconds))
+
+    async def stop_consistency_check(self) -> None:
+        """Stop the periodic consistency check task."""
+        if self._consistency_task is None:
+            return
+        self._consistency_task.cancel()
+        try:
+            await self._consistency_task
+        except asyncio.CancelledError:
+            pass
+        self._consistency_task = None
+
+
+# Module-level singleton
+_inventory: ContainerInventory | None = None
+
+
+def get_container_inventory() -> ContainerInventory:
+    """Get the global ContainerInventory instance."""
+    global _inventory
+    if _inventory is None:
+        _inventory = ContainerInventory()
+    return _inventory
+
+
+def get_ready_inventory() -> ContainerInventory | None:
+    """Return the global inventory if it can answer queries, else None."""
+    if _inventory is not None and _inventory.is_ready:
+        return _inventory
+    return None
@@ -22,6 +22,7 @@ from datetime import datetime, timezone
 import docker
 
 from agent.events.base import EventCallback, NodeEvent, NodeEventListener, NodeEventType
+from agent.events.container_inventory import INVENTORY_EVENT_ACTIONS, ContainerInventory
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,18 @@ DOCKER_ACTION_MAP = {
     "destroy": NodeEventType.DESTROYING,
 }
 
+# Changes a container's CPU/memory limits without changing its state
+RESOURCE_UPDATE_ACTION = "update"
+
+
+def _invalidate_container_resources(event: dict) -> None:
+    """Make the next heartbeat re-inspect a container after ``docker update``."""
+    from agent.helpers import get_container_resource_cache
+
+    container_id = (event.get("Actor") or {}).get("ID")
+    if container_id:
+        get_container_resource_cache().invalidate(container_id)
+
 
 class DockerEventListener(NodeEventListener):
     """Listens to Docker Events API for container state changes.
@@ -49,9 +62,14 @@ class DockerEventListener(NodeEventListener):
 
     The listener handles reconnection automatically if the Docker connection
     is lost, with exponential backoff.
+
+    If a ContainerInventory is attached, every raw container event is also
+    applied to it. The inventory is re-seeded after each (re)subscription and
+    invalidated whenever the stream drops, since events may have been missed.
     """
 
-    def __init__(self):
+    def __init__(self, inventory: ContainerInventory | None = None):
+        self._inventory = inventory
         self._client: docker.DockerClient | None = None
         self._running = False
         # Lazily initialized in start() to avoid binding asyncio primitives to a
@@ -131,14 +149,25 @@ class DockerEventListener(NodeEventListener):
         async consumer.
         """
         # Get events generator - filters for container events
+        event_actions = [*DOCKER_ACTION_MAP.keys(), RESOURCE_UPDATE_ACTION]
+        if self._inventory is not None:
+            event_actions.extend(INVENTORY_EVENT_ACTIONS)
         events = self._client.events(
             decode=True,
             filters={
                 "type": "container",
-                "event": list(DOCKER_ACTION_MAP.keys()),
+                "event": event_actions,
             },
         )
 
+        # Seed the inventory only after subscribing so that no change can
+        # fall between the snapshot and the first delivered event.
+        if self._inventory is not None:
+            try:
+                await self._inventory.resync()
+            except Exception as e:
+                logger.warning(f"Container inventory seed failed: {e}")
+
         # Start background thread to read events
         self._thread_stop.clear()
         self._async_queue = asyncio.Queue()
@@ -168,6 +197,16 @@ class DockerEventListener(NodeEventListener):
                 if isinstance(event, Exception):
                     raise event
 
+                if event.get("Action") == RESOURCE_UPDATE_ACTION:
+                    _invalidate_container_resources(event)
+
+                if self._inventory is not None:
+                    try:
+                        await self._inventory.apply_event(event)
+                    except Exception as e:
+                        logger.warning(f"Container inventory update failed: {e}")
+                        self._inventory.invalidate()
+
                 # Process the event
                 node_event = self._parse_event(event)
                 if node_event:
@@ -177,6 +216,8 @@ class DockerEventListener(NodeEventListener):
                         logger.error(f"Error in event callback: {e}")
 
         finally:
+            if self._inventory is not None:
+                self._inventory.invalidate()
             # Stop the reader thread
             self._thread_stop.set()
             events.close()
@@ -10,6 +10,7 @@ import asyncio
 from datetime import datetime, timezone
 import logging
 import re
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -223,6 +224,8 @@ def get_capabilities() -> AgentCapabilities:
     features = ["console", "status"]
     if settings.enable_vxlan:
         features.append("vxlan")
+    if settings.image_seed_enabled:
+        features.append("image_seed")
 
     return AgentCapabilities(
         providers=providers,
@@ -232,6 +235,149 @@ def get_capabilities() -> AgentCapabilities:
     )
 
 
+class ContainerResourceCache:
+    """Per-container facts that heartbeats need but list summaries lack.
+
+    ``/containers/json`` already returns name, state, labels and image ID for
+    every container in one call. Only two things require an inspect:
+
+    - HostConfig CPU/memory limits (cached by container ID)
+    - image tag resolution (cached by image ID)
+
+    A container is re-inspected only when it is new, its state differs from
+    the state seen at the last inspect, or a ``docker update`` changed its
+    limits (the event listener calls ``invalidate``). Entries for containers/images that disappear from the
+    listing are evicted, so the cache never outgrows the host.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # container_id -> (state at inspect time, vcpus, memory_mb)
+        self._limits: dict[str, tuple[str, float, int]] = {}
+        # image_id -> display name (first tag or short ID)
+        self._image_names: dict[str, str] = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._limits.clear()
+            self._image_names.clear()
+
+    def invalidate(self, container_id: str) -> None:
+        """Force a re-inspect of one container on the next collection."""
+        with self._lock:
+            self._limits.pop(container_id, None)
+
+    def limits(self, client, container_id: str, state: str) -> tuple[float, int]:
+        """Return (vcpus, memory_mb) for a container, inspecting only on change."""
+        with self._lock:
+            cached = self._limits.get(container_id)
+        if cached is not None and cached[0] == state:
+            return cached[1], cached[2]
+
+        attrs = client.api.inspect_container(container_id)
+        host_config = attrs.get("HostConfig") or {}
+        nano_cpus = host_config.get("NanoCpus") or 0
+        vcpus = nano_cpus / 1e9 if nano_cpus else 1
+        mem_limit = host_config.get("Memory") or 0
+        memory_mb = mem_limit // (1024 * 1024) if mem_limit else 0
+        with self._lock:
+            self._limits[container_id] = (state, vcpus, memory_mb)
+        return vcpus, memory_mb
+
+    def image_name(self, client, image_id: str) -> str:
+        """Return the first tag of an image (or its short ID), cached by ID."""
+        with self._lock:
+            cached = self._image_names.get(image_id)
+        if cached is not None:
+            return cached
+
+        attrs = client.api.inspect_image(image_id)
+        tags = attrs.get("RepoTags") or []
+        if tags:
+            name = tags[0]
+        elif image_id.startswith("sha256:"):
+            name = image_id[:19]
+        else:
+            name = image_id[:12]
+        with self._lock:
+            self._image_names[image_id] = name
+        return name
+
+    def retain(self, container_ids: set[str], image_ids: set[str]) -> None:
+        """Evict entries for containers/images no longer present."""
+        with self._lock:
+            for cid in set(self._limits) - container_ids:
+                del self._limits[cid]
+            for iid in set(self._image_names) - image_ids:
+                del self._image_names[iid]
+
+
+_container_resource_cache = ContainerResourceCache()
+
+
+def get_container_resource_cache() -> ContainerResourceCache:
+    """Get the process-wide container resource cache."""
+    return _container_resource_cache
+
+
+def _collect_container_details(client) -> tuple[int, int, list[dict]]:
+    """Build heartbeat container details from one sparse container listing.
+
+    Returns (containers_running, containers_total, container_details).
+    """
+    cache = get_container_resource_cache()
+    containers_running = 0
+    containers_total = 0
+    container_details = []
+    seen_containers: set[str] = set()
+    seen_images: set[str] = set()
+
+    for info in client.api.containers(all=True):
+        container_id = info.get("Id", "")
+        names = info.get("Names") or ["unknown"]
+        name = names[0].lstrip("/")
+        labels = info.get("Labels") or {}
+        is_archetype_node = bool(labels.get("archetype.node_name"))
+        is_archetype_system = name.startswith("archetype-") and not is_archetype_node
+
+        if not is_archetype_node and not is_archetype_system:
+            continue
+
+        status = (info.get("State") or "").lower()
+        try:
+            vcpus, memory_mb = cache.limits(client, container_id, status)
+        except (docker.errors.NotFound, docker.errors.APIError) as e:
+            logger.warning(f"Skipping corrupted/dead container {name}: {e}")
+            continue
+        seen_containers.add(container_id)
+
+        containers_total += 1
+        if status == "running":
+            containers_running += 1
+
+        image_id = info.get("ImageID") or ""
+        try:
+            image_name = cache.image_name(client, image_id) if image_id else "unknown"
+            seen_images.add(image_id)
+        except Exception:
+            image_name = "unknown"
+
+        container_details.append({
+            "name": name,
+            "status": status,
+            "lab_prefix": labels.get("archetype.lab_id", ""),
+            "node_name": labels.get("archetype.node_name"),
+            "node_kind": labels.get("archetype.node_kind"),
+            "image": image_name,
+            "is_system": is_archetype_system,
+            "vcpus": vcpus,
+            "memory_mb": memory_mb,
+        })
+
+    cache.retain(seen_containers, seen_images)
+    return containers_running, containers_total, container_details
+
+
 def _sync_get_resource_usage() -> dict:
     """Gather system resource metrics (synchronous implementation)."""
     import psutil
@@ -260,56 +406,9 @@ def _sync_get_resource_usage() -> dict:
         container_details = []
         try:
             client = get_docker_client()
-
-            container_list = client.api.containers(all=True)
-            all_containers = []
-            for container_info in container_list:
-                try:
-                    c = client.containers.get(container_info["Id"])
-                    all_containers.append(c)
-                except (docker.errors.NotFound, docker.errors.APIError) as e:
-                    container_name = container_info.get("Names", ["unknown"])[0].lstrip("/")
-                    logger.warning(f"Skipping corrupted/dead container {container_name}: {e}")
-                    continue
-
-            for c in all_containers:
-                labels = c.labels
-                is_archetype_node = bool(labels.get("archetype.node_name"))
-                is_archetype_system = c.name.startswith("archetype-") and not is_archetype_node
-
-                if not is_archetype_node and not is_archetype_system:
-                    continue
-
-                containers_total += 1
-                if c.status == "running":
-                    containers_running += 1
-
-                lab_prefix = labels.get("archetype.lab_id", "")
-                node_name = labels.get("archetype.node_name")
-                node_kind = labels.get("archetype.node_kind")
-
-                try:
-                    image_name = c.image.tags[0] if c.image.tags else c.image.short_id
-                except Exception:
-                    image_name = "unknown"
-
-                host_config = c.attrs.get("HostConfig", {})
-                nano_cpus = host_config.get("NanoCpus") or 0
-                container_vcpus = nano_cpus / 1e9 if nano_cpus else 1
-                mem_limit = host_config.get("Memory") or 0
-                container_memory_mb = mem_limit // (1024 * 1024) if mem_limit else 0
-
-                container_details.append({
-                    "name": c.name,
-                    "status": c.status,
-                    "lab_prefix": lab_prefix,
-                    "node_name": node_name,
-                    "node_kind": node_kind,
-                    "image": image_name,
-                    "is_system": is_archetype_system,
-                    "vcpus": container_vcpus,
-                    "memory_mb": container_memory_mb,
-                })
+            containers_running, containers_total, container_details = (
+                _collect_container_details(client)
+            )
         except Exception as e:
             logger.warning(f"Docker container collection failed: {type(e).__name__}: {e}")
 
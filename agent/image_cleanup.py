@@ -5,8 +5,9 @@ failed or interrupted image transfers. Follows the same pattern as
 NetworkCleanupManager in agent/network/cleanup.py.
 
 Cleanup targets:
-- /tmp/tmp*.tar: Docker image tarballs from receive_image / pull_from_controller
-- {workspace}/*.part-*: Partial file-based image downloads
+- /tmp/tmp*.tar: Docker image tarballs from receive_image
+- {workspace}/**/*.part-*: Partial file-based image downloads and resumable
+  controller pulls (an interrupted pull can resume until its partial is reaped)
 """
 
 from __future__ import annotations
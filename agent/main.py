@@ -262,10 +262,21 @@ async def lifespan(app: FastAPI):
                 listener.start(forward_event_to_controller)
             ))
             logger.info("Docker event listener started")
+            if settings.container_inventory_enabled:
+                from agent.events import get_container_inventory
+                get_container_inventory().start_consistency_check(
+                    settings.container_inventory_resync_interval
+                )
         except Exception as e:
             logger.error(f"Failed to start Docker event listener: {e}")
 
-    # Start carrier state monitor (OVS link_state polling)
+    # Background deep re-verification of cached image checksums
+    _checksum_reverify_task = None
+    if settings.checksum_reverify_interval > 0:
+        from agent.checksum_cache import reverify_loop
+        _checksum_reverify_task = asyncio.create_task(reverify_loop())
+
+    # Start carrier state monitor (OVSDB link_state updates, polling fallback)
     _carrier_monitor = None
     _vm_port_refresh_task = None
     if settings.enable_ovs:
@@ -290,7 +301,11 @@ async def lifespan(app: FastAPI):
                 get_managed_ports=lambda: build_managed_ports(ovs_mgr, plugin, libvirt_prov),
                 notifier=report_carrier_state_change,
             )
-            await _carrier_monitor.start(interval=settings.carrier_monitor_interval)
+            await _carrier_monitor.start(
+                interval=settings.carrier_monitor_interval,
+                resync_interval=settings.carrier_monitor_resync_interval,
+                debounce=settings.carrier_monitor_debounce,
+            )
 
             # Periodic VM port cache refresh (tap devices appear/disappear on deploy/destroy).
             if libvirt_prov is not None:
@@ -325,6 +340,11 @@ async def lifespan(app: FastAPI):
             await listener.stop()
         except Exception:
             pass
+        try:
+            from agent.events import get_container_inventory
+            await get_container_inventory().stop_consistency_check()
+        except Exception:
+            pass
         _state._event_listener_task.cancel()
         try:
             await _state._event_listener_task
@@ -340,6 +360,13 @@ async def lifespan(app: FastAPI):
         finally:
             _state.set_fix_interfaces_task(None)
 
+    if _checksum_reverify_task is not None:
+        _checksum_reverify_task.cancel()
+        try:
+            await _checksum_reverify_task
+        except asyncio.CancelledError:
+            pass
+
     # Stop VM port refresh task
     if _vm_port_refresh_task is not None:
         _vm_port_refresh_task.cancel()
@@ -366,6 +393,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping network backend: {e}")
 
+    # Close the native OVSDB session
+    try:
+        from agent.network.ovsdb import close_ovsdb_client
+        await close_ovsdb_client()
+    except Exception as e:
+        logger.warning(f"Error closing OVSDB client: {e}")
+
     # Stop periodic network cleanup
     try:
         from agent.network.cleanup import get_cleanup_manager
@@ -66,12 +66,18 @@ if PROMETHEUS_AVAILABLE:
         "Managed runtime resources skipped because required identity metadata was missing",
         ["resource_type", "operation", "reason"],
     )
+
+    container_inventory_drift = Counter(
+        "archetype_agent_container_inventory_drift_total",
+        "Container inventory records corrected by the periodic consistency check",
+    )
 else:
     docker_api_duration = DummyMetric()
     ovs_operation_duration = DummyMetric()
     node_operation_duration = DummyMetric()
     node_operation_errors = DummyMetric()
     runtime_identity_skips = DummyMetric()
+    container_inventory_drift = DummyMetric()
 
 
 def get_metrics() -> tuple[bytes, str]:
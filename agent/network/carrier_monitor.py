@@ -1,6 +1,6 @@
 """OVS carrier state monitor.
 
-Polls OVS interface link_state and reports changes to the API controller.
+Watches OVS interface link_state and reports changes to the API controller.
 When a NOS does ``shutdown`` on an interface (clearing IFF_UP), the host-side
 veth peer carrier drops and OVS records ``link_state=down``.  This module
 detects that transition and calls a notifier callback so the API can
@@ -23,6 +23,13 @@ IFF_UP.  The host-side veth then sees carrier drop, the monitor fires a
 new transition, and the cascade propagates back — both sides errdisabled.
 Fix: cEOS post-boot commands disable link-flap errdisable detection
 (see ``vendors.py`` ceos config).
+
+Detection is push-based when the native OVSDB client is available: the
+monitor registers a listener on the client's Interface table replica and
+reports a transition as soon as ovsdb-server sends the update, debounced
+per port so a flap inside the window collapses to its final state.
+Polling remains as a periodic resync at a slower interval, and falls back
+to ``ovs-vsctl`` every *interval* seconds while OVSDB is unreachable.
 """
 from __future__ import annotations
 
@@ -32,6 +39,8 @@ import logging
 from dataclasses import dataclass
 from typing import Any, Callable, Awaitable
 
+from agent.network.ovsdb import OvsdbClient, get_ovsdb_client, optional_value
+
 logger = logging.getLogger(__name__)
 
 
@@ -103,7 +112,7 @@ def build_managed_ports(
 
 
 class CarrierMonitor:
-    """Polls OVS port link_state and reports carrier changes to the API."""
+    """Watches OVS port link_state and reports carrier changes to the API."""
 
     def __init__(
         self,
@@ -126,27 +135,49 @@ class CarrierMonitor:
         self._notifier = notifier
         self._last_link_states: dict[str, str] = {}  # ovs_port_name -> "up"/"down"
         self._task: asyncio.Task | None = None
+        self._ovsdb: OvsdbClient | None = None
+        self._debounce = 0.0
+        # Ports with an OVSDB transition waiting out the debounce window
+        self._pending: dict[str, asyncio.TimerHandle] = {}
+        self._observed: dict[str, str] = {}  # latest pushed link_state per pending port
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    async def start(self, interval: float = 3.0) -> None:
-        """Start polling in a background task."""
+    async def start(
+        self,
+        interval: float = 3.0,
+        resync_interval: float = 30.0,
+        debounce: float = 0.2,
+    ) -> None:
+        """Subscribe to OVSDB link_state updates and start the resync loop.
+
+        Args:
+            interval: Poll interval while OVSDB is unavailable.
+            resync_interval: Poll interval while OVSDB updates are pushed;
+                the poll then only catches anything the stream missed.
+            debounce: Seconds a pushed transition must hold before it is
+                reported.
+        """
         if self._task is not None:
             return
+        self._debounce = debounce
+        await self._ensure_subscribed()
         # Seed initial state so we don't fire spurious transitions.
         await self._seed_initial_state()
-        self._task = asyncio.create_task(self._poll_loop(interval))
+        self._task = asyncio.create_task(self._poll_loop(interval, resync_interval))
         logger.info(
-            "CarrierMonitor started (bridge=%s, interval=%.1fs, tracked=%d ports)",
+            "CarrierMonitor started (bridge=%s, mode=%s, interval=%.1fs, tracked=%d ports)",
             self._bridge,
-            interval,
+            "ovsdb" if self._ovsdb is not None else "poll",
+            resync_interval if self._ovsdb is not None else interval,
             len(self._last_link_states),
         )
 
     def stop(self) -> None:
-        """Cancel the background task."""
+        """Cancel the background task and drop the OVSDB subscription."""
+        self._unsubscribe()
         if self._task is not None:
             self._task.cancel()
             self._task = None
@@ -156,11 +187,20 @@ class CarrierMonitor:
     # Internal
     # ------------------------------------------------------------------
 
-    async def _poll_loop(self, interval: float) -> None:
-        """Run forever, polling OVS every *interval* seconds."""
+    async def _poll_loop(self, interval: float, resync_interval: float | None = None) -> None:
+        """Run forever, polling OVS every *interval* seconds.
+
+        While OVSDB updates are being pushed the loop only resyncs every
+        *resync_interval* seconds. Each cycle also re-subscribes after the
+        OVSDB connection was lost and reconnects.
+        """
         while True:
             try:
-                await asyncio.sleep(interval)
+                subscribed = self._ovsdb is not None and self._ovsdb.is_usable()
+                await asyncio.sleep(
+                    resync_interval if subscribed and resync_interval else interval
+                )
+                await self._ensure_subscribed()
                 await self._poll_once()
             except asyncio.CancelledError:
                 break
@@ -207,28 +247,108 @@ class CarrierMonitor:
 
         # Fire notifications (non-blocking, log errors).
         for port_name, new_state in notifications:
-            carrier_state = "on" if new_state == "up" else "off"
-            info = self._resolve_port(port_name)
-            if info is None:
-                continue
-            lab_id, node_name, interface = info
-            logger.info(
-                "Carrier change detected: %s:%s %s (port=%s)",
+            self._notify(port_name, new_state)
+
+    def _notify(self, port_name: str, new_state: str) -> None:
+        """Dispatch a carrier notification for *port_name* in the background."""
+        carrier_state = "on" if new_state == "up" else "off"
+        info = self._resolve_port(port_name)
+        if info is None:
+            return
+        lab_id, node_name, interface = info
+        logger.info(
+            "Carrier change detected: %s:%s %s (port=%s)",
+            node_name,
+            interface,
+            carrier_state,
+            port_name,
+        )
+        try:
+            asyncio.create_task(
+                self._notifier(lab_id, node_name, interface, carrier_state)
+            )
+        except Exception:
+            logger.exception(
+                "Failed to dispatch carrier notification for %s:%s",
                 node_name,
                 interface,
-                carrier_state,
-                port_name,
             )
-            try:
-                asyncio.create_task(
-                    self._notifier(lab_id, node_name, interface, carrier_state)
-                )
-            except Exception:
-                logger.exception(
-                    "Failed to dispatch carrier notification for %s:%s",
-                    node_name,
-                    interface,
-                )
+
+    # ------------------------------------------------------------------
+    # OVSDB push
+    # ------------------------------------------------------------------
+
+    async def _ensure_subscribed(self) -> None:
+        """Attach the update listener to the shared OVSDB client if needed."""
+        if self._ovsdb is not None and self._ovsdb.is_usable():
+            return
+        self._unsubscribe()
+        client = await get_ovsdb_client()
+        if client is None:
+            return
+        client.add_listener(self._on_ovsdb_update)
+        self._ovsdb = client
+        logger.debug("CarrierMonitor subscribed to OVSDB Interface updates")
+
+    def _unsubscribe(self) -> None:
+        if self._ovsdb is not None:
+            self._ovsdb.remove_listener(self._on_ovsdb_update)
+            self._ovsdb = None
+        for handle in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
+        self._observed.clear()
+
+    def _on_ovsdb_update(
+        self,
+        table: str,
+        uuid: str,
+        old: dict[str, Any] | None,
+        new: dict[str, Any] | None,
+    ) -> None:
+        """OVSDB listener: debounce link_state changes per port."""
+        if table != "Interface":
+            return
+        row = new if new is not None else old
+        port_name = row.get("name") if row else None
+        if not isinstance(port_name, str):
+            return
+        if new is None:
+            # Interface deleted; the next poll prunes its tracking.
+            handle = self._pending.pop(port_name, None)
+            if handle is not None:
+                handle.cancel()
+            self._observed.pop(port_name, None)
+            return
+        state = optional_value(new.get("link_state"))
+        if not isinstance(state, str):
+            return
+        if old is not None:
+            previous = optional_value(old.get("link_state"))
+            if state == previous and port_name not in self._pending:
+                return  # Another monitored column changed
+            if isinstance(previous, str):
+                self._last_link_states.setdefault(port_name, previous)
+        self._observed[port_name] = state
+        handle = self._pending.pop(port_name, None)
+        if handle is not None:
+            handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._pending[port_name] = loop.call_later(self._debounce, self._settle, port_name)
+
+    def _settle(self, port_name: str) -> None:
+        """Report a pushed transition once it has held for the debounce window."""
+        self._pending.pop(port_name, None)
+        current = self._observed.pop(port_name, None)
+        if current is None:
+            return
+        if port_name not in self._get_managed_ports():
+            self._last_link_states.pop(port_name, None)
+            return
+        previous = self._last_link_states.get(port_name)
+        self._last_link_states[port_name] = current
+        if previous is not None and previous != current:
+            self._notify(port_name, current)
 
     # ------------------------------------------------------------------
     # OVS query
@@ -237,8 +357,15 @@ class CarrierMonitor:
     async def _query_ovs_link_states(self) -> dict[str, str]:
         """Batch-query OVS for all interface link_state values.
 
-        Returns ``{port_name: "up"|"down"}``.
+        Served from the OVSDB replica when subscribed, otherwise from
+        ``ovs-vsctl``. Returns ``{port_name: "up"|"down"}``.
         """
+        if self._ovsdb is not None and self._ovsdb.is_usable():
+            return {
+                iface.name: iface.link_state
+                for iface in self._ovsdb.interfaces()
+                if iface.link_state is not None
+            }
         try:
             proc = await asyncio.create_subprocess_exec(
                 "ovs-vsctl",
@@ -47,17 +47,22 @@ import logging
 import os
 import secrets
 import signal
+import time
+from collections.abc import Iterator, Mapping, MutableMapping
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from aiohttp import web
 
 from agent.config import settings
 from agent.network.cmd import run_cmd as _run_cmd
 from agent.network.ovs_vlan_tags import used_vlan_tags_on_bridge_from_ovs_outputs
+from agent.network.ovsdb import OvsdbError, get_ovsdb_client
 
 logger = logging.getLogger(__name__)
 
@@ -87,6 +92,10 @@ PLUGIN_SPEC_PATH = f"/etc/docker/plugins/{PLUGIN_NAME}.spec"
 
 # State persistence path (in workspace directory)
 STATE_PERSISTENCE_FILE = "docker_ovs_plugin_state.json"
+# Journal records tolerated before the state snapshot is rewritten
+STATE_JOURNAL_COMPACT_MIN = 1000
+# Longest wait between retries of a failed batched state save
+STATE_FLUSH_RETRY_MAX = 30.0
 
 # OVS configuration
 OVS_BRIDGE_PREFIX = "ovs-"
@@ -99,6 +108,64 @@ VLAN_RANGE_END = 2049
 LINKED_VLAN_START = 2050
 LINKED_VLAN_END = 4000
 
+# How long the bridge used-tag index may be served before re-reading OVS.
+# Tags the plugin allocates itself are tracked exactly; this only bounds how
+# late a foreign port (libvirt VM, VXLAN tunnel) is noticed.
+BRIDGE_VLAN_INDEX_TTL = 2.0
+
+
+class _TrackedRecord:
+    """Base for persisted records whose field assignments mark them changed.
+
+    ``_on_change`` is bound by the ``_RecordTable`` holding the record.
+    """
+
+    _on_change: Callable[[], None] | None = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name != "_on_change" and self._on_change is not None:
+            self._on_change()
+
+
+class _RecordTable(MutableMapping):
+    """``id -> record`` mapping that notes which ids changed since the last save.
+
+    Behaves like the plain dict it replaces, but storing or deleting a key,
+    or assigning a field of a stored record, adds ``(section, id)`` to the
+    plugin's ``dirty`` log so a save serializes only those records.
+    """
+
+    def __init__(self, section: str, dirty: dict[tuple[str, str], None]):
+        self._records: dict[str, Any] = {}
+        self._section = section
+        self._dirty = dirty
+
+    def __getitem__(self, key: str) -> Any:
+        return self._records[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._records
+
+    def __repr__(self) -> str:
+        return repr(self._records)
+
+    def __setitem__(self, key: str, record: Any) -> None:
+        self._records[key] = record
+        if isinstance(record, _TrackedRecord):
+            record._on_change = partial(self._dirty.__setitem__, (self._section, key), None)
+        self._dirty[(self._section, key)] = None
+
+    def __delitem__(self, key: str) -> None:
+        del self._records[key]
+        self._dirty[(self._section, key)] = None
+
 
 @dataclass
 class LabBridge:
@@ -119,7 +186,7 @@ class LabBridge:
 
 
 @dataclass
-class NetworkState:
+class NetworkState(_TrackedRecord):
     """State for a Docker network (one per interface)."""
 
     network_id: str
@@ -129,7 +196,7 @@ class NetworkState:
 
 
 @dataclass
-class EndpointState:
+class EndpointState(_TrackedRecord):
     """State for a container endpoint."""
 
     endpoint_id: str
@@ -166,6 +233,8 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
     _run_cmd = staticmethod(_run_cmd)
 
     def __init__(self):
+        # (section, id) of networks/endpoints changed since the last save
+        self._dirty_records: dict[tuple[str, str], None] = {}
         self.lab_bridges: dict[str, LabBridge] = {}  # lab_id -> LabBridge
         self.networks: dict[str, NetworkState] = {}  # network_id -> NetworkState
         self.endpoints: dict[str, EndpointState] = {}  # endpoint_id -> EndpointState
@@ -183,14 +252,50 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
         self._global_next_vlan = VLAN_RANGE_START
         self._allocated_linked_vlans: set[int] = set()
         self._global_next_linked_vlan = LINKED_VLAN_START
+        # bridge_name -> (read_at, tags); see _bridge_vlan_index()
+        self._bridge_vlan_cache: dict[str, tuple[float, set[int]]] = {}
 
         # State persistence
         workspace = Path(settings.workspace_path)
         workspace.mkdir(parents=True, exist_ok=True)
         self._state_file = workspace / STATE_PERSISTENCE_FILE
         self._state_dirty = False  # Track if state needs saving
+        # Incremental persistence: what the snapshot + journal on disk hold
+        self._persisted_records: dict[str, dict[str, dict[str, Any]]] | None = None
+        self._persisted_meta: dict[str, Any] = {}
+        self._state_journal_entries = 0
+        # Bumped by every snapshot; journal lines of older ones are ignored
+        self._state_generation = 0
+        self._state_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="plugin-state")
+        self._flush_task: asyncio.Task | None = None
         self._stale_gc_counter = 0  # Counts audit cycles for periodic GC
 
+    def _record_table(self, section: str, records: Mapping[str, Any]) -> _RecordTable:
+        """Build the table for ``section``, marking replaced and new ids changed."""
+        previous = getattr(self, f"_{section}", None)
+        if previous is not None:
+            self._dirty_records.update(dict.fromkeys((section, key) for key in previous))
+        table = _RecordTable(section, self._dirty_records)
+        for key, record in records.items():
+            table[key] = record
+        return table
+
+    @property
+    def networks(self) -> _RecordTable:
+        return self._networks
+
+    @networks.setter
+    def networks(self, records: Mapping[str, NetworkState]) -> None:
+        self._networks = self._record_table("networks", records)
+
+    @property
+    def endpoints(self) -> _RecordTable:
+        return self._endpoints
+
+    @endpoints.setter
+    def endpoints(self, records: Mapping[str, EndpointState]) -> None:
+        self._endpoints = self._record_table("endpoints", records)
+
     @asynccontextmanager
     async def _locked(self):
         """Serialize plugin state mutations without binding locks at __init__."""
@@ -355,7 +460,26 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
         vlan_tag: int,
         external_ids: dict[str, str] | None = None,
     ) -> bool:
-        """Attach a veth to OVS bridge with VLAN tag."""
+        """Attach a veth to OVS bridge with VLAN tag.
+
+        Uses a native OVSDB transaction when available, else ovs-vsctl.
+        """
+        client = await get_ovsdb_client()
+        if client is not None:
+            try:
+                await client.add_port(
+                    bridge_name,
+                    port_name,
+                    tag=vlan_tag,
+                    iface_type="system",
+                    iface_external_ids=external_ids,
+                )
+            except OvsdbError as e:
+                logger.debug(f"OVSDB add-port of {port_name} failed, falling back to ovs-vsctl: {e}")
+            else:
+                await self._run_cmd(["ip", "link", "set", port_name, "up"])
+                return True
+
         ovs_args = [
             "add-port", bridge_name, port_name,
             f"tag={vlan_tag}",
@@ -376,9 +500,34 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
 
     async def _delete_port(self, bridge_name: str, port_name: str) -> None:
         """Delete a port from OVS bridge and remove veth."""
-        await self._ovs_vsctl("--if-exists", "del-port", bridge_name, port_name)
+        client = await get_ovsdb_client()
+        deleted = False
+        if client is not None:
+            try:
+                # Catch up first: the port may have been added moments ago
+                await client.sync()
+                await client.del_port(bridge_name, port_name)
+                deleted = True
+            except OvsdbError as e:
+                logger.debug(f"OVSDB del-port of {port_name} failed, falling back to ovs-vsctl: {e}")
+        if not deleted:
+            await self._ovs_vsctl("--if-exists", "del-port", bridge_name, port_name)
         await self._run_cmd(["ip", "link", "delete", port_name])
 
+    async def _set_port_tag(self, port_name: str, vlan_tag: int) -> tuple[int, str, str]:
+        """Set a port's access VLAN, like ``ovs-vsctl set port <port> tag=<tag>``.
+
+        Returns the ``_ovs_vsctl``-style (code, stdout, stderr) result.
+        """
+        client = await get_ovsdb_client()
+        if client is not None:
+            try:
+                await client.set_port_tag(port_name, vlan_tag, wait=True)
+                return 0, "", ""
+            except OvsdbError as e:
+                logger.debug(f"OVSDB tag update of {port_name} failed, falling back to ovs-vsctl: {e}")
+        return await self._ovs_vsctl("set", "port", port_name, f"tag={vlan_tag}")
+
     def _generate_veth_names(self, endpoint_id: str) -> tuple[str, str]:
         """Generate unique veth pair names (max 15 chars each)."""
         suffix = secrets.token_hex(3)
@@ -391,7 +540,16 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
 
         This is a safety net to prevent VLAN tag collisions across providers
         sharing the same bridge (docker plugin, libvirt VMs, VXLAN tunnels).
+        Served from the OVSDB replica when available, else two CLI dumps.
         """
+        client = await get_ovsdb_client()
+        if client is not None:
+            try:
+                await client.sync()
+                return client.used_vlan_tags_on_bridge(bridge_name)
+            except OvsdbError as e:
+                logger.debug(f"OVSDB tag read failed, falling back to ovs-vsctl: {e}")
+
         code, ports_out, _ = await self._ovs_vsctl("list-ports", bridge_name)
         if code != 0:
             return set()
@@ -412,20 +570,40 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
             list_port_name_tag_csv=csv_out,
         )
 
+    async def _bridge_vlan_index(self, bridge_name: str) -> set[int]:
+        """Return the cached used-tag index for a bridge, refreshing it when stale.
+
+        Allocation runs under the plugin lock, so this keeps full-table OVS
+        reads out of the critical section for all but one call per TTL.
+        """
+        now = time.monotonic()
+        cached = self._bridge_vlan_cache.get(bridge_name)
+        if cached is not None and now - cached[0] < BRIDGE_VLAN_INDEX_TTL:
+            return cached[1]
+        tags = await self._get_used_vlan_tags_on_bridge(bridge_name)
+        self._bridge_vlan_cache[bridge_name] = (now, tags)
+        return tags
+
+    def _vlan_in_use(self, vlan: int, used_on_bridge: set[int]) -> bool:
+        return (
+            vlan in self._allocated_vlans
+            or vlan in self._allocated_linked_vlans
+            or vlan in used_on_bridge
+        )
+
     async def _allocate_vlan(self, lab_bridge: LabBridge) -> int:
         """Allocate next available VLAN tag across all labs.
 
         Prefer the isolated range (100-2049). If exhausted, spill into the
         linked range (2050-4000) to avoid hard failure.
         """
-        used_on_bridge = await self._get_used_vlan_tags_on_bridge(settings.ovs_bridge_name)
-        used_vlans = set(self._allocated_vlans) | set(self._allocated_linked_vlans) | used_on_bridge
+        used_on_bridge = await self._bridge_vlan_index(settings.ovs_bridge_name)
 
         # Pass 1: preferred isolated range
         max_attempts = VLAN_RANGE_END - VLAN_RANGE_START + 1
         vlan = self._global_next_vlan
         for _ in range(max_attempts):
-            if vlan not in used_vlans:
+            if not self._vlan_in_use(vlan, used_on_bridge):
                 self._allocated_vlans.add(vlan)
                 self._global_next_vlan = VLAN_RANGE_START if vlan >= VLAN_RANGE_END else vlan + 1
                 return vlan
@@ -444,7 +622,7 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
         max_attempts = LINKED_VLAN_END - LINKED_VLAN_START + 1
         vlan = self._global_next_linked_vlan
         for _ in range(max_attempts):
-            if vlan not in used_vlans:
+            if not self._vlan_in_use(vlan, used_on_bridge):
                 self._allocated_linked_vlans.add(vlan)
                 self._global_next_linked_vlan = (
                     LINKED_VLAN_START if vlan >= LINKED_VLAN_END else vlan + 1
@@ -473,14 +651,13 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
         is stored in the DB and managed by convergence.
         If linked range is exhausted, spill into isolated range.
         """
-        used_on_bridge = await self._get_used_vlan_tags_on_bridge(settings.ovs_bridge_name)
-        used_vlans = set(self._allocated_linked_vlans) | set(self._allocated_vlans) | used_on_bridge
+        used_on_bridge = await self._bridge_vlan_index(settings.ovs_bridge_name)
 
         # Pass 1: preferred linked range
         max_attempts = LINKED_VLAN_END - LINKED_VLAN_START + 1
         vlan = self._global_next_linked_vlan
         for _ in range(max_attempts):
-            if vlan not in used_vlans:
+            if not self._vlan_in_use(vlan, used_on_bridge):
                 self._allocated_linked_vlans.add(vlan)
                 self._global_next_linked_vlan = (
                     LINKED_VLAN_START if vlan >= LINKED_VLAN_END else vlan + 1
@@ -501,7 +678,7 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
         max_attempts = VLAN_RANGE_END - VLAN_RANGE_START + 1
         vlan = self._global_next_vlan
         for _ in range(max_attempts):
-            if vlan not in used_vlans:
+            if not self._vlan_in_use(vlan, used_on_bridge):
                 self._allocated_vlans.add(vlan)
                 self._global_next_vlan = VLAN_RANGE_START if vlan >= VLAN_RANGE_END else vlan + 1
                 return vlan
@@ -997,9 +1174,7 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
                 raise ValueError(f"Endpoint not found for {container_name}:{interface_name}")
 
             # Set endpoint to same VLAN as external interface
-            code, _, stderr = await self._ovs_vsctl(
-                "set", "port", endpoint.host_veth, f"tag={vlan_tag}"
-            )
+            code, _, stderr = await self._set_port_tag(endpoint.host_veth, vlan_tag)
             if code != 0:
                 raise RuntimeError(f"Failed to set VLAN: {stderr}")
 
@@ -1493,7 +1668,9 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
                 self.networks[network_id] = network
                 lab_bridge.network_ids.add(network_id)
 
-                await self._mark_dirty_and_save()
+                # Written now: no OVS port records a network until its
+                # first endpoint, so startup recovery could not rebuild it
+                await self._mark_dirty_and_save(immediate=True)
 
                 logger.info(f"Network {network_id[:12]} created on bridge {lab_bridge.bridge_name}")
 
@@ -1532,6 +1709,8 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
         network_id = data.get("NetworkID", "")
         endpoint_id = data.get("EndpointID", "")
 
+        # Only VLAN reservation and state mutation run under the plugin lock;
+        # veth/OVS work for concurrent CreateEndpoint calls overlaps.
         async with self._locked():
             network = self.networks.get(network_id)
             if not network:
@@ -1545,23 +1724,7 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
 
             vlan_tag = await self._allocate_vlan(lab_bridge)
 
-            if not await self._create_veth_pair(host_veth, cont_veth):
-                return web.json_response({"Err": "Failed to create veth pair"})
-
-            if not await self._attach_to_ovs(
-                network.bridge_name,
-                host_veth,
-                vlan_tag,
-                external_ids={
-                    "archetype.endpoint_id": endpoint_id,
-                    "archetype.interface_name": network.interface_name,
-                    "archetype.lab_id": network.lab_id,
-                    "archetype.network_id": network_id,
-                },
-            ):
-                await self._run_cmd(["ip", "link", "delete", host_veth])
-                return web.json_response({"Err": "Failed to attach to OVS"})
-
+            # Tracked up front so orphan-port cleanup leaves the new port alone
             endpoint = EndpointState(
                 endpoint_id=endpoint_id,
                 network_id=network_id,
@@ -1572,14 +1735,37 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
             )
             self.endpoints[endpoint_id] = endpoint
 
+        error = None
+        if not await self._create_veth_pair(host_veth, cont_veth):
+            error = "Failed to create veth pair"
+        elif not await self._attach_to_ovs(
+            network.bridge_name,
+            host_veth,
+            vlan_tag,
+            external_ids={
+                "archetype.endpoint_id": endpoint_id,
+                "archetype.interface_name": network.interface_name,
+                "archetype.lab_id": network.lab_id,
+                "archetype.network_id": network_id,
+            },
+        ):
+            await self._run_cmd(["ip", "link", "delete", host_veth])
+            error = "Failed to attach to OVS"
+
+        async with self._locked():
+            if error:
+                if self.endpoints.get(endpoint_id) is endpoint:
+                    del self.endpoints[endpoint_id]
+                self._release_vlan(vlan_tag)
+                return web.json_response({"Err": error})
             self._touch_lab(network.lab_id)
 
-            await self._mark_dirty_and_save()
+        await self._mark_dirty_and_save()
 
-            logger.info(
-                f"Created endpoint {endpoint_id[:12]}: {host_veth} <-> {cont_veth} "
-                f"({network.interface_name}, VLAN {vlan_tag})"
-            )
+        logger.info(
+            f"Created endpoint {endpoint_id[:12]}: {host_veth} <-> {cont_veth} "
+            f"({network.interface_name}, VLAN {vlan_tag})"
+        )
 
         return web.json_response({"Interface": {}})
 
@@ -1754,9 +1940,10 @@ class DockerOVSPlugin(PluginStateMixin, PluginVlanMixin):
         await self._stop_endpoint_binding_audit()
 
         # Save final state
-        if self._state_dirty or True:  # Always save on shutdown
-            logger.info("Saving plugin state before shutdown...")
-            await self._save_state()
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        logger.info("Saving plugin state before shutdown...")
+        await self._save_state(snapshot=True)  # Always save on shutdown
 
         logger.info("Docker OVS plugin shutdown complete")
 
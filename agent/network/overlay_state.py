@@ -15,6 +15,7 @@ from typing import Any, TYPE_CHECKING
 
 from agent.config import settings
 from agent.network import cmd as _cmd
+from agent.network.ovsdb import Interface, OvsdbClient, OvsdbError, get_ovsdb_client
 
 if TYPE_CHECKING:
     from agent.network.overlay import OverlayManager
@@ -22,12 +23,37 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+def _read_ovs_ports_from_ovsdb(
+    client: OvsdbClient, bridge_name: str,
+) -> dict[str, dict[str, Any]] | None:
+    """Build the batch_read_ovs_ports() result from the OVSDB replica."""
+    if client.get_bridge(bridge_name) is None:
+        return None
+    interfaces = client.rows("Interface")
+    result: dict[str, dict[str, Any]] = {}
+    for port in client.bridge_ports(bridge_name):
+        if not port.name.startswith("vxlan"):
+            continue
+        iface = next(
+            (Interface.from_row(u, interfaces[u]) for u in port.interfaces if u in interfaces),
+            None,
+        )
+        result[port.name] = {
+            "name": port.name,
+            "tag": port.tag if isinstance(port.tag, int) and port.tag > 0 else 0,
+            "type": iface.type if iface else "",
+            "ofport": iface.ofport if iface and isinstance(iface.ofport, int) else -1,
+        }
+    return result
+
+
 async def batch_read_ovs_ports(bridge_name: str) -> dict[str, dict[str, Any]] | None:
     """Read all VXLAN port state from OVS using batch JSON queries.
 
-    Scopes to *bridge_name* first (``list-ports``), then reads Port and
-    Interface details in two batch calls — 3 total subprocesses regardless
-    of port count.
+    Served from the OVSDB replica when available. Otherwise scopes to
+    *bridge_name* first (``list-ports``), then reads Port and Interface
+    details in two batch calls — 3 total subprocesses regardless of port
+    count.
 
     Args:
         bridge_name: OVS bridge name to query
@@ -37,6 +63,14 @@ async def batch_read_ovs_ports(bridge_name: str) -> dict[str, dict[str, Any]] |
         ``None`` if OVS could not be queried (callers must not treat
         this as "no ports exist").
     """
+    client = await get_ovsdb_client()
+    if client is not None:
+        try:
+            await client.sync()
+            return _read_ovs_ports_from_ovsdb(client, bridge_name)
+        except OvsdbError as e:
+            logger.debug(f"OVSDB port read failed, falling back to ovs-vsctl: {e}")
+
     result: dict[str, dict[str, Any]] = {}
 
     # Step 0: scope to ports on this bridge only
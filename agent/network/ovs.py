@@ -39,8 +39,13 @@ A:eth2 has tag=1002 (isolated, no peer until connected)
 from __future__ import annotations
 
 import asyncio
+import itertools
 import json
 import logging
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, MutableMapping
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -59,6 +64,7 @@ from agent.network.ovs_provision import (
     host_veth_peer_missing as _host_veth_peer_missing_impl,
     is_port_stale as _is_port_stale_impl,
     provision_interface as _provision_interface_impl,
+    provision_interfaces as _provision_interfaces_impl,
 )
 
 
@@ -106,15 +112,87 @@ class OVSLink:
         return f"{self.lab_id}:{self.link_id}"
 
 
+class _VlanTable(MutableMapping):
+    """``key -> VLAN`` mapping with a reverse index and a log of unsaved changes.
+
+    Behaves like the plain dict it replaces (callers restore allocations by
+    assigning into it directly), but every write is indexed by VLAN and
+    recorded in ``changes`` so the allocator can journal it.
+    """
+
+    def __init__(self, on_free: Callable[[int], None]):
+        self._by_key: dict[str, int] = {}
+        self._by_vlan: dict[int, set[str]] = {}
+        self._on_free = on_free
+        self.changes: list[tuple[str, int | None]] = []  # (key, vlan or None if removed)
+
+    def __getitem__(self, key: str) -> int:
+        return self._by_key[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_key)
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._by_key
+
+    def __repr__(self) -> str:
+        return repr(self._by_key)
+
+    def __setitem__(self, key: str, vlan: int) -> None:
+        old = self._by_key.get(key)
+        if old == vlan:
+            return
+        if old is not None:
+            self._unindex(key, old)
+        self._by_key[key] = vlan
+        self._by_vlan.setdefault(vlan, set()).add(key)
+        self.changes.append((key, vlan))
+
+    def __delitem__(self, key: str) -> None:
+        vlan = self._by_key.pop(key)
+        self._unindex(key, vlan)
+        self.changes.append((key, None))
+
+    def _unindex(self, key: str, vlan: int) -> None:
+        keys = self._by_vlan.get(vlan)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self._by_vlan[vlan]
+            self._on_free(vlan)
+
+    def in_use(self, vlan: int) -> bool:
+        return vlan in self._by_vlan
+
+    def keys_for(self, vlan: int) -> list[str]:
+        return list(self._by_vlan.get(vlan, ()))
+
+
 class VlanAllocator:
     """Allocates unique VLAN tags for interface isolation.
 
-    Allocations are persisted to disk to survive agent restarts.
+    Free VLANs are kept in a queue in allocation order (released tags go to
+    the back, so they are reused last) and in-use VLANs are indexed by tag,
+    so allocate/release are O(1) regardless of how many ports exist.
+
+    Allocations are persisted to disk to survive agent restarts: a compact
+    snapshot (``vlan_allocations.json``) plus an append-only journal of
+    changes since it. Each allocate/release appends one record; bulk calls
+    (``allocate_many``, ``release_lab``, ``batch()``) append one block with a
+    single fsync. The journal is folded into a new snapshot once it grows
+    past ``JOURNAL_COMPACT_THRESHOLD`` records.
+
     On startup, the allocator recovers state from:
-    1. Persisted allocation file (if exists)
+    1. Persisted snapshot + journal (if present)
     2. Querying OVS for existing port VLAN tags
     """
 
+    JOURNAL_COMPACT_THRESHOLD = 1000
+
     def __init__(
         self,
         start: int = VLAN_START,
@@ -123,8 +201,14 @@ class VlanAllocator:
     ):
         self._start = start
         self._end = end
-        self._allocated: dict[str, int] = {}  # key -> vlan
-        self._next_vlan = start
+        self._free: deque[int] = deque()
+        self._table = _VlanTable(self._release_vlan)
+        self._cursor = start
+        self._batch_depth = 0
+        self._snapshot_pending = False
+        self._journal_entries = 0
+        # Bumped by every snapshot; journal records of older ones are ignored
+        self._generation = 0
 
         # Persistence file path
         if persistence_path is None:
@@ -132,53 +216,184 @@ class VlanAllocator:
             workspace.mkdir(parents=True, exist_ok=True)
             persistence_path = workspace / "vlan_allocations.json"
         self._persistence_path = persistence_path
+        self._journal_path = persistence_path.with_suffix(".journal")
 
         # Load persisted state on init
         self._load_from_disk()
+        self._rebuild_free_list()
 
-    def _load_from_disk(self) -> None:
-        """Load allocations from persistence file."""
-        if not self._persistence_path.exists():
+    @property
+    def _allocated(self) -> _VlanTable:
+        return self._table
+
+    @_allocated.setter
+    def _allocated(self, allocations: dict[str, int]) -> None:
+        self._table = _VlanTable(self._release_vlan)
+        for key, vlan in allocations.items():
+            self._table[key] = vlan
+        self._table.changes.clear()
+        self._snapshot_pending = True
+        self._rebuild_free_list()
+
+    @property
+    def _next_vlan(self) -> int:
+        return self._cursor
+
+    @_next_vlan.setter
+    def _next_vlan(self, vlan: int) -> None:
+        self._cursor = vlan
+        self._rebuild_free_list()
+
+    # ------------------------------------------------------------------
+    # Free list
+    # ------------------------------------------------------------------
+
+    def _rebuild_free_list(self) -> None:
+        """Queue every free VLAN, starting at the cursor and wrapping."""
+        cursor = self._cursor if self._start <= self._cursor <= self._end else self._start
+        order = itertools.chain(range(cursor, self._end + 1), range(self._start, cursor))
+        self._free = deque(v for v in order if not self._table.in_use(v))
+
+    def _release_vlan(self, vlan: int) -> None:
+        """Return a VLAN whose last key was removed to the back of the queue."""
+        if not (self._start <= vlan <= self._end):
             return
+        self._free.append(vlan)
+        # Entries are validated lazily on take; rebuild if stale ones pile up
+        if len(self._free) > 2 * (self._end - self._start + 1):
+            self._rebuild_free_list()
+
+    def _take_vlan(self) -> int:
+        while self._free:
+            vlan = self._free.popleft()
+            if not self._table.in_use(vlan):
+                self._cursor = vlan + 1 if vlan < self._end else self._start
+                return vlan
+        raise RuntimeError("No VLANs available")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
 
-        try:
-            with open(self._persistence_path, "r") as f:
-                data = json.load(f)
+    def _load_from_disk(self) -> None:
+        """Load the snapshot and replay the journal written after it."""
+        if self._persistence_path.exists():
+            try:
+                with open(self._persistence_path, "r") as f:
+                    data = json.load(f)
 
-            self._allocated = data.get("allocations", {})
-            self._next_vlan = data.get("next_vlan", self._start)
+                for key, vlan in data.get("allocations", {}).items():
+                    if self._start <= vlan <= self._end:
+                        self._table[key] = vlan
+                    else:
+                        logger.warning(f"Ignoring out-of-range VLAN allocation: {key}={vlan}")
+                self._cursor = data.get("next_vlan", self._start)
+                self._generation = data.get("generation", 0)
 
-            # Validate loaded VLANs are in range
-            valid_allocations = {}
-            for key, vlan in self._allocated.items():
-                if self._start <= vlan <= self._end:
-                    valid_allocations[key] = vlan
-                else:
-                    logger.warning(f"Ignoring out-of-range VLAN allocation: {key}={vlan}")
-
-            self._allocated = valid_allocations
-            logger.info(f"Loaded {len(self._allocated)} VLAN allocations from disk")
+            except Exception as e:
+                logger.warning(f"Failed to load VLAN allocations from disk: {e}")
+                self._table = _VlanTable(self._release_vlan)
+                self._snapshot_pending = True
+        else:
+            # Journal records are only appended on top of a snapshot
+            self._snapshot_pending = True
+
+        replayed = self._replay_journal()
+        self._table.changes.clear()
+        if self._table or replayed:
+            logger.info(
+                f"Loaded {len(self._table)} VLAN allocations from disk "
+                f"({replayed} journal records)"
+            )
 
+    def _replay_journal(self) -> int:
+        if not self._journal_path.exists():
+            return 0
+        replayed = 0
+        try:
+            with open(self._journal_path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final write from a crash; everything before it is intact
+                        break
+                    if record.get("g", 0) != self._generation:
+                        # Extends an older snapshot: the crash hit before its truncate
+                        continue
+                    key, vlan = record["k"], record.get("v")
+                    if vlan is None:
+                        self._table.pop(key, None)
+                    elif self._start <= vlan <= self._end:
+                        self._table[key] = vlan
+                    if "n" in record:
+                        self._cursor = record["n"]
+                    replayed += 1
         except Exception as e:
-            logger.warning(f"Failed to load VLAN allocations from disk: {e}")
-            self._allocated = {}
+            logger.warning(f"Failed to replay VLAN allocation journal: {e}")
+        self._journal_entries = replayed
+        return replayed
 
     def _save_to_disk(self) -> None:
-        """Save allocations to persistence file."""
+        """Write a snapshot of all allocations and truncate the journal."""
         try:
+            generation = self._generation + 1
             data = {
-                "allocations": self._allocated,
-                "next_vlan": self._next_vlan,
+                "generation": generation,
+                "allocations": dict(self._table),
+                "next_vlan": self._cursor,
             }
             # Write atomically via temp file
             tmp_path = self._persistence_path.with_suffix(".tmp")
             with open(tmp_path, "w") as f:
-                json.dump(data, f, indent=2)
+                json.dump(data, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
             tmp_path.rename(self._persistence_path)
+            self._generation = generation
+            with open(self._journal_path, "w"):
+                pass
+            self._journal_entries = 0
+            self._table.changes.clear()
+            self._snapshot_pending = False
 
         except Exception as e:
             logger.warning(f"Failed to save VLAN allocations to disk: {e}")
 
+    def _commit(self) -> None:
+        """Persist changes made since the last commit (deferred inside batch())."""
+        if self._batch_depth:
+            return
+        changes = self._table.changes
+        if self._snapshot_pending or (
+            self._journal_entries + len(changes) > self.JOURNAL_COMPACT_THRESHOLD
+        ):
+            self._save_to_disk()
+            return
+        if not changes:
+            return
+        try:
+            records = [{"g": self._generation, "k": key, "v": vlan} for key, vlan in changes]
+            records[-1]["n"] = self._cursor
+            with open(self._journal_path, "a") as f:
+                f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_entries += len(records)
+            changes.clear()
+        except Exception as e:
+            logger.warning(f"Failed to journal VLAN allocations: {e}")
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Defer persistence of every change in the block to one write."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            self._commit()
+
     async def recover_from_ovs(self, bridge_name: str) -> int:
         """Scan OVS bridge ports and recover VLAN allocations.
 
@@ -192,7 +407,6 @@ class VlanAllocator:
             Number of VLANs recovered from OVS state
         """
         recovered = 0
-        used_vlans = set(self._allocated.values())
 
         try:
             # List all ports on the bridge
@@ -229,18 +443,17 @@ class VlanAllocator:
 
                 try:
                     vlan = int(tag_str)
-                    if self._start <= vlan <= self._end and vlan not in used_vlans:
+                    if self._start <= vlan <= self._end and not self._table.in_use(vlan):
                         # Found an in-use VLAN not in our allocations
                         placeholder_key = f"_recovered:{port_name}"
-                        self._allocated[placeholder_key] = vlan
-                        used_vlans.add(vlan)
+                        self._table[placeholder_key] = vlan
                         recovered += 1
                         logger.debug(f"Recovered VLAN {vlan} from OVS port {port_name}")
                 except ValueError:
                     continue
 
             if recovered > 0:
-                self._save_to_disk()
+                self._commit()
                 logger.info(f"Recovered {recovered} VLANs from OVS state")
 
         except Exception as e:
@@ -268,15 +481,15 @@ class VlanAllocator:
                 }
 
             keys_to_remove = [
-                k for k in self._allocated.keys()
+                k for k in self._table
                 if k.startswith("_recovered:") and k.split(":", 1)[1] not in existing_ports
             ]
             for key in keys_to_remove:
-                del self._allocated[key]
+                del self._table[key]
                 removed += 1
 
             if removed > 0:
-                self._save_to_disk()
+                self._commit()
                 logger.info(f"Pruned {removed} recovered VLAN allocations")
 
         except Exception as e:
@@ -297,41 +510,68 @@ class VlanAllocator:
             RuntimeError: If no VLANs available
         """
         # Return existing allocation
-        if key in self._allocated:
-            return self._allocated[key]
-
-        # Find next available VLAN
-        used_vlans = set(self._allocated.values())
-        attempts = 0
-        while self._next_vlan in used_vlans:
-            self._next_vlan += 1
-            if self._next_vlan > self._end:
-                self._next_vlan = self._start
-            attempts += 1
-            if attempts > (self._end - self._start):
-                raise RuntimeError("No VLANs available")
-
-        vlan = self._next_vlan
-        self._allocated[key] = vlan
-        self._next_vlan += 1
-        if self._next_vlan > self._end:
-            self._next_vlan = self._start
-
-        # Persist allocation
-        self._save_to_disk()
+        vlan = self._table.get(key)
+        if vlan is not None:
+            return vlan
 
+        vlan = self._take_vlan()
+        self._table[key] = vlan
+        self._commit()
         return vlan
 
+    def allocate_many(self, keys: Iterable[str]) -> dict[str, int]:
+        """Allocate VLAN tags for several keys with one persistence step.
+
+        Raises:
+            RuntimeError: If the range runs out; nothing from this call is kept
+        """
+        result: dict[str, int] = {}
+        added: list[str] = []
+        # Unsaved changes from an enclosing batch() must survive a rollback
+        mark = len(self._table.changes)
+        cursor = self._cursor
+        try:
+            for key in keys:
+                vlan = self._table.get(key)
+                if vlan is None:
+                    vlan = self._take_vlan()
+                    self._table[key] = vlan
+                    added.append(key)
+                result[key] = vlan
+        except RuntimeError:
+            for key in added:
+                del self._table[key]
+            del self._table.changes[mark:]
+            self._cursor = cursor
+            self._rebuild_free_list()
+            raise
+        self._commit()
+        return result
+
     def release(self, key: str) -> int | None:
         """Release a VLAN allocation.
 
         Returns the released VLAN or None if not found.
         """
-        vlan = self._allocated.pop(key, None)
+        vlan = self._table.pop(key, None)
         if vlan is not None:
-            self._save_to_disk()
+            self._commit()
         return vlan
 
+    def release_many(self, keys: Iterable[str]) -> int:
+        """Release several allocations with one persistence step.
+
+        Returns:
+            Number of allocations released
+        """
+        released = 0
+        for key in keys:
+            if self._table.pop(key, None) is not None:
+                released += 1
+        if released:
+            self._commit()
+        return released
+
     def release_lab(self, lab_id: str) -> int:
         """Release all VLAN allocations for a lab.
 
@@ -344,31 +584,27 @@ class VlanAllocator:
         # Keys are in format "container:interface"
         # Container names are "archetype-{lab_id}-{node}"
         prefix = f"archetype-{lab_id[:20]}"
-        keys_to_remove = [k for k in self._allocated if k.startswith(prefix)]
+        released = self.release_many([k for k in self._table if k.startswith(prefix)])
 
-        for key in keys_to_remove:
-            del self._allocated[key]
-
-        if keys_to_remove:
-            self._save_to_disk()
-            logger.info(f"Released {len(keys_to_remove)} VLAN allocations for lab {lab_id}")
+        if released:
+            logger.info(f"Released {released} VLAN allocations for lab {lab_id}")
 
-        return len(keys_to_remove)
+        return released
 
     def get_vlan(self, key: str) -> int | None:
         """Get VLAN for a key, or None if not allocated."""
-        return self._allocated.get(key)
+        return self._table.get(key)
 
     def get_keys_for_vlan(self, vlan: int) -> list[str]:
         """Get all keys using a specific VLAN tag."""
-        return [k for k, v in self._allocated.items() if v == vlan]
+        return self._table.keys_for(vlan)
 
     def get_stats(self) -> dict[str, Any]:
         """Get allocator statistics for monitoring."""
         return {
-            "total_allocated": len(self._allocated),
+            "total_allocated": len(self._table),
             "vlan_range": f"{self._start}-{self._end}",
-            "next_vlan": self._next_vlan,
+            "next_vlan": self._cursor,
             "persistence_path": str(self._persistence_path),
         }
 
@@ -553,6 +789,19 @@ class OVSNetworkManager:
             self, container_name, interface_name, lab_id, node_name=node_name,
         )
 
+    async def provision_interfaces(
+        self,
+        container_name: str,
+        interface_names: list[str],
+        lab_id: str,
+    ) -> dict[str, int]:
+        """Provision several interfaces of one container, reserving their VLANs at once.
+
+        Returns:
+            Dict of provisioned interface name -> VLAN tag
+        """
+        return await _provision_interfaces_impl(self, container_name, interface_names, lab_id)
+
     async def hot_connect(
         self,
         container_a: str,
@@ -873,31 +1122,32 @@ class OVSNetworkManager:
             del self._links[link_key]
             result["links_deleted"] += 1
 
-        # Delete ports
-        for key, port in ports_to_delete:
-            try:
-                # Remove from OVS
-                await self._ovs_vsctl(
-                    "--if-exists", "del-port", self._bridge_name, port.port_name
-                )
+        # Delete ports (VLAN releases are persisted once, at the end)
+        with self._vlan_allocator.batch():
+            for key, port in ports_to_delete:
+                try:
+                    # Remove from OVS
+                    await self._ovs_vsctl(
+                        "--if-exists", "del-port", self._bridge_name, port.port_name
+                    )
 
-                # Delete veth
-                await self._run_cmd(["ip", "link", "delete", port.port_name])
+                    # Delete veth
+                    await self._run_cmd(["ip", "link", "delete", port.port_name])
 
-                # Release VLAN
-                self._vlan_allocator.release(key)
+                    # Release VLAN
+                    self._vlan_allocator.release(key)
 
-                # Remove from tracking
-                del self._ports[key]
+                    # Remove from tracking
+                    del self._ports[key]
 
-                result["ports_deleted"] += 1
+                    result["ports_deleted"] += 1
 
-            except Exception as e:
-                result["errors"].append(f"Port {key}: {e}")
+                except Exception as e:
+                    result["errors"].append(f"Port {key}: {e}")
 
-        # Release any remaining VLAN allocations for this lab
-        # (handles allocations that may not have tracked ports)
-        result["vlans_released"] = self._vlan_allocator.release_lab(lab_id)
+            # Release any remaining VLAN allocations for this lab
+            # (handles allocations that may not have tracked ports)
+            result["vlans_released"] = self._vlan_allocator.release_lab(lab_id)
         try:
             result["vlans_recovered_pruned"] = await self._vlan_allocator.prune_recovered_from_ovs(
                 self._bridge_name
@@ -409,6 +409,42 @@ async def provision_interface(
         raise RuntimeError(f"Failed to provision interface: {e}")
 
 
+async def provision_interfaces(
+    mgr: OVSNetworkManager,
+    container_name: str,
+    interface_names: list[str],
+    lab_id: str,
+) -> dict[str, int]:
+    """Provision several interfaces of one container.
+
+    VLAN tags for all of them are allocated with a single persistence step
+    before any veth is created. Interfaces that fail are logged and skipped,
+    and their reserved tags are released.
+
+    Returns:
+        Dict of provisioned interface name -> VLAN tag
+    """
+    allocator = mgr._vlan_allocator
+    keys = [f"{container_name}:{name}" for name in interface_names]
+    reserved = [key for key in keys if allocator.get_vlan(key) is None]
+    try:
+        allocator.allocate_many(keys)
+    except RuntimeError as e:
+        # Not enough tags for all of them; provision one by one
+        logger.warning(f"Could not reserve VLANs for {container_name}: {e}")
+        reserved = []
+
+    provisioned: dict[str, int] = {}
+    for name in interface_names:
+        try:
+            provisioned[name] = await provision_interface(mgr, container_name, name, lab_id)
+        except Exception as e:
+            logger.warning(f"Failed to provision OVS interface {name}: {e}")
+
+    allocator.release_many(key for key in reserved if key not in mgr._ports)
+    return provisioned
+
+
 # ---------------------------------------------------------------------------
 # Port deletion
 # ---------------------------------------------------------------------------
@@ -0,0 +1,653 @@
+"""Async OVSDB JSON-RPC client (RFC 7047).
+
+Talks to ovsdb-server directly over its unix socket instead of forking
+``ovs-vsctl`` for every operation. A single long-lived connection keeps a
+locally replicated copy of the Bridge, Port, Interface and Open_vSwitch
+tables through a ``monitor`` session, so reads are served from memory and
+writes are one ``transact`` round trip.
+
+Usage:
+    client = await get_ovsdb_client()
+    if client is not None:
+        await client.sync()
+        tags = client.used_vlan_tags_on_bridge("arch-ovs")
+
+``get_ovsdb_client()`` returns None when the socket is unavailable (no OVS,
+insufficient permissions, disabled in settings); callers keep their
+``ovs-vsctl`` path as the fallback.
+
+Monitor updates are applied by a background reader in the order the server
+sends them. ``sync()`` round-trips an ``echo`` so that every update the
+server queued before it (e.g. for a change just made by ``ovs-vsctl``) has
+been applied to the cache when it returns.
+"""
+from __future__ import annotations
+
+import asyncio
+import codecs
+import itertools
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from agent.config import settings
+
+logger = logging.getLogger(__name__)
+
+DATABASE = "Open_vSwitch"
+
+# Columns replicated locally; everything the typed accessors expose.
+MONITORED_COLUMNS: dict[str, list[str]] = {
+    "Open_vSwitch": ["next_cfg", "cur_cfg"],
+    "Bridge": ["name", "ports"],
+    "Port": ["name", "tag", "interfaces", "external_ids"],
+    "Interface": ["name", "type", "ofport", "link_state", "options", "external_ids"],
+}
+
+# Callback(table, uuid, old_row, new_row); old_row is None on insert and
+# new_row is None on delete.
+UpdateListener = Callable[[str, str, "dict[str, Any] | None", "dict[str, Any] | None"], None]
+
+
+class OvsdbError(Exception):
+    """An OVSDB request failed or the connection was lost."""
+
+
+# =============================================================================
+# Datum encoding
+# =============================================================================
+
+
+def to_python(datum: Any) -> Any:
+    """Convert an OVSDB wire datum to plain Python values.
+
+    ``["set", [...]]`` becomes a list, ``["map", [[k, v], ...]]`` a dict and
+    ``["uuid", "..."]`` the uuid string. Atoms pass through unchanged.
+    """
+    if isinstance(datum, list) and len(datum) == 2:
+        kind, value = datum
+        if kind == "set":
+            return [to_python(v) for v in value]
+        if kind == "map":
+            return {to_python(k): to_python(v) for k, v in value}
+        if kind in ("uuid", "named-uuid"):
+            return value
+    return datum
+
+
+def set_values(datum: Any) -> list[Any]:
+    """Return a set-typed column as a list (a 1-element set may be an atom)."""
+    value = to_python(datum)
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def optional_value(datum: Any) -> Any:
+    """Return an optional (0..1) column value, None when empty."""
+    values = set_values(datum)
+    return values[0] if values else None
+
+
+def set_datum(values: list[Any]) -> list:
+    """Encode a Python list as an OVSDB set."""
+    return ["set", list(values)]
+
+
+def map_datum(values: dict[str, str]) -> list:
+    """Encode a Python dict as an OVSDB map."""
+    return ["map", [[k, v] for k, v in values.items()]]
+
+
+def uuid_datum(uuid: str) -> list:
+    return ["uuid", uuid]
+
+
+def named_uuid(name: str) -> list:
+    return ["named-uuid", name]
+
+
+# =============================================================================
+# Typed rows
+# =============================================================================
+
+
+@dataclass(frozen=True)
+class Bridge:
+    uuid: str
+    name: str
+    ports: frozenset[str] = frozenset()  # Port row uuids
+
+    @classmethod
+    def from_row(cls, uuid: str, row: dict[str, Any]) -> "Bridge":
+        return cls(uuid=uuid, name=row.get("name", ""), ports=frozenset(set_values(row.get("ports"))))
+
+
+@dataclass(frozen=True)
+class Port:
+    uuid: str
+    name: str
+    tag: int | None = None
+    interfaces: frozenset[str] = frozenset()  # Interface row uuids
+    external_ids: dict[str, str] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def from_row(cls, uuid: str, row: dict[str, Any]) -> "Port":
+        return cls(
+            uuid=uuid,
+            name=row.get("name", ""),
+            tag=optional_value(row.get("tag")),
+            interfaces=frozenset(set_values(row.get("interfaces"))),
+            external_ids=to_python(row.get("external_ids")) or {},
+        )
+
+
+@dataclass(frozen=True)
+class Interface:
+    uuid: str
+    name: str
+    type: str = ""
+    ofport: int | None = None
+    link_state: str | None = None
+    options: dict[str, str] = field(default_factory=dict, compare=False)
+    external_ids: dict[str, str] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def from_row(cls, uuid: str, row: dict[str, Any]) -> "Interface":
+        return cls(
+            uuid=uuid,
+            name=row.get("name", ""),
+            type=row.get("type", "") or "",
+            ofport=optional_value(row.get("ofport")),
+            link_state=optional_value(row.get("link_state")),
+            options=to_python(row.get("options")) or {},
+            external_ids=to_python(row.get("external_ids")) or {},
+        )
+
+
+# =============================================================================
+# Client
+# =============================================================================
+
+
+class OvsdbClient:
+    """JSON-RPC session with a replicated cache of the monitored tables."""
+
+    def __init__(self, remote: str | None = None, database: str = DATABASE):
+        """Initialize the client.
+
+        Args:
+            remote: ``unix:<path>`` or ``tcp:<host>:<port>``
+            database: Database name to transact against
+        """
+        self.remote = remote or settings.ovsdb_remote
+        self.database = database
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._read_task: asyncio.Task | None = None
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._tables: dict[str, dict[str, dict[str, Any]]] = {}
+        self._listeners: list[UpdateListener] = []
+        self._updated = asyncio.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._read_task is not None and not self._read_task.done()
+
+    def is_usable(self) -> bool:
+        """Connected and bound to the running event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return self.is_connected and self._loop is loop and not loop.is_closed()
+
+    # -------------------------------------------------------------------------
+    # Connection
+    # -------------------------------------------------------------------------
+
+    async def connect(self, timeout: float = 5.0) -> None:
+        """Open the session and load the monitored tables.
+
+        Raises:
+            OvsdbError: The server is unreachable or rejected the monitor
+        """
+        try:
+            if self.remote.startswith("unix:"):
+                opener = asyncio.open_unix_connection(self.remote[len("unix:"):])
+            elif self.remote.startswith("tcp:"):
+                host, _, port = self.remote[len("tcp:"):].rpartition(":")
+                opener = asyncio.open_connection(host, int(port))
+            else:
+                raise OvsdbError(f"Unsupported OVSDB remote: {self.remote}")
+            self._reader, self._writer = await asyncio.wait_for(opener, timeout=timeout)
+        except OvsdbError:
+            raise
+        except (OSError, asyncio.TimeoutError, ValueError) as e:
+            raise OvsdbError(f"Cannot connect to {self.remote}: {e}") from e
+
+        self._loop = asyncio.get_running_loop()
+        self._updated = asyncio.Event()
+        self._read_task = asyncio.create_task(self._read_loop())
+        try:
+            await asyncio.wait_for(self.monitor(MONITORED_COLUMNS), timeout=timeout)
+        except (OvsdbError, asyncio.TimeoutError) as e:
+            await self.close()
+            raise OvsdbError(f"OVSDB monitor failed on {self.remote}: {e}") from e
+        logger.info(f"Connected to OVSDB at {self.remote}")
+
+    async def close(self) -> None:
+        """Close the session and drop the cache."""
+        if self._read_task is not None:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._read_task = None
+        if self._writer is not None:
+            try:
+                self._writer.close()
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+            self._writer = None
+        self._fail_pending(OvsdbError("OVSDB connection closed"))
+        self._tables.clear()
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    # -------------------------------------------------------------------------
+    # JSON-RPC
+    # -------------------------------------------------------------------------
+
+    def _send(self, message: dict[str, Any]) -> None:
+        if self._writer is None:
+            raise OvsdbError("OVSDB connection is not open")
+        self._writer.write(json.dumps(message, separators=(",", ":")).encode())
+
+    async def call(self, method: str, params: list[Any], timeout: float = 10.0) -> Any:
+        """Send a request and wait for its result.
+
+        Raises:
+            OvsdbError: The request failed, timed out, or the session dropped
+        """
+        if not self.is_connected:
+            raise OvsdbError("OVSDB connection is not open")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._send({"method": method, "params": params, "id": request_id})
+            await self._writer.drain()
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError as e:
+            raise OvsdbError(f"OVSDB {method} timed out") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_loop(self) -> None:
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder("utf-8")()
+        buffer = ""
+        try:
+            while True:
+                chunk = await self._reader.read(65536)
+                if not chunk:
+                    break
+                buffer += text.decode(chunk)
+                while True:
+                    buffer = buffer.lstrip()
+                    if not buffer:
+                        break
+                    try:
+                        message, end = decoder.raw_decode(buffer)
+                    except json.JSONDecodeError:
+                        break  # Incomplete message; wait for more bytes
+                    buffer = buffer[end:]
+                    self._handle(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"OVSDB reader stopped: {e}")
+        finally:
+            self._fail_pending(OvsdbError("OVSDB connection lost"))
+            self._tables.clear()
+
+    def _handle(self, message: dict[str, Any]) -> None:
+        method = message.get("method")
+        if method is None:
+            future = self._pending.get(message.get("id"))
+            if future is None or future.done():
+                return
+            if message.get("error") is not None:
+                future.set_exception(OvsdbError(str(message["error"])))
+            else:
+                future.set_result(message.get("result"))
+        elif method == "echo":
+            self._send({"id": message.get("id"), "result": message.get("params"), "error": None})
+        elif method == "update":
+            params = message.get("params") or [None, {}]
+            self._apply_updates(params[1])
+
+    # -------------------------------------------------------------------------
+    # Monitor cache
+    # -------------------------------------------------------------------------
+
+    async def monitor(self, tables: dict[str, list[str]]) -> None:
+        """Replicate the given table columns and keep them updated."""
+        requests = {table: {"columns": columns} for table, columns in tables.items()}
+        initial = await self.call("monitor", [self.database, None, requests])
+        for table in tables:
+            self._tables.setdefault(table, {})
+        self._apply_updates(initial or {})
+
+    def _apply_updates(self, table_updates: dict[str, Any]) -> None:
+        for table, rows in table_updates.items():
+            cache = self._tables.setdefault(table, {})
+            for uuid, change in rows.items():
+                old = cache.get(uuid)
+                new = change.get("new")
+                if new is None:
+                    cache.pop(uuid, None)
+                else:
+                    cache[uuid] = new
+                for listener in list(self._listeners):
+                    try:
+                        listener(table, uuid, old, new)
+                    except Exception as e:
+                        logger.warning(f"OVSDB update listener failed: {e}")
+        self._updated.set()
+
+    def add_listener(self, listener: UpdateListener) -> None:
+        """Call ``listener`` for every row change applied to the cache."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: UpdateListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def sync(self) -> None:
+        """Wait until updates queued by the server so far are applied."""
+        await self.call("echo", ["sync"])
+
+    def rows(self, table: str) -> dict[str, dict[str, Any]]:
+        """Cached rows of a monitored table keyed by uuid."""
+        return self._tables.get(table, {})
+
+    # -------------------------------------------------------------------------
+    # Typed accessors
+    # -------------------------------------------------------------------------
+
+    def bridges(self) -> list[Bridge]:
+        return [Bridge.from_row(u, r) for u, r in self.rows("Bridge").items()]
+
+    def ports(self) -> list[Port]:
+        return [Port.from_row(u, r) for u, r in self.rows("Port").items()]
+
+    def interfaces(self) -> list[Interface]:
+        return [Interface.from_row(u, r) for u, r in self.rows("Interface").items()]
+
+    def get_bridge(self, name: str) -> Bridge | None:
+        return next((b for b in self.bridges() if b.name == name), None)
+
+    def get_port(self, name: str) -> Port | None:
+        return next((p for p in self.ports() if p.name == name), None)
+
+    def get_interface(self, name: str) -> Interface | None:
+        return next((i for i in self.interfaces() if i.name == name), None)
+
+    def bridge_ports(self, bridge_name: str) -> list[Port]:
+        """Ports attached to a bridge (empty if the bridge does not exist)."""
+        bridge = self.get_bridge(bridge_name)
+        if bridge is None:
+            return []
+        port_rows = self.rows("Port")
+        return [Port.from_row(u, port_rows[u]) for u in bridge.ports if u in port_rows]
+
+    def bridge_interfaces(self, bridge_name: str) -> list[Interface]:
+        """Interfaces of all ports attached to a bridge."""
+        iface_rows = self.rows("Interface")
+        return [
+            Interface.from_row(u, iface_rows[u])
+            for port in self.bridge_ports(bridge_name)
+            for u in port.interfaces
+            if u in iface_rows
+        ]
+
+    def used_vlan_tags_on_bridge(self, bridge_name: str) -> set[int]:
+        """VLAN tags (>0) assigned to ports on a bridge."""
+        return {
+            port.tag
+            for port in self.bridge_ports(bridge_name)
+            if isinstance(port.tag, int) and port.tag > 0
+        }
+
+    # -------------------------------------------------------------------------
+    # Transactions
+    # -------------------------------------------------------------------------
+
+    async def transact(self, *operations: dict[str, Any]) -> list[dict[str, Any]]:
+        """Run operations atomically and return their results.
+
+        Raises:
+            OvsdbError: Any operation failed (the transaction was aborted)
+        """
+        results = await self.call("transact", [self.database, *operations])
+        for index, result in enumerate(results or []):
+            if isinstance(result, dict) and result.get("error"):
+                op = operations[index]["op"] if index < len(operations) else "commit"
+                raise OvsdbError(
+                    f"OVSDB {op} failed: {result['error']}"
+                    + (f" ({result['details']})" if result.get("details") else "")
+                )
+        return results
+
+    async def _commit_and_wait(
+        self, operations: list[dict[str, Any]], wait: bool, timeout: float,
+    ) -> list[dict[str, Any]]:
+        """Transact, optionally waiting for ovs-vswitchd to apply the change.
+
+        Mirrors ``ovs-vsctl`` (without ``--no-wait``): bumps ``next_cfg`` in
+        the same transaction and waits until ``cur_cfg`` catches up.
+        """
+        if wait:
+            operations = [
+                *operations,
+                {"op": "mutate", "table": "Open_vSwitch", "where": [], "mutations": [["next_cfg", "+=", 1]]},
+                {"op": "select", "table": "Open_vSwitch", "where": [], "columns": ["next_cfg"]},
+            ]
+        results = await self.transact(*operations)
+        if not wait:
+            return results
+
+        rows = results[-1].get("rows") or [{}]
+        target = rows[0].get("next_cfg")
+        if not isinstance(target, int):
+            return results
+        deadline = time.monotonic() + timeout
+        while True:
+            if any(
+                isinstance(row.get("cur_cfg"), int) and row["cur_cfg"] >= target
+                for row in self.rows("Open_vSwitch").values()
+            ):
+                return results
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise OvsdbError("Timed out waiting for ovs-vswitchd to apply configuration")
+            self._updated.clear()
+            try:
+                await asyncio.wait_for(self._updated.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def add_port(
+        self,
+        bridge_name: str,
+        port_name: str,
+        *,
+        tag: int | None = None,
+        iface_type: str | None = None,
+        options: dict[str, str] | None = None,
+        external_ids: dict[str, str] | None = None,
+        iface_external_ids: dict[str, str] | None = None,
+        may_exist: bool = False,
+        wait: bool = True,
+        timeout: float = 10.0,
+    ) -> None:
+        """Add a port with a single interface, like ``ovs-vsctl add-port``.
+
+        ``external_ids`` go on the Port row, ``iface_external_ids`` on the
+        Interface row.
+
+        Raises:
+            OvsdbError: No bridge is named ``bridge_name``
+        """
+        if may_exist and self.get_port(port_name) is not None:
+            return
+        iface_row: dict[str, Any] = {"name": port_name}
+        if iface_type:
+            iface_row["type"] = iface_type
+        if options:
+            iface_row["options"] = map_datum(options)
+        if iface_external_ids:
+            iface_row["external_ids"] = map_datum(iface_external_ids)
+        port_row: dict[str, Any] = {
+            "name": port_name,
+            "interfaces": named_uuid("iface"),
+        }
+        if tag is not None:
+            port_row["tag"] = tag
+        if external_ids:
+            port_row["external_ids"] = map_datum(external_ids)
+        results = await self._commit_and_wait(
+            [
+                {"op": "insert", "table": "Interface", "row": iface_row, "uuid-name": "iface"},
+                {"op": "insert", "table": "Port", "row": port_row, "uuid-name": "port"},
+                {
+                    "op": "mutate",
+                    "table": "Bridge",
+                    "where": [["name", "==", bridge_name]],
+                    "mutations": [["ports", "insert", set_datum([named_uuid("port")])]],
+                },
+            ],
+            wait,
+            timeout,
+        )
+        # Without a bridge the new rows are unreferenced and garbage-collected
+        if results[2].get("count") != 1:
+            raise OvsdbError(f"No bridge named {bridge_name}")
+
+    async def del_port(
+        self,
+        bridge_name: str,
+        port_name: str,
+        *,
+        if_exists: bool = True,
+        wait: bool = True,
+        timeout: float = 10.0,
+    ) -> None:
+        """Remove a port from a bridge, like ``ovs-vsctl del-port``.
+
+        The Port and Interface rows are garbage-collected by ovsdb-server
+        once the bridge no longer references them.
+
+        Raises:
+            OvsdbError: The port does not exist (unless ``if_exists``) or is
+                not on ``bridge_name``
+        """
+        port = self.get_port(port_name)
+        if port is None:
+            if if_exists:
+                return
+            raise OvsdbError(f"No port named {port_name}")
+        port_ref = set_datum([uuid_datum(port.uuid)])
+        results = await self._commit_and_wait(
+            [{
+                "op": "mutate",
+                "table": "Bridge",
+                "where": [["name", "==", bridge_name], ["ports", "includes", port_ref]],
+                "mutations": [["ports", "delete", port_ref]],
+            }],
+            wait,
+            timeout,
+        )
+        if results[0].get("count") != 1:
+            raise OvsdbError(f"Bridge {bridge_name} has no port named {port_name}")
+
+    async def set_port_tag(self, port_name: str, tag: int | None, *, wait: bool = False) -> None:
+        """Set (or clear with None) a port's access VLAN tag.
+
+        Raises:
+            OvsdbError: No port is named ``port_name``
+        """
+        results = await self._commit_and_wait(
+            [{
+                "op": "update",
+                "table": "Port",
+                "where": [["name", "==", port_name]],
+                "row": {"tag": tag if tag is not None else set_datum([])},
+            }],
+            wait,
+            timeout=10.0,
+        )
+        if not results[0].get("count"):
+            raise OvsdbError(f"No port named {port_name}")
+
+
+# =============================================================================
+# Shared client
+# =============================================================================
+
+_client: OvsdbClient | None = None
+_client_lock: asyncio.Lock | None = None
+_client_lock_loop: asyncio.AbstractEventLoop | None = None
+_retry_after: float = 0.0
+
+# Don't retry an unreachable server on every call
+_RECONNECT_BACKOFF = 30.0
+
+
+async def get_ovsdb_client() -> OvsdbClient | None:
+    """Return the shared connected client, or None if OVSDB is unavailable."""
+    global _client, _client_lock, _client_lock_loop, _retry_after
+    if not settings.ovsdb_enabled:
+        return None
+    if _client is not None and _client.is_usable():
+        return _client
+    if time.monotonic() < _retry_after:
+        return None
+
+    # Tests and the plugin runner may use more than one loop per process
+    loop = asyncio.get_running_loop()
+    if _client_lock is None or _client_lock_loop is not loop:
+        _client_lock = asyncio.Lock()
+        _client_lock_loop = loop
+    async with _client_lock:
+        if _client is not None and _client.is_usable():
+            return _client
+        client = OvsdbClient()
+        try:
+            await client.connect()
+        except OvsdbError as e:
+            _retry_after = time.monotonic() + _RECONNECT_BACKOFF
+            logger.debug(f"OVSDB unavailable, using ovs-vsctl: {e}")
+            return None
+        _client = client
+        return _client
+
+
+async def close_ovsdb_client() -> None:
+    """Close the shared client (agent shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -11,6 +11,7 @@ import json
 import logging
 import os
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 
 from agent.config import settings
@@ -21,6 +22,8 @@ from agent.network.docker_plugin import (
     LINKED_VLAN_START,
     NetworkState,
     OVS_BRIDGE_PREFIX,
+    STATE_FLUSH_RETRY_MAX,
+    STATE_JOURNAL_COMPACT_MIN,
     VLAN_RANGE_END,
     VLAN_RANGE_START,
     _parse_ovs_map,
@@ -40,49 +43,102 @@ class PluginStateMixin:
     # State Persistence
     # =========================================================================
 
-    def _serialize_state(self) -> dict[str, Any]:
-        """Serialize plugin state to a JSON-compatible dict."""
+    def _serialize_meta(self) -> dict[str, Any]:
+        """Serialize the allocator cursors persisted alongside the records."""
         return {
-            "version": 1,
-            "saved_at": datetime.now(timezone.utc).isoformat(),
             "global_next_vlan": self._global_next_vlan,
             "global_next_linked_vlan": self._global_next_linked_vlan,
+        }
+
+    @staticmethod
+    def _serialize_lab_bridge(bridge: LabBridge) -> dict[str, Any]:
+        return {
+            "lab_id": bridge.lab_id,
+            "bridge_name": bridge.bridge_name,
+            "next_vlan": bridge.next_vlan,
+            "network_ids": sorted(bridge.network_ids),
+            "last_activity": bridge.last_activity.isoformat(),
+            "vxlan_tunnels": dict(bridge.vxlan_tunnels),
+            "external_ports": dict(bridge.external_ports),
+        }
+
+    @staticmethod
+    def _serialize_network(net: NetworkState) -> dict[str, Any]:
+        return {
+            "network_id": net.network_id,
+            "lab_id": net.lab_id,
+            "interface_name": net.interface_name,
+            "bridge_name": net.bridge_name,
+        }
+
+    @staticmethod
+    def _serialize_endpoint(ep: EndpointState) -> dict[str, Any]:
+        return {
+            "endpoint_id": ep.endpoint_id,
+            "network_id": ep.network_id,
+            "interface_name": ep.interface_name,
+            "host_veth": ep.host_veth,
+            "cont_veth": ep.cont_veth,
+            "vlan_tag": ep.vlan_tag,
+            "container_name": ep.container_name,
+            "node_name": ep.node_name,
+        }
+
+    def _serialize_records(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Serialize lab bridges, networks and endpoints, keyed by section and id."""
+        return {
             "lab_bridges": {
-                lab_id: {
-                    "lab_id": bridge.lab_id,
-                    "bridge_name": bridge.bridge_name,
-                    "next_vlan": bridge.next_vlan,
-                    "network_ids": list(bridge.network_ids),
-                    "last_activity": bridge.last_activity.isoformat(),
-                    "vxlan_tunnels": bridge.vxlan_tunnels,
-                    "external_ports": bridge.external_ports,
-                }
+                lab_id: self._serialize_lab_bridge(bridge)
                 for lab_id, bridge in self.lab_bridges.items()
             },
             "networks": {
-                net_id: {
-                    "network_id": net.network_id,
-                    "lab_id": net.lab_id,
-                    "interface_name": net.interface_name,
-                    "bridge_name": net.bridge_name,
-                }
+                net_id: self._serialize_network(net)
                 for net_id, net in self.networks.items()
             },
             "endpoints": {
-                ep_id: {
-                    "endpoint_id": ep.endpoint_id,
-                    "network_id": ep.network_id,
-                    "interface_name": ep.interface_name,
-                    "host_veth": ep.host_veth,
-                    "cont_veth": ep.cont_veth,
-                    "vlan_tag": ep.vlan_tag,
-                    "container_name": ep.container_name,
-                    "node_name": ep.node_name,
-                }
+                ep_id: self._serialize_endpoint(ep)
                 for ep_id, ep in self.endpoints.items()
             },
         }
 
+    def _changed_records(self) -> dict[str, dict[str, dict[str, Any] | None]]:
+        """Serialize records that differ from what is on disk (None if deleted).
+
+        Networks and endpoints come from the dirty log their tables keep, so
+        the cost is independent of how many exist. Lab bridges (one per lab,
+        mutated in place) are compared in full.
+        """
+        persisted = self._persisted_records
+        changed: dict[str, dict[str, dict[str, Any] | None]] = {
+            "lab_bridges": {}, "networks": {}, "endpoints": {},
+        }
+
+        previous = persisted["lab_bridges"]
+        for lab_id, bridge in self.lab_bridges.items():
+            record = self._serialize_lab_bridge(bridge)
+            if previous.get(lab_id) != record:
+                changed["lab_bridges"][lab_id] = record
+        for lab_id in previous.keys() - self.lab_bridges.keys():
+            changed["lab_bridges"][lab_id] = None
+
+        serializers = {"networks": self._serialize_network, "endpoints": self._serialize_endpoint}
+        tables = {"networks": self.networks, "endpoints": self.endpoints}
+        for section, key in self._dirty_records:
+            obj = tables[section].get(key)
+            record = None if obj is None else serializers[section](obj)
+            if persisted[section].get(key) != record:
+                changed[section][key] = record
+        return changed
+
+    def _serialize_state(self) -> dict[str, Any]:
+        """Serialize plugin state to a JSON-compatible dict."""
+        return {
+            "version": 1,
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+            **self._serialize_meta(),
+            **self._serialize_records(),
+        }
+
     def _deserialize_state(self, data: dict[str, Any]) -> None:
         """Deserialize plugin state from a JSON dict."""
         version = data.get("version", 1)
@@ -143,32 +199,138 @@ class PluginStateMixin:
                 self._global_next_vlan = next_vlan
 
 
-    async def _save_state(self) -> None:
-        """Save plugin state to disk atomically.
+    @property
+    def _state_journal_file(self) -> Path:
+        return self._state_file.with_suffix(".journal")
 
-        Uses temp file + rename for atomic writes to prevent corruption.
-        Runs file I/O in thread pool to avoid blocking event loop.
+    async def _save_state(self, snapshot: bool = False) -> bool:
+        """Persist plugin state to disk.
+
+        The state file is a snapshot; changes since it are appended to a
+        journal sidecar as one JSON line per changed record, so a save costs
+        O(changed records) regardless of how many endpoints exist.
+        A full snapshot (temp file + atomic rename, then journal truncate) is
+        written when none exists yet, when the journal outgrows
+        STATE_JOURNAL_COMPACT_MIN / twice the record count, or on request.
+        Each snapshot carries a new generation and journal lines carry the
+        generation they extend, so lines left by a crash before the truncate
+        are skipped on load. File I/O runs on a single writer thread so
+        saves land in order.
+
+        Returns True if the state was written.
         """
-        try:
-            state = self._serialize_state()
-            tmp_path = self._state_file.with_suffix(".tmp")
+        meta = self._serialize_meta()
+        persisted = self._persisted_records
+        record_count = len(self.lab_bridges) + len(self.networks) + len(self.endpoints)
+        journal_limit = max(STATE_JOURNAL_COMPACT_MIN, 2 * record_count)
+
+        lines: list[str] = []
+        changed: dict[str, dict[str, dict[str, Any] | None]] = {}
+        if persisted is not None and not snapshot:
+            changed = self._changed_records()
+            generation = self._state_generation
+            for section, records in changed.items():
+                for key, record in records.items():
+                    lines.append(json.dumps({"g": generation, "s": section, "k": key, "v": record}))
+            if meta != self._persisted_meta:
+                lines.append(json.dumps({"g": generation, "s": "meta", "v": meta}))
+        self._dirty_records.clear()
+
+        write_snapshot = (
+            persisted is None
+            or snapshot
+            or self._state_journal_entries + len(lines) > journal_limit
+        )
+        state_file = self._state_file
+        journal_file = self._state_journal_file
+
+        if write_snapshot:
+            records = self._serialize_records()
+            self._state_generation += 1
+            state = {
+                "version": 1,
+                "generation": self._state_generation,
+                "saved_at": datetime.now(timezone.utc).isoformat(),
+                **meta,
+                **records,
+            }
 
-            # Write to temp file in thread pool to avoid blocking event loop
             def write_state():
+                tmp_path = state_file.with_suffix(".tmp")
                 with open(tmp_path, "w") as f:
-                    json.dump(state, f, indent=2)
+                    json.dump(state, f, separators=(",", ":"))
+                    f.flush()
+                    os.fsync(f.fileno())
                 # Atomic rename
-                tmp_path.rename(self._state_file)
-
-            await asyncio.to_thread(write_state)
+                tmp_path.rename(state_file)
+                with open(journal_file, "w"):
+                    pass
+        elif lines:
+            def write_state():
+                with open(journal_file, "a") as f:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+        else:
             self._state_dirty = False
+            return True
+
+        # Record what will be on disk before yielding, so a save started
+        # while this one is writing diffs against it rather than re-sending
+        if write_snapshot:
+            self._persisted_records = records
+        else:
+            for section, section_records in changed.items():
+                for key, record in section_records.items():
+                    if record is None:
+                        persisted[section].pop(key, None)
+                    else:
+                        persisted[section][key] = record
+        self._persisted_meta = meta
+        self._state_journal_entries = 0 if write_snapshot else self._state_journal_entries + len(lines)
+        self._state_dirty = False
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._state_writer, write_state)
 
             logger.debug(
-                f"Saved plugin state: {len(self.lab_bridges)} bridges, "
-                f"{len(self.endpoints)} endpoints"
+                f"Saved plugin state ({'snapshot' if write_snapshot else f'{len(lines)} journal records'}): "
+                f"{len(self.lab_bridges)} bridges, {len(self.endpoints)} endpoints"
             )
+            return True
         except Exception as e:
             logger.error(f"Failed to save plugin state: {e}")
+            # Unknown what reached disk: next save writes a full snapshot
+            self._persisted_records = None
+            self._state_dirty = True
+            return False
+
+    def _read_state_files(self) -> dict[str, Any]:
+        """Read the snapshot and replay the journal lines written after it."""
+        with open(self._state_file, "r") as f:
+            data = json.load(f)
+
+        generation = data.get("generation", 0)
+        replayed = 0
+        if self._state_journal_file.exists():
+            with open(self._state_journal_file, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final write from a crash; everything before it is intact
+                        break
+                    if entry.get("g", 0) != generation:
+                        # Extends an older snapshot: the crash hit before its truncate
+                        continue
+                    if entry["s"] == "meta":
+                        data.update(entry["v"])
+                    elif entry["v"] is None:
+                        data.setdefault(entry["s"], {}).pop(entry["k"], None)
+                    else:
+                        data.setdefault(entry["s"], {})[entry["k"]] = entry["v"]
+                    replayed += 1
+        self._state_journal_entries = replayed
+        return data
 
     async def _load_state(self) -> bool:
         """Load plugin state from disk.
@@ -180,16 +342,26 @@ class PluginStateMixin:
             return False
 
         try:
-            with open(self._state_file, "r") as f:
-                data = json.load(f)
+            data = self._read_state_files()
 
             self._deserialize_state(data)
+            self._dirty_records.clear()
+            self._state_generation = data.get("generation", 0)
+            self._persisted_records = {
+                section: dict(data.get(section, {}))
+                for section in ("lab_bridges", "networks", "endpoints")
+            }
+            self._persisted_meta = {
+                "global_next_vlan": data.get("global_next_vlan"),
+                "global_next_linked_vlan": data.get("global_next_linked_vlan"),
+            }
             if self._migrate_state_to_shared_bridge():
                 await self._save_state()
 
             logger.info(
                 f"Loaded plugin state: {len(self.lab_bridges)} bridges, "
-                f"{len(self.networks)} networks, {len(self.endpoints)} endpoints"
+                f"{len(self.networks)} networks, {len(self.endpoints)} endpoints "
+                f"({self._state_journal_entries} journal records)"
             )
             return True
 
@@ -225,13 +397,58 @@ class PluginStateMixin:
 
         return updated
 
-    async def _mark_dirty_and_save(self) -> None:
-        """Mark state as dirty and save to disk.
+    async def _mark_dirty_and_save(self, immediate: bool = False) -> None:
+        """Mark state as dirty and schedule a batched save.
 
-        Called after any state mutation to ensure persistence.
+        Called after any state mutation. Mutations made within
+        ``plugin_state_flush_delay`` of the first one are written together by
+        a single save; shutdown() flushes whatever is still pending. A crash
+        inside that window is recovered from OVS port external_ids on the
+        next startup (see _adopt_endpoint_port).
+
+        ``immediate`` writes the state before returning, for mutations OVS
+        holds no trace of (a network with no endpoints yet). If that save
+        fails, the batched save retries it.
         """
         self._state_dirty = True
-        await self._save_state()
+        if immediate:
+            await self._flush_state()
+            if not self._state_dirty:
+                return
+        loop = asyncio.get_running_loop()
+        task = self._flush_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._flush_task = loop.create_task(self._flush_state_later())
+
+    async def _flush_state_later(self) -> None:
+        # Loop so mutations made while a save is writing get their own save;
+        # a failed save leaves the state dirty and is retried with backoff
+        delay = settings.plugin_state_flush_delay
+        while self._state_dirty:
+            await asyncio.sleep(delay)
+            try:
+                saved = await self._save_state()
+            except Exception as e:
+                logger.error(f"Failed to save plugin state: {e}")
+                self._persisted_records = None
+                self._state_dirty = True
+                saved = False
+            if saved:
+                delay = settings.plugin_state_flush_delay
+            else:
+                delay = min(max(delay, 0.1) * 2, STATE_FLUSH_RETRY_MAX)
+
+    async def _flush_state(self) -> None:
+        """Write any pending state changes now."""
+        task = self._flush_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._state_dirty:
+            await self._save_state()
 
     # =========================================================================
     # Stale State Garbage Collection
@@ -712,6 +929,8 @@ class PluginStateMixin:
                     continue
 
                 if port not in tracked_veths:
+                    if await self._adopt_endpoint_port(port):
+                        continue
                     # Orphaned port - clean it up
                     logger.warning(f"Removing orphaned OVS port: {port}")
                     await self._delete_port(bridge.bridge_name, port)
@@ -719,6 +938,59 @@ class PluginStateMixin:
 
         return cleaned
 
+    async def _adopt_endpoint_port(self, port: str) -> bool:
+        """Track an untracked port that OVS metadata ties to a known lab.
+
+        State saves are batched, so a crash can lose endpoints created just
+        before it; their ports still carry the endpoint's external_ids. A
+        network lost the same way is re-created from those ids as long as
+        its lab is still tracked.
+        """
+        code, ext_ids_raw, _ = await self._ovs_vsctl("get", "interface", port, "external_ids")
+        if code != 0:
+            return False
+        ext_ids = _parse_ovs_map(ext_ids_raw)
+        endpoint_id = ext_ids.get("archetype.endpoint_id")
+        network_id = ext_ids.get("archetype.network_id", "")
+        network = self.networks.get(network_id)
+        lab_bridge = self.lab_bridges.get(ext_ids.get("archetype.lab_id", ""))
+        if not endpoint_id or endpoint_id in self.endpoints:
+            return False
+        if network is None and (not network_id or lab_bridge is None):
+            return False
+
+        code, tag_out, _ = await self._ovs_vsctl("get", "port", port, "tag")
+        try:
+            vlan_tag = int(tag_out.strip().strip("[]")) if code == 0 else None
+        except ValueError:
+            vlan_tag = None
+        if vlan_tag is None:
+            return False
+
+        if network is None:
+            network = NetworkState(
+                network_id=network_id,
+                lab_id=lab_bridge.lab_id,
+                interface_name=ext_ids.get("archetype.interface_name", "eth1"),
+                bridge_name=lab_bridge.bridge_name,
+            )
+            self.networks[network_id] = network
+            lab_bridge.network_ids.add(network_id)
+            logger.info(f"Recovered untracked network {network_id[:12]} from OVS port {port}")
+
+        self.endpoints[endpoint_id] = EndpointState(
+            endpoint_id=endpoint_id,
+            network_id=network.network_id,
+            interface_name=network.interface_name,
+            host_veth=port,
+            cont_veth=f"peer-{port}",
+            vlan_tag=vlan_tag,
+        )
+        self._allocated_vlans.add(vlan_tag)
+        self._state_dirty = True
+        logger.info(f"Adopted untracked endpoint {endpoint_id[:12]} from OVS port {port}")
+        return True
+
     # =========================================================================
     # State Recovery (discovers existing OVS state on startup)
     # =========================================================================
@@ -749,6 +1021,8 @@ class PluginStateMixin:
             orphaned = await self._cleanup_orphaned_ovs_ports()
             if orphaned > 0:
                 logger.info(f"Cleaned up {orphaned} orphaned OVS ports")
+            if self._state_dirty:
+                await self._save_state()
 
             return
 
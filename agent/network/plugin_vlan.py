@@ -376,17 +376,13 @@ class PluginVlanMixin:
             shared_vlan = await self._allocate_linked_vlan(lab_bridge)
 
             # Set BOTH ports to the new linked-range tag
-            code, _, stderr = await self._ovs_vsctl(
-                "set", "port", ep_a.host_veth, f"tag={shared_vlan}"
-            )
+            code, _, stderr = await self._set_port_tag(ep_a.host_veth, shared_vlan)
             if code != 0:
                 logger.error(f"Failed to set VLAN on port A: {stderr}")
                 self._release_linked_vlan(shared_vlan)
                 return None
 
-            code, _, stderr = await self._ovs_vsctl(
-                "set", "port", ep_b.host_veth, f"tag={shared_vlan}"
-            )
+            code, _, stderr = await self._set_port_tag(ep_b.host_veth, shared_vlan)
             if code != 0:
                 logger.error(f"Failed to set VLAN on port B: {stderr}")
                 self._release_linked_vlan(shared_vlan)
@@ -445,9 +441,7 @@ class PluginVlanMixin:
             # Allocate new unique VLAN
             new_vlan = await self._allocate_vlan(lab_bridge)
 
-            code, _, stderr = await self._ovs_vsctl(
-                "set", "port", endpoint.host_veth, f"tag={new_vlan}"
-            )
+            code, _, stderr = await self._set_port_tag(endpoint.host_veth, new_vlan)
             if code != 0:
                 logger.error(f"Failed to set VLAN: {stderr}")
                 return None
@@ -604,9 +598,7 @@ class PluginVlanMixin:
                 return False
 
             # Set VLAN to match peer
-            code, _, stderr = await self._ovs_vsctl(
-                "set", "port", endpoint.host_veth, f"tag={target_vlan}"
-            )
+            code, _, stderr = await self._set_port_tag(endpoint.host_veth, target_vlan)
             if code != 0:
                 logger.error(f"Failed to set VLAN {target_vlan}: {stderr}")
                 return False
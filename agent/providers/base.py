@@ -300,6 +300,17 @@ class Provider(ABC):
         """
         return {}
 
+    async def status_all_labs(self) -> dict[str, list[NodeInfo]]:
+        """Get status of every lab managed by this provider in one pass.
+
+        Unlike discover_labs(), enumeration failures are raised rather than
+        reported as "no labs", so callers can tell the two apart.
+        Returns dict mapping lab_id -> list of NodeInfo.
+
+        Default implementation delegates to discover_labs().
+        """
+        return await self.discover_labs()
+
     async def audit_runtime_identity(self) -> dict[str, Any]:
         """Audit runtime identity coverage for all managed runtimes.
 
@@ -40,6 +40,7 @@ from docker.errors import NotFound, APIError, ImageNotFound
 from docker.types import IPAMConfig
 
 from agent.config import settings
+from agent.events.container_inventory import ContainerRecord, get_ready_inventory
 from agent.labels import (
     LABEL_LAB_ID,
     LABEL_NODE_DEFINITION_ID,
@@ -1219,27 +1220,14 @@ class DockerProvider(Provider, VlanPersistenceMixin):
         Returns:
             Number of interfaces successfully provisioned
         """
-        provisioned = 0
-
-        for i in range(count):
-            iface_num = start_index + i
-            # Determine interface name based on prefix
-            if interface_prefix.endswith("-"):
-                # e.g., "e1-" -> "e1-1", "e1-2" (SR Linux style)
-                iface_name = f"{interface_prefix}{iface_num}"
-            else:
-                iface_name = f"{interface_prefix}{iface_num}"
-
-            try:
-                await self.ovs_manager.provision_interface(
-                    container_name=container_name,
-                    interface_name=iface_name,
-                    lab_id=lab_id,
-                )
-                provisioned += 1
-            except Exception as e:
-                logger.warning(f"Failed to provision OVS interface {iface_name}: {e}")
-                # Continue with remaining interfaces
+        # e.g. "eth" -> "eth1", "e1-" -> "e1-1" (SR Linux style)
+        iface_names = [f"{interface_prefix}{start_index + i}" for i in range(count)]
+        # Failed interfaces are logged and skipped
+        provisioned = len(await self.ovs_manager.provision_interfaces(
+            container_name=container_name,
+            interface_names=iface_names,
+            lab_id=lab_id,
+        ))
 
         if provisioned > 0:
             logger.info(f"Provisioned {provisioned} OVS interfaces in {container_name}")
@@ -1876,6 +1864,22 @@ class DockerProvider(Provider, VlanPersistenceMixin):
             ip_addresses=self._get_container_ips(container),
         )
 
+    def _node_from_record(self, record: ContainerRecord) -> NodeInfo | None:
+        """Convert an inventory record to NodeInfo (no Docker API calls)."""
+        node_name = record.node_name
+        if not node_name:
+            return None
+
+        return NodeInfo(
+            name=node_name,
+            status=self._get_container_status(record),
+            container_id=record.short_id,
+            runtime_id=record.id,
+            node_definition_id=record.labels.get(LABEL_NODE_DEFINITION_ID),
+            image=record.image_ref,
+            ip_addresses=list(record.ip_addresses),
+        )
+
     def _topology_from_json(self, deploy_topology: DeployTopology) -> ParsedTopology:
         """Convert DeployTopology (JSON) to internal ParsedTopology.
 
@@ -2172,6 +2176,14 @@ class DockerProvider(Provider, VlanPersistenceMixin):
         """Get status of all nodes in a lab."""
         nodes: list[NodeInfo] = []
 
+        inventory = get_ready_inventory()
+        if inventory is not None:
+            for record in inventory.for_lab(lab_id):
+                node = self._node_from_record(record)
+                if node:
+                    nodes.append(node)
+            return StatusResult(lab_exists=len(nodes) > 0, nodes=nodes)
+
         try:
             containers = await asyncio.to_thread(
                 self.docker.containers.list,
@@ -2204,6 +2216,37 @@ class DockerProvider(Provider, VlanPersistenceMixin):
                 error=str(e),
             )
 
+    async def status_all_labs(self) -> dict[str, list[NodeInfo]]:
+        """Get status of all labs from a single container listing."""
+        labs: dict[str, list[NodeInfo]] = {}
+
+        inventory = get_ready_inventory()
+        if inventory is not None:
+            for record in inventory.all():
+                node = self._node_from_record(record)
+                if node and record.lab_id:
+                    labs.setdefault(record.lab_id, []).append(node)
+            return labs
+
+        containers = await asyncio.to_thread(
+            self.docker.containers.list,
+            all=True,
+            filters={"label": LABEL_LAB_ID},
+        )
+        for container in containers:
+            lab_id = (container.labels or {}).get(LABEL_LAB_ID)
+            if not lab_id:
+                continue
+            try:
+                node = self._node_from_container(container)
+            except Exception as e:
+                # Skip containers that can't be inspected (stale references)
+                logger.warning(f"Failed to get node info from container {container.id}: {e}")
+                continue
+            if node:
+                labs.setdefault(lab_id, []).append(node)
+        return labs
+
     async def _recover_stale_networks(
         self,
         container: Any,
@@ -2978,6 +3021,15 @@ class DockerProvider(Provider, VlanPersistenceMixin):
         """
         discovered: dict[str, list[NodeInfo]] = {}
 
+        inventory = get_ready_inventory()
+        if inventory is not None:
+            for record in inventory.all(provider=self.name):
+                node = self._node_from_record(record)
+                if node and record.lab_id:
+                    discovered.setdefault(record.lab_id, []).append(node)
+            logger.info(f"Discovered {len(discovered)} labs with DockerProvider (inventory)")
+            return discovered
+
         try:
             containers = await asyncio.to_thread(
                 self.docker.containers.list,
@@ -3018,11 +3070,15 @@ class DockerProvider(Provider, VlanPersistenceMixin):
         }
 
         try:
-            containers = await asyncio.to_thread(
-                self.docker.containers.list,
-                all=True,
-                filters={"label": LABEL_PROVIDER + "=" + self.name},
-            )
+            inventory = get_ready_inventory()
+            if inventory is not None:
+                containers = inventory.all(provider=self.name)
+            else:
+                containers = await asyncio.to_thread(
+                    self.docker.containers.list,
+                    all=True,
+                    filters={"label": LABEL_PROVIDER + "=" + self.name},
+                )
 
             for container in containers:
                 labels = container.labels or {}
@@ -3135,11 +3191,15 @@ class DockerProvider(Provider, VlanPersistenceMixin):
         """
         removed = []
         try:
-            containers = await asyncio.to_thread(
-                self.docker.containers.list,
-                all=True,
-                filters={"label": LABEL_PROVIDER + "=" + self.name},
-            )
+            inventory = get_ready_inventory()
+            if inventory is not None:
+                containers = inventory.all(provider=self.name)
+            else:
+                containers = await asyncio.to_thread(
+                    self.docker.containers.list,
+                    all=True,
+                    filters={"label": LABEL_PROVIDER + "=" + self.name},
+                )
             for container in containers:
                 lab_id = container.labels.get(LABEL_LAB_ID, "")
                 if not lab_id:
@@ -3149,7 +3209,13 @@ class DockerProvider(Provider, VlanPersistenceMixin):
                     continue
 
                 logger.info(f"Removing orphan container {container.name} (lab: {lab_id})")
-                await asyncio.to_thread(container.remove, force=True)
+                if isinstance(container, ContainerRecord):
+                    await asyncio.to_thread(
+                        self.docker.api.remove_container, container.id, force=True
+                    )
+                    inventory.discard(container.id)
+                else:
+                    await asyncio.to_thread(container.remove, force=True)
                 removed.append(container.name)
                 await self.local_network.cleanup_lab(lab_id)
                 self._cleanup_orphan_vlans(
@@ -23,6 +23,7 @@ if TYPE_CHECKING:
     from agent.schemas import DeployTopology
 
 
+from agent import checksum_cache
 from agent.config import settings
 from agent.providers.naming import (
     DOCKER_PREFIX,
@@ -803,12 +804,21 @@ class LibvirtProvider(Provider, VlanPersistenceMixin):
         On mismatch, drops page caches and re-verifies. If the second hash
         matches, the file is fine (page cache was stale). If it still
         mismatches, the file is actually corrupted.
+
+        A digest verified earlier for the unchanged file (same device,
+        inode, size and mtime) is taken from the checksum cache without
+        reading the image; the background re-verification catches in-place
+        corruption.
         """
         if not expected_sha256:
             return
+        if checksum_cache.lookup(image_path) == expected_sha256:
+            return
 
+        hashed = os.stat(image_path)
         actual = self._compute_file_sha256(image_path)
         if actual == expected_sha256:
+            checksum_cache.record(image_path, actual, hashed)
             return
 
         logger.warning(
@@ -829,6 +839,7 @@ class LibvirtProvider(Provider, VlanPersistenceMixin):
             logger.info(
                 "Backing image OK after cache drop — page cache corruption recovered"
             )
+            checksum_cache.record(image_path, actual, hashed)
             return
 
         raise RuntimeError(
@@ -940,17 +951,19 @@ class LibvirtProvider(Provider, VlanPersistenceMixin):
 
     def _node_from_domain(self, domain, lab_id: str) -> NodeInfo | None:
         """Convert libvirt domain to NodeInfo."""
-        name = domain.name()
         metadata = self._get_domain_metadata_values(domain)
 
         if metadata.get("lab_id") != lab_id:
             return None
+        return self._node_from_domain_metadata(domain, metadata)
 
+    def _node_from_domain_metadata(self, domain, metadata: dict) -> NodeInfo | None:
+        """Convert libvirt domain with already-parsed metadata to NodeInfo."""
         node_name = metadata.get("node_name")
         if not node_name or not metadata.get("node_definition_id"):
             logger.debug(
                 "Skipping metadata-incomplete domain during status: %s",
-                name,
+                domain.name(),
             )
             return None
 
@@ -1466,6 +1479,23 @@ class LibvirtProvider(Provider, VlanPersistenceMixin):
         """Get status of all VMs in a lab."""
         return await self._run_libvirt(self._status_sync, lab_id)
 
+    def _status_all_labs_sync(self) -> dict[str, list[NodeInfo]]:
+        """Status of all VMs grouped by lab — runs on the libvirt thread."""
+        labs: dict[str, list[NodeInfo]] = {}
+        for domain in self.conn.listAllDomains(0):
+            metadata = self._get_domain_metadata_values(domain)
+            lab_id = metadata.get("lab_id")
+            if not lab_id:
+                continue
+            node = self._node_from_domain_metadata(domain, metadata)
+            if node:
+                labs.setdefault(lab_id, []).append(node)
+        return labs
+
+    async def status_all_labs(self) -> dict[str, list[NodeInfo]]:
+        """Get status of all labs from a single domain listing."""
+        return await self._run_libvirt(self._status_all_labs_sync)
+
     def _start_node_sync(self, domain_name: str) -> tuple[str, str | None, str | None]:
         """Lookup, start domain — runs on libvirt thread.
 
@@ -13,23 +13,30 @@ patterns in container logs or via CLI commands.
 Post-boot commands: Some vendors require workarounds after boot (e.g., cEOS
 needs iptables rules removed). These are run once when readiness is first
 detected, tracked via _post_boot_completed set.
+
+Log scanning is incremental: each node keeps a cursor (a Docker ``since``
+timestamp or a serial log byte offset) plus its match state across probe
+calls, so a poll only reads and matches output produced since the last one.
 """
 
 from __future__ import annotations
 
 import asyncio
+import codecs
 import logging
 import re
 import shlex
+import threading
 import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import docker
 import subprocess
 
 from agent.config import settings
+from agent.docker_client import get_docker_client
 from agent.vendors import get_vendor_config, is_ceos_kind
 
 # Try to import libvirt - it's optional
@@ -55,6 +62,85 @@ logger = logging.getLogger(__name__)
 # Key: container_name, Value: True if commands have been run
 _post_boot_completed: set[str] = set()
 
+# Lines fetched on the first scan of a container (matches the old full read)
+LOG_SCAN_INITIAL_TAIL = 500
+# Characters of the previous read kept so matches can span a read boundary
+LOG_SCAN_CARRY_CHARS = 1024
+# Each read starts this many seconds before the previous one ended, so a
+# line stamped just before that end but written after the read is not
+# missed; the part repeating the carry is dropped
+LOG_SCAN_SINCE_MARGIN = 2.0
+# Serial console text retained per VM for pattern and diagnostic matching
+SERIAL_LOG_WINDOW_CHARS = 65536
+# Scan state for nodes not probed this long is dropped
+LOG_SCAN_IDLE_TTL = 3600.0
+
+
+@dataclass
+class _LogScanState:
+    """Incremental scan position and match state for one container's logs."""
+
+    generation: str  # container id + start time; a restart begins a new scan
+    since: float | None = None  # Docker logs cursor (unix time of last read)
+    ready: bool = False
+    progress: int = 0
+    carry: str = ""
+    last_used: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+@dataclass
+class _SerialLogState:
+    """Read offset and retained text window for one VM serial log."""
+
+    inode: int
+    offset: int = 0
+    window: str = ""
+    decoder: codecs.IncrementalDecoder = field(
+        default_factory=lambda: codecs.getincrementaldecoder("utf-8")(errors="replace"),
+        repr=False,
+    )
+    last_used: float = 0.0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+# Probe objects are built per request, so scan state lives at module level.
+# Key: container name (Docker) or serial log path (libvirt)
+_log_scan_states: dict[str, _LogScanState] = {}
+_serial_log_states: dict[str, _SerialLogState] = {}
+_scan_states_lock = threading.Lock()
+
+
+def _drop_seen_lines(carry: str, text: str) -> str:
+    """Strip the lines at the start of ``text`` that end ``carry``.
+
+    The longest overlap wins. Only whole lines of ``carry`` are tried; its
+    first line counts only if ``carry`` was not cut from a longer read.
+    """
+    if not carry or not text:
+        return text
+    starts = [i + 1 for i, char in enumerate(carry) if char == "\n" and i + 1 < len(carry)]
+    if len(carry) < LOG_SCAN_CARRY_CHARS:
+        starts.insert(0, 0)
+    for start in starts:
+        if text.startswith(carry[start:]):
+            return text[len(carry) - start:]
+    return text
+
+
+def _prune_scan_states(now: float) -> None:
+    """Drop scan state for nodes that have not been probed recently."""
+    for states in (_log_scan_states, _serial_log_states):
+        for key in [k for k, v in states.items() if now - v.last_used > LOG_SCAN_IDLE_TTL]:
+            del states[key]
+
+
+def clear_log_scan_state() -> None:
+    """Forget all incremental log scan state."""
+    with _scan_states_lock:
+        _log_scan_states.clear()
+        _serial_log_states.clear()
+
 
 @dataclass
 class ReadinessResult:
@@ -116,10 +202,14 @@ class LogPatternProbe(ReadinessProbe):
         }
 
     async def check(self, container_name: str) -> ReadinessResult:
-        """Check container logs for readiness pattern."""
+        """Check container logs for readiness pattern.
+
+        Only output written since the previous check of this container is
+        fetched and matched; readiness and progress carry over.
+        """
         def _sync_check() -> ReadinessResult:
             try:
-                client = docker.from_env()
+                client = get_docker_client()
                 container = client.containers.get(container_name)
 
                 if container.status != "running":
@@ -129,27 +219,23 @@ class LogPatternProbe(ReadinessProbe):
                         progress_percent=0,
                     )
 
-                # Get recent logs (last 500 lines should be enough)
-                logs = container.logs(tail=500, timestamps=False).decode("utf-8", errors="replace")
+                state = self._scan_state(container_name, container)
+                with state.lock:
+                    if not state.ready:
+                        self._scan_new_output(container, state)
+                    ready, progress = state.ready, state.progress
 
-                # Check for completion pattern
-                if self.pattern.search(logs):
+                if ready:
                     return ReadinessResult(
                         is_ready=True,
                         message="Boot complete",
                         progress_percent=100,
                     )
 
-                # Check for progress patterns
-                max_progress = 0
-                for compiled_pattern, progress in self._compiled_progress.items():
-                    if compiled_pattern.search(logs):
-                        max_progress = max(max_progress, progress)
-
                 return ReadinessResult(
                     is_ready=False,
                     message="Boot in progress",
-                    progress_percent=max_progress if max_progress > 0 else None,
+                    progress_percent=progress if progress > 0 else None,
                 )
 
             except docker.errors.NotFound:
@@ -166,6 +252,43 @@ class LogPatternProbe(ReadinessProbe):
 
         return await asyncio.to_thread(_sync_check)
 
+    @staticmethod
+    def _scan_state(container_name: str, container) -> _LogScanState:
+        """Return the scan state for this container run, resetting on restart."""
+        started_at = (container.attrs or {}).get("State", {}).get("StartedAt", "")
+        generation = f"{container.id}:{started_at}"
+        now = time.monotonic()
+        with _scan_states_lock:
+            state = _log_scan_states.get(container_name)
+            if state is None or state.generation != generation:
+                _prune_scan_states(now)
+                state = _LogScanState(generation=generation)
+                _log_scan_states[container_name] = state
+            state.last_used = now
+        return state
+
+    def _scan_new_output(self, container, state: _LogScanState) -> None:
+        """Fetch logs written since the last scan and update match state."""
+        until = time.time()
+        if state.since is None:
+            raw = container.logs(tail=LOG_SCAN_INITIAL_TAIL, until=until, timestamps=False)
+        else:
+            raw = container.logs(since=state.since - LOG_SCAN_SINCE_MARGIN, until=until, timestamps=False)
+        state.since = until
+        new_text = raw.decode("utf-8", errors="replace") if raw else ""
+        new_text = _drop_seen_lines(state.carry, new_text)
+        if not new_text:
+            return
+
+        logs = state.carry + new_text
+        state.carry = logs[-LOG_SCAN_CARRY_CHARS:]
+        if self.pattern.search(logs):
+            state.ready = True
+            return
+        for compiled_pattern, progress in self._compiled_progress.items():
+            if progress > state.progress and compiled_pattern.search(logs):
+                state.progress = progress
+
 
 class CliProbe(ReadinessProbe):
     """Check readiness by executing a CLI command and checking output.
@@ -189,7 +312,7 @@ class CliProbe(ReadinessProbe):
         """Execute CLI command and check output."""
         def _sync_check() -> ReadinessResult:
             try:
-                client = docker.from_env()
+                client = get_docker_client()
                 container = client.containers.get(container_name)
 
                 if container.status != "running":
@@ -502,6 +625,55 @@ class LibvirtLogPatternProbe(ReadinessProbe):
             self._last_console_read_reason = "tcp_serial_error"
             return ""
 
+    def _read_serial_log(self) -> str | None:
+        """Return the last ~64KB of the serial log, reading only new bytes.
+
+        Returns None when the log is missing or empty so the caller falls
+        back to the console. A new inode or a shrunken file restarts the scan.
+        """
+        log_path = Path(self.serial_log_path)
+        try:
+            st = log_path.stat()
+        except FileNotFoundError:
+            self._last_console_read_reason = "serial_log_not_ready"
+            logger.debug(
+                "Serial log not found: %s (parent=%s)",
+                self.serial_log_path, log_path.parent.exists(),
+            )
+            return None
+        if st.st_size == 0:
+            self._last_console_read_reason = "serial_log_empty"
+            return None
+
+        now = time.monotonic()
+        with _scan_states_lock:
+            state = _serial_log_states.get(self.serial_log_path)
+            if state is None or state.inode != st.st_ino or st.st_size < state.offset:
+                _prune_scan_states(now)
+                state = _SerialLogState(inode=st.st_ino)
+                _serial_log_states[self.serial_log_path] = state
+            state.last_used = now
+
+        with state.lock:
+            if st.st_size > state.offset:
+                # Bytes older than the retained window would be trimmed anyway
+                start = max(state.offset, st.st_size - SERIAL_LOG_WINDOW_CHARS)
+                if start > state.offset:
+                    state.decoder.reset()
+                with open(log_path, "rb") as f:
+                    f.seek(start)
+                    data = f.read(st.st_size - start)
+                state.offset = start + len(data)
+                text = state.decoder.decode(data)
+                text = text.replace("\r\n", "\n").replace("\r", "\n")
+                state.window = (state.window + text)[-SERIAL_LOG_WINDOW_CHARS:]
+            content = state.window
+
+        self._last_console_read_reason = (
+            "serial_log_file" if content.strip() else "serial_log_empty"
+        )
+        return content
+
     def _get_console_output(self) -> str:
         """Get console output from VM serial port.
 
@@ -512,23 +684,9 @@ class LibvirtLogPatternProbe(ReadinessProbe):
         # Primary: serial log file (no lock needed, works even with active console)
         if self.serial_log_path:
             try:
-                log_path = Path(self.serial_log_path)
-                if log_path.exists() and log_path.stat().st_size > 0:
-                    content = log_path.read_text(errors="replace")
-                    if len(content) > 65536:
-                        content = content[-65536:]  # Tail ~64KB
-                    self._last_console_read_reason = (
-                        "serial_log_file" if content.strip() else "serial_log_empty"
-                    )
+                content = self._read_serial_log()
+                if content is not None:
                     return content
-                elif log_path.exists():
-                    self._last_console_read_reason = "serial_log_empty"
-                else:
-                    self._last_console_read_reason = "serial_log_not_ready"
-                    logger.debug(
-                        "Serial log not found: %s (parent=%s)",
-                        self.serial_log_path, log_path.parent.exists(),
-                    )
             except Exception as e:
                 logger.debug("Serial log error %s: %s", self.serial_log_path, e)
                 self._last_console_read_reason = "serial_log_error"
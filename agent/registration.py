@@ -95,6 +95,8 @@ async def register_with_controller() -> bool:
             result = RegistrationResponse(**response.json())
             if result.success:
                 _state.set_registered(True)
+                # Controller may have restarted; start from a full snapshot
+                _heartbeat_encoder.reset()
                 # Use the assigned ID from controller (may differ if we're
                 # re-registering an existing agent with a new generated ID)
                 if result.assigned_id and result.assigned_id != _state.AGENT_ID:
@@ -228,16 +230,79 @@ async def _bootstrap_transport_config() -> None:
         logger.warning(f"Transport bootstrap failed: {e}")
 
 
+# Detail lists carried by the delta protocol instead of every heartbeat
+_DETAIL_KINDS = (("containers", "container_details"), ("vms", "vm_details"))
+
+
+class HeartbeatDeltaEncoder:
+    """Encode heartbeat resource usage as deltas against the last ack.
+
+    The first heartbeat (and any heartbeat after the controller loses track)
+    is a full snapshot in the legacy layout plus ``{"seq": N, "full": true}``,
+    so controllers that predate the delta protocol still get complete data.
+    Once the controller answers with ``resource_seq == N`` subsequent
+    heartbeats carry only scalar gauges plus upserted/removed containers and
+    VMs relative to snapshot N. Any mismatch falls back to a full snapshot.
+    """
+
+    def __init__(self):
+        self._next_seq = 1
+        self._acked_seq: int | None = None
+        self._acked: dict[str, dict[str, dict]] = {}
+        self._pending: tuple[int, dict[str, dict[str, dict]]] | None = None
+
+    def reset(self) -> None:
+        """Force the next heartbeat to be a full snapshot."""
+        self._acked_seq = None
+        self._acked = {}
+        self._pending = None
+
+    def encode(self, usage: dict) -> tuple[dict, dict]:
+        """Return (resource_usage, resource_delta) for the next heartbeat."""
+        seq = self._next_seq
+        self._next_seq += 1
+        snapshot = {
+            kind: {d.get("name", ""): d for d in usage.get(key, []) or []}
+            for kind, key in _DETAIL_KINDS
+        }
+        self._pending = (seq, snapshot)
+
+        if self._acked_seq is None:
+            return usage, {"seq": seq, "full": True}
+
+        gauges = {k: v for k, v in usage.items() if k not in {key for _, key in _DETAIL_KINDS}}
+        delta: dict = {"seq": seq, "base_seq": self._acked_seq, "full": False}
+        for kind, _key in _DETAIL_KINDS:
+            previous = self._acked.get(kind, {})
+            current = snapshot[kind]
+            delta[f"{kind}_upsert"] = [d for name, d in current.items() if previous.get(name) != d]
+            delta[f"{kind}_removed"] = sorted(set(previous) - set(current))
+        return gauges, delta
+
+    def acknowledge(self, resource_seq: int | None) -> None:
+        """Advance the baseline if the controller applied the pending heartbeat."""
+        if self._pending is not None and resource_seq == self._pending[0]:
+            self._acked_seq, self._acked = self._pending
+            self._pending = None
+        else:
+            self.reset()
+
+
+_heartbeat_encoder = HeartbeatDeltaEncoder()
+
+
 async def send_heartbeat() -> HeartbeatResponse | None:
     """Send heartbeat to controller."""
     from agent.network.transport import get_data_plane_ip
+    resource_usage, resource_delta = _heartbeat_encoder.encode(await get_resource_usage())
     request = HeartbeatRequest(
         agent_id=_state.AGENT_ID,
         status=AgentStatus.ONLINE,
         active_jobs=_state.get_active_jobs(),
-        resource_usage=await get_resource_usage(),
+        resource_usage=resource_usage,
         data_plane_ip=get_data_plane_ip(),
         docker_snapshotter_mode=get_docker_snapshotter_mode(),
+        resource_delta=resource_delta,
     )
 
     try:
@@ -249,7 +314,9 @@ async def send_heartbeat() -> HeartbeatResponse | None:
             headers=get_controller_auth_headers(),
         )
         if response.status_code == 200:
-            return HeartbeatResponse(**response.json())
+            result = HeartbeatResponse(**response.json())
+            _heartbeat_encoder.acknowledge(result.resource_seq)
+            return result
     except Exception as e:
         logger.warning(f"Heartbeat failed: {e}")
     return None
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
 import os
@@ -13,8 +14,10 @@ from pathlib import Path
 
 import docker
 import httpx
-from fastapi import APIRouter, File, Request, UploadFile
+from fastapi import APIRouter, File, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
 
+from agent import checksum_cache
 from agent.config import settings
 from agent.docker_client import get_docker_client
 from agent.helpers import _get_docker_images, _get_file_images
@@ -24,6 +27,8 @@ from agent.schemas import (
     DockerImageInfo,
     ImageExistsResponse,
     ImageInventoryResponse,
+    ImageLayersRequest,
+    ImageLayersResponse,
     ImagePullProgress,
     ImagePullRequest,
     ImagePullResponse,
@@ -59,67 +64,151 @@ def _validate_file_destination(reference: str) -> Path | None:
     return destination
 
 
-async def _store_file_based_image(
-    destination: Path,
-    sha256: str,
-    device_id: str,
-    total_bytes: int,
-    job_id: str | None,
-    chunk_iter,
-    transfer_started_at: float,
-) -> ImageReceiveResponse:
-    destination.parent.mkdir(parents=True, exist_ok=True)
-    temp_destination = destination.with_name(
-        f"{destination.name}.part-{uuid.uuid4().hex[:8]}"
-    )
+# Chunk size for image transfers to and from the controller
+_TRANSFER_CHUNK_SIZE = 1024 * 1024
+# Bytes written between persisted resume checkpoints of a pull
+_RESUME_CHECKPOINT_BYTES = 64 * 1024 * 1024
+# Reconnects after a dropped controller stream before a pull fails
+_PULL_RESUME_ATTEMPTS = 3
+# Resume points keyed by job_id (active pulls) and image_id (interrupted pulls)
+_transfer_resume: dict[str, dict] = {}
+_resume_points: dict[str, dict] = {}
+_active_partials: set[Path] = set()
+# Uploads currently being served to peer agents from GET /images/seed
+_active_seed_uploads = 0
 
-    bytes_written = 0
-    try:
-        with temp_destination.open("wb") as tmp_out:
-            async for chunk in chunk_iter:
-                if not chunk:
-                    continue
-                tmp_out.write(chunk)
-                bytes_written += len(chunk)
 
-                if job_id and total_bytes > 0:
-                    percent = min(95, int((bytes_written / total_bytes) * 95))
-                    _image_pull_jobs[job_id] = ImagePullProgress(
-                        job_id=job_id,
-                        status="transferring",
-                        progress_percent=percent,
-                        bytes_transferred=bytes_written,
-                        total_bytes=total_bytes,
-                        started_at=transfer_started_at,
-                    )
+class _ResumableDownload:
+    """Partial download that hashes bytes as they are written.
+
+    Writes and hash updates run in a worker thread so the event loop never
+    blocks on disk, and every byte is written once and never re-read,
+    except for the prefix kept when resuming after an agent restart.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.offset = 0
+        self.etag: str | None = None
+        self._hasher = hashlib.sha256()
+        self._file = None
+
+    def _open(self, offset: int) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Append mode: writes always land at the (truncated) end of the file
+        f = open(self.path, "a+b")
+        f.seek(0)
+        hasher = hashlib.sha256()
+        kept = 0
+        while kept < offset:
+            block = f.read(min(offset - kept, _TRANSFER_CHUNK_SIZE))
+            if not block:
+                break
+            hasher.update(block)
+            kept += len(block)
+        f.truncate(kept)
+        self._file, self._hasher, self.offset = f, hasher, kept
+
+    def _write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._hasher.update(chunk)
+
+    async def open(self, offset: int = 0) -> None:
+        """Open the partial file, keeping (and hashing) its first ``offset`` bytes."""
+        await asyncio.to_thread(self._open, offset)
+
+    async def restart(self) -> None:
+        """Discard everything downloaded so far."""
+        self.close()
+        self.etag = None
+        await self.open(0)
+
+    async def write(self, chunk: bytes) -> None:
+        await asyncio.to_thread(self._write, chunk)
+        self.offset += len(chunk)
+
+    async def checkpoint(self) -> None:
+        """Flush written bytes so a persisted offset never runs ahead of the file."""
+        await asyncio.to_thread(self._file.flush)
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def discard(self) -> None:
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+def _pull_partial_path(image_id: str, reference: str, destination: Path | None) -> Path:
+    """Stable partial file for pulling an image, so a later pull can resume it."""
+    if destination is not None:
+        return destination.with_name(f"{destination.name}.part-resume")
+    key = hashlib.sha256(f"{image_id}\n{reference}".encode()).hexdigest()[:32]
+    return Path(settings.workspace_path) / ".image-transfers" / f"{key}.tar.part-resume"
+
+
+def _parse_content_range(value: str | None) -> tuple[int, int]:
+    """Return (start, total) from a ``bytes start-end/total`` Content-Range."""
+    try:
+        unit, _, spec = (value or "").partition(" ")
+        byte_range, _, total = spec.partition("/")
+        start = int(byte_range.partition("-")[0])
+        if unit != "bytes":
+            raise ValueError(unit)
+        return start, int(total) if total != "*" else 0
+    except ValueError:
+        raise ValueError(f"Invalid Content-Range from controller: {value!r}") from None
 
-        os.replace(temp_destination, destination)
-    except Exception:
-        if temp_destination.exists():
-            temp_destination.unlink(missing_ok=True)
-        raise
 
-    import hashlib
+def _transfer_progress(
+    job_id: str,
+    bytes_written: int,
+    total_bytes: int,
+    cap: int,
+    started_at: float,
+) -> ImagePullProgress:
+    if total_bytes > 0:
+        percent = min(cap, int((bytes_written / total_bytes) * cap))
+    else:
+        percent = min(cap, bytes_written // (1024 * 1024))  # 1% per MB
+    return ImagePullProgress(
+        job_id=job_id,
+        status="transferring",
+        progress_percent=percent,
+        bytes_transferred=bytes_written,
+        total_bytes=total_bytes,
+        started_at=started_at,
+    )
 
-    def _compute_file_sha256():
-        h = hashlib.sha256()
-        with open(destination, "rb") as hf:
-            while True:
-                block = hf.read(1024 * 1024)
-                if not block:
-                    break
-                h.update(block)
-        return h.hexdigest()
 
-    actual_hash = await asyncio.to_thread(_compute_file_sha256)
+def _finalize_file_based_image(
+    destination: Path,
+    download: _ResumableDownload,
+    sha256: str,
+    device_id: str,
+    total_bytes: int,
+    job_id: str | None,
+) -> ImageReceiveResponse:
+    """Verify a completed download and move it into place."""
+    download.close()
+    actual_hash = download.hexdigest()
+    bytes_written = download.offset
     if sha256 and actual_hash != sha256:
-        destination.unlink(missing_ok=True)
+        download.discard()
         return ImageReceiveResponse(
             success=False,
             error=f"Checksum mismatch: expected {sha256[:16]}..., got {actual_hash[:16]}...",
         )
 
+    os.replace(download.path, destination)
     Path(str(destination) + ".sha256").write_text(actual_hash)
+    # Hashed while writing: later checks of the unchanged file skip the read
+    checksum_cache.record(destination, actual_hash)
 
     if job_id:
         _image_pull_jobs[job_id] = ImagePullProgress(
@@ -146,13 +235,99 @@ async def _store_file_based_image(
     return ImageReceiveResponse(success=True, loaded_images=[str(destination)])
 
 
+async def _store_file_based_image(
+    destination: Path,
+    sha256: str,
+    device_id: str,
+    total_bytes: int,
+    job_id: str | None,
+    chunk_iter,
+    transfer_started_at: float,
+) -> ImageReceiveResponse:
+    download = _ResumableDownload(
+        destination.with_name(f"{destination.name}.part-{uuid.uuid4().hex[:8]}")
+    )
+    try:
+        await download.open()
+        async for chunk in chunk_iter:
+            if not chunk:
+                continue
+            await download.write(chunk)
+
+            if job_id and total_bytes > 0:
+                _image_pull_jobs[job_id] = _transfer_progress(
+                    job_id, download.offset, total_bytes, 95, transfer_started_at,
+                )
+        return _finalize_file_based_image(
+            destination, download, sha256, device_id, total_bytes, job_id,
+        )
+    except Exception:
+        download.discard()
+        raise
+
+
+def _parse_loaded_images(output: str) -> list[str]:
+    """Extract image tags/IDs from ``docker load`` output."""
+    loaded_images = []
+    for line in output.splitlines():
+        if "Loaded image:" in line:
+            loaded_images.append(line.split("Loaded image:", 1)[-1].strip())
+        elif "Loaded image ID:" in line:
+            loaded_images.append(line.split("Loaded image ID:", 1)[-1].strip())
+    return loaded_images
+
+
+def _record_docker_image_metadata(reference: str, device_id: str) -> None:
+    try:
+        from agent.image_metadata import set_docker_image_metadata
+        client = get_docker_client()
+        img = client.images.get(reference)
+        set_docker_image_metadata(
+            image_id=img.id,
+            tags=img.tags or [reference],
+            device_id=device_id,
+            source="api-sync",
+        )
+    except Exception as e:
+        logger.debug(f"Failed to persist Docker image metadata: {e}")
+
+
+def _layer_chain_ids(diff_ids: list[str]) -> list[str]:
+    """Chain ID of each layer prefix, as Docker's layer store keys them."""
+    chain_ids: list[str] = []
+    for diff_id in diff_ids:
+        if chain_ids:
+            digest = hashlib.sha256(f"{chain_ids[-1]} {diff_id}".encode()).hexdigest()
+            chain_ids.append(f"sha256:{digest}")
+        else:
+            chain_ids.append(diff_id)
+    return chain_ids
+
+
+def _local_layer_chain_ids() -> set[str]:
+    """Chain IDs of every layer stack held by local Docker images."""
+    chain_ids: set[str] = set()
+    for image in get_docker_client().images.list():
+        layers = ((image.attrs or {}).get("RootFS") or {}).get("Layers") or []
+        chain_ids.update(_layer_chain_ids(layers))
+    return chain_ids
+
+
 def _persist_transfer_state() -> None:
-    """Write active (non-terminal) transfer jobs to disk for crash recovery."""
-    active = {
-        job_id: progress.model_dump()
-        for job_id, progress in _image_pull_jobs.items()
-        if progress.status in ("pending", "transferring", "loading")
-    }
+    """Write active (non-terminal) transfer jobs to disk for crash recovery.
+
+    Pulls also record where their partial download stopped under
+    ``"resume"``, so a pull of the same image after a restart continues
+    from that offset.
+    """
+    active = {}
+    for job_id, progress in _image_pull_jobs.items():
+        if progress.status not in ("pending", "transferring", "loading"):
+            continue
+        entry = progress.model_dump()
+        if job_id in _transfer_resume:
+            entry["resume"] = _transfer_resume[job_id]
+        active[job_id] = entry
     if active:
         try:
             _TRANSFER_STATE_FILE.write_text(json.dumps(active))
@@ -171,7 +346,11 @@ def _clear_persisted_transfer_state() -> None:
 
 
 def _load_persisted_transfer_state() -> None:
-    """On startup, load persisted state and mark interrupted jobs as failed."""
+    """On startup, load persisted state and mark interrupted jobs as failed.
+
+    Resume points of interrupted pulls are kept so the controller's retry
+    continues the download instead of starting over.
+    """
     if not _TRANSFER_STATE_FILE.exists():
         return
     try:
@@ -186,6 +365,9 @@ def _load_persisted_transfer_state() -> None:
                 error="Agent restarted during transfer",
                 started_at=entry.get("started_at"),
             )
+            resume = entry.get("resume")
+            if isinstance(resume, dict) and resume.get("image_id"):
+                _resume_points[resume["image_id"]] = resume
         if data:
             logger.info(
                 f"Recovered {len(data)} interrupted transfer(s) from previous run"
@@ -220,6 +402,7 @@ def delete_image(reference: str) -> dict[str, object]:
             if not destination.exists():
                 remove_file_image_metadata(str(destination))
                 return {"success": True, "deleted": False}
+            checksum_cache.forget(destination)
             destination.unlink(missing_ok=True)
             Path(str(destination) + ".sha256").unlink(missing_ok=True)
             remove_file_image_metadata(str(destination))
@@ -251,7 +434,6 @@ def delete_image(reference: str) -> dict[str, object]:
 @router.post("/images/backfill-checksums")
 async def backfill_image_checksums() -> dict:
     """Compute SHA256 sidecars for existing file-based images missing them."""
-    import hashlib
     import glob as globmod
 
     image_dir = "/var/lib/archetype/images"
@@ -267,15 +449,9 @@ async def backfill_image_checksums() -> dict:
             if os.path.exists(sidecar):
                 continue
             try:
-                h = hashlib.sha256()
-                with open(path, "rb") as f:
-                    while True:
-                        chunk = f.read(1024 * 1024)
-                        if not chunk:
-                            break
-                        h.update(chunk)
+                digest = checksum_cache.file_sha256(path)
                 with open(sidecar, "w") as sf:
-                    sf.write(h.hexdigest())
+                    sf.write(digest)
                 updated += 1
             except Exception as e:
                 errors.append(f"{os.path.basename(path)}: {e}")
@@ -398,7 +574,7 @@ async def receive_image(
                     chunk = await file.read(chunk_size)
                     if not chunk:
                         break
-                    tmp_file.write(chunk)
+                    await asyncio.to_thread(tmp_file.write, chunk)
                     bytes_written += len(chunk)
 
                     # Update progress
@@ -450,31 +626,12 @@ async def receive_image(
                     )
                 return ImageReceiveResponse(success=False, error=error_msg)
 
-            # Parse loaded images from output
-            output = (result.stdout or "") + (result.stderr or "")
-            loaded_images = []
-            for line in output.splitlines():
-                if "Loaded image:" in line:
-                    loaded_images.append(line.split("Loaded image:", 1)[-1].strip())
-                elif "Loaded image ID:" in line:
-                    loaded_images.append(line.split("Loaded image ID:", 1)[-1].strip())
-
+            loaded_images = _parse_loaded_images((result.stdout or "") + (result.stderr or ""))
             logger.info(f"Successfully loaded images: {loaded_images}")
 
             # Persist device metadata for Docker images
             if device_id:
-                try:
-                    from agent.image_metadata import set_docker_image_metadata
-                    client = get_docker_client()
-                    img = client.images.get(reference)
-                    set_docker_image_metadata(
-                        image_id=img.id,
-                        tags=img.tags or [reference],
-                        device_id=device_id,
-                        source="api-sync",
-                    )
-                except Exception as e:
-                    logger.debug(f"Failed to persist Docker image metadata: {e}")
+                _record_docker_image_metadata(reference, device_id)
 
             # Update final status
             if job_id:
@@ -522,12 +679,244 @@ async def receive_image(
         return ImageReceiveResponse(success=False, error=error_msg)
 
 
+@router.post("/images/layers/missing")
+async def missing_image_layers(request: ImageLayersRequest) -> ImageLayersResponse:
+    """Report which layers of an image this agent lacks.
+
+    The controller uses the answer to send a layer-delta archive that
+    omits the leading layers already in the local layer store; ``docker
+    load`` reuses those instead of reading them from the archive.
+    """
+    try:
+        local_chain_ids = await asyncio.to_thread(_local_layer_chain_ids)
+    except Exception as e:
+        logger.warning(f"Could not list local image layers: {e}")
+        local_chain_ids = set()
+
+    present = 0
+    for chain_id in _layer_chain_ids(request.layers):
+        if chain_id not in local_chain_ids:
+            break
+        present += 1
+    return ImageLayersResponse(present_layers=present, missing=request.layers[present:])
+
+
+@router.post("/images/load-stream")
+async def load_image_stream(
+    request: Request,
+    image_id: str = "",
+    reference: str = "",
+    total_bytes: int = 0,
+    job_id: str = "",
+    device_id: str = "",
+) -> ImageReceiveResponse:
+    """Load a Docker image tar streamed as the raw request body.
+
+    The body is piped straight into ``docker load`` as it arrives, so
+    nothing is written to a temp file. Used for layer-delta syncs.
+    """
+    logger.info(f"Streaming image into docker load: {reference} [{image_id}] ({total_bytes} bytes)")
+    transfer_started_at = time.time()
+    if job_id:
+        _image_pull_jobs[job_id] = ImagePullProgress(
+            job_id=job_id,
+            status="transferring",
+            total_bytes=total_bytes,
+            started_at=transfer_started_at,
+        )
+        _persist_transfer_state()
+
+    proc = None
+    bytes_received = 0
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "docker", "load",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            async for chunk in request.stream():
+                if not chunk:
+                    continue
+                proc.stdin.write(chunk)
+                await proc.stdin.drain()
+                bytes_received += len(chunk)
+                if job_id:
+                    _image_pull_jobs[job_id] = _transfer_progress(
+                        job_id, bytes_received, total_bytes, 90, transfer_started_at,
+                    )
+        except (BrokenPipeError, ConnectionResetError):
+            # docker load gave up early; its stderr explains why
+            pass
+
+        if job_id:
+            _image_pull_jobs[job_id] = ImagePullProgress(
+                job_id=job_id,
+                status="loading",
+                progress_percent=90,
+                bytes_transferred=bytes_received,
+                total_bytes=total_bytes,
+            )
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=600)
+        output = stdout.decode(errors="replace") + stderr.decode(errors="replace")
+        if proc.returncode != 0:
+            raise RuntimeError(stderr.decode(errors="replace").strip() or "docker load failed")
+    except Exception as e:
+        if proc is not None and proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        error_msg = "docker load timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+        logger.error(f"Streaming docker load failed for {reference}: {error_msg}")
+        if job_id:
+            _image_pull_jobs[job_id] = ImagePullProgress(
+                job_id=job_id,
+                status="failed",
+                error=error_msg,
+            )
+            _persist_transfer_state()
+        return ImageReceiveResponse(success=False, error=error_msg)
+
+    loaded_images = _parse_loaded_images(output)
+    logger.info(f"Successfully loaded images: {loaded_images} ({bytes_received} bytes streamed)")
+    if device_id:
+        _record_docker_image_metadata(reference, device_id)
+    if job_id:
+        _image_pull_jobs[job_id] = ImagePullProgress(
+            job_id=job_id,
+            status="completed",
+            progress_percent=100,
+            bytes_transferred=bytes_received,
+            total_bytes=total_bytes,
+        )
+        _persist_transfer_state()
+    return ImageReceiveResponse(success=True, loaded_images=loaded_images)
+
+
+def _seed_resume_offset(request: Request, etag: str) -> int:
+    """Return the offset a peer asked to resume from, or 0 for the whole file.
+
+    Peers resume with an open-ended ``bytes=N-`` range guarded by
+    ``If-Range``; other range forms and stale validators get the full file.
+    """
+    header = request.headers.get("range", "")
+    if_range = request.headers.get("if-range")
+    if not header.startswith("bytes=") or (if_range and if_range != etag):
+        return 0
+    start, sep, end = header[len("bytes="):].partition("-")
+    if not sep or end or not start.isdigit():
+        return 0
+    return int(start)
+
+
+async def _seed_file_chunks(path: Path, start: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while chunk := await asyncio.to_thread(f.read, _TRANSFER_CHUNK_SIZE):
+            yield chunk
+
+
+async def _seed_docker_save_chunks(reference: str):
+    proc = await asyncio.create_subprocess_exec(
+        "docker", "save", reference,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        while chunk := await proc.stdout.read(_TRANSFER_CHUNK_SIZE):
+            yield chunk
+        _, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            # The peer's docker load fails on the truncated archive and the
+            # controller falls back to sending the image itself
+            logger.error(f"docker save of {reference} for a peer failed: {stderr.decode(errors='replace')}")
+    finally:
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+
+
+async def _count_seed_upload(chunks):
+    global _active_seed_uploads
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        _active_seed_uploads -= 1
+
+
+@router.get("/images/seed")
+async def seed_image(request: Request, reference: str) -> StreamingResponse:
+    """Serve a local image to a peer agent.
+
+    The controller hands this URL to agents syncing an image this agent
+    already holds, so distribution fans out from every synced agent
+    instead of funnelling through the controller. File-based images honour
+    ``Range``/``If-Range`` so interrupted peer pulls resume; Docker images
+    are streamed from ``docker save``. Returns 503 once
+    ``image_seed_max_uploads`` uploads are running.
+    """
+    global _active_seed_uploads
+    if not settings.image_seed_enabled:
+        raise HTTPException(status_code=404, detail="Image seeding is disabled")
+    if _active_seed_uploads >= settings.image_seed_max_uploads:
+        raise HTTPException(
+            status_code=503,
+            detail="All seed upload slots are busy",
+            headers={"Retry-After": "5"},
+        )
+
+    status_code = 200
+    headers: dict[str, str] = {}
+    if _is_file_based_reference(reference):
+        path = _validate_file_destination(reference)
+        if path is None or not path.is_file():
+            raise HTTPException(status_code=404, detail=f"Image not found: {reference}")
+        stat = path.stat()
+        size = stat.st_size
+        etag = f'"{size:x}-{stat.st_mtime_ns:x}"'
+        start = _seed_resume_offset(request, etag)
+        if start and start >= size:
+            raise HTTPException(
+                status_code=416,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+        headers = {"Accept-Ranges": "bytes", "ETag": etag, "Content-Length": str(size - start)}
+        if start:
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{size - 1}/{size}"
+        chunks = _seed_file_chunks(path, start)
+        media_type = "application/octet-stream"
+    else:
+        try:
+            await asyncio.to_thread(get_docker_client().images.get, reference)
+        except docker.errors.ImageNotFound:
+            raise HTTPException(status_code=404, detail=f"Image not found: {reference}")
+        chunks = _seed_docker_save_chunks(reference)
+        media_type = "application/x-tar"
+
+    _active_seed_uploads += 1
+    logger.info(f"Seeding {reference} to a peer agent ({_active_seed_uploads} active)")
+    return StreamingResponse(
+        _count_seed_upload(chunks),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
 @router.post("/images/pull")
 async def pull_image(request: ImagePullRequest) -> ImagePullResponse:
     """Initiate pulling an image from the controller.
 
     This endpoint starts an async pull operation where the agent
-    fetches the image from the controller's stream endpoint.
+    fetches the image from the controller's stream endpoint, or from a
+    peer agent's seed endpoint when the controller assigns ``source_url``.
 
     Args:
         request: Image ID and reference to pull
@@ -552,30 +941,108 @@ async def pull_image(request: ImagePullRequest) -> ImagePullResponse:
         reference=request.reference,
         sha256=request.sha256 or "",
         device_id=request.device_id or "",
+        source_url=request.source_url or "",
     ))
 
     return ImagePullResponse(job_id=job_id, status="pending")
 
 
+async def _download_from_controller(
+    job_id: str,
+    stream_url: str,
+    download: _ResumableDownload,
+    progress_cap: int,
+    started_at: float,
+    resume: dict,
+) -> tuple[int, str | None]:
+    """Download ``stream_url`` into ``download``, resuming after dropped connections.
+
+    ``stream_url`` is the controller's stream endpoint or a peer agent's
+    seed endpoint; both take the shared controller secret. Reconnects ask
+    for the remaining bytes with ``Range`` and ``If-Range``; a 200 reply
+    means the source's copy changed (or it cannot serve a range) and the
+    download starts over. Returns ``(total_bytes, error)``
+    where ``error`` is set when the controller refused the request.
+    """
+    client = get_http_client()
+    total_bytes = 0
+    attempt = 0
+    while True:
+        headers = dict(get_controller_auth_headers())
+        if download.offset and download.etag:
+            headers["Range"] = f"bytes={download.offset}-"
+            headers["If-Range"] = download.etag
+        try:
+            async with client.stream(
+                "GET", stream_url,
+                headers=headers,
+                timeout=httpx.Timeout(600.0),
+            ) as response:
+                if response.status_code == 416 and download.offset:
+                    logger.info(f"Controller rejected resume of {stream_url}; restarting")
+                    await download.restart()
+                    continue
+                if response.status_code == 206:
+                    start, total_bytes = _parse_content_range(response.headers.get("content-range"))
+                    if start != download.offset:
+                        raise ValueError(
+                            f"Controller resumed at byte {start}, expected {download.offset}"
+                        )
+                    logger.info(f"Resuming pull of {stream_url} at byte {start}")
+                elif response.status_code == 200:
+                    if download.offset:
+                        await download.restart()
+                    total_bytes = int(response.headers.get("content-length", 0))
+                else:
+                    return total_bytes, f"{stream_url} returned {response.status_code}"
+
+                download.etag = response.headers.get("etag")
+                resume["etag"] = download.etag
+                checkpoint_at = download.offset + _RESUME_CHECKPOINT_BYTES
+                async for chunk in response.aiter_bytes(chunk_size=_TRANSFER_CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    await download.write(chunk)
+                    _image_pull_jobs[job_id] = _transfer_progress(
+                        job_id, download.offset, total_bytes, progress_cap, started_at,
+                    )
+                    if download.etag and download.offset >= checkpoint_at:
+                        await download.checkpoint()
+                        resume["offset"] = download.offset
+                        _persist_transfer_state()
+                        checkpoint_at = download.offset + _RESUME_CHECKPOINT_BYTES
+            return total_bytes, None
+        except httpx.TransportError as e:
+            attempt += 1
+            if attempt > _PULL_RESUME_ATTEMPTS:
+                raise
+            logger.warning(
+                f"Pull stream from {stream_url} dropped at byte {download.offset} "
+                f"({e}); reconnecting ({attempt}/{_PULL_RESUME_ATTEMPTS})"
+            )
+            await asyncio.sleep(min(2 ** attempt, 30))
+
+
 async def _execute_pull_from_controller(
     job_id: str,
     image_id: str,
     reference: str,
     sha256: str = "",
     device_id: str = "",
+    source_url: str = "",
 ):
     """Execute image pull from controller in background.
 
-    Fetches the image stream from the controller and loads it locally.
+    Fetches the image stream from the controller (or the peer agent at
+    ``source_url``) and loads it locally.
+    The partial download survives dropped connections and agent restarts:
+    the next attempt for the same image resumes from the last offset.
     """
-    import tempfile
-    import subprocess
-    import os
-
     logger.info(f"Starting pull from controller: {reference}")
 
-    tmp_path = None
     _pull_started_at = time.time()
+    download: _ResumableDownload | None = None
+    keep_partial = False
     try:
         _image_pull_jobs[job_id] = ImagePullProgress(
             job_id=job_id,
@@ -585,89 +1052,87 @@ async def _execute_pull_from_controller(
         )
         _persist_transfer_state()
 
-        # Build stream URL - encode the image_id for the URL
-        from urllib.parse import quote
-        encoded_image_id = quote(image_id, safe='')
-        stream_url = f"{settings.controller_url}/images/library/{encoded_image_id}/stream"
-
-        logger.debug(f"Fetching from: {stream_url}")
-
-        # Stream the image from controller
-        client = get_http_client()
-        async with client.stream(
-            "GET", stream_url,
-            headers=get_controller_auth_headers(),
-            timeout=httpx.Timeout(600.0),
-        ) as response:
-            if response.status_code != 200:
-                error_msg = f"Controller returned {response.status_code}"
+        destination = None
+        if _is_file_based_reference(reference):
+            destination = _validate_file_destination(reference)
+            if not destination:
+                error_msg = (
+                    "file-based image sync requires an absolute destination path"
+                    if not reference.startswith("/")
+                    else "Invalid destination path"
+                )
                 _image_pull_jobs[job_id] = ImagePullProgress(
                     job_id=job_id,
                     status="failed",
                     error=error_msg,
                 )
+                _persist_transfer_state()
                 return
 
-            # Get content length if available
-            total_bytes = int(response.headers.get("content-length", 0))
+        if source_url:
+            stream_url = source_url
+        else:
+            # Build stream URL - encode the image_id for the URL
+            from urllib.parse import quote
+            encoded_image_id = quote(image_id, safe='')
+            stream_url = f"{settings.controller_url}/images/library/{encoded_image_id}/stream"
 
-            if _is_file_based_reference(reference):
-                destination = _validate_file_destination(reference)
-                if not destination:
-                    error_msg = (
-                        "file-based image sync requires an absolute destination path"
-                        if not reference.startswith("/")
-                        else "Invalid destination path"
-                    )
-                    _image_pull_jobs[job_id] = ImagePullProgress(
-                        job_id=job_id,
-                        status="failed",
-                        error=error_msg,
-                    )
-                    _persist_transfer_state()
-                    return
+        logger.debug(f"Fetching from: {stream_url}")
 
-                result = await _store_file_based_image(
-                    destination=destination,
-                    sha256=sha256,
-                    device_id=device_id,
-                    total_bytes=total_bytes,
-                    job_id=job_id,
-                    chunk_iter=response.aiter_bytes(chunk_size=1024 * 1024),
-                    transfer_started_at=_pull_started_at,
-                )
-                if not result.success:
-                    _image_pull_jobs[job_id] = ImagePullProgress(
-                        job_id=job_id,
-                        status="failed",
-                        error=result.error,
-                    )
-                    _persist_transfer_state()
-                return
+        partial_path = _pull_partial_path(image_id, reference, destination)
+        resume = _resume_points.pop(image_id, None) or {}
+        if partial_path in _active_partials:
+            # Another pull of this image owns the resumable file
+            partial_path = partial_path.with_name(f"{partial_path.name}-{uuid.uuid4().hex[:8]}")
+            resume = {}
+        _active_partials.add(partial_path)
+        download = _ResumableDownload(partial_path)
+        offset = 0
+        if resume.get("reference") == reference and resume.get("etag"):
+            offset = int(resume.get("offset") or 0)
+            download.etag = resume["etag"]
+        await download.open(offset)
+        resume = {
+            "image_id": image_id,
+            "reference": reference,
+            "etag": download.etag,
+            "offset": download.offset,
+        }
+        _transfer_resume[job_id] = resume
+
+        keep_partial = True
+        total_bytes, error_msg = await _download_from_controller(
+            job_id, stream_url, download,
+            progress_cap=95 if destination else 85,
+            started_at=_pull_started_at,
+            resume=resume,
+        )
+        keep_partial = False
+        if error_msg:
+            _image_pull_jobs[job_id] = ImagePullProgress(
+                job_id=job_id,
+                status="failed",
+                error=error_msg,
+            )
+            return
 
-            # Save to temp file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".tar") as tmp_file:
-                tmp_path = tmp_file.name
-                bytes_written = 0
-                async for chunk in response.aiter_bytes(chunk_size=1024 * 1024):
-                    tmp_file.write(chunk)
-                    bytes_written += len(chunk)
+        bytes_written = download.offset
+        logger.debug(f"Downloaded {bytes_written} bytes")
 
-                    # Update progress
-                    if total_bytes > 0:
-                        percent = min(85, int((bytes_written / total_bytes) * 85))
-                    else:
-                        percent = min(85, bytes_written // (1024 * 1024))  # 1% per MB
-                    _image_pull_jobs[job_id] = ImagePullProgress(
-                        job_id=job_id,
-                        status="transferring",
-                        progress_percent=percent,
-                        bytes_transferred=bytes_written,
-                        total_bytes=total_bytes,
-                        started_at=_pull_started_at,
-                    )
+        if destination is not None:
+            result = _finalize_file_based_image(
+                destination, download, sha256, device_id, total_bytes, job_id,
+            )
+            if not result.success:
+                _image_pull_jobs[job_id] = ImagePullProgress(
+                    job_id=job_id,
+                    status="failed",
+                    error=result.error,
+                )
+                _persist_transfer_state()
+            return
 
-        logger.debug(f"Downloaded {bytes_written} bytes")
+        download.close()
 
         # Update to loading status
         _image_pull_jobs[job_id] = ImagePullProgress(
@@ -681,7 +1146,7 @@ async def _execute_pull_from_controller(
         # Load into Docker (wrapped in thread to avoid blocking)
         def _sync_docker_load():
             return subprocess.run(
-                ["docker", "load", "-i", tmp_path],
+                ["docker", "load", "-i", str(download.path)],
                 capture_output=True,
                 text=True,
                 timeout=600,
@@ -719,12 +1184,16 @@ async def _execute_pull_from_controller(
         )
         _persist_transfer_state()
     finally:
-        # Always clean up temp file
-        if tmp_path:
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
+        resume = _transfer_resume.pop(job_id, None)
+        if download is not None:
+            _active_partials.discard(download.path)
+            if keep_partial and resume and resume.get("etag"):
+                # Interrupted mid-stream: let the next pull of this image resume
+                download.close()
+                resume["offset"] = download.offset
+                _resume_points[image_id] = resume
+            else:
+                download.discard()
 
 
 # CRITICAL: get_pull_progress and get_active_transfers MUST be defined
@@ -840,8 +1309,11 @@ def check_image(reference: str) -> ImageExistsResponse:
             exists = os.path.exists(reference)
             file_sha256 = None
             if exists:
+                # A digest verified for the file as it is now beats the
+                # sidecar written when it arrived
+                file_sha256 = checksum_cache.lookup(reference)
                 sidecar = reference + ".sha256"
-                if os.path.exists(sidecar):
+                if file_sha256 is None and os.path.exists(sidecar):
                     try:
                         file_sha256 = open(sidecar).read().strip()
                     except OSError:
@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import inspect
 import logging
 from pathlib import Path
 
 import docker
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 
 from agent.config import settings
 from agent.docker_client import get_docker_client
@@ -17,6 +19,7 @@ from agent.helpers import (
 )
 from agent.providers import get_provider, list_providers
 from agent.schemas import (
+    BulkLabStatusResponse,
     CleanupLabOrphansRequest, CleanupLabOrphansResponse,
     CleanupOrphansRequest, CleanupOrphansResponse,
     CleanupWorkspacesRequest,
@@ -35,6 +38,67 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["labs"])
 
 
+@router.get("/labs/status", response_model=BulkLabStatusResponse)
+async def bulk_lab_status(
+    request: Request,
+    lab_ids: list[str] | None = Query(default=None, alias="lab_id"),
+):
+    """Get status of many labs (all labs when none are given) in one pass.
+
+    Each provider enumerates its runtimes once instead of once per lab. The
+    response carries a content-derived ETag; a matching If-None-Match gets
+    304 so the controller can skip re-processing unchanged hosts.
+    """
+    labs: dict[str, list[NodeInfo]] = {}
+    errors: list[str] = []
+
+    for provider_name, label in (("docker", "Docker"), ("libvirt", "Libvirt")):
+        provider = get_provider(provider_name)
+        if not provider:
+            continue
+        try:
+            by_lab = await provider.status_all_labs()
+        except Exception as e:
+            errors.append(f"{label} query failed: {e}")
+            continue
+        for lab_id, nodes in by_lab.items():
+            labs.setdefault(lab_id, []).extend(
+                NodeInfo(
+                    name=node.name,
+                    status=provider_status_to_schema(node.status),
+                    container_id=node.container_id,
+                    runtime_id=node.runtime_id,
+                    node_definition_id=node.node_definition_id,
+                    image=node.image,
+                    ip_addresses=node.ip_addresses,
+                )
+                for node in nodes
+            )
+
+    wanted = sorted(set(lab_ids)) if lab_ids else sorted(labs)
+    error = "; ".join(errors) if errors else None
+    statuses = [
+        LabStatusResponse(
+            lab_id=lab_id,
+            nodes=sorted(labs.get(lab_id, []), key=lambda n: n.name),
+            error=error,
+        )
+        for lab_id in wanted
+    ]
+
+    digest = hashlib.sha256()
+    for status in statuses:
+        digest.update(status.model_dump_json().encode())
+    digest.update((error or "").encode())
+    etag = f'"{digest.hexdigest()[:32]}"'
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    body = BulkLabStatusResponse(etag=etag, labs=statuses, error=error)
+    return JSONResponse(content=body.model_dump(mode="json"), headers={"ETag": etag})
+
+
 @router.get("/labs/{lab_id}/status")
 async def lab_status(lab_id: str) -> LabStatusResponse:
     """Get status of all nodes in a lab.
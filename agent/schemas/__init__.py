@@ -51,6 +51,7 @@ from agent.schemas.deploy import (  # noqa: F401
 )
 
 from agent.schemas.labs import (  # noqa: F401
+    BulkLabStatusResponse,
     CleanupLabOrphansRequest,
     CleanupLabOrphansResponse,
     CleanupOrphansRequest,
@@ -147,6 +148,8 @@ from agent.schemas.images import (  # noqa: F401
     DockerImageInfo,
     ImageExistsResponse,
     ImageInventoryResponse,
+    ImageLayersRequest,
+    ImageLayersResponse,
     ImagePullProgress,
     ImagePullRequest,
     ImagePullResponse,
@@ -62,12 +62,18 @@ class HeartbeatRequest(BaseModel):
     resource_usage: dict[str, Any] = Field(default_factory=dict)  # cpu, memory, etc.
     data_plane_ip: str | None = None
     docker_snapshotter_mode: str | None = None
+    # Delta protocol (v2): container/VM detail changes since the last
+    # controller-acknowledged heartbeat. None = legacy full payload only.
+    resource_delta: dict[str, Any] | None = None
 
 
 class HeartbeatResponse(BaseModel):
     """Controller -> Agent: Acknowledged, here's any pending work."""
     acknowledged: bool
     pending_jobs: list[str] = Field(default_factory=list)  # Job IDs to fetch
+    # Inventory sequence the controller holds for this agent after applying
+    # resource_delta. None means the controller does not understand deltas.
+    resource_seq: int | None = None
 
 
 class JobResult(BaseModel):
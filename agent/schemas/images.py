@@ -51,6 +51,8 @@ class ImagePullRequest(BaseModel):
     reference: str  # Docker reference
     sha256: str | None = None
     device_id: str | None = None
+    # Peer agent seed URL to download from instead of the controller
+    source_url: str | None = None
 
 
 class ImagePullResponse(BaseModel):
@@ -68,3 +70,19 @@ class ImagePullProgress(BaseModel):
     total_bytes: int = 0
     error: str | None = None
     started_at: float | None = None
+
+
+class ImageLayersRequest(BaseModel):
+    """Controller -> Agent: Layer diff IDs of an image, base layer first."""
+    layers: list[str] = Field(default_factory=list)
+
+
+class ImageLayersResponse(BaseModel):
+    """Agent -> Controller: Which layers of an image the agent lacks.
+
+    A layer only counts as present when its whole chain (it and every
+    layer below it) is in the local layer store, so the present layers are
+    always a leading prefix of the request.
+    """
+    present_layers: int = 0
+    missing: list[str] = Field(default_factory=list)
@@ -28,6 +28,18 @@ class LabStatusResponse(BaseModel):
     error: str | None = None
 
 
+class BulkLabStatusResponse(BaseModel):
+    """Agent -> Controller: Status of many labs in one response.
+
+    ``etag`` is derived from the content; the controller sends it back in
+    If-None-Match and receives 304 when nothing changed. Labs the agent has
+    no nodes for are omitted unless explicitly requested.
+    """
+    etag: str
+    labs: list[LabStatusResponse] = Field(default_factory=list)
+    error: str | None = None
+
+
 # --- Node Reconciliation ---
 
 
@@ -22,10 +22,13 @@ def _set_testing_env(monkeypatch, tmp_path):
     """Ensure agent startup tasks are disabled during unit tests.
 
     Also redirect workspace_path to a temp directory so tests don't
-    try to create /var/lib/archetype-agent (which fails in CI).
+    try to create /var/lib/archetype-agent (which fails in CI), and keep
+    the native OVSDB client off so OVS calls go through mocked ovs-vsctl.
     """
     monkeypatch.setenv("ARCHETYPE_AGENT_TESTING", "1")
     monkeypatch.setattr(settings, "workspace_path", str(tmp_path / "workspace"))
+    # Never talk to a host ovsdb-server from unit tests
+    monkeypatch.setattr(settings, "ovsdb_enabled", False)
     yield
 
 
@@ -633,3 +633,133 @@ class TestResolvePortMetadataOnly:
         )
 
         assert mon._resolve_port("unknown") is None
+
+
+class _FakeOvsdbClient:
+    """Stand-in for OvsdbClient: a listener list and an Interface replica."""
+
+    def __init__(self, link_states: dict[str, str]):
+        from agent.network.ovsdb import Interface
+
+        self._interface = Interface
+        self.link_states = dict(link_states)
+        self.listeners = []
+        self.usable = True
+
+    def is_usable(self) -> bool:
+        return self.usable
+
+    def add_listener(self, listener) -> None:
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def interfaces(self):
+        return [
+            self._interface(uuid=f"u-{name}", name=name, link_state=state)
+            for name, state in self.link_states.items()
+        ]
+
+    def push(self, name: str, state: str) -> None:
+        """Apply a link_state change and fan it out like a monitor update."""
+        old = {"name": name, "link_state": self.link_states.get(name, ["set", []])}
+        self.link_states[name] = state
+        for listener in list(self.listeners):
+            listener("Interface", f"u-{name}", old, {"name": name, "link_state": state})
+
+
+class TestCarrierMonitorOvsdbPush:
+    """Push-based detection from OVSDB Interface updates."""
+
+    async def _start(self, client, ports, notifier, debounce=0.01):
+        from agent.network.carrier_monitor import CarrierMonitor
+
+        mon = CarrierMonitor("arch-ovs", lambda: ports, notifier)
+        with patch(
+            "agent.network.carrier_monitor.get_ovsdb_client",
+            AsyncMock(return_value=client),
+        ), patch("asyncio.create_subprocess_exec") as fork:
+            await mon.start(interval=3.0, resync_interval=60.0, debounce=debounce)
+        fork.assert_not_called()
+        return mon
+
+    @pytest.mark.asyncio
+    async def test_transition_pushed_without_polling(self):
+        import asyncio
+
+        client = _FakeOvsdbClient({"vh1": "up"})
+        ports = _make_ports(("vh1", "archetype-lab1-r1", "eth1", "lab1"))
+        notifier = AsyncMock(return_value=True)
+        mon = await self._start(client, ports, notifier)
+        try:
+            assert mon._last_link_states == {"vh1": "up"}
+
+            client.push("vh1", "down")
+            await asyncio.sleep(0.05)
+
+            notifier.assert_awaited_once_with("lab1", "r1", "eth1", "off")
+            assert mon._last_link_states["vh1"] == "down"
+        finally:
+            mon.stop()
+        assert client.listeners == []
+
+    @pytest.mark.asyncio
+    async def test_flap_within_debounce_window_is_suppressed(self):
+        import asyncio
+
+        client = _FakeOvsdbClient({"vh1": "up"})
+        ports = _make_ports(("vh1", "archetype-lab1-r1", "eth1", "lab1"))
+        notifier = AsyncMock(return_value=True)
+        mon = await self._start(client, ports, notifier, debounce=0.05)
+        try:
+            client.push("vh1", "down")
+            client.push("vh1", "up")
+            await asyncio.sleep(0.1)
+
+            notifier.assert_not_awaited()
+            assert mon._last_link_states["vh1"] == "up"
+        finally:
+            mon.stop()
+
+    @pytest.mark.asyncio
+    async def test_unmanaged_port_push_ignored(self):
+        import asyncio
+
+        client = _FakeOvsdbClient({"vh1": "up", "other": "up"})
+        ports = _make_ports(("vh1", "archetype-lab1-r1", "eth1", "lab1"))
+        notifier = AsyncMock(return_value=True)
+        mon = await self._start(client, ports, notifier)
+        try:
+            client.push("other", "down")
+            await asyncio.sleep(0.05)
+
+            notifier.assert_not_awaited()
+            assert "other" not in mon._last_link_states
+        finally:
+            mon.stop()
+
+    @pytest.mark.asyncio
+    async def test_lost_connection_falls_back_to_polling(self):
+        client = _FakeOvsdbClient({"vh1": "up"})
+        ports = _make_ports(("vh1", "archetype-lab1-r1", "eth1", "lab1"))
+        notifier = AsyncMock(return_value=True)
+        mon = await self._start(client, ports, notifier)
+        mon.stop()
+
+        client.usable = False
+        mock_proc = AsyncMock()
+        mock_proc.returncode = 0
+        mock_proc.communicate = AsyncMock(return_value=(_ovs_json(["vh1", "down"]), b""))
+        with patch(
+            "agent.network.carrier_monitor.get_ovsdb_client",
+            AsyncMock(return_value=None),
+        ), patch("asyncio.create_subprocess_exec", return_value=mock_proc) as fork:
+            mon._ovsdb = client
+            await mon._ensure_subscribed()
+            assert mon._ovsdb is None
+            await mon._poll_once()
+
+        fork.assert_called_once()
+        assert mon._last_link_states["vh1"] == "down"
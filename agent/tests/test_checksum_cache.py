@@ -0,0 +1,124 @@
+"""Tests for agent/checksum_cache.py and the checks that use it.
+
+Covers:
+- lookups keyed by (device, inode, size, mtime_ns)
+- recording on write and full hash, forgetting on delete
+- background re-verification of stale entries
+- _verify_backing_image skipping the read for an unchanged image
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from agent import checksum_cache
+
+
+@pytest.fixture()
+def image(tmp_path):
+    path = tmp_path / "veos.qcow2"
+    path.write_bytes(b"q" * 4096)
+    return path
+
+
+DIGEST = hashlib.sha256(b"q" * 4096).hexdigest()
+
+
+def test_unchanged_file_is_served_from_cache(image, monkeypatch):
+    assert checksum_cache.lookup(image) is None
+    assert checksum_cache.file_sha256(image) == DIGEST
+
+    hash_file = MagicMock(side_effect=AssertionError("file was re-read"))
+    monkeypatch.setattr(checksum_cache, "_hash_file", hash_file)
+    assert checksum_cache.file_sha256(image) == DIGEST
+
+
+def test_rewritten_file_misses(image):
+    checksum_cache.record(image, DIGEST)
+    image.write_bytes(b"r" * 4096)
+    os.utime(image, ns=(0, 1))
+
+    assert checksum_cache.lookup(image) is None
+
+
+def test_replaced_file_misses(image, tmp_path):
+    checksum_cache.record(image, DIGEST)
+    replacement = tmp_path / "new.qcow2"
+    replacement.write_bytes(b"q" * 4096)
+    st = os.stat(image)
+    os.utime(replacement, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(replacement, image)
+
+    assert checksum_cache.lookup(image) is None
+
+
+def test_change_during_hash_is_not_recorded(image):
+    hashed = os.stat(image)
+    image.write_bytes(b"changed")
+
+    checksum_cache.record(image, DIGEST, hashed)
+
+    assert checksum_cache.lookup(image) is None
+
+
+def test_forget_drops_entry(image):
+    checksum_cache.record(image, DIGEST)
+    checksum_cache.forget(image)
+    assert checksum_cache.lookup(image) is None
+
+
+def test_corrupt_cache_file_is_ignored(image):
+    checksum_cache._cache_path().parent.mkdir(parents=True, exist_ok=True)
+    checksum_cache._cache_path().write_text("{not json")
+    assert checksum_cache.lookup(image) is None
+    checksum_cache.record(image, DIGEST)
+    assert checksum_cache.lookup(image) == DIGEST
+
+
+class TestReverify:
+    @pytest.fixture(autouse=True)
+    def _python_hash(self, monkeypatch):
+        monkeypatch.setattr(checksum_cache.shutil, "which", lambda _name: None)
+
+    def test_refreshes_matching_entries(self, image):
+        checksum_cache.record(image, DIGEST)
+        result = checksum_cache.reverify_stale(0)
+        assert result == {"checked": 1, "dropped": 0}
+        assert checksum_cache.lookup(image) == DIGEST
+
+    def test_skips_recent_entries(self, image):
+        checksum_cache.record(image, DIGEST)
+        assert checksum_cache.reverify_stale(3600) == {"checked": 0, "dropped": 0}
+
+    def test_drops_silently_corrupted_file(self, image):
+        checksum_cache.record(image, DIGEST)
+        st = os.stat(image)
+        with open(image, "r+b") as f:
+            f.write(b"X")
+        os.utime(image, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert checksum_cache.lookup(image) == DIGEST
+
+        assert checksum_cache.reverify_stale(0) == {"checked": 1, "dropped": 1}
+        assert checksum_cache.lookup(image) is None
+
+    def test_prunes_deleted_files(self, image):
+        checksum_cache.record(image, DIGEST)
+        image.unlink()
+        assert checksum_cache.reverify_stale(0) == {"checked": 0, "dropped": 1}
+        assert checksum_cache._read_entries() == {}
+
+
+def test_backing_image_verified_once(image):
+    from agent.providers.libvirt import LibvirtProvider
+
+    provider = LibvirtProvider.__new__(LibvirtProvider)
+    compute = MagicMock(return_value=DIGEST)
+    provider._compute_file_sha256 = compute
+
+    for _ in range(5):
+        provider._verify_backing_image(str(image), DIGEST)
+
+    assert compute.call_count == 1
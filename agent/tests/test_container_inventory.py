@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from agent.events import container_inventory as inv_mod
+from agent.events.container_inventory import ContainerInventory, ContainerRecord
+from agent.labels import LABEL_LAB_ID, LABEL_NODE_DEFINITION_ID, LABEL_NODE_NAME, LABEL_PROVIDER
+from agent.providers.base import NodeStatus
+from agent.providers.docker import DockerProvider
+
+
+@pytest.fixture
+def sync_to_thread(monkeypatch):
+    async def _sync(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "to_thread", _sync)
+
+
+def _summary(cid: str, node: str, lab: str, state: str = "running", ip: str | None = None) -> dict:
+    networks = {"lab-net": {"IPAddress": ip}} if ip else {}
+    return {
+        "Id": cid,
+        "Names": [f"/archetype-{lab}-{node}"],
+        "State": state,
+        "Image": "ceos:4.32.1F",
+        "ImageID": "sha256:0123456789abcdef",
+        "Labels": {
+            LABEL_LAB_ID: lab,
+            LABEL_NODE_NAME: node,
+            LABEL_PROVIDER: "docker",
+            LABEL_NODE_DEFINITION_ID: f"def-{node}",
+        },
+        "NetworkSettings": {"Networks": networks},
+    }
+
+
+def _event(action: str, cid: str, lab: str = "lab-a") -> dict:
+    return {
+        "Type": "container",
+        "Action": action,
+        "Actor": {"ID": cid, "Attributes": {LABEL_LAB_ID: lab, LABEL_NODE_NAME: "r1"}},
+    }
+
+
+def _inventory(summaries: list[dict]) -> tuple[ContainerInventory, MagicMock]:
+    client = MagicMock()
+
+    def _containers(all=True, filters=None):
+        wanted = (filters or {}).get("id")
+        return [s for s in summaries if wanted is None or s["Id"] == wanted]
+
+    client.api.containers.side_effect = _containers
+    return ContainerInventory(client_factory=lambda: client), client
+
+
+def test_record_from_summary_parses_name_ips_and_image():
+    record = ContainerRecord.from_summary(_summary("a" * 64, "r1", "lab-a", ip="10.0.0.5"))
+
+    assert record.name == "archetype-lab-a-r1"
+    assert record.short_id == "a" * 12
+    assert record.lab_id == "lab-a"
+    assert record.node_name == "r1"
+    assert record.ip_addresses == ["10.0.0.5"]
+    assert record.image_ref == "ceos:4.32.1F"
+
+    untagged = ContainerRecord.from_summary({**_summary("b", "r2", "lab-a"), "Image": "sha256:fedcba9876543210"})
+    assert untagged.image_ref == "sha256:01234"
+
+
+@pytest.mark.asyncio
+async def test_resync_seeds_with_single_listing_and_indexes_by_lab(sync_to_thread):
+    inventory, client = _inventory([
+        _summary("c1", "r1", "lab-a"),
+        _summary("c2", "r2", "lab-a"),
+        _summary("c3", "r1", "lab-b"),
+    ])
+
+    assert inventory.is_ready is False
+    await inventory.resync()
+
+    assert inventory.is_ready is True
+    assert client.api.containers.call_count == 1
+    assert {r.node_name for r in inventory.for_lab("lab-a")} == {"r1", "r2"}
+    assert inventory.lab_ids() == {"lab-a", "lab-b"}
+    assert inventory.for_lab("missing") == []
+
+
+@pytest.mark.asyncio
+async def test_events_update_state_without_docker_calls(sync_to_thread):
+    summaries = [_summary("c1", "r1", "lab-a")]
+    inventory, client = _inventory(summaries)
+    await inventory.resync()
+    generation = inventory.generation
+
+    await inventory.apply_event(_event("die", "c1"))
+
+    assert inventory.get("c1").state == "exited"
+    assert inventory.generation == generation + 1
+    assert client.api.containers.call_count == 1
+
+    await inventory.apply_event(_event("destroy", "c1"))
+    assert inventory.get("c1") is None
+    assert inventory.for_lab("lab-a") == []
+
+
+@pytest.mark.asyncio
+async def test_create_event_refreshes_single_container(sync_to_thread):
+    summaries = [_summary("c1", "r1", "lab-a")]
+    inventory, client = _inventory(summaries)
+    await inventory.resync()
+
+    summaries.append(_summary("c2", "r2", "lab-a", state="created"))
+    await inventory.apply_event(_event("create", "c2"))
+
+    assert inventory.get("c2").state == "created"
+    last_filters = client.api.containers.call_args.kwargs["filters"]
+    assert last_filters["id"] == "c2"
+
+
+@pytest.mark.asyncio
+async def test_unmanaged_events_are_ignored(sync_to_thread):
+    inventory, client = _inventory([])
+    await inventory.resync()
+
+    await inventory.apply_event({"Type": "container", "Action": "start", "Actor": {"ID": "x", "Attributes": {}}})
+    await inventory.apply_event({"Type": "network", "Action": "connect"})
+
+    assert len(inventory) == 0
+    assert client.api.containers.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_resync_reports_and_corrects_drift(sync_to_thread, monkeypatch):
+    summaries = [_summary("c1", "r1", "lab-a"), _summary("c2", "r2", "lab-a")]
+    inventory, _client = _inventory(summaries)
+    assert await inventory.resync() == 0
+
+    drift_counter = MagicMock()
+    import agent.metrics as metrics
+    monkeypatch.setattr(metrics, "container_inventory_drift", drift_counter)
+
+    summaries[:] = [_summary("c1", "r1", "lab-a", state="exited")]
+    drift = await inventory.resync()
+
+    assert drift == 2
+    assert inventory.get("c2") is None
+    assert inventory.get("c1").state == "exited"
+    drift_counter.inc.assert_called_once_with(2)
+
+
+@pytest.mark.asyncio
+async def test_resync_keeps_event_state_observed_during_listing():
+    inventory = ContainerInventory(client_factory=lambda: None)
+    snapshot = [_summary("c1", "r1", "lab-a")]
+
+    async def _list(container_id=None):
+        # A destroy event arrives while the listing is in flight
+        await inventory.apply_event(_event("destroy", "c1"))
+        return snapshot
+
+    inventory._list_summaries = _list
+    await inventory.resync()
+
+    assert inventory.get("c1") is None
+
+
+def test_invalidate_hides_inventory_from_callers(monkeypatch):
+    inventory = ContainerInventory(client_factory=lambda: None)
+    inventory._ready = True
+    monkeypatch.setattr(inv_mod, "_inventory", inventory)
+    assert inv_mod.get_ready_inventory() is inventory
+
+    inventory.invalidate()
+    assert inv_mod.get_ready_inventory() is None
+
+
+@pytest.mark.asyncio
+async def test_provider_status_and_discovery_answer_from_inventory(sync_to_thread, monkeypatch):
+    inventory, _client = _inventory([
+        _summary("c1", "r1", "lab-a", ip="10.0.0.1"),
+        _summary("c2", "r2", "lab-a", state="exited"),
+        _summary("c3", "r1", "lab-b"),
+    ])
+    await inventory.resync()
+    monkeypatch.setattr(inv_mod, "_inventory", inventory)
+
+    provider = DockerProvider()
+    provider._docker = MagicMock()
+
+    result = await provider.status("lab-a", Path("/tmp/workspace"))
+    statuses = {n.name: n.status for n in result.nodes}
+    assert result.lab_exists is True
+    assert statuses == {"r1": NodeStatus.RUNNING, "r2": NodeStatus.STOPPED}
+    node = next(n for n in result.nodes if n.name == "r1")
+    assert node.ip_addresses == ["10.0.0.1"]
+    assert node.node_definition_id == "def-r1"
+
+    discovered = await provider.discover_labs()
+    assert set(discovered) == {"lab-a", "lab-b"}
+
+    all_status = await provider.status_all_labs()
+    assert {lab: sorted(n.name for n in nodes) for lab, nodes in all_status.items()} == {
+        "lab-a": ["r1", "r2"],
+        "lab-b": ["r1"],
+    }
+
+    audit = await provider.audit_runtime_identity()
+    assert audit["managed_runtimes"] == 3
+
+    provider._docker.containers.list.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_provider_orphan_cleanup_removes_by_id_from_inventory(sync_to_thread, monkeypatch):
+    inventory, _client = _inventory([
+        _summary("c1", "r1", "lab-keep"),
+        _summary("c2", "r1", "lab-gone"),
+    ])
+    await inventory.resync()
+    monkeypatch.setattr(inv_mod, "_inventory", inventory)
+
+    provider = DockerProvider()
+    provider._docker = MagicMock()
+    provider._local_network = MagicMock()
+
+    async def _cleanup_lab(_lab_id):
+        return None
+
+    provider._local_network.cleanup_lab = _cleanup_lab
+    monkeypatch.setattr(provider, "_cleanup_orphan_vlans", lambda *_args: None)
+
+    removed = await provider.cleanup_orphan_containers({"lab-keep"})
+
+    assert removed == ["archetype-lab-gone-r1"]
+    provider._docker.api.remove_container.assert_called_once_with("c2", force=True)
+    assert inventory.get("c2") is None
@@ -0,0 +1,181 @@
+"""Concurrency tests and a throughput benchmark for CreateEndpoint.
+
+Runs the real handler against fake command runners. The unit tests check
+overlap deterministically: a gated runner holds every veth creation until
+all of them are in flight, which only completes if no lock serializes
+them. The wall-clock benchmark is opt-in (``PLUGIN_BENCHMARK=1``).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+import agent.network.docker_plugin as plugin_mod
+from agent.network.docker_plugin import DockerOVSPlugin, LabBridge, NetworkState
+
+
+class FakeRunner:
+    """Command runner that takes ``latency`` seconds per command."""
+
+    def __init__(self, latency: float = 0.002):
+        self.latency = latency
+        self.calls: list[list[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, cmd: list[str]) -> tuple[int, str, str]:
+        self.calls.append(cmd)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return 0, "", ""
+
+    def count(self, *prefix: str) -> int:
+        return sum(1 for cmd in self.calls if cmd[: len(prefix)] == list(prefix))
+
+
+class GatedRunner(FakeRunner):
+    """Command runner that holds ``ip link add`` until ``expected`` are in flight."""
+
+    def __init__(self, expected: int):
+        super().__init__(latency=0)
+        self.expected = expected
+        self.veths_in_flight = 0
+        self.max_veths_in_flight = 0
+        self._all_in_flight = asyncio.Event()
+
+    async def __call__(self, cmd: list[str]) -> tuple[int, str, str]:
+        if cmd[:3] != ["ip", "link", "add"]:
+            return await super().__call__(cmd)
+        self.calls.append(cmd)
+        self.veths_in_flight += 1
+        self.max_veths_in_flight = max(self.max_veths_in_flight, self.veths_in_flight)
+        if self.veths_in_flight == self.expected:
+            self._all_in_flight.set()
+        try:
+            await self._all_in_flight.wait()
+        finally:
+            self.veths_in_flight -= 1
+        return 0, "", ""
+
+
+def _make_plugin(monkeypatch, tmp_path, runner: FakeRunner) -> DockerOVSPlugin:
+    monkeypatch.setattr(plugin_mod.settings, "workspace_path", str(tmp_path))
+    monkeypatch.setattr(plugin_mod.settings, "ovs_bridge_name", "arch-ovs")
+    plugin = DockerOVSPlugin()
+    plugin._run_cmd = runner
+    plugin.lab_bridges["lab1"] = LabBridge(lab_id="lab1", bridge_name="arch-ovs")
+    plugin.networks["net1"] = NetworkState(
+        network_id="net1", lab_id="lab1", interface_name="eth1", bridge_name="arch-ovs",
+    )
+    return plugin
+
+
+def _request(endpoint_id: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        json=AsyncMock(return_value={"NetworkID": "net1", "EndpointID": endpoint_id})
+    )
+
+
+class TestConcurrentCreateEndpoint:
+    async def test_veth_and_ovs_work_overlaps(self, monkeypatch, tmp_path):
+        runner = GatedRunner(expected=20)
+        plugin = _make_plugin(monkeypatch, tmp_path, runner)
+
+        # Hangs (and times out) if veth creation runs under the plugin lock
+        responses = await asyncio.wait_for(
+            asyncio.gather(
+                *(plugin.handle_create_endpoint(_request(f"ep{i:04d}")) for i in range(20))
+            ),
+            timeout=10,
+        )
+
+        assert all(json.loads(r.text) == {"Interface": {}} for r in responses)
+        assert runner.max_veths_in_flight == 20
+        vlans = [ep.vlan_tag for ep in plugin.endpoints.values()]
+        assert len(vlans) == 20 and len(set(vlans)) == 20
+
+    async def test_failed_attach_releases_reservation(self, monkeypatch, tmp_path):
+        runner = FakeRunner(latency=0)
+        plugin = _make_plugin(monkeypatch, tmp_path, runner)
+        plugin._attach_to_ovs = AsyncMock(return_value=False)
+
+        response = await plugin.handle_create_endpoint(_request("ep-fail"))
+
+        assert json.loads(response.text)["Err"] == "Failed to attach to OVS"
+        assert "ep-fail" not in plugin.endpoints
+        assert plugin._allocated_vlans == set()
+
+    async def test_bridge_tag_index_read_once_per_ttl(self, monkeypatch, tmp_path):
+        runner = FakeRunner(latency=0)
+        plugin = _make_plugin(monkeypatch, tmp_path, runner)
+        read = AsyncMock(return_value={100})
+        plugin._get_used_vlan_tags_on_bridge = read
+
+        vlans = [await plugin._allocate_vlan(plugin.lab_bridges["lab1"]) for _ in range(5)]
+
+        assert 100 not in vlans
+        read.assert_awaited_once_with("arch-ovs")
+
+
+async def test_create_500_endpoints_batches_state_writes(monkeypatch, tmp_path):
+    """500 concurrent endpoints get unique VLANs and share a few state writes."""
+    runner = FakeRunner(latency=0)
+    plugin = _make_plugin(monkeypatch, tmp_path, runner)
+    writes = 0
+    real_save = plugin._save_state
+
+    async def counting_save():
+        nonlocal writes
+        writes += 1
+        return await real_save()
+
+    plugin._save_state = counting_save
+    count = 500
+
+    responses = await asyncio.wait_for(
+        asyncio.gather(
+            *(plugin.handle_create_endpoint(_request(f"ep{i:04d}")) for i in range(count))
+        ),
+        timeout=30,
+    )
+    await plugin._flush_state()
+
+    assert all(json.loads(r.text) == {"Interface": {}} for r in responses)
+    assert len({ep.vlan_tag for ep in plugin.endpoints.values()}) == count
+    assert writes < count
+    reloaded = DockerOVSPlugin()
+    assert await reloaded._load_state() is True
+    assert len(reloaded.endpoints) == count
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(os.getenv("PLUGIN_BENCHMARK") != "1", reason="set PLUGIN_BENCHMARK=1 to enable")
+async def test_benchmark_create_500_endpoints(monkeypatch, tmp_path, record_property):
+    """500 concurrent endpoints against a 2ms-per-command runner beat serial time."""
+    runner = FakeRunner(latency=0.002)
+    plugin = _make_plugin(monkeypatch, tmp_path, runner)
+    count = 500
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(plugin.handle_create_endpoint(_request(f"ep{i:04d}")) for i in range(count))
+    )
+    elapsed = time.perf_counter() - start
+    await plugin._flush_state()
+
+    # Serial lower bound: every veth/OVS command back to back
+    commands = runner.count("ip", "link", "add") + runner.count("ovs-vsctl", "add-port")
+    endpoints_per_sec = count / elapsed
+    record_property("endpoints_per_sec", round(endpoints_per_sec, 1))
+    print(f"created {count} endpoints in {elapsed:.3f}s ({endpoints_per_sec:.1f} endpoints/sec)")
+    assert elapsed < commands * runner.latency
@@ -168,6 +168,9 @@ async def test_mark_dirty_and_save_marks_flag(monkeypatch, tmp_path):
 
     await plugin._mark_dirty_and_save()
     assert plugin._state_dirty is True
+    plugin._save_state.assert_not_awaited()
+
+    await plugin._flush_state()
     plugin._save_state.assert_awaited_once()
 
 
@@ -162,8 +162,8 @@ async def test_start_containers_dummy_interface_fallback(monkeypatch):
 async def test_provision_ovs_interfaces_counts_successes(monkeypatch):
     provider = DockerProvider()
     provider._ovs_manager = MagicMock()
-    provider._ovs_manager.provision_interface = AsyncMock(
-        side_effect=[None, RuntimeError("fail"), None]
+    provider._ovs_manager.provision_interfaces = AsyncMock(
+        return_value={"eth1": 100, "eth3": 101}
     )
 
     count = await provider._provision_ovs_interfaces(
@@ -174,6 +174,9 @@ async def test_provision_ovs_interfaces_counts_successes(monkeypatch):
         lab_id="lab1",
     )
     assert count == 2
+    provider._ovs_manager.provision_interfaces.assert_awaited_once_with(
+        container_name="c1", interface_names=["eth1", "eth2", "eth3"], lab_id="lab1",
+    )
 
 
 def test_topology_from_json_applies_ceos_interface_fallback(monkeypatch):
@@ -184,6 +184,49 @@ async def test_listen_loop_processes_timeout_event_callback_error_and_cleanup(mo
     callback.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_listen_loop_invalidates_resources_on_update(monkeypatch):
+    from agent import helpers
+
+    docker_events = _load_docker_events(monkeypatch)
+    listener = docker_events.DockerEventListener()
+    listener._running = True
+    listener._stop_event = asyncio.Event()
+
+    subscribed = {}
+    fake_events = _FakeEvents()
+
+    def _events(**kwargs):
+        subscribed.update(kwargs)
+        return fake_events
+
+    listener._client = SimpleNamespace(events=_events)
+    monkeypatch.setattr(docker_events.threading, "Thread", _FakeThread)
+
+    cache = helpers.ContainerResourceCache()
+    cache._limits["cid"] = ("running", 1, 512)
+    monkeypatch.setattr(helpers, "get_container_resource_cache", lambda: cache)
+
+    sequence = iter([
+        {"Type": "container", "Action": "update", "Actor": {"ID": "cid", "Attributes": {}}},
+        None,
+    ])
+
+    async def _wait_for(awaitable, timeout):
+        if hasattr(awaitable, "close"):
+            awaitable.close()
+        return next(sequence)
+
+    monkeypatch.setattr(docker_events.asyncio, "wait_for", _wait_for)
+
+    callback = AsyncMock(return_value=None)
+    await listener._listen_loop(callback)
+
+    assert "update" in subscribed["filters"]["event"]
+    assert "cid" not in cache._limits
+    callback.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_listen_loop_raises_exception_events(monkeypatch):
     docker_events = _load_docker_events(monkeypatch)
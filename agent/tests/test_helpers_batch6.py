@@ -83,41 +83,38 @@ def test_get_capabilities_reflects_settings(monkeypatch):
 
 def test_sync_get_resource_usage_success_and_docker_skip_paths(monkeypatch):
     monkeypatch.setitem(sys.modules, "psutil", _fake_psutil())
+    helpers.get_container_resource_cache().clear()
 
-    good = _FakeContainer(
-        name="arch-lab-r1",
-        status="running",
-        labels={"archetype.lab_id": "lab-1", "archetype.node_name": "r1", "archetype.node_kind": "router"},
-        nano_cpus=2_000_000_000,
-        mem_bytes=2 * 1024 * 1024 * 1024,
-    )
-    system = _FakeContainer(name="archetype-agent", status="running", labels={})
-    ignored = _FakeContainer(name="nginx", status="running", labels={})
+    def _summary(cid: str, name: str, labels: dict[str, str]) -> dict:
+        return {"Id": cid, "Names": [f"/{name}"], "State": "running", "Labels": labels, "ImageID": "img-1"}
 
-    by_id = {
-        "good": good,
-        "system": system,
-        "ignored": ignored,
+    host_configs = {
+        "good": {"NanoCpus": 2_000_000_000, "Memory": 2 * 1024 * 1024 * 1024},
+        "system": {"NanoCpus": 1_000_000_000, "Memory": 1024 * 1024 * 1024},
     }
 
-    class _Containers:
-        def get(self, cid: str):
-            if cid == "gone":
-                import docker
+    def _inspect_container(cid: str):
+        if cid == "gone":
+            import docker
 
-                raise docker.errors.NotFound("gone")
-            return by_id[cid]
+            raise docker.errors.NotFound("gone")
+        return {"HostConfig": host_configs[cid]}
 
     fake_client = SimpleNamespace(
         api=SimpleNamespace(
             containers=lambda all=True: [  # noqa: ARG005
-                {"Id": "good", "Names": ["/arch-lab-r1"]},
-                {"Id": "system", "Names": ["/archetype-agent"]},
-                {"Id": "ignored", "Names": ["/nginx"]},
-                {"Id": "gone", "Names": ["/gone"]},
-            ]
+                _summary(
+                    "good",
+                    "arch-lab-r1",
+                    {"archetype.lab_id": "lab-1", "archetype.node_name": "r1", "archetype.node_kind": "router"},
+                ),
+                _summary("system", "archetype-agent", {}),
+                _summary("ignored", "nginx", {}),
+                _summary("gone", "archetype-gone", {}),
+            ],
+            inspect_container=_inspect_container,
+            inspect_image=lambda _iid: {"RepoTags": ["repo:tag"]},
         ),
-        containers=_Containers(),
     )
     monkeypatch.setattr(helpers, "get_docker_client", lambda: fake_client)
 
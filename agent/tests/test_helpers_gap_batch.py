@@ -37,30 +37,30 @@ def test_sync_get_resource_usage_collects_docker_details(monkeypatch):
         disk_usage=lambda _path: SimpleNamespace(percent=40.0, used=50 * 1024**3, total=100 * 1024**3),
     )
 
-    good_container = MagicMock()
-    good_container.name = "archetype-lab1-r1"
-    good_container.status = "running"
-    good_container.labels = {
-        "archetype.node_name": "r1",
-        "archetype.node_kind": "linux",
-        "archetype.lab_id": "lab1",
-    }
-    good_container.image.tags = ["vendor/r1:1"]
-    good_container.image.short_id = "sha256:abc"
-    good_container.attrs = {"HostConfig": {"NanoCpus": int(2e9), "Memory": 512 * 1024 * 1024}}
-
     docker_client = MagicMock()
     docker_client.api.containers.return_value = [
-        {"Id": "good", "Names": ["/archetype-lab1-r1"]},
-        {"Id": "bad", "Names": ["/dead"]},
+        {
+            "Id": "good",
+            "Names": ["/archetype-lab1-r1"],
+            "State": "running",
+            "ImageID": "sha256:abc",
+            "Labels": {
+                "archetype.node_name": "r1",
+                "archetype.node_kind": "linux",
+                "archetype.lab_id": "lab1",
+            },
+        },
+        {"Id": "bad", "Names": ["/dead"], "State": "dead", "Labels": {"archetype.node_name": "x"}},
     ]
 
-    def _get_container(container_id: str):
+    def _inspect_container(container_id: str):
         if container_id == "good":
-            return good_container
+            return {"HostConfig": {"NanoCpus": int(2e9), "Memory": 512 * 1024 * 1024}}
         raise docker.errors.NotFound("gone")
 
-    docker_client.containers.get.side_effect = _get_container
+    docker_client.api.inspect_container.side_effect = _inspect_container
+    docker_client.api.inspect_image.return_value = {"RepoTags": ["vendor/r1:1"]}
+    helpers_mod.get_container_resource_cache().clear()
 
     monkeypatch.setattr(helpers_mod.settings, "workspace_path", "/tmp")
 
@@ -74,6 +74,49 @@ def test_sync_get_resource_usage_collects_docker_details(monkeypatch):
     assert usage["container_details"][0]["name"] == "archetype-lab1-r1"
     assert usage["container_details"][0]["vcpus"] == 2
     assert usage["container_details"][0]["memory_mb"] == 512
+    assert usage["container_details"][0]["image"] == "vendor/r1:1"
+
+
+def test_container_details_inspect_only_new_or_changed_containers():
+    summaries = [
+        {
+            "Id": f"c{i}",
+            "Names": [f"/archetype-lab1-r{i}"],
+            "State": "running",
+            "ImageID": "sha256:img",
+            "Labels": {"archetype.node_name": f"r{i}", "archetype.lab_id": "lab1"},
+        }
+        for i in range(50)
+    ]
+    docker_client = MagicMock()
+    docker_client.api.containers.side_effect = lambda all=True: [dict(s) for s in summaries]
+    docker_client.api.inspect_container.return_value = {"HostConfig": {"NanoCpus": int(1e9), "Memory": 0}}
+    docker_client.api.inspect_image.return_value = {"RepoTags": []}
+    cache = helpers_mod.ContainerResourceCache()
+
+    with patch.object(helpers_mod, "get_container_resource_cache", return_value=cache):
+        running, total, details = helpers_mod._collect_container_details(docker_client)
+        assert (running, total) == (50, 50)
+        assert details[0]["image"] == "sha256:img"
+        assert docker_client.api.inspect_container.call_count == 50
+        assert docker_client.api.inspect_image.call_count == 1
+
+        # Steady state: no inspects at all
+        helpers_mod._collect_container_details(docker_client)
+        assert docker_client.api.inspect_container.call_count == 50
+
+        # One container changed state, one disappeared
+        summaries[0]["State"] = "exited"
+        del summaries[1]
+        running, total, _ = helpers_mod._collect_container_details(docker_client)
+        assert (running, total) == (48, 49)
+        assert docker_client.api.inspect_container.call_count == 51
+        assert "c1" not in cache._limits
+
+        # Limits changed by `docker update` are re-read
+        cache.invalidate("c2")
+        helpers_mod._collect_container_details(docker_client)
+        assert docker_client.api.inspect_container.call_count == 52
 
 
 def test_sync_get_resource_usage_returns_empty_on_failure(monkeypatch):
@@ -0,0 +1,409 @@
+"""Tests for the native OVSDB JSON-RPC client (agent/network/ovsdb.py).
+
+Runs the client against an in-process fake ovsdb-server that speaks the
+subset of RFC 7047 the client uses: monitor, transact (insert, update,
+mutate, select) and echo, with update notifications and garbage
+collection of unreferenced Port/Interface rows.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid as uuidlib
+from unittest.mock import AsyncMock
+
+import pytest
+
+from agent.network import ovsdb
+from agent.network.docker_plugin import DockerOVSPlugin
+from agent.network.ovsdb import OvsdbClient, OvsdbError, to_python
+
+
+class FakeOvsdbServer:
+    """Minimal in-process ovsdb-server over a unix socket."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tables: dict[str, dict[str, dict]] = {
+            "Open_vSwitch": {str(uuidlib.uuid4()): {"next_cfg": 0, "cur_cfg": 0}},
+            "Bridge": {},
+            "Port": {},
+            "Interface": {},
+        }
+        self.requests: list[str] = []
+        self._monitors: list[tuple[asyncio.StreamWriter, dict]] = []
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+
+    async def stop(self) -> None:
+        self._server.close()
+        # wait_closed() waits for open connections (Python 3.12+)
+        for writer in list(self._connections):
+            writer.close()
+        await self._server.wait_closed()
+
+    def add_bridge(self, name: str, ports: dict[str, dict]) -> None:
+        port_uuids = []
+        for port_name, attrs in ports.items():
+            iface_uuid = str(uuidlib.uuid4())
+            self.tables["Interface"][iface_uuid] = {
+                "name": port_name,
+                "type": attrs.get("type", ""),
+                "ofport": attrs.get("ofport", 1),
+                "link_state": attrs.get("link_state", "up"),
+            }
+            port_uuid = str(uuidlib.uuid4())
+            self.tables["Port"][port_uuid] = {
+                "name": port_name,
+                "tag": attrs.get("tag", ["set", []]),
+                "interfaces": ["uuid", iface_uuid],
+            }
+            port_uuids.append(["uuid", port_uuid])
+        self.tables["Bridge"][str(uuidlib.uuid4())] = {"name": name, "ports": ["set", port_uuids]}
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        try:
+            await self._handle_requests(reader, writer)
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            self._monitors = [(w, r) for w, r in self._monitors if w is not writer]
+            writer.close()
+
+    async def _handle_requests(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        decoder = json.JSONDecoder()
+        buffer = ""
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            buffer += chunk.decode()
+            while buffer.strip():
+                try:
+                    message, end = decoder.raw_decode(buffer.lstrip())
+                except json.JSONDecodeError:
+                    break
+                buffer = buffer.lstrip()[end:]
+                self.requests.append(message["method"])
+                result = self._dispatch(writer, message["method"], message["params"])
+                writer.write(json.dumps({"id": message["id"], "result": result, "error": None}).encode())
+                await writer.drain()
+
+    def _dispatch(self, writer, method: str, params: list):
+        if method == "echo":
+            return params
+        if method == "monitor":
+            requests = params[2]
+            self._monitors.append((writer, requests))
+            return self._snapshot(requests)
+        if method == "transact":
+            return self._transact(params[1:])
+        raise AssertionError(f"unexpected method {method}")
+
+    def _snapshot(self, requests: dict) -> dict:
+        return {
+            table: {
+                u: {"new": {c: row[c] for c in spec["columns"] if c in row}}
+                for u, row in self.tables[table].items()
+            }
+            for table, spec in requests.items()
+        }
+
+    def _matches(self, row_uuid: str, row: dict, where: list) -> bool:
+        for column, function, value in where:
+            if column == "_uuid":
+                if row_uuid != value[1]:
+                    return False
+            elif function == "includes":
+                current = [tuple(v) for v in to_python_set(row.get(column))]
+                if any(tuple(v) not in current for v in to_python_set(value)):
+                    return False
+            elif row.get(column) != value:
+                return False
+        return True
+
+    def _transact(self, operations: list[dict]) -> list[dict]:
+        before = {t: {u: dict(r) for u, r in rows.items()} for t, rows in self.tables.items()}
+        names: dict[str, str] = {}
+
+        def resolve(value):
+            if isinstance(value, list) and len(value) == 2 and value[0] == "named-uuid":
+                return ["uuid", names[value[1]]]
+            if isinstance(value, list):
+                return [resolve(v) for v in value]
+            return value
+
+        results = []
+        for op in operations:
+            table = self.tables[op["table"]]
+            if op["op"] == "insert":
+                new_uuid = str(uuidlib.uuid4())
+                names[op["uuid-name"]] = new_uuid
+                table[new_uuid] = {k: resolve(v) for k, v in op["row"].items()}
+                results.append({"uuid": ["uuid", new_uuid]})
+            elif op["op"] == "update":
+                count = 0
+                for u, row in table.items():
+                    if self._matches(u, row, op["where"]):
+                        row.update({k: resolve(v) for k, v in op["row"].items()})
+                        count += 1
+                results.append({"count": count})
+            elif op["op"] == "mutate":
+                count = 0
+                for u, row in table.items():
+                    if not self._matches(u, row, op["where"]):
+                        continue
+                    count += 1
+                    for column, mutator, value in op["mutations"]:
+                        if mutator == "+=":
+                            row[column] += value
+                            continue
+                        current = [tuple(v) for v in to_python_set(row.get(column))]
+                        change = [tuple(v) for v in resolve(value)[1]]
+                        if mutator == "insert":
+                            current += change
+                        else:
+                            current = [v for v in current if v not in change]
+                        row[column] = ["set", [list(v) for v in current]]
+                results.append({"count": count})
+            elif op["op"] == "select":
+                results.append({"rows": [
+                    {c: row[c] for c in op["columns"]}
+                    for u, row in table.items()
+                    if self._matches(u, row, op["where"])
+                ]})
+        self._garbage_collect()
+        # Simulate ovs-vswitchd applying the configuration immediately
+        for row in self.tables["Open_vSwitch"].values():
+            row["cur_cfg"] = row["next_cfg"]
+        self._notify(before)
+        return results
+
+    def _garbage_collect(self) -> None:
+        referenced_ports = {
+            v[1] for row in self.tables["Bridge"].values() for v in to_python_set(row.get("ports"))
+        }
+        for u in list(self.tables["Port"]):
+            if u not in referenced_ports:
+                del self.tables["Port"][u]
+        referenced_ifaces = {
+            v[1] for row in self.tables["Port"].values() for v in to_python_set(row.get("interfaces"))
+        }
+        for u in list(self.tables["Interface"]):
+            if u not in referenced_ifaces:
+                del self.tables["Interface"][u]
+
+    def _notify(self, before: dict) -> None:
+        for writer, requests in self._monitors:
+            updates: dict = {}
+            for table, spec in requests.items():
+                cols = spec["columns"]
+                old_rows, new_rows = before[table], self.tables[table]
+                for u in set(old_rows) | set(new_rows):
+                    old = {c: old_rows[u][c] for c in cols if c in old_rows[u]} if u in old_rows else None
+                    new = {c: new_rows[u][c] for c in cols if c in new_rows[u]} if u in new_rows else None
+                    if old != new:
+                        change = {}
+                        if old is not None:
+                            change["old"] = old
+                        if new is not None:
+                            change["new"] = new
+                        updates.setdefault(table, {})[u] = change
+            if updates:
+                writer.write(json.dumps({"id": None, "method": "update", "params": [None, updates]}).encode())
+
+
+def to_python_set(datum) -> list:
+    if datum is None:
+        return []
+    if datum[0] == "set":
+        return datum[1]
+    return [datum]
+
+
+@pytest.fixture
+async def fake_server(tmp_path):
+    server = FakeOvsdbServer(str(tmp_path / "db.sock"))
+    server.add_bridge("arch-ovs", {
+        "vh1": {"tag": 100, "ofport": 5},
+        "vh2": {"tag": 101, "link_state": "down"},
+        "vxlan-abc": {"type": "vxlan", "ofport": 9},
+    })
+    server.add_bridge("other-br", {"ext1": {"tag": 555}})
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def client(fake_server):
+    c = OvsdbClient(f"unix:{fake_server.path}")
+    await c.connect()
+    try:
+        yield c
+    finally:
+        # Stops the reader task and closes the socket before the server stops
+        await c.close()
+        assert c._read_task is None
+
+
+class TestDatum:
+    def test_to_python_converts_sets_maps_and_uuids(self):
+        assert to_python(["set", [1, 2]]) == [1, 2]
+        assert to_python(["map", [["k", "v"]]]) == {"k": "v"}
+        assert to_python(["uuid", "abc"]) == "abc"
+        assert to_python(7) == 7
+
+    def test_optional_value_empty_set_is_none(self):
+        assert ovsdb.optional_value(["set", []]) is None
+        assert ovsdb.optional_value(42) == 42
+
+
+class TestReplicatedCache:
+    async def test_typed_accessors_read_from_monitor_snapshot(self, client):
+        port = client.get_port("vh1")
+        assert port is not None and port.tag == 100
+        iface = client.get_interface("vh2")
+        assert iface.link_state == "down"
+        assert client.get_interface("vxlan-abc").type == "vxlan"
+        assert {p.name for p in client.bridge_ports("arch-ovs")} == {"vh1", "vh2", "vxlan-abc"}
+
+    async def test_used_vlan_tags_scoped_to_bridge(self, client):
+        assert client.used_vlan_tags_on_bridge("arch-ovs") == {100, 101}
+        assert client.used_vlan_tags_on_bridge("missing-br") == set()
+
+    async def test_reads_do_not_hit_the_server(self, client, fake_server):
+        before = len(fake_server.requests)
+        for _ in range(50):
+            client.used_vlan_tags_on_bridge("arch-ovs")
+        assert len(fake_server.requests) == before
+
+
+class TestTransactions:
+    async def test_set_port_tag_updates_cache(self, client):
+        await client.set_port_tag("vh1", 300)
+        await client.sync()
+        assert client.get_port("vh1").tag == 300
+
+        await client.set_port_tag("vh1", None)
+        await client.sync()
+        assert client.get_port("vh1").tag is None
+
+    async def test_add_and_delete_port(self, client, fake_server):
+        await client.add_port("arch-ovs", "vh9", tag=700, external_ids={"lab": "l1"})
+        await client.sync()
+        port = client.get_port("vh9")
+        assert port.tag == 700
+        assert port.external_ids == {"lab": "l1"}
+        assert 700 in client.used_vlan_tags_on_bridge("arch-ovs")
+
+        await client.del_port("arch-ovs", "vh9")
+        await client.sync()
+        assert client.get_port("vh9") is None
+        assert client.get_interface("vh9") is None
+
+    async def test_del_missing_port(self, client):
+        await client.del_port("arch-ovs", "nope")
+        with pytest.raises(OvsdbError):
+            await client.del_port("arch-ovs", "nope", if_exists=False)
+
+    async def test_add_port_to_missing_bridge_fails(self, client):
+        with pytest.raises(OvsdbError, match="No bridge named"):
+            await client.add_port("no-such-br", "vh9", tag=700)
+        await client.sync()
+        assert client.get_port("vh9") is None
+
+    async def test_del_port_on_other_bridge_fails(self, client):
+        with pytest.raises(OvsdbError, match="has no port"):
+            await client.del_port("other-br", "vh1")
+        await client.sync()
+        assert client.get_port("vh1") is not None
+
+    async def test_listener_sees_changes(self, client):
+        seen = []
+        client.add_listener(lambda table, uuid, old, new: seen.append((table, old, new)))
+
+        await client.set_port_tag("vh2", 222)
+        await client.sync()
+
+        port_changes = [(old, new) for table, old, new in seen if table == "Port"]
+        assert port_changes and port_changes[0][1]["tag"] == 222
+
+
+class TestSharedClient:
+    async def test_unavailable_socket_returns_none(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ovsdb.settings, "ovsdb_enabled", True)
+        monkeypatch.setattr(ovsdb.settings, "ovsdb_remote", f"unix:{tmp_path / 'missing.sock'}")
+        monkeypatch.setattr(ovsdb, "_client", None)
+        monkeypatch.setattr(ovsdb, "_retry_after", 0.0)
+
+        assert await ovsdb.get_ovsdb_client() is None
+        # Backed off: no reconnect attempt until the retry window passes
+        assert ovsdb._retry_after > 0
+
+    async def test_disabled_returns_none(self):
+        assert await ovsdb.get_ovsdb_client() is None
+
+    async def test_connects_and_reuses(self, fake_server, monkeypatch):
+        monkeypatch.setattr(ovsdb.settings, "ovsdb_enabled", True)
+        monkeypatch.setattr(ovsdb.settings, "ovsdb_remote", f"unix:{fake_server.path}")
+        monkeypatch.setattr(ovsdb, "_client", None)
+        monkeypatch.setattr(ovsdb, "_retry_after", 0.0)
+
+        first = await ovsdb.get_ovsdb_client()
+        second = await ovsdb.get_ovsdb_client()
+        assert first is not None and first is second
+        await ovsdb.close_ovsdb_client()
+
+
+class TestPluginPortOperations:
+    """DockerOVSPlugin port changes go through OVSDB instead of ovs-vsctl."""
+
+    @pytest.fixture
+    async def plugin(self, fake_server, monkeypatch, tmp_path):
+        monkeypatch.setattr(ovsdb.settings, "ovsdb_enabled", True)
+        monkeypatch.setattr(ovsdb.settings, "ovsdb_remote", f"unix:{fake_server.path}")
+        monkeypatch.setattr(ovsdb.settings, "workspace_path", str(tmp_path))
+        monkeypatch.setattr(ovsdb, "_client", None)
+        monkeypatch.setattr(ovsdb, "_retry_after", 0.0)
+        plugin = DockerOVSPlugin()
+        plugin._ovs_vsctl = AsyncMock(side_effect=AssertionError("ovs-vsctl was forked"))
+        plugin._run_cmd = AsyncMock(return_value=(0, "", ""))
+        try:
+            yield plugin
+        finally:
+            await ovsdb.close_ovsdb_client()
+
+    async def test_attach_retag_and_delete(self, plugin):
+        attached = await plugin._attach_to_ovs(
+            "arch-ovs", "vh9", 700, external_ids={"archetype.endpoint_id": "ep9"},
+        )
+        client = await ovsdb.get_ovsdb_client()
+        await client.sync()
+
+        assert attached is True
+        assert client.get_port("vh9").tag == 700
+        iface = client.get_interface("vh9")
+        assert (iface.type, iface.external_ids) == ("system", {"archetype.endpoint_id": "ep9"})
+
+        assert await plugin._set_port_tag("vh9", 2001) == (0, "", "")
+        await client.sync()
+        assert client.get_port("vh9").tag == 2001
+
+        await plugin._delete_port("arch-ovs", "vh9")
+        await client.sync()
+        assert client.get_port("vh9") is None
+        plugin._run_cmd.assert_any_await(["ip", "link", "delete", "vh9"])
+
+    async def test_retag_of_missing_port_falls_back(self, plugin):
+        plugin._ovs_vsctl = AsyncMock(return_value=(1, "", "no row \"nope\""))
+
+        code, _, _ = await plugin._set_port_tag("nope", 2001)
+
+        assert code == 1
+        plugin._ovs_vsctl.assert_awaited_once_with("set", "port", "nope", "tag=2001")
@@ -5,6 +5,7 @@ Covers:
 - Container PID lookup (running, stopped, not found)
 - Interface provisioning orchestration (veth creation, OVS attachment, namespace move)
 - Failure recovery during provisioning (cleanup on partial failure)
+- Bulk provisioning with a single VLAN reservation
 - Port deletion and resource release
 - Stale port detection (namespace check, sysfs fallback)
 - Stale port cleanup
@@ -296,6 +297,47 @@ class TestProvisionInterface:
 
         mgr.initialize.assert_awaited_once()
 
+    @pytest.mark.asyncio
+    async def test_bulk_reserves_vlans_and_releases_failed(self, tmp_path: Path) -> None:
+        """provision_interfaces allocates every tag at once and frees the ones that fail."""
+        from agent.network.ovs_provision import provision_interfaces
+
+        mgr = _make_manager(tmp_path)
+        allocate_many = MagicMock(wraps=mgr._vlan_allocator.allocate_many)
+        mgr._vlan_allocator.allocate_many = allocate_many
+
+        add_ports = 0
+
+        async def _fail_second_add_port(*args):
+            nonlocal add_ports
+            if "add-port" in args:
+                add_ports += 1
+                if add_ports == 2:
+                    return (1, "", "add-port failed")
+            return (0, "", "")
+
+        mgr._ovs_vsctl = AsyncMock(side_effect=_fail_second_add_port)
+
+        with patch("agent.network.ovs_provision.get_container_pid", new_callable=AsyncMock, return_value=42):
+            result = await provision_interfaces(mgr, "archetype-lab1-r1", ["eth1", "eth2", "eth3"], "lab1")
+
+        allocate_many.assert_called_once()
+        assert sorted(result) == ["eth1", "eth3"]
+        assert mgr._vlan_allocator.get_vlan("archetype-lab1-r1:eth2") is None
+        assert mgr._vlan_allocator.get_vlan("archetype-lab1-r1:eth3") == result["eth3"]
+
+    @pytest.mark.asyncio
+    async def test_bulk_releases_reservation_when_container_stopped(self, tmp_path: Path) -> None:
+        from agent.network.ovs_provision import provision_interfaces
+
+        mgr = _make_manager(tmp_path)
+
+        with patch("agent.network.ovs_provision.get_container_pid", new_callable=AsyncMock, return_value=None):
+            result = await provision_interfaces(mgr, "archetype-lab1-r1", ["eth1", "eth2"], "lab1")
+
+        assert result == {}
+        assert dict(mgr._vlan_allocator._allocated) == {}
+
 
 # ---------------------------------------------------------------------------
 # TestDeletePort
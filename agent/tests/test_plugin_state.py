@@ -398,13 +398,172 @@ class TestSaveAndLoad:
     @pytest.mark.asyncio
     async def test_mark_dirty_and_save(self, monkeypatch, tmp_path):
         plugin = _make_plugin(monkeypatch, tmp_path)
+        monkeypatch.setattr(plugin_mod.settings, "plugin_state_flush_delay", 0.01)
         assert plugin._state_dirty is False
 
         await plugin._mark_dirty_and_save()
+        assert plugin._state_dirty is True  # save is batched, not immediate
+
+        await plugin._flush_task
 
         assert plugin._state_dirty is False  # save clears it
         assert plugin._state_file.exists()
 
+    @pytest.mark.asyncio
+    async def test_mutations_within_delay_share_one_save(self, monkeypatch, tmp_path):
+        plugin = _make_plugin(monkeypatch, tmp_path)
+        monkeypatch.setattr(plugin_mod.settings, "plugin_state_flush_delay", 0.01)
+        plugin._save_state = AsyncMock(
+            side_effect=lambda: setattr(plugin, "_state_dirty", False) or True
+        )
+
+        for i in range(20):
+            _setup_lab(plugin, f"lab{i}")
+            await plugin._mark_dirty_and_save()
+        await plugin._flush_task
+
+        plugin._save_state.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_immediate_save_writes_before_returning(self, monkeypatch, tmp_path):
+        plugin = _make_plugin(monkeypatch, tmp_path)
+        monkeypatch.setattr(plugin_mod.settings, "plugin_state_flush_delay", 60)
+        _setup_lab(plugin, "lab1")
+        await plugin._mark_dirty_and_save()
+        _add_network(plugin, "lab1", "net1")
+
+        await plugin._mark_dirty_and_save(immediate=True)
+
+        assert plugin._state_dirty is False
+        assert plugin._flush_task.cancelled()
+        assert "net1" in json.loads(plugin._state_file.read_text())["networks"]
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_is_retried(self, monkeypatch, tmp_path):
+        plugin = _make_plugin(monkeypatch, tmp_path)
+        monkeypatch.setattr(plugin_mod.settings, "plugin_state_flush_delay", 0.01)
+        attempts = []
+
+        async def _save_state():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("disk full")
+            plugin._state_dirty = False
+            return True
+
+        plugin._save_state = _save_state
+
+        await plugin._mark_dirty_and_save()
+        await asyncio.wait_for(plugin._flush_task, timeout=5)
+
+        assert len(attempts) == 2
+        assert plugin._state_dirty is False
+
+    @pytest.mark.asyncio
+    async def test_incremental_save_appends_changed_records(self, monkeypatch, tmp_path):
+        plugin = _make_plugin(monkeypatch, tmp_path)
+        _setup_lab(plugin, "lab1")
+        _add_network(plugin, "lab1", "net1", "eth1")
+        for i in range(50):
+            _add_endpoint(plugin, f"ep{i}", "net1", "eth1", 200 + i)
+        await plugin._save_state()
+        snapshot = plugin._state_file.read_text()
+
+        _add_endpoint(plugin, "ep-new", "net1", "eth1", 900)
+        del plugin.endpoints["ep0"]
+        await plugin._save_state()
+
+        # Snapshot untouched; only the two changed records were journaled
+        assert plugin._state_file.read_text() == snapshot
+        lines = plugin._state_journal_file.read_text().splitlines()
+        assert [json.loads(line)["k"] for line in lines] == ["ep-new", "ep0"]
+
+        plugin2 = _make_plugin(monkeypatch, tmp_path)
+        assert await plugin2._load_state() is True
+        assert "ep0" not in plugin2.endpoints
+        assert plugin2.endpoints["ep-new"].vlan_tag == 900
+        assert len(plugin2.endpoints) == 50
+
+    @pytest.mark.asyncio
+    async def test_load_ignores_torn_journal_line(self, monkeypatch, tmp_path):
+        plugin = _make_plugin(monkeypatch, tmp_path)
+        _setup_lab(plugin, "lab1")
+        await plugin._save_state()
+        _setup_lab(plugin, "lab2")
+        await plugin._save_state()
+        with open(plugin._state_journal_file, "a") as f:
+            f.write('{"s": "lab_bridges", "k": "lab3", "v": {"lab_id"')
+
+        plugin2 = _make_plugin(monkeypatch, tmp_path)
+        assert await plugin2._load_state() is True
+        assert set(plugin2.lab_bridges) == {"lab1", "lab2"}
+
+    @pytest.mark.asyncio
+    async def test_journal_compacts_into_snapshot(self, monkeypatch, tmp_path):
+        monkeypatch.setattr("agent.network.plugin_state.STATE_JOURNAL_COMPACT_MIN", 5)
+        plugin = _make_plugin(monkeypatch, tmp_path)
+        _setup_lab(plugin, "lab1")
+        _add_network(plugin, "lab1", "net1", "eth1")
+        ep = _add_endpoint(plugin, "ep1", "net1", "eth1", 200)
+        await plugin._save_state()
+
+        for i in range(12):
+            ep.vlan_tag = 201 + i
+            await plugin._save_state()
+
+        # Journal never exceeds max(5, 2 * 3 records) before compacting
+        assert len(plugin._state_journal_file.read_text().splitlines()) <= 6
+        plugin2 = _make_plugin(monkeypatch, tmp_path)
+        assert await plugin2._load_state() is True
+        assert plugin2.endpoints["ep1"].vlan_tag == 212
+
+    @pytest.mark.asyncio
+    async def test_load_skips_journal_of_older_snapshot(self, monkeypatch, tmp_path):
+        plugin = _make_plugin(monkeypatch, tmp_path)
+        _setup_lab(plugin, "lab1")
+        _add_network(plugin, "lab1", "net1", "eth1")
+        _add_endpoint(plugin, "ep1", "net1", "eth1", 200)
+        await plugin._save_state()
+        _add_endpoint(plugin, "ep2", "net1", "eth1", 201)
+        plugin._global_next_vlan = 300
+        await plugin._save_state()
+        stale_journal = plugin._state_journal_file.read_text()
+
+        # Crash after the snapshot rename but before the journal truncate
+        del plugin.endpoints["ep2"]
+        plugin._global_next_vlan = 250
+        await plugin._save_state(snapshot=True)
+        plugin._state_journal_file.write_text(stale_journal)
+
+        plugin2 = _make_plugin(monkeypatch, tmp_path)
+        assert await plugin2._load_state() is True
+        assert "ep2" not in plugin2.endpoints
+        assert plugin2._global_next_vlan == 250
+
+    @pytest.mark.asyncio
+    async def test_incremental_save_serializes_only_changed_endpoints(
+        self, monkeypatch, tmp_path
+    ):
+        plugin = _make_plugin(monkeypatch, tmp_path)
+        _setup_lab(plugin, "lab1")
+        _add_network(plugin, "lab1", "net1", "eth1")
+        for i in range(50):
+            _add_endpoint(plugin, f"ep{i}", "net1", "eth1", 200 + i)
+        await plugin._save_state()
+
+        serialized = []
+        original = plugin._serialize_endpoint
+        monkeypatch.setattr(
+            plugin, "_serialize_endpoint",
+            lambda ep: serialized.append(ep.endpoint_id) or original(ep),
+        )
+        plugin.endpoints["ep7"].vlan_tag = 900
+        await plugin._save_state()
+
+        assert serialized == ["ep7"]
+        lines = plugin._state_journal_file.read_text().splitlines()
+        assert [json.loads(line)["k"] for line in lines] == ["ep7"]
+
 
 # ===========================================================================
 # State Migration
@@ -953,6 +1112,62 @@ class TestCleanupOrphanedOVSPorts:
         assert cleaned == 0
         plugin._delete_port.assert_not_awaited()
 
+    @pytest.mark.asyncio
+    async def test_adopts_port_of_unsaved_endpoint(self, monkeypatch, tmp_path):
+        """A port whose endpoint was lost before a batched save is re-tracked."""
+        plugin = _make_io_plugin(monkeypatch, tmp_path)
+        _setup_lab(plugin, "lab1")
+        _add_network(plugin, "lab1", "net1", "eth3")
+
+        async def _ovs_vsctl(*args):
+            if args[0] == "list-ports":
+                return (0, "vh-unsaved\n", "")
+            if args[:2] == ("get", "interface"):
+                return (0, '{"archetype.endpoint_id"="ep9", "archetype.network_id"="net1"}', "")
+            if args[:2] == ("get", "port"):
+                return (0, "321\n", "")
+            return (0, "", "")
+
+        plugin._ovs_vsctl = _ovs_vsctl
+
+        cleaned = await plugin._cleanup_orphaned_ovs_ports()
+
+        assert cleaned == 0
+        plugin._delete_port.assert_not_awaited()
+        ep = plugin.endpoints["ep9"]
+        assert (ep.host_veth, ep.interface_name, ep.vlan_tag) == ("vh-unsaved", "eth3", 321)
+        assert 321 in plugin._allocated_vlans
+
+
+    @pytest.mark.asyncio
+    async def test_recovers_network_of_unsaved_endpoint(self, monkeypatch, tmp_path):
+        """A network lost before a batched save is rebuilt from its port's ids."""
+        plugin = _make_io_plugin(monkeypatch, tmp_path)
+        lb = _setup_lab(plugin, "lab1")
+
+        async def _ovs_vsctl(*args):
+            if args[0] == "list-ports":
+                return (0, "vh-unsaved\n", "")
+            if args[:2] == ("get", "interface"):
+                return (0, (
+                    '{"archetype.endpoint_id"="ep9", "archetype.interface_name"="eth4", '
+                    '"archetype.lab_id"="lab1", "archetype.network_id"="net9"}'
+                ), "")
+            if args[:2] == ("get", "port"):
+                return (0, "322\n", "")
+            return (0, "", "")
+
+        plugin._ovs_vsctl = _ovs_vsctl
+
+        cleaned = await plugin._cleanup_orphaned_ovs_ports()
+
+        assert cleaned == 0
+        plugin._delete_port.assert_not_awaited()
+        net = plugin.networks["net9"]
+        assert (net.lab_id, net.interface_name, net.bridge_name) == ("lab1", "eth4", "arch-ovs")
+        assert "net9" in lb.network_ids
+        assert plugin.endpoints["ep9"].interface_name == "eth4"
+        assert plugin._state_dirty is True
 
 # ===========================================================================
 # Migrate Per-Lab Bridges
@@ -23,7 +23,10 @@ from agent.readiness import (
     run_post_boot_commands,
     clear_post_boot_state,
     clear_all_post_boot_state,
+    clear_log_scan_state,
+    _log_scan_states,
     _post_boot_completed,
+    LOG_SCAN_SINCE_MARGIN,
     CEOS_PROGRESS_PATTERNS,
     N9KV_DIAGNOSTIC_PATTERNS,
 )
@@ -61,7 +64,7 @@ class TestLogPatternProbe:
         mock_client = MagicMock()
         mock_client.containers.get.return_value = mock_container
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("test-container")
 
         assert result.is_ready is True
@@ -79,7 +82,7 @@ class TestLogPatternProbe:
         mock_client = MagicMock()
         mock_client.containers.get.return_value = mock_container
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("test-container")
 
         assert result.is_ready is False
@@ -96,7 +99,7 @@ class TestLogPatternProbe:
         mock_client = MagicMock()
         mock_client.containers.get.return_value = mock_container
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("test-container")
 
         assert result.is_ready is True
@@ -118,7 +121,7 @@ class TestLogPatternProbe:
         mock_client = MagicMock()
         mock_client.containers.get.return_value = mock_container
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("test-container")
 
         assert result.is_ready is False
@@ -135,7 +138,7 @@ class TestLogPatternProbe:
         mock_client = MagicMock()
         mock_client.containers.get.return_value = mock_container
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("test-container")
 
         assert result.is_ready is False
@@ -151,13 +154,138 @@ class TestLogPatternProbe:
         mock_client = MagicMock()
         mock_client.containers.get.side_effect = docker.errors.NotFound("not found")
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("missing-container")
 
         assert result.is_ready is False
         assert "not found" in result.message.lower()
 
 
+class TestIncrementalLogScan:
+    """Scan state carries across probe calls for the same node."""
+
+    @pytest.fixture(autouse=True)
+    def clear_state(self):
+        clear_log_scan_state()
+        yield
+        clear_log_scan_state()
+
+    @staticmethod
+    def _container(started_at="2024-01-01T00:00:00Z"):
+        container = MagicMock()
+        container.status = "running"
+        container.id = "c1"
+        container.attrs = {"State": {"StartedAt": started_at}}
+        return container
+
+    @pytest.mark.asyncio
+    async def test_second_check_reads_only_new_output(self):
+        """After the first tail read, checks fetch logs since the last read."""
+        probe = LogPatternProbe(pattern=r"System ready", progress_patterns={r"Phase 1": 40})
+        container = self._container()
+        container.logs.side_effect = [b"Phase 1 done\n", b"", b"System ready\n"]
+        client = MagicMock()
+        client.containers.get.return_value = container
+
+        with patch("agent.readiness.get_docker_client", return_value=client):
+            first = await probe.check("node-a")
+            second = await LogPatternProbe(pattern=r"System ready").check("node-a")
+            third = await probe.check("node-a")
+            fourth = await probe.check("node-a")
+
+        assert first.progress_percent == 40
+        # Progress is remembered even when no new output arrived
+        assert second.is_ready is False and second.progress_percent == 40
+        assert third.is_ready is True and fourth.is_ready is True
+        calls = container.logs.call_args_list
+        assert calls[0].kwargs["tail"] == 500
+        assert "tail" not in calls[1].kwargs
+        assert calls[1].kwargs["since"] == calls[0].kwargs["until"] - LOG_SCAN_SINCE_MARGIN
+        # Ready is sticky: no further log reads once matched
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_overlapping_read_skips_lines_already_seen(self):
+        """A read reaching back over the previous one only scans lines it missed."""
+        probe = LogPatternProbe(pattern=r"System ready")
+        container = self._container()
+        container.logs.side_effect = [
+            b"Booting\nPhase 1 done\n",
+            # Re-read of the margin, plus a line stamped before the last
+            # read ended but written after it
+            b"Phase 1 done\nLate line\nSystem ready\n",
+        ]
+        client = MagicMock()
+        client.containers.get.return_value = container
+
+        with patch("agent.readiness.get_docker_client", return_value=client):
+            assert (await probe.check("node-a")).is_ready is False
+            assert (await probe.check("node-a")).is_ready is True
+
+        assert _log_scan_states["node-a"].carry == "Booting\nPhase 1 done\nLate line\nSystem ready\n"
+
+    @pytest.mark.asyncio
+    async def test_restart_starts_new_scan(self):
+        """A new StartedAt resets readiness and re-reads the tail."""
+        probe = LogPatternProbe(pattern=r"System ready")
+        client = MagicMock()
+        first_run = self._container()
+        first_run.logs.return_value = b"System ready\n"
+        client.containers.get.return_value = first_run
+
+        with patch("agent.readiness.get_docker_client", return_value=client):
+            assert (await probe.check("node-a")).is_ready is True
+
+            second_run = self._container(started_at="2024-01-01T00:05:00Z")
+            second_run.logs.return_value = b"Booting\n"
+            client.containers.get.return_value = second_run
+            result = await probe.check("node-a")
+
+        assert result.is_ready is False
+        assert second_run.logs.call_args.kwargs["tail"] == 500
+
+    def test_serial_log_reads_appended_bytes_only(self, tmp_path, monkeypatch):
+        """Serial log reads seek past consumed bytes and keep a text window."""
+        log_file = tmp_path / "serial.log"
+        log_file.write_bytes(b"Booting\r\nLoading ")
+        probe = LibvirtLogPatternProbe(
+            pattern=r"login:", domain_name="vm", serial_log_path=str(log_file),
+        )
+
+        assert probe._get_console_output() == "Booting\nLoading "
+        assert probe._last_console_read_reason == "serial_log_file"
+
+        reads = []
+        real_open = open
+
+        def tracking_open(path, mode="r", *args, **kwargs):
+            handle = real_open(path, mode, *args, **kwargs)
+            real_read = handle.read
+            handle.read = lambda n=-1: reads.append(n) or real_read(n)
+            return handle
+
+        monkeypatch.setattr("builtins.open", tracking_open)
+        with real_open(log_file, "ab") as f:
+            f.write("kernel \u00e9\nlogin:".encode())
+        output = probe._get_console_output()
+
+        assert output == "Booting\nLoading kernel \u00e9\nlogin:"
+        assert reads == [len("kernel \u00e9\nlogin:".encode())]
+
+    def test_serial_log_truncation_restarts_scan(self, tmp_path):
+        """A log that shrinks (VM recreated) is read from the start again."""
+        log_file = tmp_path / "serial.log"
+        log_file.write_text("old boot output login:\n")
+        probe = LibvirtLogPatternProbe(
+            pattern=r"login:", domain_name="vm", serial_log_path=str(log_file),
+        )
+        probe._get_console_output()
+
+        log_file.write_text("new\n")
+
+        assert probe._get_console_output() == "new\n"
+
+
 # --- CliProbe Tests ---
 
 class TestCliProbe:
@@ -175,7 +303,7 @@ class TestCliProbe:
         mock_client = MagicMock()
         mock_client.containers.get.return_value = mock_container
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("test-container")
 
         assert result.is_ready is True
@@ -192,7 +320,7 @@ class TestCliProbe:
         mock_client = MagicMock()
         mock_client.containers.get.return_value = mock_container
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("test-container")
 
         assert result.is_ready is False
@@ -209,7 +337,7 @@ class TestCliProbe:
         mock_client = MagicMock()
         mock_client.containers.get.return_value = mock_container
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("test-container")
 
         assert result.is_ready is False
@@ -237,7 +365,7 @@ class TestGetProbeForVendor:
         mock_client = MagicMock()
         mock_client.containers.get.return_value = mock_container
 
-        with patch("agent.readiness.docker.from_env", return_value=mock_client):
+        with patch("agent.readiness.get_docker_client", return_value=mock_client):
             result = await probe.check("test-ceos")
 
         assert result.is_ready is False
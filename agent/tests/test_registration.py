@@ -14,6 +14,7 @@ import pytest
 import agent.agent_state as _state
 from agent.config import settings
 from agent.registration import (
+    HeartbeatDeltaEncoder,
     _bootstrap_transport_config,
     heartbeat_loop,
     register_with_controller,
@@ -295,6 +296,67 @@ class TestSendHeartbeat:
         assert response.pending_jobs == ["job-1", "job-2"]
 
 
+class TestHeartbeatDeltaEncoder:
+    """Tests for the v2 delta heartbeat encoding."""
+
+    @staticmethod
+    def _usage(*containers: dict, vms: list[dict] | None = None) -> dict:
+        return {
+            "cpu_percent": 12.0,
+            "containers_running": len(containers),
+            "container_details": list(containers),
+            "vm_details": vms or [],
+        }
+
+    def test_first_heartbeat_is_full_legacy_payload(self):
+        encoder = HeartbeatDeltaEncoder()
+        usage = self._usage({"name": "c1", "status": "running"})
+
+        payload, delta = encoder.encode(usage)
+
+        assert payload is usage
+        assert delta == {"seq": 1, "full": True}
+
+    def test_acked_heartbeat_sends_only_changes(self):
+        encoder = HeartbeatDeltaEncoder()
+        c1 = {"name": "c1", "status": "running"}
+        c2 = {"name": "c2", "status": "running"}
+        encoder.encode(self._usage(c1, c2))
+        encoder.acknowledge(1)
+
+        payload, delta = encoder.encode(self._usage(c1, {"name": "c3", "status": "running"}))
+
+        assert "container_details" not in payload
+        assert payload["cpu_percent"] == 12.0
+        assert delta["seq"] == 2
+        assert delta["base_seq"] == 1
+        assert delta["full"] is False
+        assert delta["containers_upsert"] == [{"name": "c3", "status": "running"}]
+        assert delta["containers_removed"] == ["c2"]
+        assert delta["vms_upsert"] == []
+
+        encoder.acknowledge(2)
+        _payload, delta = encoder.encode(self._usage(c1, {"name": "c3", "status": "running"}))
+        assert delta["containers_upsert"] == []
+        assert delta["containers_removed"] == []
+
+    def test_missing_or_mismatched_ack_forces_full_snapshot(self):
+        encoder = HeartbeatDeltaEncoder()
+        encoder.encode(self._usage())
+        # Legacy controller: no resource_seq in response
+        encoder.acknowledge(None)
+
+        _payload, delta = encoder.encode(self._usage())
+        assert delta["full"] is True
+
+        encoder.acknowledge(2)
+        encoder.encode(self._usage())
+        # Controller reports a different inventory sequence (resync)
+        encoder.acknowledge(99)
+        _payload, delta = encoder.encode(self._usage())
+        assert delta["full"] is True
+
+
 # ---------------------------------------------------------------------------
 # 3. heartbeat_loop()
 # ---------------------------------------------------------------------------
@@ -0,0 +1,136 @@
+"""Tests for layer-delta image sync endpoints in agent/routers/images.py.
+
+Covers: _layer_chain_ids, POST /images/layers/missing, POST /images/load-stream.
+"""
+from __future__ import annotations
+
+import hashlib
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+import agent.routers.images as images_mod
+from agent.config import settings
+from agent.main import app
+from agent.routers.images import _image_pull_jobs, _layer_chain_ids
+
+
+@pytest.fixture(autouse=True)
+def _clean_state(tmp_path, monkeypatch):
+    _image_pull_jobs.clear()
+    monkeypatch.setattr(settings, "controller_secret", "")
+    monkeypatch.setattr(images_mod, "_TRANSFER_STATE_FILE", tmp_path / ".active_transfers.json")
+    yield
+    _image_pull_jobs.clear()
+
+
+@pytest.fixture()
+def client():
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def _docker_with_images(*layer_lists):
+    images = [SimpleNamespace(attrs={"RootFS": {"Layers": layers}}) for layers in layer_lists]
+    docker_client = MagicMock()
+    docker_client.images.list.return_value = images
+    return docker_client
+
+
+def test_chain_ids_follow_docker_layer_store():
+    base, top = "sha256:aaa", "sha256:bbb"
+    expected_top = "sha256:" + hashlib.sha256(f"{base} {top}".encode()).hexdigest()
+    assert _layer_chain_ids([base, top]) == [base, expected_top]
+
+
+class TestMissingLayers:
+    def test_reports_shared_prefix_as_present(self, client):
+        local = _docker_with_images(["sha256:base", "sha256:mid", "sha256:old-top"])
+        with patch("agent.routers.images.get_docker_client", return_value=local):
+            resp = client.post(
+                "/images/layers/missing",
+                json={"layers": ["sha256:base", "sha256:mid", "sha256:new-top"]},
+            )
+
+        assert resp.status_code == 200
+        assert resp.json() == {"present_layers": 2, "missing": ["sha256:new-top"]}
+
+    def test_same_layer_on_different_base_is_missing(self, client):
+        local = _docker_with_images(["sha256:other-base", "sha256:mid"])
+        with patch("agent.routers.images.get_docker_client", return_value=local):
+            resp = client.post(
+                "/images/layers/missing",
+                json={"layers": ["sha256:base", "sha256:mid"]},
+            )
+
+        assert resp.json()["present_layers"] == 0
+
+    def test_docker_error_reports_everything_missing(self, client):
+        with patch("agent.routers.images.get_docker_client", side_effect=RuntimeError("no docker")):
+            resp = client.post("/images/layers/missing", json={"layers": ["sha256:base"]})
+
+        assert resp.json() == {"present_layers": 0, "missing": ["sha256:base"]}
+
+
+class _FakeStdin:
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, chunk):
+        self.data.extend(chunk)
+
+    async def drain(self):
+        pass
+
+
+def _docker_load_proc(returncode=0, stdout=b"Loaded image: ceos:4.32.2F\n", stderr=b""):
+    proc = MagicMock()
+    proc.stdin = _FakeStdin()
+    proc.returncode = None
+
+    async def communicate():
+        proc.returncode = returncode
+        return stdout, stderr
+
+    proc.communicate = communicate
+    return proc
+
+
+class TestLoadStream:
+    def test_pipes_body_into_docker_load(self, client):
+        proc = _docker_load_proc()
+        with patch(
+            "agent.routers.images.asyncio.create_subprocess_exec",
+            AsyncMock(return_value=proc),
+        ) as exec_mock:
+            resp = client.post(
+                "/images/load-stream",
+                params={"reference": "ceos:4.32.2F", "job_id": "sync-1", "total_bytes": "8"},
+                content=b"tar-data",
+                headers={"Content-Type": "application/x-tar"},
+            )
+
+        assert resp.status_code == 200
+        assert resp.json()["success"] is True
+        assert resp.json()["loaded_images"] == ["ceos:4.32.2F"]
+        assert exec_mock.call_args.args[:2] == ("docker", "load")
+        assert bytes(proc.stdin.data) == b"tar-data"
+        assert _image_pull_jobs["sync-1"].status == "completed"
+        assert _image_pull_jobs["sync-1"].bytes_transferred == 8
+
+    def test_docker_load_failure_is_reported(self, client):
+        proc = _docker_load_proc(returncode=1, stdout=b"", stderr=b"layer does not exist")
+        with patch(
+            "agent.routers.images.asyncio.create_subprocess_exec",
+            AsyncMock(return_value=proc),
+        ):
+            resp = client.post(
+                "/images/load-stream",
+                params={"reference": "ceos:4.32.2F", "job_id": "sync-2"},
+                content=b"tar-data",
+            )
+
+        assert resp.json()["success"] is False
+        assert "layer does not exist" in resp.json()["error"]
+        assert _image_pull_jobs["sync-2"].status == "failed"
@@ -1,7 +1,7 @@
 """Round-12 deep-path tests for agent/routers/images.py.
 
 Targets uncovered internal paths:
-- _execute_pull_from_controller: streaming, non-200, docker load fail, exception, cleanup
+- _execute_pull_from_controller: streaming, non-200, docker load fail, exception, cleanup, resume
 - receive_image: TimeoutExpired, Loaded image ID parsing, .iol handling, device_id metadata
 - backfill_image_checksums: actual hash computation
 - Transfer state: OSError on persist, corrupt JSON on load, stale temp OSError
@@ -16,6 +16,7 @@ import time
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
@@ -258,6 +259,142 @@ class TestExecutePullFromController:
         assert target.with_suffix(".img.sha256").read_text() == expected_hash
 
 
+    @staticmethod
+    def _stream_response(status_code, headers, chunks, error=None):
+        response = AsyncMock()
+        response.status_code = status_code
+        response.headers = headers
+
+        async def _aiter_bytes(chunk_size=1024 * 1024):
+            for chunk in chunks:
+                yield chunk
+            if error is not None:
+                raise error
+
+        response.aiter_bytes = _aiter_bytes
+        response.__aenter__ = AsyncMock(return_value=response)
+        response.__aexit__ = AsyncMock(return_value=False)
+        return response
+
+    @pytest.mark.asyncio
+    async def test_dropped_stream_resumes_with_range(self, monkeypatch, tmp_path):
+        """A dropped connection reconnects with Range/If-Range and keeps the bytes it has."""
+        monkeypatch.setattr(settings, "controller_url", "http://fake-controller:8000")
+        monkeypatch.setattr(settings, "workspace_path", str(tmp_path))
+        monkeypatch.setattr("agent.routers.images.asyncio.sleep", AsyncMock())
+
+        target = tmp_path / "sonic-vs.img"
+        content = b"first-half|second-half"
+        first = self._stream_response(
+            200,
+            {"content-length": str(len(content)), "etag": '"v1"'},
+            [content[:11]],
+            error=httpx.ReadError("connection reset"),
+        )
+        second = self._stream_response(
+            206,
+            {"content-range": f"bytes 11-{len(content) - 1}/{len(content)}", "etag": '"v1"'},
+            [content[11:]],
+        )
+        mock_client = AsyncMock()
+        mock_client.stream = MagicMock(side_effect=[first, second])
+
+        with patch("agent.routers.images.get_http_client", return_value=mock_client):
+            with patch("agent.routers.images.get_controller_auth_headers", return_value={}):
+                await _execute_pull_from_controller(
+                    job_id="pull-resume",
+                    image_id="qcow2:sonic-vs.img",
+                    reference=str(target),
+                    sha256=hashlib.sha256(content).hexdigest(),
+                )
+
+        assert _image_pull_jobs["pull-resume"].status == "completed"
+        assert target.read_bytes() == content
+        resume_headers = mock_client.stream.call_args_list[1].kwargs["headers"]
+        assert resume_headers["Range"] == "bytes=11-"
+        assert resume_headers["If-Range"] == '"v1"'
+        assert not list(tmp_path.glob("*.part-*"))
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_persisted_offset_after_restart(self, monkeypatch, tmp_path):
+        """A resume point persisted before a restart is used by the next pull of the image."""
+        import agent.routers.images as images_mod
+
+        monkeypatch.setattr(settings, "controller_url", "http://fake-controller:8000")
+        monkeypatch.setattr(settings, "workspace_path", str(tmp_path))
+        state_file = tmp_path / ".active_transfers.json"
+        monkeypatch.setattr(images_mod, "_TRANSFER_STATE_FILE", state_file)
+        monkeypatch.setattr(images_mod, "_resume_points", {})
+
+        target = tmp_path / "sonic-vs.img"
+        content = b"0123456789abcdef"
+        # Bytes past the checkpointed offset are dropped and fetched again
+        (tmp_path / "sonic-vs.img.part-resume").write_bytes(content[:10] + b"??")
+        state_file.write_text(json.dumps({
+            "old-job": {
+                "job_id": "old-job",
+                "status": "transferring",
+                "resume": {
+                    "image_id": "qcow2:sonic-vs.img",
+                    "reference": str(target),
+                    "etag": '"v1"',
+                    "offset": 10,
+                },
+            }
+        }))
+        _load_persisted_transfer_state()
+
+        response = self._stream_response(
+            206,
+            {"content-range": f"bytes 10-15/{len(content)}", "etag": '"v1"'},
+            [content[10:]],
+        )
+        mock_client = AsyncMock()
+        mock_client.stream = MagicMock(return_value=response)
+
+        with patch("agent.routers.images.get_http_client", return_value=mock_client):
+            with patch("agent.routers.images.get_controller_auth_headers", return_value={}):
+                await _execute_pull_from_controller(
+                    job_id="pull-after-restart",
+                    image_id="qcow2:sonic-vs.img",
+                    reference=str(target),
+                    sha256=hashlib.sha256(content).hexdigest(),
+                )
+
+        assert _image_pull_jobs["pull-after-restart"].status == "completed"
+        assert target.read_bytes() == content
+        assert mock_client.stream.call_args.kwargs["headers"]["Range"] == "bytes=10-"
+
+    @pytest.mark.asyncio
+    async def test_changed_source_restarts_download(self, monkeypatch, tmp_path):
+        """A 200 reply to a resume request discards the partial and starts over."""
+        import agent.routers.images as images_mod
+
+        monkeypatch.setattr(settings, "controller_url", "http://fake-controller:8000")
+        monkeypatch.setattr(settings, "workspace_path", str(tmp_path))
+        target = tmp_path / "sonic-vs.img"
+        (tmp_path / "sonic-vs.img.part-resume").write_bytes(b"stale")
+        monkeypatch.setattr(images_mod, "_resume_points", {
+            "qcow2:sonic-vs.img": {"reference": str(target), "etag": '"v1"', "offset": 5},
+        })
+
+        response = self._stream_response(200, {"content-length": "5", "etag": '"v2"'}, [b"fresh"])
+        mock_client = AsyncMock()
+        mock_client.stream = MagicMock(return_value=response)
+
+        with patch("agent.routers.images.get_http_client", return_value=mock_client):
+            with patch("agent.routers.images.get_controller_auth_headers", return_value={}):
+                await _execute_pull_from_controller(
+                    job_id="pull-changed",
+                    image_id="qcow2:sonic-vs.img",
+                    reference=str(target),
+                    sha256=hashlib.sha256(b"fresh").hexdigest(),
+                )
+
+        assert _image_pull_jobs["pull-changed"].status == "completed"
+        assert target.read_bytes() == b"fresh"
+
+
 # ---------------------------------------------------------------------------
 # receive_image — Docker tar edge cases
 # ---------------------------------------------------------------------------
@@ -0,0 +1,126 @@
+"""Tests for peer image seeding in agent/routers/images.py.
+
+Covers: GET /images/seed and pulls from a peer's seed URL.
+"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+import agent.routers.images as images_mod
+from agent.config import settings
+from agent.main import app
+from agent.routers.images import _execute_pull_from_controller, _image_pull_jobs
+
+
+@pytest.fixture(autouse=True)
+def _clean_state(tmp_path, monkeypatch):
+    _image_pull_jobs.clear()
+    monkeypatch.setattr(settings, "controller_secret", "")
+    monkeypatch.setattr(images_mod, "_TRANSFER_STATE_FILE", tmp_path / ".active_transfers.json")
+    monkeypatch.setattr(images_mod, "_active_seed_uploads", 0)
+    yield
+    _image_pull_jobs.clear()
+
+
+@pytest.fixture()
+def client():
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.fixture()
+def image_file() -> Path:
+    path = Path(settings.workspace_path) / "images" / "veos.qcow2"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"0123456789abcdef")
+    return path
+
+
+class TestSeedEndpoint:
+    def test_serves_file_with_validator(self, client, image_file):
+        resp = client.get("/images/seed", params={"reference": str(image_file)})
+
+        assert resp.status_code == 200
+        assert resp.content == image_file.read_bytes()
+        assert resp.headers["accept-ranges"] == "bytes"
+        assert resp.headers["etag"]
+        assert images_mod._active_seed_uploads == 0
+
+    def test_resumes_matching_range(self, client, image_file):
+        etag = client.get("/images/seed", params={"reference": str(image_file)}).headers["etag"]
+
+        resp = client.get(
+            "/images/seed",
+            params={"reference": str(image_file)},
+            headers={"Range": "bytes=10-", "If-Range": etag},
+        )
+
+        assert resp.status_code == 206
+        assert resp.content == b"abcdef"
+        assert resp.headers["content-range"] == "bytes 10-15/16"
+
+    def test_stale_validator_gets_whole_file(self, client, image_file):
+        resp = client.get(
+            "/images/seed",
+            params={"reference": str(image_file)},
+            headers={"Range": "bytes=10-", "If-Range": '"old"'},
+        )
+
+        assert resp.status_code == 200
+        assert resp.content == image_file.read_bytes()
+
+    def test_busy_seeder_returns_503(self, client, image_file, monkeypatch):
+        monkeypatch.setattr(images_mod, "_active_seed_uploads", settings.image_seed_max_uploads)
+
+        resp = client.get("/images/seed", params={"reference": str(image_file)})
+
+        assert resp.status_code == 503
+        assert resp.headers["retry-after"] == "5"
+
+    def test_rejects_paths_outside_image_store(self, client):
+        resp = client.get("/images/seed", params={"reference": "/etc/passwd"})
+        assert resp.status_code == 404
+
+    def test_disabled_seeding_returns_404(self, client, image_file, monkeypatch):
+        monkeypatch.setattr(settings, "image_seed_enabled", False)
+        resp = client.get("/images/seed", params={"reference": str(image_file)})
+        assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_pull_downloads_from_peer_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "controller_url", "http://fake-controller:8000")
+    target = Path(settings.workspace_path) / "sonic-vs.img"
+    content = b"peer-bytes"
+
+    response = AsyncMock()
+    response.status_code = 200
+    response.headers = {"content-length": str(len(content)), "etag": '"peer"'}
+
+    async def _aiter_bytes(chunk_size=1024 * 1024):
+        yield content
+
+    response.aiter_bytes = _aiter_bytes
+    response.__aenter__ = AsyncMock(return_value=response)
+    response.__aexit__ = AsyncMock(return_value=False)
+    mock_client = AsyncMock()
+    mock_client.stream = MagicMock(return_value=response)
+    source_url = "http://10.0.0.7:8001/images/seed?reference=%2Fsonic-vs.img"
+
+    with patch("agent.routers.images.get_http_client", return_value=mock_client):
+        with patch("agent.routers.images.get_controller_auth_headers", return_value={}):
+            await _execute_pull_from_controller(
+                job_id="pull-peer",
+                image_id="qcow2:sonic-vs.img",
+                reference=str(target),
+                sha256=hashlib.sha256(content).hexdigest(),
+                source_url=source_url,
+            )
+
+    assert _image_pull_jobs["pull-peer"].status == "completed"
+    assert target.read_bytes() == content
+    assert mock_client.stream.call_args.args[1] == source_url
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import json
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock, patch
 
@@ -78,6 +79,67 @@ async def test_lab_status_and_reconcile_nodes(monkeypatch, tmp_path):
     assert len(resp.results) == 1
 
 
+def _provider_node(name: str, status=ProviderNodeStatus.RUNNING) -> SimpleNamespace:
+    return SimpleNamespace(
+        name=name,
+        status=status,
+        container_id=f"cid-{name}",
+        runtime_id=f"runtime-{name}",
+        node_definition_id=f"node-def-{name}",
+        image="img",
+        ip_addresses=[],
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_lab_status_merges_providers_and_honours_etag(monkeypatch):
+    docker_provider = SimpleNamespace(
+        status_all_labs=AsyncMock(return_value={
+            "lab-1": [_provider_node("r1")],
+            "lab-2": [_provider_node("r2", ProviderNodeStatus.STOPPED)],
+        })
+    )
+    libvirt_provider = SimpleNamespace(
+        status_all_labs=AsyncMock(return_value={"lab-1": [_provider_node("vm1")]})
+    )
+    monkeypatch.setattr(labs, "get_provider", lambda name: docker_provider if name == "docker" else libvirt_provider)
+
+    def _request(etag: str | None = None):
+        return SimpleNamespace(headers={"if-none-match": etag} if etag else {})
+
+    response = await labs.bulk_lab_status(_request(), lab_ids=None)
+    body = json.loads(response.body)
+    etag = response.headers["ETag"]
+
+    assert body["etag"] == etag
+    assert body["error"] is None
+    assert {lab["lab_id"]: sorted(n["name"] for n in lab["nodes"]) for lab in body["labs"]} == {
+        "lab-1": ["r1", "vm1"],
+        "lab-2": ["r2"],
+    }
+    docker_provider.status_all_labs.assert_awaited_once()
+
+    not_modified = await labs.bulk_lab_status(_request(etag), lab_ids=None)
+    assert not_modified.status_code == 304
+
+    # Requested labs the host has nothing for are still reported (empty)
+    filtered = json.loads((await labs.bulk_lab_status(_request(etag), lab_ids=["lab-2", "lab-9"])).body)
+    assert [lab["lab_id"] for lab in filtered["labs"]] == ["lab-2", "lab-9"]
+    assert filtered["labs"][1]["nodes"] == []
+
+
+@pytest.mark.asyncio
+async def test_bulk_lab_status_reports_provider_failure_on_every_lab(monkeypatch):
+    docker_provider = SimpleNamespace(status_all_labs=AsyncMock(side_effect=RuntimeError("daemon down")))
+    monkeypatch.setattr(labs, "get_provider", lambda name: docker_provider if name == "docker" else None)
+
+    response = await labs.bulk_lab_status(SimpleNamespace(headers={}), lab_ids=["lab-1"])
+    body = json.loads(response.body)
+
+    assert "daemon down" in body["error"]
+    assert body["labs"][0]["error"] == body["error"]
+
+
 @pytest.mark.asyncio
 async def test_reconcile_single_node_docker_stop_and_fallback_paths(monkeypatch, tmp_path):
     async def _run_direct(fn, *args, **kwargs):
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
+import pytest
+
 from agent.network.ovs import VlanAllocator
 
 
@@ -41,3 +43,121 @@ def test_vlan_allocator_release_lab(tmp_path: Path) -> None:
 
     released = allocator.release_lab("lab-1234")
     assert released == 2
+
+
+def test_vlan_allocator_reuses_released_vlans_last(tmp_path: Path) -> None:
+    allocator = VlanAllocator(start=100, end=103, persistence_path=tmp_path / "alloc.json")
+
+    first = allocator.allocate("a:eth1")
+    allocator.release("a:eth1")
+
+    vlans = [allocator.allocate(f"n{i}:eth1") for i in range(4)]
+    assert vlans == [101, 102, 103, first]
+
+
+def test_vlan_allocator_exhaustion(tmp_path: Path) -> None:
+    allocator = VlanAllocator(start=100, end=101, persistence_path=tmp_path / "alloc.json")
+    allocator.allocate("a:eth1")
+    allocator.allocate("b:eth1")
+
+    with pytest.raises(RuntimeError, match="No VLANs available"):
+        allocator.allocate("c:eth1")
+
+
+def test_vlan_allocator_allocate_many_rolls_back_on_exhaustion(tmp_path: Path) -> None:
+    allocator = VlanAllocator(start=100, end=102, persistence_path=tmp_path / "alloc.json")
+    allocator.allocate("a:eth1")
+
+    with pytest.raises(RuntimeError):
+        allocator.allocate_many(["b:eth1", "c:eth1", "d:eth1"])
+
+    assert dict(allocator._allocated) == {"a:eth1": 100}
+    assert allocator.allocate_many(["a:eth1", "b:eth1"]) == {"a:eth1": 100, "b:eth1": 101}
+
+
+def test_vlan_allocator_allocate_many_rollback_keeps_enclosing_batch(tmp_path: Path) -> None:
+    persistence = tmp_path / "alloc.json"
+    allocator = VlanAllocator(start=100, end=103, persistence_path=persistence)
+    allocator.allocate("a:eth1")
+
+    with allocator.batch():
+        allocator.allocate("b:eth1")
+        with pytest.raises(RuntimeError):
+            allocator.allocate_many(["c:eth1", "d:eth1", "e:eth1"])
+        assert allocator.get_stats()["next_vlan"] == 102
+
+    reloaded = VlanAllocator(start=100, end=103, persistence_path=persistence)
+    assert dict(reloaded._allocated) == {"a:eth1": 100, "b:eth1": 101}
+    assert allocator.allocate("c:eth1") == 102
+
+
+def test_vlan_allocator_journal_replayed_on_load(tmp_path: Path) -> None:
+    persistence = tmp_path / "alloc.json"
+    allocator = VlanAllocator(start=100, end=200, persistence_path=persistence)
+    allocator.allocate("a:eth1")
+    allocator.allocate("b:eth1")
+    allocator.release("a:eth1")
+
+    # The first commit writes the snapshot; later ones only append
+    journal = persistence.with_suffix(".journal")
+    assert len(journal.read_text().splitlines()) == 2
+    # Simulate a crash mid-append
+    with open(journal, "a") as f:
+        f.write('{"k": "c:eth1", "v"')
+
+    reloaded = VlanAllocator(start=100, end=200, persistence_path=persistence)
+    assert reloaded.get_vlan("a:eth1") is None
+    assert reloaded.get_vlan("b:eth1") == 101
+    assert reloaded.get_vlan("c:eth1") is None
+    assert reloaded.allocate("d:eth1") == 102
+
+
+def test_vlan_allocator_skips_journal_of_older_snapshot(tmp_path: Path) -> None:
+    persistence = tmp_path / "alloc.json"
+    allocator = VlanAllocator(start=100, end=200, persistence_path=persistence)
+    allocator.allocate("a:eth1")
+    allocator.allocate("b:eth1")
+    journal = persistence.with_suffix(".journal")
+    stale_journal = journal.read_text()
+    allocator.release("b:eth1")
+    assert allocator.allocate("c:eth1") == 102
+
+    # Crash after the snapshot rename but before the journal truncate
+    allocator._save_to_disk()
+    journal.write_text(stale_journal)
+
+    reloaded = VlanAllocator(start=100, end=200, persistence_path=persistence)
+    assert reloaded.get_vlan("b:eth1") is None
+    assert reloaded.get_vlan("c:eth1") == 102
+    assert reloaded.allocate("d:eth1") == 103
+
+
+def test_vlan_allocator_batch_writes_one_journal_block(tmp_path: Path) -> None:
+    persistence = tmp_path / "alloc.json"
+    allocator = VlanAllocator(start=100, end=200, persistence_path=persistence)
+    allocator.allocate_many([f"archetype-lab1-n{i}:eth1" for i in range(5)])
+    journal = persistence.with_suffix(".journal")
+    journal.write_text("")
+    allocator._journal_entries = 0
+
+    with allocator.batch():
+        allocator.release("archetype-lab1-n0:eth1")
+        assert journal.read_text() == ""
+        allocator.release_lab("lab1")
+
+    assert len(journal.read_text().splitlines()) == 5
+    assert allocator.get_stats()["total_allocated"] == 0
+
+
+def test_vlan_allocator_compacts_journal(tmp_path: Path) -> None:
+    persistence = tmp_path / "alloc.json"
+    allocator = VlanAllocator(start=100, end=4000, persistence_path=persistence)
+    allocator.JOURNAL_COMPACT_THRESHOLD = 10
+
+    for i in range(25):
+        allocator.allocate(f"n{i}:eth1")
+
+    journal = persistence.with_suffix(".journal")
+    assert len(journal.read_text().splitlines()) < 10
+    reloaded = VlanAllocator(start=100, end=4000, persistence_path=persistence)
+    assert dict(reloaded._allocated) == dict(allocator._allocated)
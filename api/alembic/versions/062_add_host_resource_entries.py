@@ -0,0 +1,50 @@
+"""Add normalized per-host container/VM inventory for delta heartbeats.
+
+Revision ID: 062
+Revises: 061
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "062"
+down_revision: Union[str, None] = "061"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("hosts", sa.Column("resource_seq", sa.Integer(), nullable=True))
+
+    op.create_table(
+        "host_resource_entries",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("host_id", sa.String(length=36), nullable=False),
+        sa.Column("kind", sa.String(length=20), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("status", sa.String(length=50), nullable=False, server_default=""),
+        sa.Column("lab_prefix", sa.String(length=64), nullable=True),
+        sa.Column("is_system", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("vcpus", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("memory_mb", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("details", sa.Text(), nullable=False, server_default="{}"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["host_id"], ["hosts.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("host_id", "kind", "name", name="uq_host_resource_entry_host_kind_name"),
+    )
+    op.create_index("ix_host_resource_entries_host_id", "host_resource_entries", ["host_id"])
+    op.create_index("ix_host_resource_entries_lab_prefix", "host_resource_entries", ["lab_prefix"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_host_resource_entries_lab_prefix", table_name="host_resource_entries")
+    op.drop_index("ix_host_resource_entries_host_id", table_name="host_resource_entries")
+    op.drop_table("host_resource_entries")
+    op.drop_column("hosts", "resource_seq")
@@ -0,0 +1,44 @@
+"""Add append-only job log chunks with byte offsets.
+
+Revision ID: 063
+Revises: 062
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "063"
+down_revision: Union[str, None] = "062"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("log_base", sa.BigInteger(), nullable=False, server_default="0"))
+    op.add_column("jobs", sa.Column("log_size", sa.BigInteger(), nullable=False, server_default="0"))
+
+    op.create_table(
+        "job_log_chunks",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("job_id", sa.String(length=36), nullable=False),
+        sa.Column("offset", sa.BigInteger(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_job_log_chunks_job_offset", "job_log_chunks", ["job_id", "offset"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_log_chunks_job_offset", table_name="job_log_chunks")
+    op.drop_table("job_log_chunks")
+    op.drop_column("jobs", "log_size")
+    op.drop_column("jobs", "log_base")
@@ -0,0 +1,75 @@
+"""Add parsed, indexed job log entries for the lab logs view.
+
+Revision ID: 064
+Revises: 063
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "064"
+down_revision: Union[str, None] = "063"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("log_index_seq", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("jobs", sa.Column("log_index_host_id", sa.String(length=255), nullable=True))
+    op.add_column("jobs", sa.Column("log_index_host_name", sa.String(length=255), nullable=True))
+
+    op.create_table(
+        "job_log_entries",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("lab_id", sa.String(length=36), nullable=False),
+        sa.Column("job_id", sa.String(length=36), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("level", sa.String(length=20), nullable=False),
+        sa.Column("level_rank", sa.SmallInteger(), nullable=False),
+        sa.Column("host_id", sa.String(length=255), nullable=True),
+        sa.Column("host_name", sa.String(length=255), nullable=True),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(["lab_id"], ["labs.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_job_log_entries_lab_timestamp", "job_log_entries", ["lab_id", "timestamp", "job_id", "seq"]
+    )
+    op.create_index("ix_job_log_entries_lab_level", "job_log_entries", ["lab_id", "level_rank"])
+    op.create_index("ix_job_log_entries_lab_host_id", "job_log_entries", ["lab_id", "host_id"])
+    op.create_index("ix_job_log_entries_lab_host_name", "job_log_entries", ["lab_id", "host_name"])
+    op.create_index("ix_job_log_entries_job_seq", "job_log_entries", ["job_id", "seq"])
+
+    # Trigram index for substring search; skipped where pg_trgm is unavailable
+    conn = op.get_bind()
+    if conn.dialect.name == "postgresql":
+        try:
+            with conn.begin_nested():
+                conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                conn.execute(sa.text(
+                    "CREATE INDEX ix_job_log_entries_message_trgm "
+                    "ON job_log_entries USING gin (message gin_trgm_ops)"
+                ))
+        except sa.exc.DBAPIError:
+            pass
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_job_log_entries_message_trgm")
+    op.drop_index("ix_job_log_entries_job_seq", table_name="job_log_entries")
+    op.drop_index("ix_job_log_entries_lab_host_name", table_name="job_log_entries")
+    op.drop_index("ix_job_log_entries_lab_host_id", table_name="job_log_entries")
+    op.drop_index("ix_job_log_entries_lab_level", table_name="job_log_entries")
+    op.drop_index("ix_job_log_entries_lab_timestamp", table_name="job_log_entries")
+    op.drop_table("job_log_entries")
+    op.drop_column("jobs", "log_index_host_name")
+    op.drop_column("jobs", "log_index_host_id")
+    op.drop_column("jobs", "log_index_seq")
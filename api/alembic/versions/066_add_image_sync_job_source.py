@@ -0,0 +1,30 @@
+"""Record the source of each image sync transfer.
+
+Revision ID: 066
+Revises: 065
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "066"
+down_revision: Union[str, None] = "065"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "image_sync_jobs",
+        sa.Column("source", sa.String(36), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("image_sync_jobs", "source")
@@ -0,0 +1,78 @@
+"""Make job log chunk offsets unique and stop storing chunked logs twice.
+
+Revision ID: 067
+Revises: 066
+Create Date: 2026-10-17
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "067"
+down_revision: Union[str, None] = "066"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Concurrent writers could append at the same offset; keep the first row
+    op.execute(
+        sa.text(
+            """
+            DELETE FROM job_log_chunks
+            WHERE id IN (
+                SELECT id
+                FROM (
+                    SELECT
+                        id,
+                        ROW_NUMBER() OVER (
+                            PARTITION BY job_id, "offset"
+                            ORDER BY created_at, id
+                        ) AS rn
+                    FROM job_log_chunks
+                ) ranked
+                WHERE ranked.rn > 1
+            )
+            """
+        )
+    )
+    op.drop_index("ix_job_log_chunks_job_offset", table_name="job_log_chunks")
+    op.create_index(
+        "ix_job_log_chunks_job_offset", "job_log_chunks", ["job_id", "offset"], unique=True
+    )
+
+    # Chunked logs are read from their chunks; drop the inline copy
+    op.execute(
+        sa.text(
+            "UPDATE jobs SET log_path = NULL "
+            "WHERE log_size > 0 AND log_path IS NOT NULL AND log_path NOT LIKE '/%'"
+        )
+    )
+
+
+def downgrade() -> None:
+    # Older code reads the log from jobs.log_path, so rebuild it from the chunks
+    bind = op.get_bind()
+    jobs = bind.execute(
+        sa.text("SELECT id, log_base FROM jobs WHERE log_size > 0 AND log_path IS NULL")
+    ).all()
+    for job_id, log_base in jobs:
+        contents = bind.execute(
+            sa.text(
+                'SELECT content FROM job_log_chunks '
+                'WHERE job_id = :job_id AND "offset" >= :log_base ORDER BY "offset"'
+            ),
+            {"job_id": job_id, "log_base": log_base},
+        ).scalars()
+        bind.execute(
+            sa.text("UPDATE jobs SET log_path = :log WHERE id = :job_id"),
+            {"log": "".join(contents), "job_id": job_id},
+        )
+
+    op.drop_index("ix_job_log_chunks_job_offset", table_name="job_log_chunks")
+    op.create_index("ix_job_log_chunks_job_offset", "job_log_chunks", ["job_id", "offset"])
@@ -82,6 +82,7 @@ from app.agent_client.node_ops import (  # noqa: F401
     force_release_lock,
     get_agent_images,
     get_agent_lock_status,
+    get_all_lab_status_from_agent,
     get_lab_status_from_agent,
     get_runtime_identity_audit,
     get_node_runtime_profile,
@@ -195,6 +196,7 @@ __all__ = [
     "force_release_lock",
     "get_agent_images",
     "get_agent_lock_status",
+    "get_all_lab_status_from_agent",
     "get_lab_status_from_agent",
     "get_runtime_identity_audit",
     "get_node_runtime_profile",
@@ -9,10 +9,13 @@ from app import models
 from app.config import settings
 from app.agent_client.http import (
     _agent_request,
+    _get_agent_auth_headers,
     _safe_agent_request,
     _timed_node_operation,
     AgentError,
     AgentJobError,
+    get_http_client,
+    with_retry,
 )
 from app.agent_client.selection import get_agent_url
 
@@ -149,6 +152,42 @@ async def get_lab_status_from_agent(
         raise
 
 
+# agent_id -> (etag, payload) from the last bulk status response
+_bulk_lab_status_cache: dict[str, tuple[str, dict]] = {}
+
+
+async def get_all_lab_status_from_agent(agent: models.Host) -> dict:
+    """Get status of every lab on an agent in a single request.
+
+    Sends the previous response's ETag as If-None-Match; on 304 the cached
+    payload is returned unchanged. Returns the agent's bulk status payload
+    (``{"etag", "labs": [...], "error"}``).
+    """
+    url = f"{get_agent_url(agent)}/labs/status"
+    client = get_http_client()
+
+    async def _do_request() -> dict:
+        headers = _get_agent_auth_headers()
+        cached = _bulk_lab_status_cache.get(agent.id)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+        response = await client.get(url, headers=headers, timeout=settings.agent_status_timeout)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        payload = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            _bulk_lab_status_cache[agent.id] = (etag, payload)
+        return payload
+
+    try:
+        return await with_retry(_do_request, max_retries=1)
+    except AgentError as e:
+        e.agent_id = agent.id
+        raise
+
+
 async def reconcile_nodes_on_agent(
     agent: models.Host,
     lab_id: str,
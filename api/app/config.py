@@ -64,6 +64,13 @@ class Settings(BaseSettings):
     stale_pending_threshold: int = 600  # 10 minutes
     # How long a lab can be "starting" before auto-reconcile (seconds)
     stale_starting_threshold: int = 900  # 15 minutes
+    # Labs reconciled concurrently per cycle (each in its own DB session;
+    # keep below db_pool_size + db_max_overflow)
+    reconciliation_concurrency: int = 8
+    # Concurrent lab status queries allowed against one agent
+    reconciliation_per_agent_concurrency: int = 4
+    # Time budget for reconciling a single lab (seconds)
+    reconciliation_lab_timeout: float = 60.0
     # How often image reconciliation runs (seconds)
     image_reconciliation_interval: int = 300  # 5 minutes
 
@@ -148,10 +155,20 @@ class Settings(BaseSettings):
     image_sync_resync_max_per_cycle: int = 4
     # Chunk size for streaming image data (1MB default)
     image_sync_chunk_size: int = 1048576
+    # Send Docker images as layer deltas, skipping layers the agent already has
+    image_sync_layer_delta: bool = True
+    # Let agents that hold an image serve it to other agents (peer seeding)
+    image_seed_enabled: bool = True
+    # Concurrent transfers one source (agent, or the controller per image) serves
+    image_seed_max_uploads_per_source: int = 2
+    # Seconds a sync waits for a free source before the controller serves it
+    image_seed_source_wait: int = 300
     # Persist Docker image archives on disk after successful upload/import
     image_archive_docker_images: bool = True
     # Run archive verification every N image reconciliation cycles
     image_archive_verify_interval_cycles: int = 6
+    # Disk budget for cached `docker save` archives served to agents (LRU-evicted)
+    image_save_cache_max_bytes: int = 50 * 1024 * 1024 * 1024
 
     # Catalog cutover controls
     # Sync runtime vendor/custom-device identity into catalog tables on API startup.
@@ -241,6 +258,18 @@ class Settings(BaseSettings):
     state_enforcement_interval_extended: int = 120  # 2 min
     cleanup_interval_extended: int = 3600           # 1 hour (safety-net for lost events)
 
+    # Lab state WebSocket fan-out (one Redis pattern subscription per process)
+    # Pending messages per client; beyond this node/link updates are coalesced
+    # and a client that is still full is disconnected so it resyncs
+    state_ws_queue_size: int = 256
+    # Per-lab ring buffer of sequenced state events for reconnect resume;
+    # a client whose last_seq fell off the buffer gets a full snapshot
+    state_stream_maxlen: int = 1000
+    state_stream_ttl_seconds: int = 3600
+    # Window for merging node/link updates per lab into one batched frame
+    # (0 publishes every update immediately)
+    state_broadcast_coalesce_ms: int = 100
+
     def get_interval(self, name: str) -> int:
         """Get monitor interval, using extended value when event-driven cleanup is active.
 
@@ -10,6 +10,8 @@ from .paths import (
     ensure_image_store,
     docker_archive_root,
     ensure_docker_archive_root,
+    docker_save_cache_root,
+    ensure_docker_save_cache_root,
     docker_archive_path,
     qcow2_path,
     iol_path,
@@ -69,6 +71,16 @@ from .manifest import (
     _backfill_single_image_defaults,
 )
 
+# -- snapshot --
+from .snapshot import (
+    CatalogManifest,
+    CatalogSnapshot,
+    bump_catalog_revision,
+    get_catalog_snapshot,
+    start_catalog_invalidation_listener,
+    stop_catalog_invalidation_listener,
+)
+
 # -- custom_devices --
 from .custom_devices import (
     load_rules,
@@ -112,6 +124,8 @@ __all__ = [
     "ensure_image_store",
     "docker_archive_root",
     "ensure_docker_archive_root",
+    "docker_save_cache_root",
+    "ensure_docker_save_cache_root",
     "docker_archive_path",
     "qcow2_path",
     "iol_path",
@@ -160,6 +174,13 @@ __all__ = [
     "find_image_reference",
     "_normalize_manifest_images",
     "_backfill_single_image_defaults",
+    # snapshot
+    "CatalogManifest",
+    "CatalogSnapshot",
+    "bump_catalog_revision",
+    "get_catalog_snapshot",
+    "start_catalog_invalidation_listener",
+    "stop_catalog_invalidation_listener",
     # custom_devices
     "load_rules",
     "load_custom_devices",
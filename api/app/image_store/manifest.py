@@ -19,6 +19,7 @@ from .aliases import (
     normalize_default_device_scope_ids,
 )
 from .paths import manifest_path
+from .snapshot import CatalogManifest, get_catalog_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -113,16 +114,16 @@ def _backfill_single_image_defaults(manifest: dict) -> None:
 
 
 def load_manifest() -> dict:
-    # DB-first cutover: once catalog tables are seeded, read image library from DB.
-    try:
-        from app.db import get_session
-        from app.services.catalog_service import catalog_is_seeded, list_catalog_library_images
+    """Return the image library as a manifest dict.
 
-        with get_session() as session:
-            if catalog_is_seeded(session):
-                return {"images": list_catalog_library_images(session)}
-    except Exception:
-        logger.debug("Catalog-backed manifest read failed; falling back to file", exc_info=True)
+    Once the catalog tables are seeded this is served from the process-wide
+    catalog snapshot, which only goes back to the database when the catalog
+    revision changes. The ``images`` list is a fresh list per call; the
+    entries themselves are shared.
+    """
+    snapshot = get_catalog_snapshot()
+    if snapshot is not None:
+        return CatalogManifest(snapshot)
 
     path = manifest_path()
     if not path.exists():
@@ -165,6 +166,11 @@ def save_manifest(data: dict) -> None:
 
 def find_image_by_id(manifest: dict, image_id: str) -> dict | None:
     """Find an image entry by its ID."""
+    snapshot = getattr(manifest, "snapshot", None)
+    if snapshot is not None:
+        item = snapshot.lookup(manifest.get("images", []), "id", image_id)
+        if item is not None:
+            return item
     for item in manifest.get("images", []):
         if item.get("id") == image_id:
             return item
@@ -173,20 +179,31 @@ def find_image_by_id(manifest: dict, image_id: str) -> dict | None:
 
 def find_image_by_reference(manifest: dict, reference: str) -> dict | None:
     """Find an image entry by its Docker reference or file path."""
+    snapshot = getattr(manifest, "snapshot", None)
+    if snapshot is not None:
+        item = snapshot.lookup(manifest.get("images", []), "reference", reference)
+        if item is not None:
+            return item
     for item in manifest.get("images", []):
         if item.get("reference") == reference:
             return item
     return None
 
 
+def _images_for_device(manifest: dict, device_id: str) -> list[dict]:
+    """Images matching a device, via the snapshot index when available."""
+    snapshot = getattr(manifest, "snapshot", None)
+    if snapshot is not None:
+        return snapshot.images_for_device(device_id)
+    return [img for img in manifest.get("images", []) if image_matches_device(img, device_id)]
+
+
 def get_device_image_count(device_id: str) -> int:
     """Count how many images are assigned to a device type.
 
     Checks both 'device_id' field and 'compatible_devices' list.
     """
-    manifest = load_manifest()
-    return sum(1 for img in manifest.get("images", [])
-               if image_matches_device(img, device_id))
+    return len(_images_for_device(load_manifest(), device_id))
 
 
 def find_image_reference(device_id: str, version: str | None = None) -> str | None:
@@ -202,8 +219,7 @@ def find_image_reference(device_id: str, version: str | None = None) -> str | No
     Returns:
         Image reference (Docker tag or file path for qcow2/IOL) or None if not found
     """
-    manifest = load_manifest()
-    images = manifest.get("images", [])
+    images = _images_for_device(load_manifest(), device_id)
 
     # Supported image kinds
     supported_kinds = ("docker", "qcow2")
@@ -215,21 +231,20 @@ def find_image_reference(device_id: str, version: str | None = None) -> str | No
             if img.get("kind") not in supported_kinds:
                 continue
             img_version = (img.get("version") or "").lower()
-            if image_matches_device(img, device_id) and img_version == version_lower:
+            if img_version == version_lower:
                 return img.get("reference")
 
     # Fall back to default image for this device type
     for img in images:
         if img.get("kind") not in supported_kinds:
             continue
-        if image_matches_device(img, device_id) and is_image_default_for_device(img, device_id):
+        if is_image_default_for_device(img, device_id):
             return img.get("reference")
 
     # Fall back to any image for this device type
     for img in images:
         if img.get("kind") not in supported_kinds:
             continue
-        if image_matches_device(img, device_id):
-            return img.get("reference")
+        return img.get("reference")
 
     return None
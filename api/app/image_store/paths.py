@@ -33,6 +33,16 @@ def ensure_docker_archive_root() -> Path:
     return path
 
 
+def docker_save_cache_root() -> Path:
+    return image_store_root() / "save-cache"
+
+
+def ensure_docker_save_cache_root() -> Path:
+    path = docker_save_cache_root()
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 def docker_archive_path(image_id: str) -> Path:
     slug = _NON_ALNUM_RE.sub("_", image_id).strip("_") or "image"
     return ensure_docker_archive_root() / f"{slug}.tar"
@@ -0,0 +1,293 @@
+"""Revisioned in-process snapshot of the image catalog with O(1) indexes.
+
+``load_manifest()`` used to open a session, check the catalog stamp and hand
+back the catalog projection on every call, and callers then scanned it
+linearly. The snapshot keeps one projection per process together with
+prebuilt indexes by id, reference and compatible device.
+
+Freshness is tracked with a catalog revision counter in Redis:
+
+- Catalog writes bump ``catalog:revision`` after their transaction commits
+  and publish the new value on ``catalog:invalidate``.
+- Each API, worker and scheduler process runs a listener thread subscribed
+  to that channel. While the listener is healthy and the revision is
+  unchanged, reads are served without touching the database.
+- Without a healthy listener (Redis down, tests) every read revalidates
+  against the DB stamp, as before. The snapshot is also revalidated every
+  ``SNAPSHOT_REVALIDATE_SECONDS`` to catch writes made outside the catalog
+  helpers.
+
+Image dicts are shared with the catalog index cache, exactly like
+``list_catalog_library_images()``; callers that modify entries must persist
+them through ``save_manifest()``.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from .aliases import _device_compatibility_tokens
+
+logger = logging.getLogger(__name__)
+
+CATALOG_REVISION_KEY = "catalog:revision"
+CATALOG_INVALIDATION_CHANNEL = "catalog:invalidate"
+# Upper bound on how long a snapshot is trusted on pub/sub alone
+SNAPSHOT_REVALIDATE_SECONDS = 60.0
+_LISTENER_MAX_BACKOFF = 30.0
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable view of the image library plus lookup indexes."""
+
+    images: tuple[dict[str, Any], ...]
+    revision: int | None = None
+    validated_at: float = 0.0
+    positions_by_id: dict[str, int] = field(default_factory=dict)
+    positions_by_reference: dict[str, int] = field(default_factory=dict)
+    positions_by_device_token: dict[str, tuple[int, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        images: list[dict[str, Any]],
+        *,
+        revision: int | None = None,
+    ) -> CatalogSnapshot:
+        by_id: dict[str, int] = {}
+        by_reference: dict[str, int] = {}
+        by_token: dict[str, list[int]] = {}
+        for position, image in enumerate(images):
+            image_id = image.get("id")
+            if image_id:
+                by_id.setdefault(image_id, position)
+            reference = image.get("reference")
+            if reference:
+                by_reference.setdefault(reference, position)
+            tokens = set(_device_compatibility_tokens(image.get("device_id")))
+            for device_id in image.get("compatible_devices") or []:
+                tokens.update(_device_compatibility_tokens(device_id))
+            for token in tokens:
+                by_token.setdefault(token, []).append(position)
+        return cls(
+            images=tuple(images),
+            revision=revision,
+            validated_at=time.monotonic(),
+            positions_by_id=by_id,
+            positions_by_reference=by_reference,
+            positions_by_device_token={k: tuple(v) for k, v in by_token.items()},
+        )
+
+    def get(self, image_id: str) -> dict[str, Any] | None:
+        position = self.positions_by_id.get(image_id)
+        return self.images[position] if position is not None else None
+
+    def find_by_reference(self, reference: str) -> dict[str, Any] | None:
+        position = self.positions_by_reference.get(reference)
+        return self.images[position] if position is not None else None
+
+    def images_for_device(self, device_id: str) -> list[dict[str, Any]]:
+        """Images matching ``device_id`` (same rules as ``image_matches_device``), in library order."""
+        positions: set[int] = set()
+        for token in _device_compatibility_tokens(device_id):
+            positions.update(self.positions_by_device_token.get(token, ()))
+        return [self.images[p] for p in sorted(positions)]
+
+    def lookup(self, images: list, field_name: str, value: str) -> dict[str, Any] | None:
+        """Indexed lookup in a manifest list derived from this snapshot.
+
+        Returns None when the index cannot vouch for ``images`` (the caller
+        changed the list), so callers fall back to a linear scan.
+        """
+        positions = self.positions_by_id if field_name == "id" else self.positions_by_reference
+        position = positions.get(value)
+        if position is None or position >= len(images):
+            return None
+        item = images[position]
+        if item is self.images[position] and item.get(field_name) == value:
+            return item
+        return None
+
+
+class CatalogManifest(dict):
+    """Manifest dict returned by ``load_manifest()`` remembering its snapshot."""
+
+    __slots__ = ("snapshot",)
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        super().__init__(images=list(snapshot.images))
+        self.snapshot = snapshot
+
+
+_snapshot_lock = threading.Lock()
+_snapshot: CatalogSnapshot | None = None
+
+
+# ---------------------------------------------------------------------------
+# Cross-process invalidation
+# ---------------------------------------------------------------------------
+
+class _InvalidationListener(threading.Thread):
+    """Follows catalog revision bumps published by other processes."""
+
+    def __init__(self) -> None:
+        super().__init__(name="catalog-invalidation", daemon=True)
+        self.revision: int | None = None
+        self.healthy = False
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        from app.db import get_redis
+
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            pubsub = None
+            try:
+                client = get_redis()
+                pubsub = client.pubsub()
+                pubsub.subscribe(CATALOG_INVALIDATION_CHANNEL)
+                while not self._stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    if not isinstance(message, dict):
+                        raise TypeError(f"unexpected pub/sub message {message!r}")
+                    if message.get("type") == "subscribe":
+                        # Read the counter only once subscribed so no bump is missed
+                        self.revision = _read_revision(client)
+                        self.healthy = True
+                        backoff = 1.0
+                    elif message.get("type") == "message":
+                        self.revision = max(int(message["data"]), self.revision or 0)
+            except Exception:
+                logger.debug("Catalog invalidation listener disconnected", exc_info=True)
+            finally:
+                self.healthy = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            self._stop_event.wait(backoff)
+            backoff = min(backoff * 2, _LISTENER_MAX_BACKOFF)
+
+
+_listener: _InvalidationListener | None = None
+
+
+def _read_revision(client) -> int:
+    value = client.get(CATALOG_REVISION_KEY)
+    return int(value) if value is not None else 0
+
+
+def start_catalog_invalidation_listener() -> None:
+    """Start this process's catalog invalidation listener (idempotent)."""
+    global _listener
+    with _snapshot_lock:
+        if _listener is not None and _listener.is_alive():
+            return
+        _listener = _InvalidationListener()
+        _listener.start()
+
+
+def stop_catalog_invalidation_listener() -> None:
+    global _listener
+    with _snapshot_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def bump_catalog_revision() -> None:
+    """Advance the catalog revision and notify every process."""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+    try:
+        from app.db import get_redis
+
+        client = get_redis()
+        revision = client.incr(CATALOG_REVISION_KEY)
+        client.publish(CATALOG_INVALIDATION_CHANNEL, revision)
+    except Exception:
+        logger.warning("Failed to publish catalog revision bump", exc_info=True)
+
+
+def mark_catalog_changed(session) -> None:
+    """Bump the catalog revision once ``session`` commits its catalog writes."""
+    from sqlalchemy import event
+
+    if session.info.get("catalog_revision_pending"):
+        return
+    session.info["catalog_revision_pending"] = True
+
+    def _after_commit(committed_session) -> None:
+        committed_session.info.pop("catalog_revision_pending", None)
+        bump_catalog_revision()
+
+    event.listen(session, "after_commit", _after_commit, once=True)
+
+
+# ---------------------------------------------------------------------------
+# Snapshot access
+# ---------------------------------------------------------------------------
+
+def _same_entries(current: tuple[dict[str, Any], ...], images: list[dict[str, Any]]) -> bool:
+    return len(current) == len(images) and all(a is b for a, b in zip(current, images))
+
+
+def _refresh_snapshot() -> CatalogSnapshot | None:
+    global _snapshot
+    listener = _listener
+    # Taken before reading the DB so a concurrent bump forces another refresh
+    revision = listener.revision if listener is not None and listener.healthy else None
+    try:
+        from app.db import get_session
+        from app.services.catalog_service import catalog_is_seeded, list_catalog_library_images
+
+        with get_session() as session:
+            if not catalog_is_seeded(session):
+                return None
+            images = list_catalog_library_images(session)
+    except Exception:
+        logger.debug("Catalog-backed manifest read failed; falling back to file", exc_info=True)
+        return None
+
+    with _snapshot_lock:
+        current = _snapshot
+        if current is not None and _same_entries(current.images, images):
+            # Catalog index cache unchanged: keep the indexes, refresh the stamp
+            snapshot = replace(current, revision=revision, validated_at=time.monotonic())
+        else:
+            snapshot = CatalogSnapshot.build(images, revision=revision)
+        _snapshot = snapshot
+    return snapshot
+
+
+def get_catalog_snapshot() -> CatalogSnapshot | None:
+    """Return the current catalog snapshot, reloading only when it changed.
+
+    Returns None while the catalog is not seeded (or unreachable); callers
+    then read the legacy manifest file.
+    """
+    snapshot = _snapshot
+    listener = _listener
+    if (
+        snapshot is not None
+        and listener is not None
+        and listener.healthy
+        # Forked job processes inherit the listener but not its thread
+        and listener.is_alive()
+        and snapshot.revision is not None
+        and snapshot.revision == listener.revision
+        and time.monotonic() - snapshot.validated_at < SNAPSHOT_REVALIDATE_SECONDS
+    ):
+        return snapshot
+    return _refresh_snapshot()
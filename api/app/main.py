@@ -38,6 +38,7 @@ from app.middleware import CurrentUserMiddleware, DeprecationMiddleware
 from app.routers.v1 import router as v1_router
 from app.routers import admin, agents, auth, callbacks, console, dashboard, events, images, infrastructure, iso, jobs, lab_tests, labs, permissions, scenarios, state_ws, support, system, users, vendors, webhooks
 from app.events.publisher import close_publisher
+from app.services.broadcaster import get_broadcaster
 from app.utils.async_tasks import capture_event_loop, setup_asyncio_exception_handler
 from alembic.config import Config as AlembicConfig
 from alembic import command as alembic_command
@@ -97,6 +98,11 @@ async def lifespan(app: FastAPI):
         except Exception:
             logger.exception("Catalog identity startup sync failed; registry fallback will be used")
 
+    # Follow catalog revision bumps so image lookups skip the DB until it changes
+    from app.image_store import start_catalog_invalidation_listener
+
+    start_catalog_invalidation_listener()
+
     # Seed admin user if configured
     admin_username = settings.admin_username
     admin_email = settings.admin_email
@@ -136,8 +142,13 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down Archetype API controller")
+    from app.image_store import stop_catalog_invalidation_listener
+
+    stop_catalog_invalidation_listener()
     from app.db import async_engine
     await async_engine.dispose()
+    # Deliver node/link updates still waiting in the coalescing window
+    await get_broadcaster().flush()
     await close_publisher()
 
 
@@ -142,6 +142,19 @@ if PROMETHEUS_AVAILABLE:
         ["host_id", "host_name", "result"],
     )
 
+    # --- Image Sync Metrics ---
+
+    image_sync_bytes_sent = Counter(
+        "archetype_image_sync_bytes_sent_total",
+        "Image bytes sent to agents by sync mode",
+        ["mode"],
+    )
+
+    image_sync_bytes_saved = Counter(
+        "archetype_image_sync_bytes_saved_total",
+        "Docker image bytes not sent because the agent already had the layers",
+    )
+
     # --- Enforcement Metrics ---
 
     enforcement_actions = Counter(
@@ -273,6 +286,26 @@ if PROMETHEUS_AVAILABLE:
         "archetype_reconciliation_state_changes_total",
         "Total node state changes detected during reconciliation",
     )
+    reconciliation_scan_duration = Histogram(
+        "archetype_reconciliation_scan_seconds",
+        "Duration of the reconciliation candidate scan",
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, float("inf")),
+    )
+    reconciliation_scan_queries = Histogram(
+        "archetype_reconciliation_scan_queries",
+        "Database statements issued by one reconciliation candidate scan",
+        buckets=(1, 2, 3, 5, 10, 25, 100, float("inf")),
+    )
+    reconciliation_lab_duration = Histogram(
+        "archetype_reconciliation_lab_seconds",
+        "Duration of reconciling a single lab",
+        ["outcome"],
+        buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, float("inf")),
+    )
+    reconciliation_scan_labs = Gauge(
+        "archetype_reconciliation_scan_labs",
+        "Stable labs evaluated by the last reconciliation candidate scan",
+    )
 
     # --- State Flap Detection ---
 
@@ -302,6 +335,34 @@ if PROMETHEUS_AVAILABLE:
         "Total broadcast publish failures",
         ["message_type"],
     )
+    state_broadcast_events_in = Counter(
+        "archetype_state_broadcast_events_in_total",
+        "Node/link state updates queued for coalesced broadcast",
+        ["message_type"],
+    )
+    state_broadcast_frames_out = Counter(
+        "archetype_state_broadcast_frames_out_total",
+        "Frames published after coalescing node/link state updates",
+        ["message_type"],
+    )
+    state_ws_subscribers = Gauge(
+        "archetype_state_ws_subscribers",
+        "Lab state WebSocket subscribers attached to this process's fan-out hub",
+    )
+    state_ws_queue_depth = Histogram(
+        "archetype_state_ws_queue_depth",
+        "Per-subscriber pending messages after each delivery",
+        buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, float("inf")),
+    )
+    state_ws_messages_delivered = Counter(
+        "archetype_state_ws_messages_delivered_total",
+        "Lab state messages queued to WebSocket subscribers",
+    )
+    state_ws_messages_dropped = Counter(
+        "archetype_state_ws_messages_dropped_total",
+        "Lab state messages not queued to a slow subscriber",
+        ["reason"],
+    )
 
     # --- Enforcement Timing ---
 
@@ -354,6 +415,8 @@ else:
     agent_vms_running = DummyMetric()
     agent_stale_images = DummyMetric()
     agent_stale_image_cleanup_total = DummyMetric()
+    image_sync_bytes_sent = DummyMetric()
+    image_sync_bytes_saved = DummyMetric()
     enforcement_actions = DummyMetric()
     enforcement_failures = DummyMetric()
     enforcement_pending = DummyMetric()
@@ -375,10 +438,20 @@ else:
     reconciliation_cycle_duration = DummyMetric()
     reconciliation_labs_checked = DummyMetric()
     reconciliation_state_changes = DummyMetric()
+    reconciliation_scan_duration = DummyMetric()
+    reconciliation_scan_queries = DummyMetric()
+    reconciliation_scan_labs = DummyMetric()
+    reconciliation_lab_duration = DummyMetric()
     node_state_transitions = DummyMetric()
     circuit_breaker_state = DummyMetric()
     broadcast_messages = DummyMetric()
     broadcast_failures = DummyMetric()
+    state_broadcast_events_in = DummyMetric()
+    state_broadcast_frames_out = DummyMetric()
+    state_ws_subscribers = DummyMetric()
+    state_ws_queue_depth = DummyMetric()
+    state_ws_messages_delivered = DummyMetric()
+    state_ws_messages_dropped = DummyMetric()
     enforcement_operation_duration = DummyMetric()
     runtime_identity_events = DummyMetric()
     runtime_identity_missing_runtime_id_active_placements = DummyMetric()
@@ -901,6 +974,22 @@ def record_reconciliation_cycle(
         reconciliation_state_changes.inc(state_changes)
 
 
+def record_reconciliation_scan(duration: float, queries: int, labs_scanned: int) -> None:
+    """Record the cost of a reconciliation candidate scan."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    reconciliation_scan_duration.observe(duration)
+    reconciliation_scan_queries.observe(queries)
+    reconciliation_scan_labs.set(labs_scanned)
+
+
+def record_reconciliation_lab(duration: float, outcome: str) -> None:
+    """Record how long one lab took to reconcile and how it ended."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    reconciliation_lab_duration.labels(outcome=outcome).observe(duration)
+
+
 def record_db_transaction_issue(
     *,
     issue: str,
@@ -951,6 +1040,42 @@ def record_broadcast(message_type: str, success: bool) -> None:
         broadcast_failures.labels(message_type=message_type).inc()
 
 
+def record_state_broadcast_event(message_type: str) -> None:
+    """Record a node/link update queued for coalesced broadcast."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    state_broadcast_events_in.labels(message_type=message_type).inc()
+
+
+def record_state_broadcast_frame(message_type: str) -> None:
+    """Record a frame published for a lab's coalesced updates."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    state_broadcast_frames_out.labels(message_type=message_type).inc()
+
+
+def set_state_ws_subscribers(count: int) -> None:
+    """Set the number of subscribers attached to the state fan-out hub."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    state_ws_subscribers.set(count)
+
+
+def record_state_ws_delivery(queue_depth: int) -> None:
+    """Record a message queued to a WebSocket subscriber."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    state_ws_messages_delivered.inc()
+    state_ws_queue_depth.observe(queue_depth)
+
+
+def record_state_ws_drop(reason: str) -> None:
+    """Record a message coalesced away or a subscriber dropped for overflow."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    state_ws_messages_dropped.labels(reason=reason).inc()
+
+
 def set_agent_stale_image_count(host_id: str, host_name: str, count: int) -> None:
     """Set the current stale-image count for an agent."""
     if not PROMETHEUS_AVAILABLE:
@@ -974,6 +1099,15 @@ def record_agent_stale_image_cleanup(
     ).inc(count)
 
 
+def record_image_sync_transfer(mode: str, bytes_sent: int, bytes_saved: int = 0) -> None:
+    """Record the bytes an image sync sent (``full``, ``delta`` or ``peer``) and saved."""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    image_sync_bytes_sent.labels(mode=mode).inc(max(0, bytes_sent))
+    if bytes_saved > 0:
+        image_sync_bytes_saved.inc(bytes_saved)
+
+
 def record_enforcement_duration(duration: float) -> None:
     """Record the duration of an enforcement cycle."""
     if not PROMETHEUS_AVAILABLE:
@@ -3,7 +3,7 @@
 from .base import Base  # noqa: F401
 from .auth import User, UserPreferences, AuditLog, Permission, SupportBundle  # noqa: F401
 from .lab import Lab, LabFile  # noqa: F401
-from .job import Job, ImageSyncJob, AgentUpdateJob, ISOImportJob  # noqa: F401
+from .job import Job, JobLogChunk, JobLogEntry, ImageSyncJob, AgentUpdateJob, ISOImportJob  # noqa: F401
 from .topology import Node, Link  # noqa: F401
 from .state import (  # noqa: F401
     NodeState,
@@ -16,6 +16,7 @@ from .state import (  # noqa: F401
 )
 from .infra import (  # noqa: F401
     Host,
+    HostResourceEntry,
     InfraSettings,
     InterfaceMapping,
     AgentLink,
@@ -51,6 +52,8 @@ __all__ = [
     "LabFile",
     # job
     "Job",
+    "JobLogChunk",
+    "JobLogEntry",
     "ImageSyncJob",
     "AgentUpdateJob",
     "ISOImportJob",
@@ -67,6 +70,7 @@ __all__ = [
     "ConfigSnapshot",
     # infra
     "Host",
+    "HostResourceEntry",
     "InfraSettings",
     "InterfaceMapping",
     "AgentLink",
@@ -42,6 +42,9 @@ class Host(Base):
     data_plane_address: Mapped[str | None] = mapped_column(String(255), nullable=True)
     # Last reported Docker image-store mode (legacy/containerd/unknown)
     docker_snapshotter_mode: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    # Heartbeat delta sequence applied to host_resource_entries.
+    # NULL = container/VM details still live in the legacy resource_usage blob.
+    resource_seq: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     def _parse_json_field(self, value: str | None) -> dict:
@@ -59,6 +62,34 @@ class Host(Base):
         return self._parse_json_field(self.capabilities)
 
 
+class HostResourceEntry(Base):
+    """One container or VM reported by an agent heartbeat.
+
+    Normalized form of the container_details/vm_details lists that agents
+    used to resend in full on every heartbeat. Agents now send only changed
+    entries (see services/host_inventory.py), which are applied here so
+    readers can filter by status or lab without parsing per-host JSON.
+    """
+    __tablename__ = "host_resource_entries"
+    __table_args__ = (
+        UniqueConstraint("host_id", "kind", "name", name="uq_host_resource_entry_host_kind_name"),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    host_id: Mapped[str] = mapped_column(String(36), ForeignKey("hosts.id", ondelete="CASCADE"), index=True)
+    # "container" or "vm"
+    kind: Mapped[str] = mapped_column(String(20))
+    name: Mapped[str] = mapped_column(String(255))
+    status: Mapped[str] = mapped_column(String(50), default="")
+    lab_prefix: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    is_system: Mapped[bool] = mapped_column(default=False)
+    vcpus: Mapped[float] = mapped_column(default=0)
+    memory_mb: Mapped[int] = mapped_column(Integer, default=0)
+    # Full entry as reported by the agent (JSON)
+    details: Mapped[str] = mapped_column(Text, default="{}")
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class InfraSettings(Base):
     """Global infrastructure settings (singleton row).
 
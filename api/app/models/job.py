@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import uuid4
 
-from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, SmallInteger, String, Text, delete, event, func, select
+from sqlalchemy.orm import Mapped, Session, mapped_column, object_session, synonym
 
 from .base import Base
 
@@ -29,8 +29,20 @@ class Job(Base):
     status: Mapped[str] = mapped_column(String(50), default="queued")
     # Agent executing this job
     agent_id: Mapped[str | None] = mapped_column(String(36), ForeignKey("hosts.id"), nullable=True)
-    # Log content (stored directly instead of file path for simplicity)
-    log_path: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Inline log of jobs written before chunked storage, or a log file path.
+    # Chunked jobs leave it NULL: their log lives only in JobLogChunk rows,
+    # and ``log_path`` (defined below) reads and writes those instead.
+    _log_text: Mapped[str | None] = mapped_column("log_path", Text, nullable=True)
+    # Byte offset where the current log content starts in the chunk stream.
+    # Moves forward when a writer replaces the log instead of extending it.
+    log_base: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # Byte offset just past the last chunk written for this job
+    log_size: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # Log parser position, so each append only parses the new lines into
+    # JobLogEntry rows: next line index and the current host section
+    log_index_seq: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    log_index_host_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    log_index_host_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
     # Timestamps for tracking job lifecycle
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -48,11 +60,218 @@ class Job(Base):
     )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    def _get_log_path(self) -> str | None:
+        """Return the current log text, assembling chunked logs from their chunks."""
+        if self._log_text is not None:
+            return self._log_text
+        base = self.log_base or 0
+        size = self.log_size or 0
+        if size <= base:
+            return None
+        cached = self.__dict__.get("_log_cache")
+        if cached is not None and cached[0] == (base, size):
+            pieces = cached[1]
+        else:
+            session = object_session(self)
+            if session is None:
+                return None
+            rows = list(session.execute(
+                select(JobLogChunk.content)
+                .where(JobLogChunk.job_id == self.id, JobLogChunk.offset >= base)
+                .order_by(JobLogChunk.offset)
+            ).scalars())
+            # Chunks appended since the last flush are not in the table yet
+            pending = self.__dict__.get("_pending_log")
+            if pending:
+                rows.extend(c["content"] for c in pending["chunks"] if c["offset"] >= base)
+            pieces = ["".join(rows)]
+            self.__dict__["_log_cache"] = ((base, size), pieces)
+        if len(pieces) > 1:
+            pieces[:] = ["".join(pieces)]
+        return pieces[0]
+
+    def _set_log_path(self, value: str | None) -> None:
+        """Replace or extend the log.
+
+        Job runners rebuild the whole log string and assign it. When the new
+        value extends the current log only the delta becomes a chunk; any
+        other change starts a fresh log at the current end of the stream.
+        Legacy file-path values are stored as-is for the file-based readers.
+        """
+        new = value or ""
+        if new.startswith("/") and "\n" not in new:
+            self._log_text = value
+            self.__dict__.pop("_log_cache", None)
+            return
+        old = self._get_log_path() or ""
+        # Inline text from before chunked storage is not in the stream yet
+        in_stream = self._log_text is None
+        if not in_stream:
+            self._log_text = None
+        if in_stream and new == old:
+            return
+
+        if in_stream and old and new.startswith(old):
+            self._append_log_chunk(new[len(old):])
+            return
+        self.log_base = self.log_size or 0
+        self.log_index_seq = 0
+        self.log_index_host_id = None
+        self.log_index_host_name = None
+        pending = self._pending_log_writes()
+        pending["reset"] = True
+        pending["entries"] = []
+        self.__dict__["_log_cache"] = ((self.log_base, self.log_base), [""])
+        self._append_log_chunk(new)
+
+    log_path = synonym("_log_text", descriptor=property(_get_log_path, _set_log_path))
+
+    def append_log(self, text: str) -> None:
+        """Append ``text`` to the log.
+
+        Unlike re-assigning ``log_path`` this never looks at the existing
+        log, so it costs O(len(text)) however long the log has grown.
+        """
+        if self._log_text is not None:
+            self.log_path = self._log_text + text
+            return
+        self._append_log_chunk(text)
+
+    def _pending_log_writes(self) -> dict:
+        return self.__dict__.setdefault("_pending_log", {"reset": False, "chunks": [], "entries": []})
+
+    def _append_log_chunk(self, text: str) -> None:
+        """Queue ``text`` as the next chunk; written by _write_log_chunks on flush."""
+        if not text:
+            return
+        base = self.log_base or 0
+        end = self.log_size or 0
+        data = text.encode("utf-8")
+        pending = self._pending_log_writes()
+        pending["chunks"].append({"offset": end, "size": len(data), "content": text})
+        pending["entries"].extend(_parse_log_delta(self, text))
+        self.log_size = end + len(data)
+        cached = self.__dict__.get("_log_cache")
+        if cached is not None and cached[0] == (base, end):
+            cached[1].append(text)
+            self.__dict__["_log_cache"] = ((base, self.log_size), cached[1])
+        else:
+            self.__dict__.pop("_log_cache", None)
+
+
+class JobLogChunk(Base):
+    """Append-only slice of a job's log output.
+
+    ``offset`` is the UTF-8 byte offset of the chunk within the job's log
+    stream. Offsets only ever grow, so a client can resume from any
+    ``next_offset`` it was handed without re-reading earlier output. They
+    are unique per job: a writer that appended from a stale ``log_size``
+    fails to flush instead of interleaving its chunk with another's.
+    """
+    __tablename__ = "job_log_chunks"
+    __table_args__ = (Index("ix_job_log_chunks_job_offset", "job_id", "offset", unique=True),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    job_id: Mapped[str] = mapped_column(String(36), ForeignKey("jobs.id", ondelete="CASCADE"))
+    offset: Mapped[int] = mapped_column(BigInteger)
+    size: Mapped[int] = mapped_column(Integer)
+    content: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class JobLogEntry(Base):
+    """One parsed job log line, indexed for the lab logs view.
+
+    Rows are written when the log is appended (see Job._append_log_chunk), so
+    filtering, search and pagination of ``/labs/{lab_id}/logs`` run in the
+    database. ``(timestamp, job_id, seq)`` is the keyset pagination order.
+    """
+    __tablename__ = "job_log_entries"
+    __table_args__ = (
+        Index("ix_job_log_entries_lab_timestamp", "lab_id", "timestamp", "job_id", "seq"),
+        Index("ix_job_log_entries_lab_level", "lab_id", "level_rank"),
+        Index("ix_job_log_entries_lab_host_id", "lab_id", "host_id"),
+        Index("ix_job_log_entries_lab_host_name", "lab_id", "host_name"),
+        Index("ix_job_log_entries_job_seq", "job_id", "seq"),
+    )
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    lab_id: Mapped[str] = mapped_column(String(36), ForeignKey("labs.id", ondelete="CASCADE"))
+    job_id: Mapped[str] = mapped_column(String(36), ForeignKey("jobs.id", ondelete="CASCADE"))
+    # Line index within the job's current log
+    seq: Mapped[int] = mapped_column(Integer)
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # Level: info, success, warning, error
+    level: Mapped[str] = mapped_column(String(20))
+    # LEVEL_PRIORITY of level, for "this level or worse" filters
+    level_rank: Mapped[int] = mapped_column(SmallInteger)
+    host_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    host_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    message: Mapped[str] = mapped_column(Text)
+
+
+def _parse_log_delta(job: Job, delta: str) -> list[dict]:
+    """Parse appended log text into JobLogEntry rows, advancing the job's parser state."""
+    from app.services.log_parser import LEVEL_PRIORITY, LogParseState, parse_log_lines
+
+    state = LogParseState(
+        host_name=job.log_index_host_name,
+        host_id=job.log_index_host_id,
+        line_index=job.log_index_seq or 0,
+    )
+    base_timestamp = job.created_at or datetime.now(timezone.utc)
+    rows = [
+        {
+            "seq": line.index,
+            "timestamp": line.timestamp,
+            "level": line.level,
+            "level_rank": LEVEL_PRIORITY.get(line.level, 0),
+            "host_id": line.host_id,
+            "host_name": line.host_name,
+            "message": line.message,
+        }
+        for line in parse_log_lines(delta, state, base_timestamp)
+    ]
+    job.log_index_seq = state.line_index
+    job.log_index_host_id = state.host_id
+    job.log_index_host_name = state.host_name
+    return rows
+
+
+@event.listens_for(Session, "after_flush")
+def _write_log_chunks(session: Session, flush_context) -> None:
+    """Insert chunk and entry rows for jobs flushed with pending log appends."""
+    reset_job_ids = []
+    chunks = []
+    entries = []
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Job):
+            continue
+        pending = obj.__dict__.pop("_pending_log", None)
+        if not pending:
+            continue
+        if pending["reset"]:
+            reset_job_ids.append(obj.id)
+        chunks.extend({"job_id": obj.id, **chunk} for chunk in pending["chunks"])
+        if obj.lab_id:
+            entries.extend(
+                {"lab_id": obj.lab_id, "job_id": obj.id, **entry} for entry in pending["entries"]
+            )
+
+    connection = session.connection() if reset_job_ids or chunks else None
+    if reset_job_ids:
+        connection.execute(delete(JobLogEntry).where(JobLogEntry.job_id.in_(reset_job_ids)))
+    if chunks:
+        connection.execute(JobLogChunk.__table__.insert(), chunks)
+    if entries:
+        connection.execute(JobLogEntry.__table__.insert(), entries)
+
 
 class ImageSyncJob(Base):
     """Tracks image transfer operations with progress.
 
-    Each sync job represents a single image transfer from controller to agent.
+    Each sync job represents a single image transfer to an agent, from the
+    controller or from a peer agent that already holds the image.
     Progress is tracked as bytes transferred and percentage complete.
 
     Status values:
@@ -76,6 +295,11 @@ class ImageSyncJob(Base):
     progress_percent: Mapped[int] = mapped_column(Integer, default=0)
     bytes_transferred: Mapped[int] = mapped_column(BigInteger, default=0)
     total_bytes: Mapped[int] = mapped_column(BigInteger, default=0)
+    # Bytes a layer-delta sync did not send because the agent had the layers
+    bytes_saved: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    # Where the image came from: a seeding peer's host ID or "controller"
+    # (NULL until a source is assigned)
+    source: Mapped[str | None] = mapped_column(String(36), nullable=True)
     # Error message if failed
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     # Timestamps
@@ -22,6 +22,7 @@ from app.auth import get_current_admin, get_current_user
 from app.config import settings
 from app.metrics import record_agent_stale_image_cleanup, set_agent_stale_image_count
 from app.routers.system import get_commit
+from app.services.host_inventory import apply_heartbeat_usage, get_host_details
 from app.state import HostStatus, JobStatus, LabState, LinkActualState
 from app.utils.http import require_admin
 from app.utils.time import utcnow
@@ -275,12 +276,16 @@ class HeartbeatRequest(BaseModel):
     resource_usage: dict = Field(default_factory=dict)
     data_plane_ip: str | None = None
     docker_snapshotter_mode: str | None = None
+    # Delta protocol: container/VM changes since the acknowledged sequence
+    resource_delta: dict | None = None
 
 
 class HeartbeatResponse(BaseModel):
     """Controller -> Agent: Acknowledged."""
     acknowledged: bool
     pending_jobs: list[str] = Field(default_factory=list)
+    # Applied delta sequence; None asks the agent for a full snapshot
+    resource_seq: int | None = None
 
 
 class HostOut(BaseModel):
@@ -679,7 +684,9 @@ def heartbeat(
 
     # Update status and resource usage
     host.status = request.status
-    host.resource_usage = json.dumps(request.resource_usage)
+    resource_seq = apply_heartbeat_usage(
+        database, host, request.resource_usage, request.resource_delta
+    )
     host.last_heartbeat = utcnow()
     # Update data plane address if agent reports one
     if request.data_plane_ip is not None:
@@ -700,6 +707,7 @@ def heartbeat(
     return HeartbeatResponse(
         acknowledged=True,
         pending_jobs=pending_jobs,
+        resource_seq=resource_seq,
     )
 
 
@@ -769,10 +777,13 @@ def list_agents_detailed(
     for ih in image_hosts:
         images_by_host.setdefault(ih.host_id, []).append(_image_host_to_dict(ih))
 
+    details_by_host = get_host_details(database, hosts)
+
     result = []
     for host in hosts:
         capabilities = host.get_capabilities()
         resource_usage = host.get_resource_usage()
+        host_details = details_by_host[host.id]
 
         # Determine role based on capabilities and is_local flag
         if capabilities.get("providers"):
@@ -805,11 +816,11 @@ def list_agents_detailed(
                 "vms_running": resource_usage.get("vms_running", 0),
                 "vms_total": resource_usage.get("vms_total", 0),
                 "container_details": _enrich_details(
-                    resource_usage.get("container_details", []),
+                    host_details["container_details"],
                     labs_by_id, labs_by_prefix,
                 ),
                 "vm_details": _enrich_details(
-                    resource_usage.get("vm_details", []),
+                    host_details["vm_details"],
                     labs_by_id, labs_by_prefix,
                 ),
             },
@@ -992,7 +1003,8 @@ def unregister_agent(
     cleanup["vxlan_tunnels_deleted"] = count
 
     # 7. DELETE the host (cascading FKs handle ImageHost, ImageSyncJob,
-    #    AgentUpdateJob, AgentLink, AgentNetworkConfig automatically)
+    #    AgentUpdateJob, AgentLink, AgentNetworkConfig, HostResourceEntry
+    #    automatically)
     database.delete(host)
     database.commit()
 
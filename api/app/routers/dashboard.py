@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from app import db, models
 from app.auth import get_current_user
+from app.services.host_inventory import get_host_details, get_running_lab_prefixes
 from app.state import HostStatus
 from app.utils.cache import cache_get, cache_set
 from app.utils.lab import find_lab_by_prefix, find_lab_with_name
@@ -49,10 +50,9 @@ def get_dashboard_metrics(database: Session = Depends(db.get_db), _user: models.
     online_count = 0
     labs_with_containers: set[str] = set()  # Track labs with running containers
     per_host: list[dict] = []  # Per-host breakdown for multi-host environments
+    online_hosts = [h for h in hosts if h.status == HostStatus.ONLINE]
 
-    for host in hosts:
-        if host.status != HostStatus.ONLINE:
-            continue
+    for host in online_hosts:
         online_count += 1
         usage = host.get_resource_usage()
         host_cpu = usage.get("cpu_percent", 0)
@@ -91,14 +91,11 @@ def get_dashboard_metrics(database: Session = Depends(db.get_db), _user: models.
             "started_at": host.started_at.isoformat() if host.started_at else None,
         })
 
-        # Track which labs have running containers
-        for container in usage.get("container_details", []):
-            if container.get("status") == "running" and not container.get("is_system"):
-                lab_id = find_lab_by_prefix(
-                    container.get("lab_prefix", ""), labs_by_id, labs_by_prefix
-                )
-                if lab_id:
-                    labs_with_containers.add(lab_id)
+    # Track which labs have running containers
+    for lab_prefix in get_running_lab_prefixes(database, online_hosts):
+        lab_id = find_lab_by_prefix(lab_prefix, labs_by_id, labs_by_prefix)
+        if lab_id:
+            labs_with_containers.add(lab_id)
 
     # Calculate averages
     avg_cpu = total_cpu / online_count if online_count > 0 else 0
@@ -153,8 +150,9 @@ def get_containers_breakdown(database: Session = Depends(db.get_db), _user: mode
 
     all_containers = []
     all_vms = []
+    details_by_host = get_host_details(database, hosts)
     for host in hosts:
-        usage = host.get_resource_usage()
+        usage = details_by_host[host.id]
         # Collect containers
         for container in usage.get("container_details", []):
             container["agent_name"] = host.name
@@ -222,6 +220,7 @@ def get_resource_distribution(database: Session = Depends(db.get_db), _user: mod
 
     by_agent = []
     lab_containers = {}  # lab_id -> container count
+    details_by_host = get_host_details(database, hosts)
 
     for host in hosts:
         usage = host.get_resource_usage()
@@ -236,7 +235,7 @@ def get_resource_distribution(database: Session = Depends(db.get_db), _user: mod
         })
 
         # Count containers per lab (only non-system containers)
-        for c in usage.get("container_details", []):
+        for c in details_by_host[host.id]["container_details"]:
             if c.get("is_system"):
                 continue
             lab_id = find_lab_by_prefix(c.get("lab_prefix", ""), labs_by_id)
@@ -77,7 +77,6 @@ from .upload_docker import (  # noqa: F401
     complete_chunk_upload,
     get_chunk_upload_status,
     init_chunk_upload,
-    _load_image_background,
     _load_image_background_from_archive,
     _load_image_streaming,
     _load_image_sync,
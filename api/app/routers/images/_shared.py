@@ -1,6 +1,7 @@
 """Shared state, utilities, and Pydantic models for the images package."""
 from __future__ import annotations
 
+import hashlib
 import json
 import lzma
 import os
@@ -11,6 +12,7 @@ import time
 from datetime import datetime, timezone
 from pathlib import Path
 from types import SimpleNamespace
+from typing import BinaryIO
 
 import threading as _threading
 from pydantic import BaseModel, Field
@@ -32,6 +34,8 @@ _chunk_upload_sessions: dict[str, dict] = {}
 _chunk_upload_lock = threading.Lock()
 
 DEFAULT_CHUNK_SIZE = 10 * 1024 * 1024
+# Read size when spooling an upload to disk; bounds per-upload memory
+UPLOAD_SPOOL_BUFFER_SIZE = 1024 * 1024
 CHUNK_UPLOAD_TTL_SECONDS = 24 * 60 * 60
 _CHUNK_UPLOAD_DIR = Path(tempfile.gettempdir()) / "archetype-image-uploads"
 _QCOW2_BASE_SUFFIXES = (".qcow2", ".qcow", ".img")
@@ -96,16 +100,30 @@ def _send_sse_event(event_type: str, data: dict) -> str:
     return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
 
 
-def _write_content_to_tempfile(content: bytes, suffix: str) -> tuple[str, int]:
-    """Write content to a temporary file and return (path, size).
+def _spool_upload_to_tempfile(source: BinaryIO, suffix: str) -> tuple[str, int, str]:
+    """Copy an upload stream to a temporary file and return (path, size, sha256).
 
+    Reads ``UPLOAD_SPOOL_BUFFER_SIZE`` bytes at a time and hashes as it
+    writes, so memory use does not depend on the size of the upload.
     This is a blocking operation meant to run in asyncio.to_thread().
     """
+    digest = hashlib.sha256()
+    size = 0
     with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-        tmp_file.write(content)
         temp_path = tmp_file.name
-    file_size = os.path.getsize(temp_path)
-    return temp_path, file_size
+        try:
+            while True:
+                chunk = source.read(UPLOAD_SPOOL_BUFFER_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                tmp_file.write(chunk)
+                size += len(chunk)
+        except BaseException:
+            tmp_file.close()
+            os.unlink(temp_path)
+            raise
+    return temp_path, size, digest.hexdigest()
 
 
 def _decompress_xz_file(source_path: str) -> tuple[str, int]:
@@ -4,13 +4,12 @@ from __future__ import annotations
 import asyncio
 import hmac
 import logging
-import os
 from datetime import datetime, timezone
 from pathlib import Path
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
@@ -21,6 +20,24 @@ from app.image_store import (
     find_image_by_id,
     load_manifest,
 )
+from app.metrics import record_image_sync_transfer
+from app.services.docker_layer_delta import (
+    LayerDelta,
+    aiter_layer_delta,
+    plan_layer_delta,
+    read_archive_layers,
+)
+from app.services.docker_save_cache import (
+    docker_save_cache_key,
+    get_cached_archive,
+    materialize_docker_archive,
+    stream_docker_archive,
+)
+from app.services.image_seeding import (
+    assign_controller_source,
+    assign_image_source,
+    seed_url,
+)
 from app.tasks.image_sync import queue_image_sync_job
 
 router = APIRouter(tags=["images"])
@@ -60,6 +77,8 @@ class SyncJobOut(BaseModel):
     progress_percent: int = 0
     bytes_transferred: int = 0
     total_bytes: int = 0
+    bytes_saved: int = 0
+    source: str | None = None  # seeding peer host ID or "controller"
     error_message: str | None = None
     started_at: datetime | None = None
     completed_at: datetime | None = None
@@ -80,6 +99,97 @@ def _resolve_ready_docker_archive(image: dict) -> Path | None:
     return path
 
 
+def _byte_range(request: Request, size: int, etag: str) -> tuple[int, int] | None:
+    """Return the inclusive byte range requested for a ``size``-byte body, if any.
+
+    Only a single ``bytes=`` range is honoured; multi-range and malformed
+    headers, and ranges whose ``If-Range`` validator no longer matches
+    ``etag``, are ignored so the full body is sent. Raises 416 when the
+    range starts past the end of the body.
+    """
+    header = request.headers.get("range")
+    if not header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range != etag:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        elif last:
+            # Suffix range: the final N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+        else:
+            return None
+    except ValueError:
+        return None
+    if start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _file_stream_response(
+    path: Path,
+    media_type: str,
+    request: Request,
+    etag: str | None = None,
+) -> Response:
+    """Stream a complete file with ``Range``/``If-Range`` support.
+
+    Without an explicit ``etag`` the validator is derived from the file's
+    size and mtime, so a replaced file never satisfies a stale resume.
+    """
+    stat = path.stat()
+    size = stat.st_size
+    etag = etag or f'"{size:x}-{stat.st_mtime_ns:x}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    byte_range = _byte_range(request, size, etag)
+    start, end = byte_range or (0, size - 1)
+
+    def generate():
+        with path.open("rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(settings.image_sync_chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    headers = {
+        "Content-Type": media_type,
+        "Content-Length": str(end - start + 1),
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+    }
+    if byte_range is None:
+        return StreamingResponse(generate(), media_type=media_type, headers=headers)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        generate(),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
 async def _authorize_library_stream(
     request: Request,
     database: Session = Depends(db.get_db),
@@ -210,10 +320,144 @@ async def push_image_to_hosts(
     return {"jobs": job_ids, "count": len(job_ids)}
 
 
+async def _plan_docker_layer_delta(
+    client: httpx.AsyncClient,
+    host: models.Host,
+    archive_path: Path,
+) -> LayerDelta | None:
+    """Ask the agent which image layers it lacks and plan the archive to send.
+
+    Returns None when the full archive should be sent instead: the archive
+    is not plain ``docker save`` output, the agent cannot report its layers
+    (older agents), or it has none of them.
+    """
+    try:
+        layers = await asyncio.to_thread(read_archive_layers, archive_path)
+    except ValueError as e:
+        logger.debug(f"Sending full archive {archive_path} to {host.name}: {e}")
+        return None
+    try:
+        response = await client.post(
+            f"http://{host.address}/images/layers/missing",
+            json={"layers": layers.diff_ids},
+        )
+        response.raise_for_status()
+        present_layers = int(response.json().get("present_layers", 0))
+    except (httpx.HTTPError, ValueError, TypeError, AttributeError) as e:
+        logger.info(f"Agent {host.name} did not report image layers ({e}); sending full archive")
+        return None
+    if present_layers <= 0:
+        return None
+    return await asyncio.to_thread(plan_layer_delta, layers, present_layers)
+
+
+async def _push_docker_layer_delta(
+    client: httpx.AsyncClient,
+    host: models.Host,
+    delta: LayerDelta,
+    image_id: str,
+    image: dict,
+    job_id: str,
+) -> dict:
+    """Stream a layer-delta archive into the agent's ``docker load``."""
+    response = await client.post(
+        f"http://{host.address}/images/load-stream",
+        params={
+            "image_id": image_id,
+            "reference": image.get("reference", ""),
+            "total_bytes": str(delta.size),
+            "job_id": job_id,
+            "device_id": image.get("device_id", ""),
+        },
+        content=aiter_layer_delta(delta, settings.image_sync_chunk_size),
+        headers={"Content-Type": "application/x-tar"},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def _wait_for_agent_pull(
+    client: httpx.AsyncClient,
+    session: Session,
+    job: models.ImageSyncJob,
+    host: models.Host,
+    pull_request: dict,
+) -> None:
+    """Start a pull on the agent and mirror its progress into ``job``.
+
+    Raises ValueError when the agent reports a failure or the pull times out.
+    """
+    pull_response = await client.post(f"http://{host.address}/images/pull", json=pull_request)
+    pull_response.raise_for_status()
+    pull_job_id = pull_response.json().get("job_id")
+    if not pull_job_id:
+        raise ValueError("Agent did not return a pull job ID")
+
+    progress_url = f"http://{host.address}/images/pull/{pull_job_id}/progress"
+    deadline = datetime.now(timezone.utc).timestamp() + settings.image_sync_timeout
+    while True:
+        progress_response = await client.get(progress_url)
+        progress_response.raise_for_status()
+        progress = progress_response.json()
+        job.progress_percent = progress.get("progress_percent", 0)
+        job.bytes_transferred = progress.get("bytes_transferred", 0)
+        if progress.get("total_bytes"):
+            job.total_bytes = progress["total_bytes"]
+        session.commit()
+
+        status = progress.get("status")
+        if status == "completed":
+            return
+        if status in {"failed", "unknown"}:
+            raise ValueError(progress.get("error") or "Agent pull failed")
+        if datetime.now(timezone.utc).timestamp() >= deadline:
+            raise ValueError("Timed out waiting for agent pull to complete")
+        await asyncio.sleep(2)
+
+
+async def _pull_from_peer(
+    client: httpx.AsyncClient,
+    session: Session,
+    job: models.ImageSyncJob,
+    host: models.Host,
+    peer: models.Host,
+    image_id: str,
+    image: dict,
+) -> bool:
+    """Have ``host`` pull the image from the seeding agent ``peer``.
+
+    Returns False, with the job handed to the controller, if the peer
+    transfer fails (peer busy or gone, image changed, checksum mismatch).
+    """
+    reference = image.get("reference", "")
+    logger.info(f"Sync job {job.id}: {host.name} pulls {reference} from peer {peer.name}")
+    try:
+        await _wait_for_agent_pull(client, session, job, host, {
+            "image_id": image_id,
+            "reference": reference,
+            "sha256": image.get("sha256", ""),
+            "device_id": image.get("device_id", ""),
+            "source_url": seed_url(peer, reference),
+        })
+    except (httpx.HTTPError, ValueError) as e:
+        logger.warning(
+            f"Peer transfer of {reference} from {peer.name} to {host.name} failed ({e}); "
+            f"falling back to the controller"
+        )
+        job.progress_percent = 0
+        job.bytes_transferred = 0
+        assign_controller_source(session, job)
+        return False
+    record_image_sync_transfer("peer", job.total_bytes)
+    return True
+
+
 async def _execute_sync_job(job_id: str, image_id: str, image: dict, host: models.Host | str):
     """Execute a sync job in the background.
 
     Streams Docker or file-based images to the agent and updates job progress.
+    The image comes from a peer agent when the seeding tracker assigns one,
+    and from the controller otherwise or when the peer transfer fails.
     Uses structured error handling for better error messages.
     """
     from app.db import get_session
@@ -255,156 +499,114 @@ async def _execute_sync_job(job_id: str, image_id: str, image: dict, host: model
             agent_url = f"http://{host.address}/images/receive"
             from app.agent_client import _get_agent_auth_headers
             _auth_headers = _get_agent_auth_headers()
-            _docker_tmp_path = None
             async with httpx.AsyncClient(timeout=httpx.Timeout(settings.image_sync_timeout), headers=_auth_headers) as client:
+                delta = None
                 if is_file_based:
                     source_path = Path(reference)
                     if not source_path.exists() or not source_path.is_file():
                         raise ValueError(f"Source image file not found: {reference}")
 
-                    size_bytes = source_path.stat().st_size
-                    job.total_bytes = size_bytes
+                    job.total_bytes = source_path.stat().st_size
                     session.commit()
-
-                    pull_response = await client.post(
-                        f"http://{host.address}/images/pull",
-                        json={
-                            "image_id": image_id,
-                            "reference": reference,
-                            "sha256": image.get("sha256", ""),
-                            "device_id": image.get("device_id", ""),
-                        },
-                    )
-                    pull_response.raise_for_status()
-                    pull_job_id = pull_response.json().get("job_id")
-                    if not pull_job_id:
-                        raise ValueError("Agent did not return a pull job ID")
-
-                    progress_url = f"http://{host.address}/images/pull/{pull_job_id}/progress"
-                    deadline = datetime.now(timezone.utc).timestamp() + settings.image_sync_timeout
-                    while True:
-                        progress_response = await client.get(progress_url)
-                        progress_response.raise_for_status()
-                        progress = progress_response.json()
-                        job.progress_percent = progress.get("progress_percent", 0)
-                        job.bytes_transferred = progress.get("bytes_transferred", 0)
-                        if progress.get("total_bytes"):
-                            job.total_bytes = progress["total_bytes"]
-                        session.commit()
-
-                        status = progress.get("status")
-                        if status == "completed":
-                            break
-                        if status in {"failed", "unknown"}:
-                            raise ValueError(progress.get("error") or "Agent pull failed")
-                        if datetime.now(timezone.utc).timestamp() >= deadline:
-                            raise ValueError("Timed out waiting for agent pull to complete")
-                        await asyncio.sleep(2)
                 elif image_kind == "docker":
                     if archive_source_path is not None:
+                        archive_path = archive_source_path
                         saved_bytes = archive_source_path.stat().st_size
-                        job.total_bytes = saved_bytes
-                        job.bytes_transferred = saved_bytes
-                        job.progress_percent = 50
-                        session.commit()
-                        tmp_file_obj = open(archive_source_path, "rb")
                     else:
-                        # Get image size from Docker
-                        try:
-                            proc = await asyncio.create_subprocess_exec(
-                                "docker", "inspect", "--format", "{{.Size}}", reference,
-                                stdout=asyncio.subprocess.PIPE,
-                                stderr=asyncio.subprocess.PIPE,
-                            )
-                            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=30)
-                            if proc.returncode == 0:
-                                job.total_bytes = int(stdout.decode().strip())
-                                session.commit()
-                        except Exception as e:
-                            logger.warning(f"Could not get image size for {reference}: {e}")
-
-                        # Stream docker save to temp file to avoid loading
-                        # the entire image into memory
-                        import tempfile as _tempfile
-                        tmp_fd, _docker_tmp_path = _tempfile.mkstemp(suffix=".tar")
-                        try:
-                            proc = await asyncio.create_subprocess_exec(
-                                "docker", "save", reference,
-                                stdout=asyncio.subprocess.PIPE,
-                                stderr=asyncio.subprocess.PIPE,
-                            )
-                            saved_bytes = 0
-                            chunk_size = settings.image_sync_chunk_size
-                            with os.fdopen(tmp_fd, "wb") as tmp_out:
-                                while True:
-                                    chunk = await proc.stdout.read(chunk_size)
-                                    if not chunk:
-                                        break
-                                    tmp_out.write(chunk)
-                                    saved_bytes += len(chunk)
-                            # Wait for process to finish (stdout already consumed)
-                            _, stderr = await proc.communicate()
-                            if proc.returncode != 0:
-                                error_msg = stderr.decode() if stderr else "docker save failed"
-                                raise ValueError(error_msg)
-                        except BaseException:
-                            # Clean up on any error during docker save
-                            try:
-                                os.unlink(_docker_tmp_path)
-                            except OSError:
-                                pass
-                            _docker_tmp_path = None
-                            raise
-
-                        # Update progress while upload begins
-                        job.bytes_transferred = saved_bytes
-                        job.progress_percent = 50
-                        session.commit()
-                        tmp_file_obj = open(_docker_tmp_path, "rb")
-                    files = {"file": ("image.tar", tmp_file_obj, "application/x-tar")}
-                    params = {
+                        # Shared with concurrent syncs and agent pulls of the
+                        # same image: at most one docker save runs per image
+                        cached = await materialize_docker_archive(reference)
+                        archive_path = cached.path
+                        saved_bytes = cached.size
+                    job.total_bytes = saved_bytes
+                    session.commit()
+
+                    if settings.image_sync_layer_delta:
+                        delta = await _plan_docker_layer_delta(client, host, archive_path)
+                else:
+                    raise ValueError(f"Unsupported image kind for sync: {image_kind}")
+
+                # A layer delta from the controller is smaller than a full
+                # copy from a peer; everything else goes to the tracker
+                peer = None
+                if delta is None:
+                    peer = await assign_image_source(session, job, host.id)
+                else:
+                    assign_controller_source(session, job)
+
+                if peer is not None and await _pull_from_peer(client, session, job, host, peer, image_id, image):
+                    logger.info(f"Sync job {job_id}: {host.name} received {reference} from {peer.name}")
+                elif is_file_based:
+                    await _wait_for_agent_pull(client, session, job, host, {
                         "image_id": image_id,
                         "reference": reference,
-                        "total_bytes": str(saved_bytes),
-                        "job_id": job_id,
+                        "sha256": image.get("sha256", ""),
                         "device_id": image.get("device_id", ""),
-                    }
+                    })
+                    record_image_sync_transfer("full", job.total_bytes)
                 else:
-                    raise ValueError(f"Unsupported image kind for sync: {image_kind}")
+                    job.bytes_transferred = saved_bytes
+                    job.progress_percent = 50
+                    session.commit()
 
-                if not is_file_based:
-                    try:
-                        response = await client.post(agent_url, files=files, params=params)
-                        response.raise_for_status()
-                        result = response.json()
-                        if not result.get("success"):
-                            raise ValueError(result.get("error", "Agent failed to receive image"))
-                    except httpx.TimeoutException as e:
-                        structured_error = categorize_httpx_error(
-                            e, host_name=host.name, agent_id=host.id, job_id=job_id
-                        )
-                        raise ValueError(structured_error.to_error_message()) from e
-                    except httpx.ConnectError as e:
-                        structured_error = categorize_httpx_error(
-                            e, host_name=host.name, agent_id=host.id, job_id=job_id
-                        )
-                        raise ValueError(structured_error.to_error_message()) from e
-                    except httpx.HTTPStatusError as e:
-                        structured_error = categorize_httpx_error(
-                            e, host_name=host.name, agent_id=host.id, job_id=job_id
-                        )
-                        raise ValueError(structured_error.to_error_message()) from e
-                    finally:
-                        # Close file descriptors and clean up temp files
-                        if image_kind == "docker" and _docker_tmp_path:
-                            try:
-                                tmp_file_obj.close()
-                            except Exception:
-                                pass
-                            try:
-                                os.unlink(_docker_tmp_path)
-                            except OSError:
-                                pass
+                    if delta is not None:
+                        try:
+                            result = await _push_docker_layer_delta(
+                                client, host, delta, image_id, image, job_id,
+                            )
+                        except httpx.HTTPError as e:
+                            result = {"success": False, "error": str(e) or type(e).__name__}
+                        if result.get("success"):
+                            job.bytes_transferred = delta.size
+                            job.bytes_saved = delta.bytes_saved
+                            session.commit()
+                            record_image_sync_transfer("delta", delta.size, delta.bytes_saved)
+                            logger.info(
+                                f"Sync job {job_id}: sent {delta.size} of {saved_bytes} bytes "
+                                f"({delta.present_layers}/{len(delta.layers.diff_ids)} layers "
+                                f"already on {host.name})"
+                            )
+                        else:
+                            logger.warning(
+                                f"Layer-delta sync of {reference} to {host.name} failed "
+                                f"({result.get('error')}); sending the full archive"
+                            )
+                            delta = None
+
+                    if delta is None:
+                        tmp_file_obj = open(archive_path, "rb")
+                        files = {"file": ("image.tar", tmp_file_obj, "application/x-tar")}
+                        params = {
+                            "image_id": image_id,
+                            "reference": reference,
+                            "total_bytes": str(saved_bytes),
+                            "job_id": job_id,
+                            "device_id": image.get("device_id", ""),
+                        }
+                        try:
+                            response = await client.post(agent_url, files=files, params=params)
+                            response.raise_for_status()
+                            result = response.json()
+                            if not result.get("success"):
+                                raise ValueError(result.get("error", "Agent failed to receive image"))
+                            record_image_sync_transfer("full", saved_bytes)
+                        except httpx.TimeoutException as e:
+                            structured_error = categorize_httpx_error(
+                                e, host_name=host.name, agent_id=host.id, job_id=job_id
+                            )
+                            raise ValueError(structured_error.to_error_message()) from e
+                        except httpx.ConnectError as e:
+                            structured_error = categorize_httpx_error(
+                                e, host_name=host.name, agent_id=host.id, job_id=job_id
+                            )
+                            raise ValueError(structured_error.to_error_message()) from e
+                        except httpx.HTTPStatusError as e:
+                            structured_error = categorize_httpx_error(
+                                e, host_name=host.name, agent_id=host.id, job_id=job_id
+                            )
+                            raise ValueError(structured_error.to_error_message()) from e
+                        finally:
+                            tmp_file_obj.close()
 
             # Success
             job.status = "completed"
@@ -456,9 +658,15 @@ async def _execute_sync_job(job_id: str, image_id: str, image: dict, host: model
 @router.get("/library/{image_id}/stream")
 async def stream_image(
     image_id: str,
+    request: Request,
     _principal: models.User | None = Depends(_authorize_library_stream),
 ) -> StreamingResponse:
-    """Stream a syncable image for agents to pull."""
+    """Stream a syncable image for agents to pull.
+
+    Complete files (file-based images, persisted and cached archives) honour
+    ``Range``/``If-Range`` so interrupted pulls can resume. An archive still
+    being produced by ``docker save`` is streamed whole.
+    """
     from urllib.parse import unquote
     image_id = unquote(image_id)
 
@@ -479,61 +687,31 @@ async def stream_image(
         source_path = Path(reference)
         if not source_path.exists() or not source_path.is_file():
             raise HTTPException(status_code=404, detail="Source image file not found")
-
-        def generate_file():
-            with source_path.open("rb") as f:
-                while True:
-                    chunk = f.read(settings.image_sync_chunk_size)
-                    if not chunk:
-                        break
-                    yield chunk
-
-        return StreamingResponse(
-            generate_file(),
-            media_type="application/octet-stream",
-            headers={
-                "Content-Type": "application/octet-stream",
-                "Content-Length": str(source_path.stat().st_size),
-            },
-        )
+        return _file_stream_response(source_path, "application/octet-stream", request)
 
     archive_source_path = _resolve_ready_docker_archive(image)
     if archive_source_path is not None:
-        def generate_archive_file():
-            with archive_source_path.open("rb") as f:
-                while True:
-                    chunk = f.read(settings.image_sync_chunk_size)
-                    if not chunk:
-                        break
-                    yield chunk
+        return _file_stream_response(archive_source_path, "application/x-tar", request)
 
+    # Shared docker save cache: one save per image, however many agents pull
+    cache_key = await docker_save_cache_key(reference)
+    if cache_key is not None:
+        cached = get_cached_archive(cache_key)
+        if cached is not None:
+            return _file_stream_response(cached.path, "application/x-tar", request, etag=cached.etag)
+
+        # Length is unknown until the save finishes, so the body is chunked
         return StreamingResponse(
-            generate_archive_file(),
+            stream_docker_archive(reference, cache_key),
             media_type="application/x-tar",
             headers={
                 "Content-Type": "application/x-tar",
-                "Content-Length": str(archive_source_path.stat().st_size),
+                "ETag": f'"{cache_key}"',
             },
         )
 
-    # Get image size for Content-Length header (async subprocess to avoid blocking)
-    content_length = None
-    try:
-        proc = await asyncio.create_subprocess_exec(
-            "docker", "inspect", "--format", "{{.Size}}", reference,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=30)
-        if proc.returncode == 0:
-            # Note: This is the image size, not the tar size
-            # Tar size is usually slightly larger
-            content_length = int(stdout.decode().strip())
-    except Exception:
-        pass
-
     async def generate():
-        """Stream docker save output."""
+        """Stream docker save output (image unknown to docker inspect; not cached)."""
         proc = await asyncio.create_subprocess_exec(
             "docker", "save", reference,
             stdout=asyncio.subprocess.PIPE,
@@ -558,17 +736,43 @@ async def stream_image(
             proc.kill()
             raise
 
-    headers = {"Content-Type": "application/x-tar"}
-    if content_length:
-        headers["Content-Length"] = str(content_length)
-
     return StreamingResponse(
         generate(),
         media_type="application/x-tar",
-        headers=headers,
+        headers={"Content-Type": "application/x-tar"},
     )
 
 
+@router.get("/library/{image_id}/layers")
+async def get_image_layers(
+    image_id: str,
+    _principal: models.User | None = Depends(_authorize_library_stream),
+) -> dict:
+    """Publish the layer diff IDs of a Docker image, base layer first."""
+    from urllib.parse import unquote
+    image_id = unquote(image_id)
+
+    image = find_image_by_id(load_manifest(), image_id)
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found in library")
+    if image.get("kind") != "docker" or not image.get("reference"):
+        raise HTTPException(status_code=400, detail="Only Docker images have layers")
+
+    archive_path = _resolve_ready_docker_archive(image)
+    try:
+        if archive_path is None:
+            archive_path = (await materialize_docker_archive(image["reference"])).path
+        layers = await asyncio.to_thread(read_archive_layers, archive_path)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=f"Cannot read image layers: {e}")
+    return {
+        "image_id": image_id,
+        "reference": image["reference"],
+        "layers": layers.diff_ids,
+        "archive_bytes": layers.size,
+    }
+
+
 @router.get("/sync-jobs")
 def list_sync_jobs(
     status: str | None = None,
@@ -612,6 +816,8 @@ def list_sync_jobs(
             progress_percent=job.progress_percent,
             bytes_transferred=job.bytes_transferred,
             total_bytes=job.total_bytes,
+            bytes_saved=job.bytes_saved or 0,
+            source=job.source,
             error_message=job.error_message,
             started_at=job.started_at,
             completed_at=job.completed_at,
@@ -643,6 +849,8 @@ def get_sync_job(
         progress_percent=job.progress_percent,
         bytes_transferred=job.bytes_transferred,
         total_bytes=job.total_bytes,
+        bytes_saved=job.bytes_saved or 0,
+        source=job.source,
         error_message=job.error_message,
         started_at=job.started_at,
         completed_at=job.completed_at,
@@ -14,6 +14,7 @@ from uuid import uuid4
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from app import models
 from app.auth import get_current_admin, get_current_user
@@ -57,8 +58,8 @@ from ._shared import (
     _resolved_qcow2_upload_filename,
     _sanitize_upload_filename,
     _send_sse_event,
+    _spool_upload_to_tempfile,
     _update_progress,
-    _write_content_to_tempfile,
     threading,
 )
 
@@ -281,20 +282,27 @@ def load_image(
     if ResourceMonitor.check_disk_pressure() == PressureLevel.CRITICAL:
         raise HTTPException(status_code=507, detail="Insufficient disk space for upload")
 
+    filename = file.filename or "image.tar"
+    suffixes = Path(filename).suffixes
+    suffix = "".join(suffixes) if suffixes else ".tar"
+
     if background:
         # Background mode with polling
         import uuid
         upload_id = str(uuid.uuid4())[:8]
-        filename = file.filename or "image.tar"
-        content = file.file.read()
-        file.file.close()
+        # Spool to disk in bounded reads; the archive is never held in memory
+        try:
+            archive_path, _, sha256 = _spool_upload_to_tempfile(file.file, suffix)
+        finally:
+            file.file.close()
 
         _update_progress(upload_id, "starting", "Upload received, starting import...", 5)
 
         # Start background thread
         thread = threading.Thread(
-            target=_load_image_background,
-            args=(upload_id, filename, content),
+            target=_load_image_background_from_archive,
+            args=(upload_id, filename, archive_path),
+            kwargs={"sha256": sha256},
             daemon=True
         )
         thread.start()
@@ -302,20 +310,24 @@ def load_image(
         return {"upload_id": upload_id, "status": "started"}
 
     if stream:
-        # Read file content BEFORE returning StreamingResponse
+        # Spool the upload BEFORE returning StreamingResponse
         # because UploadFile gets closed after endpoint returns
-        filename = file.filename or "image.tar"
-        content = file.file.read()
-        file.file.close()
+        try:
+            archive_path, _, sha256 = _spool_upload_to_tempfile(file.file, suffix)
+        finally:
+            file.file.close()
 
         return StreamingResponse(
-            _load_image_streaming(filename, content),
+            _load_image_streaming(filename, archive_path=archive_path, sha256=sha256),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
                 "X-Accel-Buffering": "no",  # Disable nginx buffering
             },
+            # The generator's own cleanup never runs if the client goes
+            # away before the first chunk; this runs either way
+            background=BackgroundTask(_cleanup_temp_files, archive_path),
         )
 
     # Non-streaming mode (original behavior)
@@ -648,205 +660,18 @@ def cancel_chunk_upload(
     return {"message": "Upload cancelled"}
 
 
-def _load_image_background(upload_id: str, filename: str, content: bytes):
-    """Process image upload in background thread with progress updates."""
-    print(f"[UPLOAD {upload_id}] Starting background processing for {filename}")
-    suffixes = Path(filename).suffixes
-    suffix = "".join(suffixes) if suffixes else ".tar"
-    temp_path = ""
-    load_path = ""
-    decompressed_path = ""
-
-    try:
-        # Phase 1: Save to temp file
-        print(f"[UPLOAD {upload_id}] Phase 1: Saving file")
-        _update_progress(upload_id, "saving", f"Saving {filename}...", 10)
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-            tmp_file.write(content)
-            temp_path = tmp_file.name
-
-        load_path = temp_path
-        file_size = os.path.getsize(temp_path)
-        print(f"[UPLOAD {upload_id}] File saved: {file_size} bytes, checking if decompression needed")
-        _update_progress(upload_id, "saved", f"File saved ({_format_size(file_size)})", 30)
-
-        # Phase 2: Decompress if needed
-        print(f"[UPLOAD {upload_id}] Filename: {filename}, checking for .xz extension")
-        if filename.lower().endswith((".tar.xz", ".txz", ".xz")):
-            print(f"[UPLOAD {upload_id}] Phase 2: Decompressing XZ archive")
-            _update_progress(upload_id, "decompressing", "Decompressing XZ archive...", 35)
-            try:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".tar") as tmp_tar:
-                    with lzma.open(temp_path, "rb") as source:
-                        shutil.copyfileobj(source, tmp_tar)
-                    decompressed_path = tmp_tar.name
-                load_path = decompressed_path
-                decompressed_size = os.path.getsize(decompressed_path)
-                print(f"[UPLOAD {upload_id}] Decompression complete: {decompressed_size} bytes")
-                _update_progress(upload_id, "decompressed", "Decompression complete", 50)
-            except lzma.LZMAError as exc:
-                print(f"[UPLOAD {upload_id}] Decompression failed: {exc}")
-                _update_progress(upload_id, "error", f"Decompression failed: {exc}", 0, error=True)
-                return
-        else:
-            print(f"[UPLOAD {upload_id}] No decompression needed")
-
-        # Phase 3: Detect format
-        print(f"[UPLOAD {upload_id}] Phase 3: Detecting format of {load_path}")
-        _update_progress(upload_id, "detecting", "Detecting image format...", 55)
-        is_docker_image = _is_docker_image_tar(load_path)
-        print(f"[UPLOAD {upload_id}] Is docker image: {is_docker_image}")
-        loaded_images = []
-
-        # Phase 4: Import
-        if is_docker_image:
-            print(f"[UPLOAD {upload_id}] Phase 4: Running docker load")
-            _update_progress(upload_id, "loading", "Running docker load...", 60)
-            try:
-                result = subprocess.run(
-                    ["docker", "load", "-i", load_path],
-                    capture_output=True,
-                    text=True,
-                    check=False,
-                    timeout=600,  # 10 minute timeout
-                )
-                print(f"[UPLOAD {upload_id}] docker load returned: {result.returncode}")
-            except subprocess.TimeoutExpired:
-                print(f"[UPLOAD {upload_id}] docker load timed out after 600 seconds")
-                _update_progress(upload_id, "error", "docker load timed out", 0, error=True)
-                return
-            output = (result.stdout or "") + (result.stderr or "")
-            if result.returncode != 0:
-                _update_progress(upload_id, "error", output.strip() or "docker load failed", 0, error=True)
-                return
-            for line in output.splitlines():
-                if "Loaded image:" in line:
-                    loaded_images.append(line.split("Loaded image:", 1)[-1].strip())
-                elif "Loaded image ID:" in line:
-                    loaded_images.append(line.split("Loaded image ID:", 1)[-1].strip())
-        else:
-            base_name = Path(filename).stem
-            for ext in [".tar", ".gz", ".xz"]:
-                if base_name.lower().endswith(ext):
-                    base_name = base_name[:-len(ext)]
-            image_name = base_name.lower().replace(" ", "-").replace("_", "-")
-            image_tag = f"{image_name}:imported"
-
-            print(f"[UPLOAD {upload_id}] Phase 4: Importing as {image_tag}", flush=True)
-            _update_progress(upload_id, "importing", f"Importing as {image_tag}...", 60)
-
-            try:
-                # Use file-based output capture to avoid pipe deadlocks in daemon threads
-                import sys
-                print(f"[UPLOAD {upload_id}] Starting docker import subprocess", flush=True)
-                sys.stdout.flush()
-                sys.stderr.flush()
-
-                # Create temp files for output capture (avoids pipe blocking)
-                with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.out') as stdout_file:
-                    with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.err') as stderr_file:
-                        stdout_path = stdout_file.name
-                        stderr_path = stderr_file.name
-
-                try:
-                    with open(stdout_path, 'w') as stdout_f, open(stderr_path, 'w') as stderr_f:
-                        print(f"[UPLOAD {upload_id}] Running: docker import {load_path} {image_tag}", flush=True)
-                        result = subprocess.run(
-                            ["docker", "import", load_path, image_tag],
-                            stdout=stdout_f,
-                            stderr=stderr_f,
-                            timeout=600,
-                        )
-                        result_returncode = result.returncode
-
-                    # Read output from files
-                    with open(stdout_path, 'r') as f:
-                        stdout_content = f.read()
-                    with open(stderr_path, 'r') as f:
-                        stderr_content = f.read()
-                    output = stdout_content + stderr_content
-                    print(f"[UPLOAD {upload_id}] docker import returned: {result_returncode}", flush=True)
-                finally:
-                    # Clean up temp output files
-                    for p in [stdout_path, stderr_path]:
-                        if os.path.exists(p):
-                            os.unlink(p)
-
-            except subprocess.TimeoutExpired:
-                print(f"[UPLOAD {upload_id}] docker import timed out after 600 seconds", flush=True)
-                _update_progress(upload_id, "error", "docker import timed out", 0, error=True)
-                return
-            except Exception as e:
-                import traceback
-                print(f"[UPLOAD {upload_id}] docker import exception: {e}", flush=True)
-                traceback.print_exc()
-                _update_progress(upload_id, "error", f"docker import failed: {e}", 0, error=True)
-                return
-            if result_returncode != 0:
-                print(f"[UPLOAD {upload_id}] docker import failed: {output}", flush=True)
-                _update_progress(upload_id, "error", output.strip() or "docker import failed", 0, error=True)
-                return
-            loaded_images.append(image_tag)
-            output = f"Imported as {image_tag}"
-            print(f"[UPLOAD {upload_id}] Import successful: {image_tag}")
-
-        if not loaded_images:
-            print(f"[UPLOAD {upload_id}] No images detected")
-            _update_progress(upload_id, "error", "No images detected", 0, error=True)
-            return
-
-        # Phase 5: Update manifest
-        print(f"[UPLOAD {upload_id}] Phase 5: Updating manifest")
-        _update_progress(upload_id, "finalizing", "Updating image library...", 95)
-
-        manifest = load_manifest()
-        for image_ref in loaded_images:
-            potential_id = f"docker:{image_ref}"
-            if find_image_by_id(manifest, potential_id):
-                print(f"[UPLOAD {upload_id}] Image already exists: {image_ref}")
-                _update_progress(upload_id, "error", f"Image {image_ref} already exists", 0, error=True)
-                return
-
-        for image_ref in loaded_images:
-            device_id, version = detect_device_from_filename(image_ref)
-            entry = create_image_entry(
-                image_id=f"docker:{image_ref}",
-                kind="docker",
-                reference=image_ref,
-                filename=filename,
-                device_id=device_id,
-                version=version,
-                size_bytes=file_size,
-            )
-            manifest["images"].append(entry)
-        save_manifest(manifest)
-        _queue_docker_archive_creation(loaded_images)
-
-        print(f"[UPLOAD {upload_id}] Complete! Setting progress to 100%")
-        _update_progress(upload_id, "complete", output or "Image loaded successfully", 100,
-                        images=loaded_images, complete=True)
-        print(f"[UPLOAD {upload_id}] Progress updated to complete")
-
-    except Exception as e:
-        import traceback
-        print(f"[UPLOAD {upload_id}] Exception: {e}")
-        traceback.print_exc()
-        _update_progress(upload_id, "error", str(e), 0, error=True)
-    finally:
-        if decompressed_path and os.path.exists(decompressed_path):
-            os.unlink(decompressed_path)
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
-
-
 def _load_image_background_from_archive(
     upload_id: str,
     filename: str,
     archive_path: str,
     cleanup_archive: bool = True,
+    sha256: str | None = None,
 ):
-    """Process an uploaded Docker archive already staged on disk."""
+    """Process an uploaded Docker archive already staged on disk.
+
+    ``sha256`` is the digest of the uploaded archive when the caller hashed
+    it while staging; it is recorded on the new library entries.
+    """
     temp_path = archive_path
     load_path = temp_path
     decompressed_path = ""
@@ -1006,6 +831,7 @@ def _load_image_background_from_archive(
                 device_id=device_id,
                 version=version,
                 size_bytes=file_size,
+                sha256=sha256,
             )
             manifest["images"].append(entry)
         save_manifest(manifest)
@@ -1036,32 +862,31 @@ def _load_image_background_from_archive(
             os.unlink(temp_path)
 
 
-async def _load_image_streaming(filename: str, content: bytes):
+async def _load_image_streaming(
+    filename: str,
+    archive_path: str,
+    sha256: str | None = None,
+):
     """Stream image loading progress via Server-Sent Events.
 
     Args:
         filename: Original filename of the uploaded file
-        content: File content as bytes (already read from UploadFile)
+        archive_path: Upload already spooled to disk (takes ownership and
+            removes it when done)
+        sha256: Digest of the spooled upload, recorded on new entries
     """
-    suffixes = Path(filename).suffixes
-    suffix = "".join(suffixes) if suffixes else ".tar"
-    temp_path = ""
+    temp_path = archive_path
     load_path = ""
     decompressed_path = ""
 
     try:
-        # Phase 1: Save uploaded file to temp (run in thread to avoid blocking event loop)
-        total_size = len(content)
+        # Phase 1: Size the spooled upload (run in thread to avoid blocking event loop)
+        file_size = await asyncio.to_thread(os.path.getsize, archive_path)
         yield _send_sse_event("progress", {
             "phase": "saving",
-            "message": f"Processing uploaded file: {filename} ({_format_size(total_size)})...",
+            "message": f"Processing uploaded file: {filename} ({_format_size(file_size)})...",
             "percent": 5,
         })
-
-        # Write content to temp file in a thread to avoid blocking
-        temp_path, file_size = await asyncio.to_thread(
-            _write_content_to_tempfile, content, suffix
-        )
         load_path = temp_path
 
         yield _send_sse_event("progress", {
@@ -1243,6 +1068,7 @@ async def _load_image_streaming(filename: str, content: bytes):
                 device_id=device_id,
                 version=version,
                 size_bytes=file_size,
+                sha256=sha256,
             )
             manifest["images"].append(entry)
         save_manifest(manifest)
@@ -1279,9 +1105,7 @@ def _load_image_sync(file: UploadFile) -> dict:
     load_path = ""
     decompressed_path = ""
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-            shutil.copyfileobj(file.file, tmp_file)
-            temp_path = tmp_file.name
+        temp_path, _, sha256 = _spool_upload_to_tempfile(file.file, suffix)
         load_path = temp_path
         if filename.lower().endswith((".tar.xz", ".txz", ".xz")):
             try:
@@ -1368,6 +1192,7 @@ def _load_image_sync(file: UploadFile) -> dict:
                 device_id=device_id,
                 version=version,
                 size_bytes=file_size,
+                sha256=sha256,
             )
             manifest["images"].append(entry)
         save_manifest(manifest)
@@ -2,16 +2,20 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, AsyncGenerator
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, defer
 
 from app import agent_client, db, models, schemas
 from app.auth import get_current_user
 from app.db import get_session
+from app.services.job_log import JOB_LOG_READ_LIMIT, read_job_log
 from app.services.topology import TopologyService
 from app.state import HostStatus, JobStatus, LabState, NodeActualState, NodeDesiredState
 from app.tasks.jobs import run_agent_job, run_multihost_deploy, run_multihost_destroy
@@ -21,6 +25,7 @@ from app.utils.job import get_job_timeout_at, is_job_stuck
 from app.utils.lab import get_lab_or_404, get_lab_provider, require_lab_editor
 from app.utils.logs import get_log_content, _is_likely_file_path
 from app.utils.async_tasks import safe_create_task
+from app.utils.db import release_db_transaction_for_io
 from app.jobs import has_conflicting_job
 from app.services.state_machine import NodeStateMachine
 
@@ -28,6 +33,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["jobs"])
 
+# Seconds between chunk polls while tailing a live job log
+JOB_LOG_STREAM_INTERVAL = 0.5
+
 
 def get_agent_providers(host: models.Host) -> list[str]:
     """Compatibility wrapper for tests monkeypatching app.routers.jobs."""
@@ -823,10 +831,32 @@ def get_job_log(
     lab_id: str,
     job_id: str,
     tail: int | None = None,
+    offset: int | None = Query(default=None, ge=0),
+    limit: int = Query(default=JOB_LOG_READ_LIMIT, ge=1, le=JOB_LOG_READ_LIMIT),
     database: Session = Depends(db.get_db),
     current_user: models.User = Depends(get_current_user),
-) -> dict[str, str]:
+) -> dict[str, Any]:
+    """Return a job's log.
+
+    With ``offset`` the response is a byte range of the log plus the
+    ``next_offset`` to pass on the following request, so pollers only
+    transfer output produced since their last read.
+    """
     get_lab_or_404(lab_id, database, current_user)
+    if offset is not None:
+        job = database.get(models.Job, job_id, options=[defer(models.Job.log_path)])
+        if not job or job.lab_id != lab_id:
+            raise HTTPException(status_code=404, detail="Job not found")
+        log_range = read_job_log(database, job, offset, limit)
+        return {
+            "log": log_range.content,
+            "offset": log_range.offset,
+            "next_offset": log_range.next_offset,
+            "size": log_range.size,
+            "reset": log_range.reset,
+            "status": job.status,
+        }
+
     job = database.get(models.Job, job_id)
     if not job or job.lab_id != lab_id:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -852,6 +882,72 @@ def get_job_log(
     return {"log": content}
 
 
+def _sse_event(event_type: str, data: dict) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/labs/{lab_id}/jobs/{job_id}/log/stream")
+async def stream_job_log(
+    lab_id: str,
+    job_id: str,
+    offset: int = Query(default=0, ge=0),
+    database: Session = Depends(db.get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Tail a job's log via Server-Sent Events.
+
+    Sends a ``log`` event for each batch of new output starting at
+    ``offset`` and a ``complete`` event once the job has finished and all
+    of its output has been sent. Each poll reads only the chunks past the
+    client's cursor.
+    """
+    get_lab_or_404(lab_id, database, current_user)
+    job = database.get(models.Job, job_id, options=[defer(models.Job.log_path)])
+    if not job or job.lab_id != lab_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    release_db_transaction_for_io(
+        database, context=f"job log stream for {job_id}", table="jobs", lab_id=lab_id,
+    )
+
+    async def generate() -> AsyncGenerator[str, None]:
+        cursor = offset
+        while True:
+            with get_session() as session:
+                job = session.get(models.Job, job_id, options=[defer(models.Job.log_path)])
+                if job is None:
+                    yield _sse_event("error", {"message": "Job not found"})
+                    return
+                status = job.status
+                log_range = read_job_log(session, job, cursor)
+
+            if log_range.content or log_range.reset:
+                yield _sse_event("log", {
+                    "log": log_range.content,
+                    "offset": log_range.offset,
+                    "next_offset": log_range.next_offset,
+                    "reset": log_range.reset,
+                })
+            cursor = log_range.next_offset
+
+            if cursor < log_range.size:
+                continue
+            if status not in (JobStatus.QUEUED, JobStatus.RUNNING):
+                yield _sse_event("complete", {"status": status, "next_offset": cursor})
+                return
+            await asyncio.sleep(JOB_LOG_STREAM_INTERVAL)
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
 @router.get("/labs/{lab_id}/audit")
 def audit_log(
     lab_id: str,
@@ -14,9 +14,9 @@ from datetime import datetime, timezone
 from typing import Literal
 
 import yaml
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 
 from app import db, models, schemas
 from app.auth import get_current_user
@@ -26,6 +26,7 @@ from app.state import (
     NodeActualState,
     NodeDesiredState,
 )
+from app.utils.db import release_db_transaction_for_io
 from app.utils.http import raise_not_found
 from app.utils.lab import get_lab_or_404, get_lab_provider, get_lab_with_role
 from app.utils.nodes import get_node_placement_mapping
@@ -187,185 +188,260 @@ async def check_nodes_ready(
     )
 
 
-@router.get("/labs/{lab_id}/nodes/ready/poll")
-async def poll_nodes_ready(
-    lab_id: str,
-    timeout: int = 300,
-    interval: int = 10,
-    database: Session = Depends(db.get_db),
-    current_user: models.User = Depends(get_current_user),
-) -> schemas.LabReadinessResponse:
-    """Long-poll until all running nodes are ready or timeout.
+# Seconds between DB resyncs of a long-poll's node view while state events
+# flow; transitions arrive over the lab's broadcast channel in between.
+READY_POLL_RESYNC_SECONDS = 60.0
+# Longest wait for the state channel subscription before the first snapshot
+READY_POLL_SUBSCRIBE_TIMEOUT = 5.0
 
-    This endpoint blocks until either:
-    - All nodes with desired_state=running are ready
-    - The timeout is reached
+# Agent readiness sweeps are shared by every long-poll waiting on a lab
+_ready_probe_locks: dict[str, asyncio.Lock] = {}
+_ready_probe_last: dict[str, float] = {}
+_ready_waiters: dict[str, int] = {}
 
-    Args:
-        timeout: Maximum seconds to wait (default: 300, max: 600)
-        interval: Seconds between checks (default: 10, min: 5)
 
-    Returns:
-        LabReadinessResponse with final readiness state
-
-    Response Headers:
-        X-Readiness-Status: "complete" if all ready, "timeout" if timed out
-    """
-    from fastapi.responses import JSONResponse
-    from app.utils.lab import get_node_provider
-
-    # Validate parameters
-    timeout = min(max(timeout, 10), 600)  # 10s to 10min
-    interval = min(max(interval, 5), 60)  # 5s to 60s
-
-    lab = get_lab_or_404(lab_id, database, current_user)
-    _ensure_node_states_exist(database, lab.id)
-
-    db_nodes = (
-        database.query(models.Node)
-        .filter(models.Node.lab_id == lab_id)
+def _load_readiness_view(database: Session, lab_id: str) -> dict[str, dict]:
+    """Snapshot node readiness fields and release the transaction."""
+    states = (
+        database.query(models.NodeState)
+        .filter(models.NodeState.lab_id == lab_id)
         .all()
     )
-    nodes_by_name = {n.container_name: n for n in db_nodes}
-    node_devices = {n.container_name: n.device for n in db_nodes}
-    node_images = {n.container_name: n.image for n in db_nodes}
+    view = {
+        s.node_name: {
+            "desired_state": s.desired_state,
+            "actual_state": s.actual_state,
+            "is_ready": bool(s.is_ready),
+        }
+        for s in states
+    }
+    release_db_transaction_for_io(
+        database, context="nodes ready long-poll", table="node_states", lab_id=lab_id,
+    )
+    return view
 
-    lab_provider = get_lab_provider(lab)
-    agent = await _pkg().get_online_agent_for_lab(database, lab, required_provider=lab_provider)
 
-    start_time = asyncio.get_running_loop().time()
-    end_time = start_time + timeout
+def _view_all_ready(view: dict[str, dict]) -> bool:
+    return all(
+        v["is_ready"] and v["actual_state"] == NodeActualState.RUNNING
+        for v in view.values()
+        if v["desired_state"] == NodeDesiredState.RUNNING
+    )
 
-    while asyncio.get_running_loop().time() < end_time:
-        # Refresh session to get latest state
-        database.expire_all()
 
-        states = (
-            database.query(models.NodeState)
-            .filter(models.NodeState.lab_id == lab_id)
-            .order_by(models.NodeState.node_name)
-            .all()
+async def _watch_readiness_events(
+    lab_id: str,
+    view: dict[str, dict],
+    changed: asyncio.Event,
+    subscribed: asyncio.Event,
+) -> None:
+    """Apply the lab's node state broadcasts to ``view`` and signal changes.
+
+    Handles single ``node_state`` frames and the batched ``node_states``
+    frames the broadcaster emits when updates coalesce. ``subscribed`` is
+    set once the state channel subscription is confirmed.
+    """
+    from app.services.broadcaster import get_broadcaster
+
+    try:
+        async for message in get_broadcaster().subscribe(lab_id, subscribed=subscribed):
+            data = message.get("data") or {}
+            if message.get("type") == "node_state":
+                updates = [data]
+            elif message.get("type") == "node_states":
+                updates = data.get("nodes") or []
+            else:
+                continue
+            for update in updates:
+                node_name = update.get("node_name")
+                if not node_name:
+                    continue
+                view[node_name] = {
+                    "desired_state": update.get("desired_state"),
+                    "actual_state": update.get("actual_state"),
+                    "is_ready": bool(update.get("is_ready")),
+                }
+                changed.set()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # The waiter falls back to re-reading the DB every interval
+        logger.debug(f"Readiness event subscription for lab {lab_id} ended: {e}")
+
+
+async def _await_readiness_subscription(watcher: asyncio.Task, subscribed: asyncio.Event) -> None:
+    """Wait until the watcher's subscription is live, it fails, or the timeout passes."""
+    confirmed = asyncio.create_task(subscribed.wait())
+    try:
+        await asyncio.wait(
+            {confirmed, watcher},
+            timeout=READY_POLL_SUBSCRIBE_TIMEOUT,
+            return_when=asyncio.FIRST_COMPLETED,
         )
+    finally:
+        confirmed.cancel()
 
-        # Count nodes that should be running
-        nodes_should_run = [s for s in states if s.desired_state == NodeDesiredState.RUNNING]
 
-        if not nodes_should_run:
-            # No nodes expected to run - return immediately
-            return schemas.LabReadinessResponse(
-                lab_id=lab_id,
-                all_ready=True,
-                ready_count=0,
-                total_count=len(states),
-                running_count=0,
-                nodes=[],
+async def _probe_unready_nodes(lab_id: str, interval: int) -> dict[str, dict]:
+    """Ask the agent about running nodes that have not reported ready.
+
+    At most one sweep per lab runs per ``interval`` no matter how many
+    clients are waiting. Nodes found ready are committed in a short session
+    and broadcast, which wakes every waiter. No session is held across agent
+    calls. Returns the agent replies keyed by node name.
+    """
+    from app.services.broadcaster import broadcast_node_state_change
+    from app.utils.lab import get_node_provider
+
+    lock = _ready_probe_locks.setdefault(lab_id, asyncio.Lock())
+    async with lock:
+        now = asyncio.get_running_loop().time()
+        if now - _ready_probe_last.get(lab_id, float("-inf")) < interval:
+            return {}
+        _ready_probe_last[lab_id] = now
+
+        with db.get_session() as session:
+            lab = session.get(models.Lab, lab_id)
+            if lab is None:
+                return {}
+            pending = [
+                s.node_name
+                for s in session.query(models.NodeState).filter(
+                    models.NodeState.lab_id == lab_id,
+                    models.NodeState.actual_state == NodeActualState.RUNNING,
+                    models.NodeState.is_ready.is_(False),
+                )
+            ]
+            if not pending:
+                return {}
+            nodes_by_name = {
+                n.container_name: n
+                for n in session.query(models.Node).filter(
+                    models.Node.lab_id == lab_id,
+                    models.Node.container_name.in_(pending),
+                )
+            }
+            targets = []
+            for node_name in pending:
+                db_node = nodes_by_name.get(node_name)
+                provider_type = None
+                if db_node is not None and db_node.image:
+                    provider_type = get_node_provider(db_node)
+                targets.append((node_name, db_node.device if db_node else None, provider_type))
+            agent = await _pkg().get_online_agent_for_lab(
+                session, lab, required_provider=get_lab_provider(lab)
             )
+            if agent is None:
+                return {}
+            host_id, host_name = agent.id, agent.name
+            session.expunge(agent)
 
-        # Check readiness for running nodes
-        nodes_out = []
-        ready_count = 0
-        running_count = 0
-
-        for state in states:
-            progress_percent = None
-            message = None
-
-            if state.actual_state == NodeActualState.RUNNING:
-                running_count += 1
-                if agent and not state.is_ready:
-                    try:
-                        device_kind = node_devices.get(state.node_name)
-                        node_image = node_images.get(state.node_name)
-                        provider_type = None
-                        if node_image:
-                            db_node = nodes_by_name.get(state.node_name)
-                            if db_node is not None:
-                                provider_type = get_node_provider(db_node)
-                        readiness = await _pkg().agent_client.check_node_readiness(
-                            agent,
-                            lab.id,
-                            state.node_name,
-                            kind=device_kind,
-                            provider_type=provider_type,
+        replies: dict[str, dict] = {}
+        for node_name, device_kind, provider_type in targets:
+            try:
+                replies[node_name] = await _pkg().agent_client.check_node_readiness(
+                    agent,
+                    lab_id,
+                    node_name,
+                    kind=device_kind,
+                    provider_type=provider_type,
+                )
+            except Exception as e:
+                replies[node_name] = {"message": f"Readiness check failed: {e}"}
+
+        ready_names = [name for name, reply in replies.items() if reply.get("is_ready")]
+        if ready_names:
+            with db.get_session() as session:
+                rows = (
+                    session.query(models.NodeState)
+                    .filter(
+                        models.NodeState.lab_id == lab_id,
+                        models.NodeState.node_name.in_(ready_names),
+                        models.NodeState.actual_state == NodeActualState.RUNNING,
+                    )
+                    .all()
+                )
+                for ns in rows:
+                    ns.is_ready = True
+                session.commit()
+                for ns in rows:
+                    asyncio.create_task(
+                        broadcast_node_state_change(
+                            lab_id=lab_id,
+                            node_id=ns.node_id,
+                            node_name=ns.node_name,
+                            desired_state=ns.desired_state,
+                            actual_state=ns.actual_state,
+                            is_ready=True,
+                            error_message=ns.error_message,
+                            host_id=host_id,
+                            host_name=host_name,
                         )
-                        if readiness.get("is_ready"):
-                            state.is_ready = True
-                            database.commit()
-                        progress_percent = readiness.get("progress_percent")
-                        message = readiness.get("message")
-                    except Exception as e:
-                        message = f"Readiness check failed: {e}"
-
-            if state.is_ready and state.actual_state == NodeActualState.RUNNING:
-                ready_count += 1
-
-            if state in nodes_should_run:
-                nodes_out.append(schemas.NodeReadinessOut(
-                    node_id=state.node_id,
-                    node_name=state.node_name,
-                    is_ready=state.is_ready and state.actual_state == NodeActualState.RUNNING,
-                    actual_state=state.actual_state,
-                    progress_percent=progress_percent,
-                    message=message,
-                    boot_started_at=state.boot_started_at,
-                    management_ip=state.management_ip,
-                ))
-
-        # Check if all nodes that should run are ready
-        all_ready = all(
-            s.is_ready and s.actual_state == NodeActualState.RUNNING
-            for s in nodes_should_run
-        )
+                    )
+        return replies
 
-        if all_ready:
-            response = schemas.LabReadinessResponse(
-                lab_id=lab_id,
-                all_ready=True,
-                ready_count=ready_count,
-                total_count=len(states),
-                running_count=running_count,
-                nodes=nodes_out,
-            )
-            return JSONResponse(
-                content=response.model_dump(mode="json"),
-                headers={"X-Readiness-Status": "complete"},
-            )
 
-        # Wait before next check
-        await asyncio.sleep(interval)
+def _readiness_response(
+    database: Session,
+    lab_id: str,
+    replies: dict[str, dict],
+    *,
+    timed_out: bool,
+):
+    """Build the final long-poll answer from a fresh read of NodeState."""
+    from fastapi.responses import JSONResponse
 
-    # Timeout reached - return current state
     states = (
         database.query(models.NodeState)
         .filter(models.NodeState.lab_id == lab_id)
         .order_by(models.NodeState.node_name)
         .all()
     )
+    nodes_should_run = [s for s in states if s.desired_state == NodeDesiredState.RUNNING]
+    if not nodes_should_run:
+        # No nodes expected to run
+        return schemas.LabReadinessResponse(
+            lab_id=lab_id,
+            all_ready=True,
+            ready_count=0,
+            total_count=len(states),
+            running_count=0,
+            nodes=[],
+        )
+
+    all_ready = all(
+        s.is_ready and s.actual_state == NodeActualState.RUNNING
+        for s in nodes_should_run
+    )
+    if not all_ready and not timed_out:
+        return None
 
     nodes_out = []
     ready_count = 0
     running_count = 0
-
     for state in states:
         if state.actual_state == NodeActualState.RUNNING:
             running_count += 1
-        if state.is_ready and state.actual_state == NodeActualState.RUNNING:
+        is_ready = state.is_ready and state.actual_state == NodeActualState.RUNNING
+        if is_ready:
             ready_count += 1
-
+        if all_ready and state.desired_state != NodeDesiredState.RUNNING:
+            continue
+        reply = {} if timed_out else replies.get(state.node_name, {})
         nodes_out.append(schemas.NodeReadinessOut(
             node_id=state.node_id,
             node_name=state.node_name,
-            is_ready=state.is_ready and state.actual_state == NodeActualState.RUNNING,
+            is_ready=is_ready,
             actual_state=state.actual_state,
-            progress_percent=None,
-            message="Timeout waiting for readiness",
+            progress_percent=reply.get("progress_percent"),
+            message="Timeout waiting for readiness" if timed_out else reply.get("message"),
             boot_started_at=state.boot_started_at,
             management_ip=state.management_ip,
         ))
 
     response = schemas.LabReadinessResponse(
         lab_id=lab_id,
-        all_ready=False,
+        all_ready=all_ready,
         ready_count=ready_count,
         total_count=len(states),
         running_count=running_count,
@@ -373,10 +449,115 @@ async def poll_nodes_ready(
     )
     return JSONResponse(
         content=response.model_dump(mode="json"),
-        headers={"X-Readiness-Status": "timeout"},
+        headers={"X-Readiness-Status": "complete" if all_ready else "timeout"},
     )
 
 
+@router.get("/labs/{lab_id}/nodes/ready/poll")
+async def poll_nodes_ready(
+    lab_id: str,
+    timeout: int = 300,
+    interval: int = 10,
+    database: Session = Depends(db.get_db),
+    current_user: models.User = Depends(get_current_user),
+) -> schemas.LabReadinessResponse:
+    """Long-poll until all running nodes are ready or timeout.
+
+    This endpoint blocks until either:
+    - All nodes with desired_state=running are ready
+    - The timeout is reached
+
+    The wait subscribes to the lab's state broadcast channel and wakes on
+    node_state events; no DB transaction is held while waiting. Any number
+    of clients may wait on the same lab: they share one agent readiness
+    sweep per interval.
+
+    Args:
+        timeout: Maximum seconds to wait (default: 300, max: 600)
+        interval: Seconds between agent readiness sweeps when no state
+            event arrives (default: 10, min: 5)
+
+    Returns:
+        LabReadinessResponse with final readiness state
+
+    Response Headers:
+        X-Readiness-Status: "complete" if all ready, "timeout" if timed out
+    """
+    # Validate parameters
+    timeout = min(max(timeout, 10), 600)  # 10s to 10min
+    interval = min(max(interval, 5), 60)  # 5s to 60s
+
+    lab = get_lab_or_404(lab_id, database, current_user)
+    _ensure_node_states_exist(database, lab.id)
+
+    view: dict[str, dict] = {}
+    changed = asyncio.Event()
+    _ready_waiters[lab_id] = _ready_waiters.get(lab_id, 0) + 1
+    # Subscribe before the snapshot so no transition falls between them
+    subscribed = asyncio.Event()
+    watcher = asyncio.create_task(_watch_readiness_events(lab_id, view, changed, subscribed))
+    await _await_readiness_subscription(watcher, subscribed)
+
+    try:
+        view.update(_load_readiness_view(database, lab_id))
+        loop = asyncio.get_running_loop()
+        end_time = loop.time() + timeout
+        last_resync = loop.time()
+        replies: dict[str, dict] = {}
+        probe_due = True
+
+        while True:
+            if _view_all_ready(view):
+                response = _readiness_response(database, lab_id, replies, timed_out=False)
+                if response is not None:
+                    return response
+                # The view ran ahead of the DB; trust the DB
+                view.update(_load_readiness_view(database, lab_id))
+                last_resync = loop.time()
+
+            remaining = end_time - loop.time()
+            if remaining <= 0:
+                break
+
+            if probe_due:
+                # Drive readiness checks for nodes that are still booting
+                probe_due = False
+                for node_name, reply in (await _probe_unready_nodes(lab_id, interval)).items():
+                    replies[node_name] = reply
+                    if reply.get("is_ready") and node_name in view:
+                        view[node_name]["is_ready"] = True
+                if (
+                    watcher.done()
+                    or not subscribed.is_set()
+                    or loop.time() - last_resync >= READY_POLL_RESYNC_SECONDS
+                ):
+                    view.update(_load_readiness_view(database, lab_id))
+                    last_resync = loop.time()
+                if _view_all_ready(view):
+                    continue
+
+            changed.clear()
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=min(remaining, interval))
+            except asyncio.TimeoutError:
+                probe_due = True
+
+        return _readiness_response(database, lab_id, replies, timed_out=True)
+    finally:
+        watcher.cancel()
+        try:
+            await watcher
+        except asyncio.CancelledError:
+            pass
+        _ready_waiters[lab_id] -= 1
+        if not _ready_waiters[lab_id]:
+            del _ready_waiters[lab_id]
+            lock = _ready_probe_locks.get(lab_id)
+            if lock is not None and not lock.locked():
+                del _ready_probe_locks[lab_id]
+                _ready_probe_last.pop(lab_id, None)
+
+
 # ============================================================================
 # Inventory Export Endpoint (IaC Workflow Support)
 # ============================================================================
@@ -655,14 +836,15 @@ def get_lab_logs(
     level: str | None = None,
     since: str | None = None,
     search: str | None = None,
-    limit: int = 500,
+    limit: int = Query(default=500, ge=1, le=5000),
+    cursor: str | None = None,
     database: Session = Depends(db.get_db),
     current_user: models.User = Depends(get_current_user),
 ) -> schemas.LabLogsResponse:
     """Get aggregated logs for a lab.
 
-    Combines job logs from all jobs in this lab, parsed with host sections.
-    Optionally includes system logs from Loki if configured and user is admin.
+    Serves job log lines that were parsed into indexed entries when they
+    were written; filtering, search and pagination run in the database.
 
     Query parameters:
     - job_id: Filter to logs from a specific job
@@ -671,11 +853,15 @@ def get_lab_logs(
     - since: Time filter (e.g., "15m", "1h", "24h")
     - search: Text search in log messages
     - limit: Maximum number of entries to return (default 500)
+    - cursor: Continue after the page that returned this ``next_cursor``
 
     Returns structured log entries with host associations and summary info.
     """
-    from app.services.log_parser import parse_job_log, filter_entries
-    from app.utils.logs import get_log_content
+    from app.services.lab_log_index import (
+        backfill_legacy_job_logs,
+        lab_log_host_names,
+        query_lab_log_entries,
+    )
 
     get_lab_or_404(lab_id, database, current_user)
 
@@ -686,21 +872,42 @@ def get_lab_logs(
     if duration:
         since_dt = datetime.now(timezone.utc) - duration
 
-    # Query jobs for this lab
+    # Jobs logged before the entry index existed are indexed on first view
+    backfill_legacy_job_logs(database, lab_id)
+
+    try:
+        page = query_lab_log_entries(
+            database,
+            lab_id,
+            job_id=job_id,
+            host_id=host_id,
+            level=level,
+            since=since_dt,
+            search=search,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    # Recent jobs for the filtering UI (log text itself is not needed)
     jobs_query = (
         database.query(models.Job)
+        .options(defer(models.Job.log_path))
         .filter(models.Job.lab_id == lab_id)
         .order_by(models.Job.created_at.desc())
     )
-
     if job_id:
         jobs_query = jobs_query.filter(models.Job.id == job_id)
-
-    # Limit to recent jobs for performance
     jobs = jobs_query.limit(50).all()
 
-    # Build agent_id -> host_name lookup from all jobs
-    agent_ids = {job.agent_id for job in jobs if job.agent_id}
+    # Entries logged without a host belong to the agent that ran their job
+    job_agents = dict(
+        database.query(models.Job.id, models.Job.agent_id)
+        .filter(models.Job.id.in_({e.job_id for e in page.entries} | {j.id for j in jobs}))
+        .all()
+    )
+    agent_ids = {agent_id for agent_id in job_agents.values() if agent_id}
     agent_name_map: dict[str, str] = {}
     if agent_ids:
         hosts = (
@@ -710,59 +917,29 @@ def get_lab_logs(
         )
         agent_name_map = {h.id: h.name for h in hosts}
 
-    # Parse all job logs
-    all_entries = []
-    hosts_found = set()
-
-    for job in jobs:
-        log_content = get_log_content(job.log_path)
-        if not log_content:
-            continue
-
-        # Get host info for this job from its agent_id
-        job_host_id = job.agent_id
-        job_host_name = agent_name_map.get(job.agent_id) if job.agent_id else None
-
-        parsed = parse_job_log(
-            log_content=log_content,
-            job_id=job.id,
-            job_created_at=job.created_at,
-        )
-
-        # If job has an agent, set host info on entries that don't have it
-        # and add the host to hosts_found
-        for entry in parsed.entries:
-            if not entry.host_id and job_host_id:
-                entry.host_id = job_host_id
-                entry.host_name = job_host_name
-            if entry.host_name:
-                hosts_found.add(entry.host_name)
-
-        all_entries.extend(parsed.entries)
-        hosts_found.update(parsed.hosts)
-
-        # Also add job's host to found hosts
-        if job_host_name:
-            hosts_found.add(job_host_name)
-
-    # Apply filters
-    filtered_entries = filter_entries(
-        all_entries,
-        host_id=host_id,
-        level=level,
-        search=search,
-        since=since_dt,
+    hosts_found = lab_log_host_names(database, lab_id)
+    hosts_found.update(
+        agent_name_map[job.agent_id] for job in jobs if job.agent_id in agent_name_map
     )
 
-    # Sort by timestamp (newest first for display, but API returns oldest first for streaming)
-    filtered_entries.sort(key=lambda e: e.timestamp)
-
-    # Apply limit
-    has_more = len(filtered_entries) > limit
-    limited_entries = filtered_entries[:limit]
-
-    # Count errors
-    error_count = sum(1 for e in limited_entries if e.level == "error")
+    response_entries = []
+    for e in page.entries:
+        entry_host_id, entry_host_name = e.host_id, e.host_name
+        job_agent_id = job_agents.get(e.job_id)
+        if not entry_host_id and job_agent_id:
+            entry_host_id = job_agent_id
+            entry_host_name = agent_name_map.get(job_agent_id)
+        response_entries.append(
+            schemas.LabLogEntry(
+                timestamp=e.timestamp,
+                level=e.level,
+                message=e.message,
+                host_id=entry_host_id,
+                host_name=entry_host_name,
+                job_id=e.job_id,
+                source="job",
+            )
+        )
 
     # Build job summaries for filtering UI
     job_summaries = [
@@ -776,27 +953,14 @@ def get_lab_logs(
         for job in jobs
     ]
 
-    # Convert entries to response schema
-    response_entries = [
-        schemas.LabLogEntry(
-            timestamp=e.timestamp,
-            level=e.level,
-            message=e.message,
-            host_id=e.host_id,
-            host_name=e.host_name,
-            job_id=e.job_id,
-            source=e.source,
-        )
-        for e in limited_entries
-    ]
-
     return schemas.LabLogsResponse(
         entries=response_entries,
         jobs=job_summaries,
-        hosts=list(hosts_found),
-        total_count=len(filtered_entries),
-        error_count=error_count,
-        has_more=has_more,
+        hosts=sorted(hosts_found),
+        total_count=page.total_count,
+        error_count=sum(1 for e in response_entries if e.level == "error"),
+        has_more=page.has_more,
+        next_cursor=page.next_cursor,
     )
 
 
@@ -4,9 +4,10 @@ This module provides a WebSocket endpoint that clients can connect to
 for receiving real-time state updates for a specific lab. It replaces
 polling with push-based updates for better user experience.
 
-The endpoint subscribes to Redis pub/sub channels and forwards state
-change messages to connected clients. Multiple clients can connect
-to the same lab and all will receive updates.
+The endpoint subscribes to the process-wide state fan-out hub (one Redis
+pattern subscription per worker) and forwards state change messages to
+connected clients. Multiple clients can connect to the same lab and all
+will receive updates.
 
 Usage:
     WebSocket connect to: /ws/labs/{lab_id}/state
@@ -28,6 +29,7 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from app import db, models
 from app.config import settings
 from app.services.broadcaster import get_broadcaster
+from app.services.state_fanout import SlowSubscriberError
 from app.services.state_machine import NodeStateMachine
 from app.state import NodeActualState, NodeDesiredState
 from app.utils.nodes import get_node_placement_mapping
@@ -36,6 +38,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["state_ws"])
 
+# How long a connection waits for its subscription before replaying anyway
+SUBSCRIBE_CONFIRM_TIMEOUT = 5.0
+
 
 class ConnectionManager:
     """Manages WebSocket connections per lab.
@@ -92,16 +97,65 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 
-async def _subscribe_and_forward(websocket: WebSocket, lab_id: str) -> None:
-    """Subscribe to Redis pub/sub and forward messages to WebSocket client.
+class _LiveGate:
+    """Orders live messages after the missed events or snapshot being sent.
+
+    While held, live messages are buffered instead of forwarded. Releasing
+    sends the buffer, skipping messages whose ``seq`` the client already
+    has from the replay or snapshot; later duplicates are skipped as well.
+    """
+
+    def __init__(self) -> None:
+        self.held: list[dict] | None = []
+        self.covered_seq: int | None = None
+
+    def is_covered(self, message: dict) -> bool:
+        seq = message.get("seq")
+        return (
+            self.covered_seq is not None
+            and isinstance(seq, int)
+            and seq <= self.covered_seq
+        )
+
+    def hold(self) -> None:
+        if self.held is None:
+            self.held = []
+
+    async def release(self, websocket: WebSocket, covered_seq: int | None) -> None:
+        if covered_seq is not None:
+            self.covered_seq = max(covered_seq, self.covered_seq or 0)
+        try:
+            while self.held:
+                message = self.held.pop(0)
+                if not self.is_covered(message):
+                    await websocket.send_json(message)
+        finally:
+            self.held = None
+
+
+async def _subscribe_and_forward(
+    websocket: WebSocket,
+    lab_id: str,
+    subscribed: asyncio.Event | None = None,
+    gate: _LiveGate | None = None,
+) -> None:
+    """Subscribe to the state fan-out hub and forward messages to WebSocket client.
 
     This runs in a background task and forwards all state change messages
-    from Redis to the connected WebSocket client.
+    from Redis to the connected WebSocket client. ``subscribed`` is set
+    once the subscription is confirmed; messages arriving while ``gate``
+    is held are buffered on it rather than sent.
     """
     broadcaster = get_broadcaster()
 
     try:
-        async for message in broadcaster.subscribe(lab_id):
+        async for message in broadcaster.subscribe(lab_id, subscribed=subscribed):
+            if gate is not None:
+                if gate.held is not None:
+                    gate.held.append(message)
+                    continue
+                if gate.is_covered(message):
+                    continue
             try:
                 await websocket.send_json(message)
             except Exception as e:
@@ -109,18 +163,46 @@ async def _subscribe_and_forward(websocket: WebSocket, lab_id: str) -> None:
                 break
     except asyncio.CancelledError:
         logger.debug(f"Subscription task cancelled for lab {lab_id}")
+    except SlowSubscriberError:
+        # Client fell behind; closing makes it reconnect and reload the snapshot
+        try:
+            await websocket.close(code=1013, reason="Client too slow, reconnect")
+        except Exception:
+            pass
     except Exception as e:
         logger.warning(f"Error in subscription loop for lab {lab_id}: {e}")
 
 
-async def _send_initial_state(websocket: WebSocket, lab_id: str) -> None:
+async def _await_subscription(subscription_task: asyncio.Task, subscribed: asyncio.Event) -> None:
+    """Wait until the subscription is live, its task ends, or the timeout passes."""
+    confirmed = asyncio.create_task(subscribed.wait())
+    try:
+        await asyncio.wait(
+            {confirmed, subscription_task},
+            timeout=SUBSCRIBE_CONFIRM_TIMEOUT,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    finally:
+        confirmed.cancel()
+
+
+async def _send_initial_state(websocket: WebSocket, lab_id: str) -> int | None:
     """Send initial state snapshot when client connects.
 
     Queries all data from the database in a worker thread, then sends
     messages over WebSocket. This prevents blocking the event loop during
     DB queries and holding a DB connection during I/O.
+
+    The lab's event sequence number is read before the query, so any event
+    the snapshot might not reflect has a higher seq and is replayed if the
+    client later resumes from it.
+
+    Returns:
+        The sequence number the snapshot reflects, None if unknown
     """
     try:
+        seq = await _current_seq(lab_id)
+
         # Phase 1: Query all data and build messages in worker thread
         max_retries = settings.state_enforcement_max_retries
 
@@ -191,7 +273,7 @@ async def _send_initial_state(websocket: WebSocket, lab_id: str) -> None:
                 messages.append({
                     "type": "initial_state",
                     "timestamp": datetime.now(timezone.utc).isoformat(),
-                    "data": {"nodes": nodes_data},
+                    "data": {"nodes": nodes_data, "seq": seq},
                 })
 
                 # Get link states
@@ -243,9 +325,72 @@ async def _send_initial_state(websocket: WebSocket, lab_id: str) -> None:
             n_nodes = len(messages[1].get("data", {}).get("nodes", []))
             n_links = len(messages[2]["data"]["links"]) if len(messages) > 2 else 0
             logger.debug(f"Sent initial state for lab {lab_id}: {n_nodes} nodes, {n_links} links")
+        return seq
 
     except Exception as e:
         logger.error(f"Failed to send initial state for lab {lab_id}: {e}")
+        return None
+
+
+async def _current_seq(lab_id: str) -> int | None:
+    """Read the lab's latest event sequence number, None if unavailable."""
+    try:
+        return await get_broadcaster().current_seq(lab_id)
+    except Exception as e:
+        logger.debug(f"Failed to read state sequence for lab {lab_id}: {e}")
+        return None
+
+
+async def _send_missed_events(websocket: WebSocket, lab_id: str, last_seq: int) -> int | None:
+    """Replay the events published since last_seq from the lab's ring buffer.
+
+    Returns:
+        The highest sequence number sent (last_seq if nothing was missed),
+        or None if the gap is too old (or the buffer unavailable) and a
+        full snapshot is needed
+    """
+    try:
+        events = await get_broadcaster().replay(lab_id, last_seq)
+    except Exception as e:
+        logger.debug(f"Failed to replay state events for lab {lab_id}: {e}")
+        return None
+    if events is None:
+        return None
+
+    await websocket.send_json({
+        "type": "resume",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "data": {"last_seq": last_seq, "count": len(events)},
+    })
+    covered = last_seq
+    for event in events:
+        await websocket.send_json(event)
+        if isinstance(event.get("seq"), int):
+            covered = max(covered, event["seq"])
+    logger.debug(f"Resumed lab {lab_id} from seq {last_seq}: {len(events)} events")
+    return covered
+
+
+async def _resume_or_send_initial_state(
+    websocket: WebSocket,
+    lab_id: str,
+    last_seq: int | None,
+    gate: _LiveGate,
+) -> None:
+    """Send only missed events when possible, otherwise the full snapshot.
+
+    Live messages are held on ``gate`` until this is done, so none reaches
+    the client ahead of an older replayed event or twice.
+    """
+    gate.hold()
+    covered = None
+    try:
+        if last_seq is not None and last_seq >= 0:
+            covered = await _send_missed_events(websocket, lab_id, last_seq)
+        if covered is None:
+            covered = await _send_initial_state(websocket, lab_id)
+    finally:
+        await gate.release(websocket, covered)
 
 
 @router.websocket("/ws/labs/{lab_id}/state")
@@ -253,6 +398,7 @@ async def lab_state_websocket(
     websocket: WebSocket,
     lab_id: str,
     token: str | None = None,
+    last_seq: int | None = None,
 ) -> None:
     """WebSocket endpoint for real-time lab state updates.
 
@@ -263,7 +409,10 @@ async def lab_state_websocket(
     - Job progress updates
 
     The connection receives an initial state snapshot on connect,
-    then incremental updates as changes occur.
+    then incremental updates as changes occur. Every published event
+    carries a per-lab ``seq``; a client reconnecting with ``last_seq``
+    receives a ``resume`` message followed by only the events it missed,
+    falling back to the snapshot when they are no longer buffered.
 
     Protocol:
     - Server sends JSON messages with type, timestamp, data
@@ -284,12 +433,19 @@ async def lab_state_websocket(
 
     await manager.connect(websocket, lab_id)
 
-    # Start subscription task
-    subscription_task = asyncio.create_task(_subscribe_and_forward(websocket, lab_id))
+    # Subscribe before reading missed events or the snapshot so nothing
+    # published in between is lost; live messages wait on the gate
+    subscribed = asyncio.Event()
+    gate = _LiveGate()
+    subscription_task = asyncio.create_task(
+        _subscribe_and_forward(websocket, lab_id, subscribed, gate)
+    )
 
     try:
-        # Send initial state (opens and releases its own session)
-        await _send_initial_state(websocket, lab_id)
+        await _await_subscription(subscription_task, subscribed)
+        # Send missed events or the initial state (snapshot opens and
+        # releases its own session)
+        await _resume_or_send_initial_state(websocket, lab_id, last_seq, gate)
 
         # Keep connection alive and handle client messages
         while True:
@@ -311,8 +467,11 @@ async def lab_state_websocket(
                             "timestamp": datetime.now(timezone.utc).isoformat(),
                         })
                     elif msg_type == "refresh":
-                        # Client requests state refresh (opens own session)
-                        await _send_initial_state(websocket, lab_id)
+                        # Client requests state refresh, optionally as a delta
+                        resume_from = message.get("last_seq")
+                        if not isinstance(resume_from, int) or isinstance(resume_from, bool):
+                            resume_from = None
+                        await _resume_or_send_initial_state(websocket, lab_id, resume_from, gate)
                 except json.JSONDecodeError:
                     pass  # Ignore non-JSON messages
 
@@ -47,6 +47,8 @@ from app.tasks.state_enforcement import state_enforcement_monitor
 from app.tasks.link_reconciliation import link_reconciliation_monitor
 from app.tasks.cleanup_handler import cleanup_event_monitor
 from app.events.publisher import close_publisher
+from app.image_store import start_catalog_invalidation_listener, stop_catalog_invalidation_listener
+from app.services.broadcaster import get_broadcaster
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -129,6 +131,8 @@ async def startup():
             logger.warning(f"Database not ready (attempt {attempt + 1}/30), retrying in 2s...")
             await asyncio.sleep(2)
 
+    start_catalog_invalidation_listener()
+
     # Start all monitors wrapped in supervisors
     monitors = [
         ("agent_health_monitor", agent_health_monitor),
@@ -179,6 +183,9 @@ async def shutdown():
     if _monitor_tasks:
         await asyncio.gather(*_monitor_tasks, return_exceptions=True)
 
+    stop_catalog_invalidation_listener()
+    # Deliver node/link updates still waiting in the coalescing window
+    await get_broadcaster().flush()
     await close_publisher()
     logger.info("Scheduler shutdown complete")
 
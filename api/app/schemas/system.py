@@ -65,6 +65,8 @@ class LabLogsResponse(BaseModel):
     total_count: int
     error_count: int
     has_more: bool = False
+    # Keyset cursor for the next page (pass back as ?cursor=)
+    next_cursor: str | None = None
 
 
 # =============================================================================
@@ -11,8 +11,18 @@ Usage:
     await broadcaster.publish_node_state(lab_id, node_data)
     await broadcaster.publish_link_state(lab_id, link_data)
 
+Node and link updates can be coalesced per lab: updates for the same node
+or link within a short window are merged and sent as one batched
+``node_states``/``link_states`` frame. Latency is bounded by the window,
+since it starts at the first pending update and is never extended.
+
+Every published message is stamped with a per-lab sequence number and
+appended to a short Redis Stream (the lab's ring buffer), so reconnecting
+clients can replay what they missed instead of reloading a full snapshot.
+
 The WebSocket endpoint subscribes to the lab's channel and forwards
-messages to connected clients.
+messages to connected clients. Subscriptions are served from a single
+per-process Redis pattern subscription (see state_fanout).
 """
 from __future__ import annotations
 
@@ -25,7 +35,12 @@ from typing import AsyncGenerator
 import redis.asyncio as aioredis
 
 from app.config import settings
-from app.metrics import record_broadcast
+from app.metrics import (
+    record_broadcast,
+    record_state_broadcast_event,
+    record_state_broadcast_frame,
+)
+from app.services.state_fanout import StateFanoutHub
 from app.utils.timeouts import REDIS_OPERATION_TIMEOUT
 
 logger = logging.getLogger(__name__)
@@ -33,6 +48,18 @@ logger = logging.getLogger(__name__)
 # Singleton broadcaster instance
 _broadcaster: "StateBroadcaster | None" = None
 
+# Allocates the lab's next sequence number, stamps it into the payload and
+# appends it to the lab's ring buffer in one step, so stream order always
+# matches sequence order. The sequence key deliberately has no TTL: if it
+# reset, a stale last_seq could be mistaken for a recent one.
+_SEQUENCE_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local payload = '{"seq": ' .. seq .. ', ' .. string.sub(ARGV[1], 2)
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[2], '*', 'seq', seq, 'data', payload)
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return payload
+"""
+
 
 class StateBroadcaster:
     """Broadcasts state changes via Redis pub/sub.
@@ -41,15 +68,22 @@ class StateBroadcaster:
     provides an async generator for subscribing to updates for a specific lab.
     """
 
-    def __init__(self, redis_url: str):
+    def __init__(self, redis_url: str, coalesce_window: float = 0.0):
         """Initialize the broadcaster with a Redis connection.
 
         Args:
             redis_url: Redis connection URL
+            coalesce_window: Seconds to collect node/link updates per lab
+                before sending them as one frame (0 publishes immediately)
         """
         self._redis_url = redis_url
+        self._coalesce_window = coalesce_window
+        # lab_id -> {(message type, node_id/link_name): latest message}
+        self._pending: dict[str, dict[tuple[str, str], dict]] = {}
+        self._flush_tasks: dict[str, asyncio.Task] = {}
         self._redis: aioredis.Redis | None = None
-        self._pubsub_connections: dict[str, aioredis.client.PubSub] = {}
+        self._fanout = StateFanoutHub(self._get_redis, channel_prefix="lab_state:")
+        self._sequence_script = None
 
     async def _get_redis(self) -> aioredis.Redis:
         """Get or create Redis connection."""
@@ -65,14 +99,176 @@ class StateBroadcaster:
         """Get the Redis channel name for a lab."""
         return f"lab_state:{lab_id}"
 
+    def _seq_key(self, channel: str) -> str:
+        """Get the Redis key holding a lab's last sequence number."""
+        return f"{channel}:seq"
+
+    def _stream_key(self, channel: str) -> str:
+        """Get the Redis Stream key holding a lab's recent events."""
+        return f"{channel}:log"
+
+    async def _sequence(self, r: aioredis.Redis, channel: str, data: str) -> str:
+        """Stamp a sequence number into the payload and record it for replay.
+
+        Falls back to the unsequenced payload if recording fails; live
+        delivery must not depend on the ring buffer, and clients without a
+        usable last_seq simply reload the snapshot.
+        """
+        try:
+            if self._sequence_script is None:
+                self._sequence_script = r.register_script(_SEQUENCE_SCRIPT)
+            return await asyncio.wait_for(
+                self._sequence_script(
+                    keys=[self._seq_key(channel), self._stream_key(channel)],
+                    args=[
+                        data,
+                        settings.state_stream_maxlen,
+                        settings.state_stream_ttl_seconds,
+                    ],
+                ),
+                timeout=REDIS_OPERATION_TIMEOUT,
+            )
+        except Exception as e:
+            logger.debug(f"Failed to sequence message on {channel}: {e}")
+            return data
+
     async def _publish(self, channel: str, data: str) -> int:
-        """Publish to Redis with timeout protection."""
+        """Sequence and publish to Redis with timeout protection."""
         r = await self._get_redis()
+        data = await self._sequence(r, channel, data)
         return await asyncio.wait_for(
             r.publish(channel, data),
             timeout=REDIS_OPERATION_TIMEOUT,
         )
 
+    async def _emit(self, lab_id: str, message: dict, coalesce_key: str | None = None) -> int:
+        """Publish a message to the lab's channel, or queue it for coalescing.
+
+        Messages without a coalesce key flush the lab's pending batch first,
+        so subscribers still see events in the order they were emitted.
+
+        Returns:
+            Number of subscribers that received the message (0 if queued)
+        """
+        if coalesce_key is not None and self._coalesce_window > 0:
+            self._enqueue(lab_id, (message["type"], coalesce_key), message)
+            return 0
+        if lab_id in self._pending:
+            await self._flush(lab_id)
+        return await self._publish(self._channel_name(lab_id), json.dumps(message))
+
+    def _enqueue(self, lab_id: str, key: tuple[str, str], message: dict) -> None:
+        """Queue an update, replacing any pending update for the same node/link."""
+        pending = self._pending.setdefault(lab_id, {})
+        pending.pop(key, None)
+        pending[key] = message
+        record_state_broadcast_event(message["type"])
+        if lab_id not in self._flush_tasks:
+            self._flush_tasks[lab_id] = asyncio.create_task(self._flush_later(lab_id))
+
+    async def _flush_later(self, lab_id: str) -> None:
+        await asyncio.sleep(self._coalesce_window)
+        self._flush_tasks.pop(lab_id, None)
+        await self._flush(lab_id)
+
+    async def _flush(self, lab_id: str) -> None:
+        """Publish a lab's pending node/link updates as batched frames."""
+        task = self._flush_tasks.pop(lab_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        pending = self._pending.pop(lab_id, None)
+        if not pending:
+            return
+
+        channel = self._channel_name(lab_id)
+        for msg_type, batch_type, field in (
+            ("node_state", "node_states", "nodes"),
+            ("link_state", "link_states", "links"),
+        ):
+            messages = [m for (t, _), m in pending.items() if t == msg_type]
+            if not messages:
+                continue
+            if len(messages) == 1:
+                frame = messages[0]
+            else:
+                frame = {
+                    "type": batch_type,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "data": {field: [m["data"] for m in messages]},
+                }
+            try:
+                count = await self._publish(channel, json.dumps(frame))
+                logger.debug(
+                    f"Published {len(messages)} coalesced {msg_type} updates to {channel} "
+                    f"({count} subscribers)"
+                )
+                record_state_broadcast_frame(frame["type"])
+            except Exception as e:
+                logger.warning(f"Failed to publish coalesced {msg_type} updates for lab {lab_id}: {e}")
+                record_broadcast(frame["type"], False)
+
+    async def flush(self) -> None:
+        """Publish all pending coalesced updates immediately."""
+        for lab_id in list(self._pending):
+            await self._flush(lab_id)
+
+    async def current_seq(self, lab_id: str) -> int | None:
+        """Get the sequence number of the lab's most recent event.
+
+        Returns:
+            The last sequence number (0 if nothing was published yet), or
+            None if Redis could not be reached
+        """
+        try:
+            r = await self._get_redis()
+            value = await asyncio.wait_for(
+                r.get(self._seq_key(self._channel_name(lab_id))),
+                timeout=REDIS_OPERATION_TIMEOUT,
+            )
+            return int(value or 0)
+        except Exception as e:
+            logger.debug(f"Failed to read sequence for lab {lab_id}: {e}")
+            return None
+
+    async def replay(self, lab_id: str, last_seq: int) -> list[dict] | None:
+        """Get the events a client missed since last_seq.
+
+        Args:
+            lab_id: Lab identifier
+            last_seq: Highest sequence number the client has applied
+
+        Returns:
+            Parsed messages with seq > last_seq in sequence order, or None if
+            the gap can't be filled from the ring buffer and the client needs
+            a full snapshot
+        """
+        channel = self._channel_name(lab_id)
+        try:
+            r = await self._get_redis()
+            entries = await asyncio.wait_for(
+                r.xrange(self._stream_key(channel)),
+                timeout=REDIS_OPERATION_TIMEOUT,
+            )
+            if not entries:
+                current = int(await asyncio.wait_for(
+                    r.get(self._seq_key(channel)),
+                    timeout=REDIS_OPERATION_TIMEOUT,
+                ) or 0)
+                return [] if last_seq == current else None
+
+            oldest = int(entries[0][1]["seq"])
+            newest = int(entries[-1][1]["seq"])
+            if last_seq + 1 < oldest or last_seq > newest:
+                return None
+            return [
+                json.loads(fields["data"])
+                for _, fields in entries
+                if int(fields["seq"]) > last_seq
+            ]
+        except Exception as e:
+            logger.warning(f"Failed to replay events for lab {lab_id}: {e}")
+            return None
+
     async def publish_node_state(
         self,
         lab_id: str,
@@ -112,7 +308,8 @@ class StateBroadcaster:
             max_enforcement_attempts: Maximum enforcement attempts before giving up
 
         Returns:
-            Number of subscribers that received the message
+            Number of subscribers that received the message (0 when the
+            update is queued for coalescing)
         """
         try:
             # Auto-compute display_state if not provided
@@ -141,9 +338,8 @@ class StateBroadcaster:
                     "starting_started_at": starting_started_at,
                 },
             }
-            channel = self._channel_name(lab_id)
-            count = await self._publish(channel, json.dumps(message))
-            logger.debug(f"Published node state to {channel}: {node_name} -> {actual_state} ({count} subscribers)")
+            count = await self._emit(lab_id, message, coalesce_key=node_id)
+            logger.debug(f"Published node state for lab {lab_id}: {node_name} -> {actual_state} ({count} subscribers)")
             record_broadcast("node_state", True)
             return count
         except Exception as e:
@@ -184,7 +380,8 @@ class StateBroadcaster:
             error_message: Error message if any
 
         Returns:
-            Number of subscribers that received the message
+            Number of subscribers that received the message (0 when the
+            update is queued for coalescing)
         """
         try:
             message = {
@@ -210,9 +407,8 @@ class StateBroadcaster:
                     "target_vlan_tag": target_vlan_tag,
                 },
             }
-            channel = self._channel_name(lab_id)
-            count = await self._publish(channel, json.dumps(message))
-            logger.debug(f"Published link state to {channel}: {link_name} -> {actual_state}")
+            count = await self._emit(lab_id, message, coalesce_key=link_name)
+            logger.debug(f"Published link state for lab {lab_id}: {link_name} -> {actual_state}")
             record_broadcast("link_state", True)
             return count
         except Exception as e:
@@ -247,7 +443,7 @@ class StateBroadcaster:
                 },
             }
             channel = self._channel_name(lab_id)
-            count = await self._publish(channel, json.dumps(message))
+            count = await self._emit(lab_id, message)
             logger.debug(f"Published lab state to {channel}: {state}")
             record_broadcast("lab_state", True)
             return count
@@ -291,7 +487,7 @@ class StateBroadcaster:
                 },
             }
             channel = self._channel_name(lab_id)
-            count = await self._publish(channel, json.dumps(message))
+            count = await self._emit(lab_id, message)
             logger.debug(f"Published job progress to {channel}: {job_id} -> {status}")
             record_broadcast("job_progress", True)
             return count
@@ -319,7 +515,7 @@ class StateBroadcaster:
                 },
             }
             channel = self._channel_name(lab_id)
-            count = await self._publish(channel, json.dumps(message))
+            count = await self._emit(lab_id, message)
             logger.debug(f"Published test result to {channel}: {result.get('spec_name')}")
             record_broadcast("test_result", True)
             return count
@@ -361,7 +557,7 @@ class StateBroadcaster:
                 },
             }
             channel = self._channel_name(lab_id)
-            count = await self._publish(channel, json.dumps(message))
+            count = await self._emit(lab_id, message)
             logger.debug(f"Published scenario step to {channel}: step {step_index} -> {status}")
             record_broadcast("scenario_step", True)
             return count
@@ -370,51 +566,34 @@ class StateBroadcaster:
             record_broadcast("scenario_step", False)
             return 0
 
-    async def subscribe(self, lab_id: str) -> AsyncGenerator[dict, None]:
+    def subscribe(
+        self,
+        lab_id: str,
+        subscribed: asyncio.Event | None = None,
+    ) -> AsyncGenerator[dict, None]:
         """Subscribe to state updates for a lab.
 
-        This is an async generator that yields state change messages
-        as they are published to the lab's channel.
+        Returns an async generator that yields state change messages
+        as they are published to the lab's channel. All subscribers in
+        this process share one Redis pattern subscription through the
+        fan-out hub.
 
         Args:
             lab_id: Lab identifier to subscribe to
+            subscribed: Set once the Redis subscription is confirmed
 
         Yields:
             Parsed message dicts with type, timestamp, and data fields
-        """
-        redis = await self._get_redis()
-        pubsub = redis.pubsub()
-        channel = self._channel_name(lab_id)
 
-        try:
-            await pubsub.subscribe(channel)
-            logger.info(f"Subscribed to channel {channel}")
-
-            while True:
-                try:
-                    message = await pubsub.get_message(
-                        ignore_subscribe_messages=True,
-                        timeout=1.0,
-                    )
-                    if message is not None and message["type"] == "message":
-                        try:
-                            data = json.loads(message["data"])
-                            yield data
-                        except json.JSONDecodeError:
-                            logger.warning(f"Invalid JSON in message: {message['data']}")
-                except asyncio.CancelledError:
-                    logger.info(f"Subscription cancelled for {channel}")
-                    break
-                except Exception as e:
-                    logger.warning(f"Error receiving message from {channel}: {e}")
-                    await asyncio.sleep(0.1)
-        finally:
-            await pubsub.unsubscribe(channel)
-            await pubsub.close()
-            logger.info(f"Unsubscribed from channel {channel}")
+        Raises:
+            SlowSubscriberError: The consumer fell too far behind
+        """
+        return self._fanout.subscribe(lab_id, subscribed)
 
     async def close(self) -> None:
-        """Close the Redis connection."""
+        """Flush pending updates, stop the fan-out reader and close Redis."""
+        await self.flush()
+        await self._fanout.close()
         if self._redis:
             await self._redis.close()
             self._redis = None
@@ -428,7 +607,10 @@ def get_broadcaster() -> StateBroadcaster:
     """
     global _broadcaster
     if _broadcaster is None:
-        _broadcaster = StateBroadcaster(settings.redis_url)
+        _broadcaster = StateBroadcaster(
+            settings.redis_url,
+            coalesce_window=settings.state_broadcast_coalesce_ms / 1000,
+        )
     return _broadcaster
 
 
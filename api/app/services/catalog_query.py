@@ -529,6 +529,8 @@ def record_catalog_ingest_event(
     summary: str,
     payload: dict[str, Any],
 ) -> None:
+    from app.image_store.snapshot import mark_catalog_changed
+
     session.add(
         models.CatalogIngestEvent(
             id=str(uuid4()),
@@ -538,6 +540,9 @@ def record_catalog_ingest_event(
             payload_json=_json_dump(payload),
         )
     )
+    # Every catalog write records an ingest event; once it commits, other
+    # processes drop their catalog snapshots.
+    mark_catalog_changed(session)
 
 
 def apply_manifest_style_image_update(
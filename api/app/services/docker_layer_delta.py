@@ -0,0 +1,161 @@
+"""Layer-delta ``docker save`` archives for Docker image sync.
+
+A full ``docker save`` archive carries every layer of an image, even when
+the agent already holds most of them (cEOS 4.32.1F -> 4.32.2F shares nearly
+all of its layers). ``docker load`` only reads a layer from the archive when
+the layer's chain ID is missing from the daemon's layer store, so an archive
+that omits the layers the agent already has still loads.
+
+The sync flow is:
+
+1. The controller reads the layer diff IDs from the archive's config.
+2. The agent reports how many leading layers it already holds
+   (``POST /images/layers/missing``). Presence is decided per chain, so it
+   is always a prefix of the layer list.
+3. The controller streams a copy of the archive without those layers:
+   every other tar member (manifest, config, repositories, remaining
+   layers) is copied byte for byte from the cached archive.
+
+Archives that are not single-image ``docker save`` output raise ValueError
+and are synced whole.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import posixpath
+import tarfile
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+_BLOCK_SIZE = tarfile.BLOCKSIZE
+# Two zero blocks terminate a tar archive
+_END_OF_ARCHIVE = b"\0" * (2 * _BLOCK_SIZE)
+
+
+@dataclass
+class ArchiveLayers:
+    """Layer layout of a single-image ``docker save`` archive."""
+
+    path: Path
+    size: int
+    # Layer diff IDs from the image config, base layer first
+    diff_ids: list[str]
+    # Archive member holding each layer, in the same order
+    layer_members: list[str]
+
+
+@dataclass
+class LayerDelta:
+    """Byte spans of an archive that make up its layer-delta copy."""
+
+    layers: ArchiveLayers
+    present_layers: int
+    spans: list[tuple[int, int]]
+    size: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(0, self.layers.size - self.size)
+
+
+def _read_json(archive: tarfile.TarFile, name: str):
+    member = archive.extractfile(name)
+    if member is None:
+        raise ValueError(f"{name} is not a regular file")
+    with member:
+        return json.load(member)
+
+
+def read_archive_layers(path: Path) -> ArchiveLayers:
+    """Return the layer layout of ``path``; raises ValueError for other archives."""
+    try:
+        with tarfile.open(path, "r:") as archive:
+            manifest = _read_json(archive, "manifest.json")
+            if not isinstance(manifest, list) or len(manifest) != 1:
+                raise ValueError("expected exactly one image in manifest.json")
+            config = _read_json(archive, manifest[0]["Config"])
+            diff_ids = list(config["rootfs"]["diff_ids"])
+            layer_members = [posixpath.normpath(name) for name in manifest[0]["Layers"]]
+    except (OSError, tarfile.TarError, KeyError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"Not a docker save archive: {e}") from e
+    if len(diff_ids) != len(layer_members):
+        raise ValueError("Layer count in manifest.json does not match the image config")
+    return ArchiveLayers(
+        path=path,
+        size=path.stat().st_size,
+        diff_ids=diff_ids,
+        layer_members=layer_members,
+    )
+
+
+def plan_layer_delta(layers: ArchiveLayers, present_layers: int) -> LayerDelta:
+    """Plan a copy of the archive without its first ``present_layers`` layers."""
+    present_layers = max(0, min(present_layers, len(layers.diff_ids)))
+    kept_layers = set(layers.layer_members[present_layers:])
+    dropped = set(layers.layer_members[:present_layers]) - kept_layers
+
+    with tarfile.open(layers.path, "r:") as archive:
+        members = archive.getmembers()
+
+    # A kept member may link to a dropped layer file (repeated layers are
+    # saved once and linked); the link target has to travel too.
+    changed = True
+    while changed:
+        changed = False
+        for member in members:
+            name = posixpath.normpath(member.name)
+            if name in dropped or not (member.issym() or member.islnk()):
+                continue
+            target = member.linkname
+            if member.issym():
+                target = posixpath.join(posixpath.dirname(name), target)
+            target = posixpath.normpath(target)
+            if target in dropped:
+                dropped.discard(target)
+                changed = True
+
+    spans: list[tuple[int, int]] = []
+    for member in members:
+        if posixpath.normpath(member.name) in dropped:
+            continue
+        # From the first header (including pax/GNU long-name headers) to the
+        # end of the padded data
+        start = member.offset
+        end = member.offset_data + -(-member.size // _BLOCK_SIZE) * _BLOCK_SIZE
+        if spans and spans[-1][0] + spans[-1][1] == start:
+            spans[-1] = (spans[-1][0], end - spans[-1][0])
+        else:
+            spans.append((start, end - start))
+
+    size = sum(length for _, length in spans) + len(_END_OF_ARCHIVE)
+    return LayerDelta(layers=layers, present_layers=present_layers, spans=spans, size=size)
+
+
+def iter_layer_delta(delta: LayerDelta, chunk_size: int) -> Iterator[bytes]:
+    """Yield the bytes of the layer-delta archive."""
+    with delta.layers.path.open("rb") as f:
+        for offset, length in delta.spans:
+            f.seek(offset)
+            while length > 0:
+                chunk = f.read(min(chunk_size, length))
+                if not chunk:
+                    raise ValueError(f"{delta.layers.path} shrank while streaming")
+                length -= len(chunk)
+                yield chunk
+    yield _END_OF_ARCHIVE
+
+
+async def aiter_layer_delta(delta: LayerDelta, chunk_size: int) -> AsyncIterator[bytes]:
+    """Async variant of ``iter_layer_delta`` reading the archive off the event loop."""
+    chunks = iter_layer_delta(delta, chunk_size)
+    sentinel = object()
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, sentinel)
+            if chunk is sentinel:
+                return
+            yield chunk
+    finally:
+        chunks.close()
@@ -0,0 +1,276 @@
+"""Content-addressed cache of ``docker save`` archives for image distribution.
+
+Agents pulling a Docker image without a persisted archive used to trigger a
+fresh ``docker save`` per request, so syncing one image to ten agents ran ten
+saves against the controller's dockerd. Archives are now produced once per
+image content and shared:
+
+- The first request starts a producer that writes ``docker save`` output to
+  a partial file in the save cache and streams it from there while it grows.
+- Concurrent requests for the same image attach to the running producer and
+  tail the same partial file.
+- Once complete, the archive is renamed into place and later requests are
+  served from disk with an exact ``Content-Length`` and an ``ETag``.
+
+Entries are keyed by the Docker image ID plus the reference, since
+``docker save`` records the requested tag in the archive. The cache is
+trimmed least-recently-used first to ``settings.image_save_cache_max_bytes``;
+serving an entry refreshes its mtime.
+
+Producers are tracked per process. Processes sharing the cache directory
+may produce the same archive concurrently; each writes its own partial file
+and the atomic rename keeps the final entry consistent.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from uuid import uuid4
+
+from app.config import settings
+from app.image_store import ensure_docker_save_cache_root
+
+logger = logging.getLogger(__name__)
+
+# How often a reader that caught up with its producer checks for more data
+_TAIL_POLL_SECONDS = 0.05
+# Partial files older than this with no live producer are left over from a crash
+_STALE_PARTIAL_SECONDS = 3600
+
+
+@dataclass
+class CachedArchive:
+    """A complete archive in the save cache."""
+
+    key: str
+    path: Path
+    size: int
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key}"'
+
+
+@dataclass
+class _Production:
+    key: str
+    reference: str
+    partial_path: Path
+    written: int = 0
+    done: bool = False
+    error: str | None = None
+    archive: CachedArchive | None = None
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+
+_productions: dict[str, _Production] = {}
+
+
+def _archive_path(key: str) -> Path:
+    return ensure_docker_save_cache_root() / f"{key}.tar"
+
+
+async def docker_save_cache_key(reference: str) -> str | None:
+    """Return the cache key for ``reference``, or None if Docker does not know it."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "docker", "image", "inspect", "--format", "{{.Id}}", reference,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=30)
+    except Exception as e:
+        logger.warning(f"Could not inspect {reference} for the save cache: {e}")
+        return None
+    image_id = stdout.decode().strip() if stdout else ""
+    if proc.returncode != 0 or not image_id:
+        return None
+    return hashlib.sha256(f"{image_id}\n{reference}".encode()).hexdigest()
+
+
+def get_cached_archive(key: str) -> CachedArchive | None:
+    """Return the complete archive for ``key`` and mark it recently used."""
+    path = _archive_path(key)
+    try:
+        size = path.stat().st_size
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return CachedArchive(key=key, path=path, size=size)
+
+
+def _start_production(key: str, reference: str) -> _Production:
+    production = _productions.get(key)
+    if production is not None:
+        return production
+    partial_path = ensure_docker_save_cache_root() / f"{key}.{os.getpid()}.{uuid4().hex[:8]}.partial"
+    # Create the file before any reader tries to open it
+    partial_path.touch()
+    production = _Production(key=key, reference=reference, partial_path=partial_path)
+    _productions[key] = production
+    production.task = asyncio.create_task(_produce(production))
+    return production
+
+
+async def _produce(production: _Production) -> None:
+    proc = None
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "docker", "save", production.reference,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        # Unbuffered so tailing readers see every chunk as soon as it is written
+        with open(production.partial_path, "wb", buffering=0) as out:
+            while True:
+                chunk = await proc.stdout.read(settings.image_sync_chunk_size)
+                if not chunk:
+                    break
+                await asyncio.to_thread(out.write, chunk)
+                production.written += len(chunk)
+        _, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise ValueError(stderr.decode() if stderr else "docker save failed")
+
+        path = _archive_path(production.key)
+        os.replace(production.partial_path, path)
+        production.archive = CachedArchive(key=production.key, path=path, size=production.written)
+    except BaseException as e:
+        production.error = str(e) or type(e).__name__
+        logger.error(f"docker save of {production.reference} for the save cache failed: {production.error}")
+        if proc is not None and proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        try:
+            production.partial_path.unlink()
+        except OSError:
+            pass
+        if isinstance(e, asyncio.CancelledError):
+            raise
+    finally:
+        production.done = True
+        _productions.pop(production.key, None)
+        if production.archive is not None:
+            live_partials = _live_partials()
+            try:
+                await asyncio.to_thread(
+                    _evict,
+                    settings.image_save_cache_max_bytes,
+                    production.key,
+                    live_partials,
+                )
+            except OSError as e:
+                logger.warning(f"docker save cache eviction failed: {e}")
+
+
+async def stream_docker_archive(
+    reference: str,
+    key: str,
+    chunk_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """Stream the archive for ``reference`` while it is being produced.
+
+    Starts a producer unless one is already running for ``key``. The stream
+    ends early, after logging, if ``docker save`` fails.
+    """
+    chunk_size = chunk_size or settings.image_sync_chunk_size
+    production = _start_production(key, reference)
+    # Opened before yielding control: the producer may rename or unlink the
+    # partial file at any await point, and the open handle stays valid.
+    # Reads go through a worker thread so a slow disk never stalls the loop.
+    try:
+        f = open(production.partial_path, "rb")
+    except FileNotFoundError:
+        f = open(production.archive.path, "rb") if production.archive else None
+    if f is None:
+        logger.error(f"Error streaming image {reference}: {production.error or 'docker save failed'}")
+        return
+    with f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if chunk:
+                yield chunk
+                continue
+            if production.done:
+                # Drain whatever landed between the last read and completion
+                while chunk := await asyncio.to_thread(f.read, chunk_size):
+                    yield chunk
+                if production.error:
+                    logger.error(f"Error streaming image {reference}: {production.error}")
+                return
+            await asyncio.sleep(_TAIL_POLL_SECONDS)
+
+
+async def materialize_docker_archive(reference: str) -> CachedArchive:
+    """Return a complete cached archive for ``reference``, producing it if needed.
+
+    Raises ValueError if the image is unknown to Docker or the save fails.
+    """
+    key = await docker_save_cache_key(reference)
+    if key is None:
+        raise ValueError(f"Docker image not found: {reference}")
+    archive = get_cached_archive(key)
+    if archive is not None:
+        return archive
+    production = _start_production(key, reference)
+    # Shielded: a cancelled waiter must not abort a save other readers share
+    await asyncio.shield(production.task)
+    if production.archive is None:
+        raise ValueError(production.error or "docker save failed")
+    return production.archive
+
+
+def evict_docker_save_cache(max_bytes: int | None = None, *, keep: str | None = None) -> int:
+    """Delete least-recently-used archives until the cache fits ``max_bytes``.
+
+    ``keep`` names an entry that must survive this pass (the one just
+    produced). Open readers are unaffected by deletion. Returns the number
+    of files removed.
+    """
+    budget = settings.image_save_cache_max_bytes if max_bytes is None else max_bytes
+    return _evict(budget, keep, _live_partials())
+
+
+def _live_partials() -> set[str]:
+    return {p.partial_path.name for p in _productions.values()}
+
+
+def _evict(budget: int, keep: str | None, live_partials: set[str]) -> int:
+    """Filesystem half of ``evict_docker_save_cache``; safe to run in a worker thread."""
+    root = ensure_docker_save_cache_root()
+    now = time.time()
+    entries: list[tuple[float, int, Path]] = []
+    total = 0
+    removed = 0
+    for path in root.iterdir():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.suffix == ".partial":
+            if path.name not in live_partials and now - stat.st_mtime > _STALE_PARTIAL_SECONDS:
+                path.unlink(missing_ok=True)
+                removed += 1
+            continue
+        if path.suffix != ".tar":
+            continue
+        total += stat.st_size
+        if path.stem != keep:
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    for _mtime, size, path in sorted(entries):
+        if total <= budget:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+        logger.info(f"Evicted {path.name} from the docker save cache")
+    return removed
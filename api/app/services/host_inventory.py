@@ -0,0 +1,249 @@
+"""Normalized per-host container/VM inventory fed by agent heartbeats.
+
+Agents used to post every container and VM detail on each heartbeat and the
+controller stored the lot as one JSON blob per host, which dashboards then
+re-parsed per request. With the delta heartbeat protocol:
+
+- ``Host.resource_usage`` holds only scalar gauges plus aggregates computed
+  here (counts, allocated vCPU/memory), so it stays small.
+- Container/VM entries live in ``host_resource_entries`` and are updated
+  from the agent's upsert/remove lists.
+- ``Host.resource_seq`` tracks the last applied delta. A delta whose
+  ``base_seq`` does not match is rejected and the agent resends a full
+  snapshot on its next heartbeat.
+
+Hosts whose ``resource_seq`` is NULL have never been normalized (pre-upgrade
+rows); readers fall back to the details embedded in their legacy blob.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import case, delete, func
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+# Entry kind -> key used in the heartbeat resource_usage payload
+DETAIL_KEYS = {"container": "container_details", "vm": "vm_details"}
+# Entry kind -> prefix used in resource_delta upsert/removed lists
+DELTA_PREFIXES = {"container": "containers", "vm": "vms"}
+
+
+def _entry_columns(kind: str, detail: dict) -> dict[str, Any]:
+    return {
+        "status": str(detail.get("status") or ""),
+        "lab_prefix": detail.get("lab_prefix") or None,
+        "is_system": bool(detail.get("is_system", False)),
+        "vcpus": float(detail.get("vcpus") or 0),
+        "memory_mb": int(detail.get("memory_mb") or 0),
+        "details": json.dumps(detail),
+    }
+
+
+def _replace_entries(session: Session, host_id: str, resource_usage: dict) -> None:
+    """Replace all entries for a host with a full snapshot."""
+    # Core DELETE executes immediately, so re-inserting the same
+    # (host_id, kind, name) keys below cannot trip the unique constraint.
+    session.execute(
+        delete(models.HostResourceEntry).where(models.HostResourceEntry.host_id == host_id)
+    )
+    for kind, key in DETAIL_KEYS.items():
+        seen: set[str] = set()
+        for detail in resource_usage.get(key) or []:
+            name = detail.get("name")
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            session.add(models.HostResourceEntry(
+                host_id=host_id, kind=kind, name=name, **_entry_columns(kind, detail),
+            ))
+
+
+def _apply_delta(session: Session, host_id: str, delta: dict) -> None:
+    """Apply upsert/removed lists from a delta heartbeat."""
+    for kind, prefix in DELTA_PREFIXES.items():
+        upserts = {d.get("name"): d for d in delta.get(f"{prefix}_upsert") or [] if d.get("name")}
+        removed = [n for n in delta.get(f"{prefix}_removed") or [] if n not in upserts]
+
+        if removed:
+            session.execute(
+                delete(models.HostResourceEntry).where(
+                    models.HostResourceEntry.host_id == host_id,
+                    models.HostResourceEntry.kind == kind,
+                    models.HostResourceEntry.name.in_(removed),
+                )
+            )
+        if not upserts:
+            continue
+
+        existing = {
+            entry.name: entry
+            for entry in session.query(models.HostResourceEntry).filter(
+                models.HostResourceEntry.host_id == host_id,
+                models.HostResourceEntry.kind == kind,
+                models.HostResourceEntry.name.in_(list(upserts)),
+            )
+        }
+        for name, detail in upserts.items():
+            columns = _entry_columns(kind, detail)
+            entry = existing.get(name)
+            if entry is None:
+                session.add(models.HostResourceEntry(host_id=host_id, kind=kind, name=name, **columns))
+            else:
+                for attr, value in columns.items():
+                    setattr(entry, attr, value)
+
+
+def _aggregate(session: Session, host_id: str) -> dict[str, Any]:
+    """Compute per-host totals from the normalized entries (one query)."""
+    entry = models.HostResourceEntry
+    is_running = entry.status == "running"
+    allocatable = is_running & entry.is_system.is_(False)
+    rows = (
+        session.query(
+            entry.kind,
+            func.count(entry.id),
+            func.sum(case((is_running, 1), else_=0)),
+            func.sum(case((allocatable, entry.vcpus), else_=0)),
+            func.sum(case((allocatable, entry.memory_mb), else_=0)),
+        )
+        .filter(entry.host_id == host_id)
+        .group_by(entry.kind)
+        .all()
+    )
+    totals = {
+        "containers_total": 0,
+        "containers_running": 0,
+        "vms_total": 0,
+        "vms_running": 0,
+        "allocated_vcpus": 0.0,
+        "allocated_memory_mb": 0,
+    }
+    for kind, total, running, vcpus, memory_mb in rows:
+        prefix = DELTA_PREFIXES.get(kind)
+        if prefix is None:
+            continue
+        totals[f"{prefix}_total"] = int(total or 0)
+        totals[f"{prefix}_running"] = int(running or 0)
+        totals["allocated_vcpus"] += float(vcpus or 0)
+        totals["allocated_memory_mb"] += int(memory_mb or 0)
+    return totals
+
+
+def apply_heartbeat_usage(
+    session: Session,
+    host: models.Host,
+    resource_usage: dict,
+    resource_delta: dict | None,
+) -> int | None:
+    """Store heartbeat gauges and apply container/VM details for a host.
+
+    Returns the sequence to acknowledge to the agent, or None when the agent
+    must resend a full snapshot (or speaks the legacy protocol).
+    """
+    gauges = {k: v for k, v in resource_usage.items() if k not in DETAIL_KEYS.values()}
+    ack: int | None = None
+
+    if resource_delta is None:
+        # Legacy agent: full details on every heartbeat
+        _replace_entries(session, host.id, resource_usage)
+        host.resource_seq = 0
+    elif resource_delta.get("full"):
+        _replace_entries(session, host.id, resource_usage)
+        host.resource_seq = ack = int(resource_delta.get("seq") or 0)
+    elif host.resource_seq is not None and resource_delta.get("base_seq") == host.resource_seq:
+        _apply_delta(session, host.id, resource_delta)
+        host.resource_seq = ack = int(resource_delta.get("seq") or 0)
+    else:
+        logger.info(
+            f"Heartbeat delta base {resource_delta.get('base_seq')} does not match "
+            f"stored seq {host.resource_seq} for agent {host.id}; requesting full snapshot"
+        )
+        previous = host.get_resource_usage()
+        # Keep the last known aggregates until the full snapshot arrives
+        for key in ("containers_total", "containers_running", "vms_total", "vms_running",
+                    "allocated_vcpus", "allocated_memory_mb"):
+            if key in previous:
+                gauges[key] = previous[key]
+        host.resource_usage = json.dumps(gauges)
+        return None
+
+    session.flush()
+    gauges.update(_aggregate(session, host.id))
+    host.resource_usage = json.dumps(gauges)
+    return ack
+
+
+def get_host_details(
+    session: Session,
+    hosts: Iterable[models.Host],
+) -> dict[str, dict[str, list[dict]]]:
+    """Return {host_id: {"container_details": [...], "vm_details": [...]}}.
+
+    Normalized hosts are served with a single query; legacy hosts fall back
+    to the details embedded in their resource_usage blob.
+    """
+    hosts = list(hosts)
+    result: dict[str, dict[str, list[dict]]] = {
+        host.id: {key: [] for key in DETAIL_KEYS.values()} for host in hosts
+    }
+    normalized_ids = [host.id for host in hosts if host.resource_seq is not None]
+    for host in hosts:
+        if host.resource_seq is None:
+            usage = host.get_resource_usage()
+            for key in DETAIL_KEYS.values():
+                result[host.id][key] = list(usage.get(key, []) or [])
+
+    if normalized_ids:
+        entries = (
+            session.query(models.HostResourceEntry.host_id, models.HostResourceEntry.kind,
+                          models.HostResourceEntry.details)
+            .filter(models.HostResourceEntry.host_id.in_(normalized_ids))
+            .order_by(models.HostResourceEntry.host_id, models.HostResourceEntry.name)
+            .all()
+        )
+        for host_id, kind, details in entries:
+            key = DETAIL_KEYS.get(kind)
+            if key is None:
+                continue
+            try:
+                result[host_id][key].append(json.loads(details) if details else {})
+            except (json.JSONDecodeError, TypeError):
+                continue
+    return result
+
+
+def get_running_lab_prefixes(session: Session, hosts: Iterable[models.Host]) -> set[str]:
+    """Return lab prefixes with at least one running, non-system container."""
+    hosts = list(hosts)
+    prefixes: set[str] = set()
+    normalized_ids = [host.id for host in hosts if host.resource_seq is not None]
+    if normalized_ids:
+        entry = models.HostResourceEntry
+        rows = (
+            session.query(entry.lab_prefix)
+            .filter(
+                entry.host_id.in_(normalized_ids),
+                entry.kind == "container",
+                entry.status == "running",
+                entry.is_system.is_(False),
+                entry.lab_prefix.isnot(None),
+            )
+            .distinct()
+            .all()
+        )
+        prefixes.update(row[0] for row in rows)
+    for host in hosts:
+        if host.resource_seq is not None:
+            continue
+        for container in host.get_resource_usage().get("container_details", []):
+            if container.get("status") == "running" and not container.get("is_system"):
+                if container.get("lab_prefix"):
+                    prefixes.add(container["lab_prefix"])
+    return prefixes
@@ -0,0 +1,159 @@
+"""Source tracker for peer-to-peer image distribution.
+
+Every sync used to stream its image from the controller, so syncing one
+image to N agents cost N controller uploads and total sync time grew
+linearly with the agent count. Agents that already hold an image
+(``ImageHost.status == "synced"``) and advertise the ``image_seed``
+capability can serve it to other agents from ``GET /images/seed``.
+
+Before a sync transfers anything, the controller assigns its source:
+
+- the least busy online peer that holds the image and has a free upload
+  slot;
+- otherwise the controller, if it has a free slot for the image;
+- otherwise the job waits for a slot, and falls back to the controller
+  after ``image_seed_source_wait`` seconds.
+
+Every source serves at most ``image_seed_max_uploads_per_source``
+transfers at a time and every finished agent becomes a source, so the
+number of holders multiplies each round and distribution fans out as a
+tree: total sync time grows roughly with the logarithm of the agent count.
+
+The assignment is stored in ``ImageSyncJob.source`` (a host ID or
+``"controller"``); the active jobs holding a source are the slot ledger.
+Picking and committing a source never awaits, so concurrent sync tasks
+on the event loop cannot claim the same slot.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.utils.db import release_db_transaction_for_io
+
+logger = logging.getLogger(__name__)
+
+CONTROLLER_SOURCE = "controller"
+# Capability feature agents advertise when they serve GET /images/seed
+SEED_FEATURE = "image_seed"
+# Job statuses that occupy their source's upload slot
+_UPLOADING_STATUSES = ("transferring", "loading")
+# How often a job waiting for a free source checks again
+_SOURCE_POLL_SECONDS = 2.0
+
+
+def _can_seed(host: models.Host) -> bool:
+    features = host.get_capabilities().get("features") or []
+    return SEED_FEATURE in features
+
+
+def _uploads_by_source(session: Session, image_id: str) -> Counter[str]:
+    """Return active uploads per source.
+
+    Peers count uploads of every image, since their slots are shared; the
+    controller counts only this image so unrelated images sync in parallel.
+    """
+    rows = (
+        session.query(models.ImageSyncJob.source, models.ImageSyncJob.image_id, func.count())
+        .filter(
+            models.ImageSyncJob.source.isnot(None),
+            models.ImageSyncJob.status.in_(_UPLOADING_STATUSES),
+        )
+        .group_by(models.ImageSyncJob.source, models.ImageSyncJob.image_id)
+        .all()
+    )
+    uploads: Counter[str] = Counter()
+    for source, job_image_id, count in rows:
+        if source != CONTROLLER_SOURCE or job_image_id == image_id:
+            uploads[source] += count
+    return uploads
+
+
+def pick_image_source(session: Session, image_id: str, target_host_id: str) -> str | None:
+    """Return the source for a new transfer of ``image_id``, or None if all are busy.
+
+    The result is a peer host ID or ``CONTROLLER_SOURCE``.
+    """
+    limit = max(1, settings.image_seed_max_uploads_per_source)
+    uploads = _uploads_by_source(session, image_id)
+
+    holders = (
+        session.query(models.Host)
+        .join(models.ImageHost, models.ImageHost.host_id == models.Host.id)
+        .filter(
+            models.ImageHost.image_id == image_id,
+            models.ImageHost.status == "synced",
+            models.Host.status == "online",
+            models.Host.id != target_host_id,
+        )
+        .all()
+    )
+    peers = [h for h in holders if _can_seed(h) and uploads[h.id] < limit]
+    if peers:
+        return min(peers, key=lambda h: (uploads[h.id], h.id)).id
+    if uploads[CONTROLLER_SOURCE] < limit:
+        return CONTROLLER_SOURCE
+    return None
+
+
+def _assign(session: Session, job: models.ImageSyncJob, source: str) -> None:
+    job.source = source
+    # The transfer starts now; time spent waiting for a source is not
+    # counted against the sync timeout
+    job.started_at = datetime.now(timezone.utc)
+    session.commit()
+
+
+def assign_controller_source(session: Session, job: models.ImageSyncJob) -> None:
+    """Record that the controller serves ``job``, without waiting for a slot."""
+    _assign(session, job, CONTROLLER_SOURCE)
+
+
+async def assign_image_source(
+    session: Session,
+    job: models.ImageSyncJob,
+    target_host_id: str,
+) -> models.Host | None:
+    """Assign a source to ``job``, waiting for a free slot if needed.
+
+    Returns the peer host to pull from, or None when the controller serves
+    the job (seeding disabled, no free peer before the wait ran out).
+    """
+    if not settings.image_seed_enabled:
+        assign_controller_source(session, job)
+        return None
+
+    deadline = time.monotonic() + settings.image_seed_source_wait
+    while True:
+        source = pick_image_source(session, job.image_id, target_host_id)
+        if source is None and time.monotonic() >= deadline:
+            logger.info(f"No free image source for sync job {job.id}; using the controller")
+            source = CONTROLLER_SOURCE
+        if source is not None:
+            _assign(session, job, source)
+            if source == CONTROLLER_SOURCE:
+                return None
+            return session.get(models.Host, source)
+        # Don't hold a transaction and pooled connection while waiting;
+        # the next pick then also sees jobs other tasks finished meanwhile
+        release_db_transaction_for_io(
+            session,
+            context=f"image source wait for sync job {job.id}",
+            table="image_sync_jobs",
+            job_id=job.id,
+        )
+        await asyncio.sleep(_SOURCE_POLL_SECONDS)
+
+
+def seed_url(host: models.Host, reference: str) -> str:
+    """Return the URL a pulling agent downloads ``reference`` from on ``host``."""
+    return f"http://{host.address}/images/seed?reference={quote(reference, safe='')}"
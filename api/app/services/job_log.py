@@ -0,0 +1,110 @@
+"""Byte-range reads over the append-only job log chunk store.
+
+Job runners still assign the whole log to ``Job.log_path``; the model layer
+turns each assignment into ``JobLogChunk`` rows keyed by UTF-8 byte offset
+(see ``app.models.job``) and leaves the ``jobs.log_path`` column NULL, so
+each log is stored once. Readers here only touch the chunks at or after the
+requested offset, so polling or tailing a long multi-host deploy costs
+O(new bytes) instead of reloading and re-splitting the whole log.
+
+Offsets are positions in the job's chunk stream, not in the current log
+text. ``Job.log_base`` marks where the current log starts; when a writer
+replaces the log rather than extending it, the base moves forward and a
+reader whose offset predates it gets the new content with ``reset`` set.
+
+Jobs written before chunking existed have ``log_size == 0``; their
+``log_path`` is served as a single range starting at offset 0.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils.logs import get_log_content
+
+# Largest range returned by a single read
+JOB_LOG_READ_LIMIT = 1024 * 1024
+
+
+@dataclass
+class JobLogRange:
+    """A slice of a job log plus the cursor to continue from."""
+
+    content: str
+    offset: int
+    next_offset: int
+    size: int
+    reset: bool = False
+
+
+def _trim_to_char_boundary(data: bytes, limit: int) -> bytes:
+    """Cut ``data`` to at most ``limit`` bytes without splitting a UTF-8 character."""
+    if len(data) <= limit:
+        return data
+    cut = limit
+    while cut > 0 and (data[cut] & 0xC0) == 0x80:
+        cut -= 1
+    return data[:cut]
+
+
+def _read_legacy(job: models.Job, offset: int, limit: int) -> JobLogRange:
+    data = (get_log_content(job.log_path) or "").encode("utf-8")
+    start = min(offset, len(data))
+    view = _trim_to_char_boundary(data[start:], limit)
+    return JobLogRange(
+        content=view.decode("utf-8", errors="replace"),
+        offset=start,
+        next_offset=start + len(view),
+        size=len(data),
+        reset=offset > len(data),
+    )
+
+
+def read_job_log(
+    session: Session,
+    job: models.Job,
+    offset: int = 0,
+    limit: int = JOB_LOG_READ_LIMIT,
+) -> JobLogRange:
+    """Read up to ``limit`` bytes of a job's log starting at ``offset``.
+
+    Only loads ``job.log_path`` for jobs that predate chunked storage, so
+    callers can fetch the job with that column deferred.
+    """
+    size = job.log_size or 0
+    if not size:
+        return _read_legacy(job, offset, limit)
+
+    base = job.log_base or 0
+    reset = offset < base or offset > size
+    start = base if reset else offset
+    if start >= size:
+        return JobLogRange(content="", offset=size, next_offset=size, size=size, reset=reset)
+
+    chunk = models.JobLogChunk
+    floor = session.execute(
+        select(func.max(chunk.offset)).where(chunk.job_id == job.id, chunk.offset <= start)
+    ).scalar()
+    if floor is None:
+        floor = base
+    rows = session.execute(
+        select(chunk.content)
+        .where(
+            chunk.job_id == job.id,
+            chunk.offset >= floor,
+            chunk.offset < min(size, start + limit),
+        )
+        .order_by(chunk.offset)
+    ).scalars()
+    data = b"".join(content.encode("utf-8") for content in rows)
+    view = _trim_to_char_boundary(data[start - floor:], min(limit, size - start))
+    return JobLogRange(
+        content=view.decode("utf-8", errors="replace"),
+        offset=start,
+        next_offset=start + len(view),
+        size=size,
+        reset=reset,
+    )
@@ -0,0 +1,169 @@
+"""Database-side queries over parsed job log entries.
+
+Job log lines are parsed once, when they are appended, into
+``job_log_entries`` rows (see ``app.models.job``). The lab logs view filters,
+searches and pages over those rows in SQL instead of re-parsing every job log
+on each request.
+
+Pages are ordered oldest first by ``(timestamp, job_id, seq)`` and continue
+from an opaque keyset cursor, so the cost of a page does not grow with the
+number of jobs in the lab.
+"""
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.log_parser import LEVEL_PRIORITY
+
+# Legacy (pre-index) jobs converted per request, newest first
+BACKFILL_BATCH = 50
+
+
+@dataclass
+class LabLogPage:
+    """One page of indexed log entries plus pagination metadata."""
+
+    entries: list[models.JobLogEntry]
+    total_count: int
+    has_more: bool
+    next_cursor: str | None
+
+
+def encode_cursor(entry: models.JobLogEntry) -> str:
+    raw = f"{entry.timestamp.isoformat()}|{entry.job_id}|{entry.seq}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str, int]:
+    """Decode a cursor from ``encode_cursor``; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        timestamp, job_id, seq = raw.rsplit("|", 2)
+        return datetime.fromisoformat(timestamp), job_id, int(seq)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def backfill_legacy_job_logs(session: Session, lab_id: str) -> int:
+    """Index the newest inline job logs written before entries existed.
+
+    Re-assigning ``log_path`` makes the model layer chunk and parse the
+    whole log once; afterwards the job is served from the index.
+    """
+    jobs = (
+        session.query(models.Job)
+        .filter(
+            models.Job.lab_id == lab_id,
+            models.Job.log_size == 0,
+            models.Job.log_path.isnot(None),
+            models.Job.log_path != "",
+            ~models.Job.log_path.startswith("/"),
+        )
+        .order_by(models.Job.created_at.desc())
+        .limit(BACKFILL_BATCH)
+        .all()
+    )
+    for job in jobs:
+        job.log_path = job.log_path
+    if jobs:
+        session.commit()
+    return len(jobs)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def query_lab_log_entries(
+    session: Session,
+    lab_id: str,
+    *,
+    job_id: str | None = None,
+    host_id: str | None = None,
+    level: str | None = None,
+    since: datetime | None = None,
+    search: str | None = None,
+    cursor: str | None = None,
+    limit: int = 500,
+) -> LabLogPage:
+    """Return one page of a lab's log entries matching the filters.
+
+    ``host_id`` matches an entry's host id or name; entries without a host
+    id match through the agent that ran their job.
+    """
+    entry = models.JobLogEntry
+    filters = [entry.lab_id == lab_id]
+    if job_id:
+        filters.append(entry.job_id == job_id)
+    if since:
+        filters.append(entry.timestamp >= since)
+    if level:
+        filters.append(entry.level_rank >= LEVEL_PRIORITY.get(level.lower(), 0))
+    if search:
+        filters.append(entry.message.ilike(f"%{_escape_like(search)}%", escape="\\"))
+    if host_id:
+        agent_jobs = (
+            select(models.Job.id)
+            .join(models.Host, models.Host.id == models.Job.agent_id)
+            .where(
+                models.Job.lab_id == lab_id,
+                or_(models.Host.id == host_id, models.Host.name == host_id),
+            )
+        )
+        filters.append(or_(
+            entry.host_id == host_id,
+            entry.host_name == host_id,
+            and_(entry.host_id.is_(None), entry.job_id.in_(agent_jobs)),
+        ))
+
+    total_count = session.execute(
+        select(func.count()).select_from(entry).where(*filters)
+    ).scalar_one()
+
+    if cursor:
+        after_ts, after_job, after_seq = decode_cursor(cursor)
+        filters.append(or_(
+            entry.timestamp > after_ts,
+            and_(
+                entry.timestamp == after_ts,
+                or_(
+                    entry.job_id > after_job,
+                    and_(entry.job_id == after_job, entry.seq > after_seq),
+                ),
+            ),
+        ))
+
+    rows = list(
+        session.execute(
+            select(entry)
+            .where(*filters)
+            .order_by(entry.timestamp, entry.job_id, entry.seq)
+            .limit(limit + 1)
+        ).scalars()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return LabLogPage(
+        entries=rows,
+        total_count=total_count,
+        has_more=has_more,
+        next_cursor=encode_cursor(rows[-1]) if has_more and rows else None,
+    )
+
+
+def lab_log_host_names(session: Session, lab_id: str) -> set[str]:
+    """Distinct host names seen in a lab's indexed log entries."""
+    entry = models.JobLogEntry
+    return set(
+        session.execute(
+            select(entry.host_name)
+            .where(entry.lab_id == lab_id, entry.host_name.isnot(None))
+            .distinct()
+        ).scalars()
+    )
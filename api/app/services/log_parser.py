@@ -2,8 +2,10 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Literal
+from typing import Literal, NamedTuple
 
 from pydantic import BaseModel
 
@@ -31,6 +33,29 @@ LEVEL_PATTERNS = [
     (re.compile(r"level=warn", re.IGNORECASE), "warning"),
     (re.compile(r"level=info", re.IGNORECASE), "info"),
 ]
+# Severity ordering used by the "minimum level" filter
+LEVEL_PRIORITY = {"info": 0, "success": 1, "warning": 2, "error": 3}
+
+
+class ParsedLine(NamedTuple):
+    """One log line parsed into entry fields."""
+
+    index: int
+    timestamp: datetime
+    level: str
+    message: str
+    host_id: str | None
+    host_name: str | None
+
+
+@dataclass
+class LogParseState:
+    """Parser position carried across incremental appends to one job log."""
+
+    host_name: str | None = None
+    host_id: str | None = None
+    line_index: int = 0
+    hosts: set[str] = field(default_factory=set)
 
 
 def extract_level(line: str) -> Literal["info", "success", "warning", "error"]:
@@ -55,39 +80,18 @@ def extract_timestamp(line: str) -> datetime | None:
     return None
 
 
-def parse_job_log(
+def parse_log_lines(
     log_content: str,
-    job_id: str | None = None,
-    job_created_at: datetime | None = None,
-) -> ParsedLogs:
-    """Parse job log content into structured entries.
-
-    Job logs may contain host sections in the format:
-        === Host: agent-name (agent-id) ===
-
-    Each section's lines are associated with that host until the next section.
-
-    Args:
-        log_content: Raw log text content
-        job_id: Optional job ID to include in entries
-        job_created_at: Fallback timestamp if lines don't have timestamps
-
-    Returns:
-        ParsedLogs with entries and list of hosts found
+    state: LogParseState,
+    base_timestamp: datetime,
+) -> Iterator[ParsedLine]:
+    """Parse log lines, continuing from (and updating) ``state``.
+
+    Host section headers update the current host but produce no entry.
+    Lines without a timestamp get ``base_timestamp`` offset by their index
+    so they keep their relative order.
     """
-    if not log_content:
-        return ParsedLogs(entries=[], hosts=[])
-
-    entries: list[LabLogEntry] = []
-    hosts_found: set[str] = set()
-    current_host_name: str | None = None
-    current_host_id: str | None = None
-    base_timestamp = job_created_at or datetime.now(timezone.utc)
-    line_index = 0
-
-    lines = log_content.split("\n")
-
-    for line in lines:
+    for line in log_content.split("\n"):
         line = line.rstrip()
         if not line:
             continue
@@ -95,17 +99,17 @@ def parse_job_log(
         # Check for host section header (=== Host: name (id) ===)
         host_match = HOST_SECTION_PATTERN.match(line)
         if host_match:
-            current_host_name = host_match.group(1).strip()
-            current_host_id = host_match.group(2) if host_match.group(2) else None
-            hosts_found.add(current_host_name)
+            state.host_name = host_match.group(1).strip()
+            state.host_id = host_match.group(2) if host_match.group(2) else None
+            state.hosts.add(state.host_name)
             continue
 
         # Check for agent line (Agent: id (name))
         agent_match = AGENT_LINE_PATTERN.match(line)
         if agent_match:
-            current_host_id = agent_match.group(1).strip()
-            current_host_name = agent_match.group(2).strip()
-            hosts_found.add(current_host_name)
+            state.host_id = agent_match.group(1).strip()
+            state.host_name = agent_match.group(2).strip()
+            state.hosts.add(state.host_name)
             # Don't continue - still add as log entry
 
         # Parse as log entry
@@ -113,31 +117,65 @@ def parse_job_log(
         if not timestamp:
             # Use base timestamp with offset for ordering
             timestamp = base_timestamp.replace(
-                microsecond=min(line_index * 1000, 999999)
+                microsecond=min(state.line_index * 1000, 999999)
             )
 
-        level = extract_level(line)
-
         # Clean up the message (remove timestamp prefix if present)
         message = line
         ts_match = TIMESTAMP_PATTERN.match(line)
         if ts_match:
             message = line[len(ts_match.group(0)) :].lstrip(" -:")
 
-        entries.append(
-            LabLogEntry(
-                timestamp=timestamp,
-                level=level,
-                message=message,
-                host_id=current_host_id,
-                host_name=current_host_name,
-                job_id=job_id,
-                source="job",
-            )
+        yield ParsedLine(
+            index=state.line_index,
+            timestamp=timestamp,
+            level=extract_level(line),
+            message=message,
+            host_id=state.host_id,
+            host_name=state.host_name,
         )
-        line_index += 1
+        state.line_index += 1
+
+
+def parse_job_log(
+    log_content: str,
+    job_id: str | None = None,
+    job_created_at: datetime | None = None,
+) -> ParsedLogs:
+    """Parse job log content into structured entries.
+
+    Job logs may contain host sections in the format:
+        === Host: agent-name (agent-id) ===
+
+    Each section's lines are associated with that host until the next section.
+
+    Args:
+        log_content: Raw log text content
+        job_id: Optional job ID to include in entries
+        job_created_at: Fallback timestamp if lines don't have timestamps
+
+    Returns:
+        ParsedLogs with entries and list of hosts found
+    """
+    if not log_content:
+        return ParsedLogs(entries=[], hosts=[])
 
-    return ParsedLogs(entries=entries, hosts=list(hosts_found))
+    state = LogParseState()
+    entries = [
+        LabLogEntry(
+            timestamp=line.timestamp,
+            level=line.level,
+            message=line.message,
+            host_id=line.host_id,
+            host_name=line.host_name,
+            job_id=job_id,
+            source="job",
+        )
+        for line in parse_log_lines(
+            log_content, state, job_created_at or datetime.now(timezone.utc)
+        )
+    ]
+    return ParsedLogs(entries=entries, hosts=list(state.hosts))
 
 
 def filter_entries(
@@ -165,9 +203,8 @@ def filter_entries(
         result = [e for e in result if e.host_id == host_id or e.host_name == host_id]
 
     if level:
-        level_priority = {"info": 0, "success": 1, "warning": 2, "error": 3}
-        min_priority = level_priority.get(level.lower(), 0)
-        result = [e for e in result if level_priority.get(e.level, 0) >= min_priority]
+        min_priority = LEVEL_PRIORITY.get(level.lower(), 0)
+        result = [e for e in result if LEVEL_PRIORITY.get(e.level, 0) >= min_priority]
 
     if search:
         search_lower = search.lower()
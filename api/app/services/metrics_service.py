@@ -87,9 +87,11 @@ class MetricsService:
         """
         from app import models
         from app import agent_client
+        from app.services.host_inventory import get_host_details
 
         # Get all hosts
         hosts = self.session.query(models.Host).all()
+        details_by_host = get_host_details(self.session, hosts)
 
         # Agent counts
         agents_total = len(hosts)
@@ -131,7 +133,7 @@ class MetricsService:
                 containers_total += usage.get("containers_total", 0)
 
                 # Aggregate containers by lab
-                for container in usage.get("container_details", []):
+                for container in details_by_host[host.id]["container_details"]:
                     if not container.get("is_system", False):
                         lab_prefix = container.get("lab_prefix", "unknown")
                         containers_by_lab[lab_prefix] = containers_by_lab.get(lab_prefix, 0) + 1
@@ -187,8 +189,10 @@ class MetricsService:
         """
         from app import models
         from app import agent_client
+        from app.services.host_inventory import get_host_details
 
         hosts = self.session.query(models.Host).all()
+        details_by_host = get_host_details(self.session, hosts)
 
         result = {
             "hosts": [],
@@ -200,6 +204,7 @@ class MetricsService:
 
         for host in hosts:
             usage = host.get_resource_usage()
+            details = details_by_host[host.id]
 
             host_data = {
                 "id": host.id,
@@ -208,7 +213,7 @@ class MetricsService:
                 "is_online": agent_client.is_agent_online(host),
                 "containers_running": usage.get("containers_running", 0),
                 "containers_total": usage.get("containers_total", 0),
-                "container_details": usage.get("container_details", []),
+                "container_details": details["container_details"],
             }
 
             result["hosts"].append(host_data)
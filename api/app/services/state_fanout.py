@@ -0,0 +1,264 @@
+"""In-process fan-out of lab state messages to WebSocket subscribers.
+
+Each API process holds ONE Redis pattern subscription (``lab_state:*``) and
+dispatches every message to bounded per-client queues, instead of opening a
+pub/sub connection and a polling task per connected browser tab.
+
+Slow clients are handled per subscriber:
+
+1. While the queue has room, messages are appended in order.
+2. When it is full, a node/link update replaces the queued update for the
+   same node/link (only the latest state matters to the UI).
+3. Anything else marks the subscriber overflowed; its generator raises
+   SlowSubscriberError and the WebSocket is closed so the client reconnects
+   and reloads the snapshot.
+
+The reader task starts with the first subscriber and exits when the last
+one leaves, so idle workers hold no subscription. If the reader is
+cancelled (shutdown), subscribers receive what is already queued and then
+their generators end.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import AsyncGenerator, Awaitable, Callable
+
+from app.config import settings
+from app.metrics import (
+    record_state_ws_delivery,
+    record_state_ws_drop,
+    set_state_ws_subscribers,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SlowSubscriberError(Exception):
+    """Raised to a subscriber that fell too far behind to catch up."""
+
+
+def _coalesce_key(message: dict) -> tuple[str, str] | None:
+    """Key under which a queued message may be replaced by a newer one."""
+    msg_type = message.get("type")
+    data = message.get("data") or {}
+    if msg_type == "node_state":
+        key = data.get("node_id") or data.get("node_name")
+    elif msg_type == "link_state":
+        key = data.get("link_name")
+    else:
+        return None
+    return (msg_type, key) if key else None
+
+
+class _Subscriber:
+    """Bounded message queue for one WebSocket client."""
+
+    __slots__ = ("lab_id", "maxsize", "overflowed", "closed", "_queue", "_wakeup")
+
+    def __init__(self, lab_id: str, maxsize: int):
+        self.lab_id = lab_id
+        self.maxsize = max(1, maxsize)
+        self.overflowed = False
+        self.closed = False
+        self._queue: deque[dict] = deque()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def offer(self, message: dict) -> str | None:
+        """Queue a message. Returns the drop reason if it was not appended."""
+        if self.overflowed:
+            return None
+        if len(self._queue) < self.maxsize:
+            self._queue.append(message)
+            self._wakeup.set()
+            return None
+
+        key = _coalesce_key(message)
+        if key is not None:
+            for index, queued in enumerate(self._queue):
+                if _coalesce_key(queued) == key:
+                    self._queue[index] = message
+                    return "coalesced"
+
+        self.overflowed = True
+        self._queue.clear()
+        self._wakeup.set()
+        return "overflow"
+
+    def close(self) -> None:
+        """End the subscription once the queued messages are consumed."""
+        self.closed = True
+        self._wakeup.set()
+
+    async def get(self) -> dict | None:
+        """Return the next message, or None once closed and drained."""
+        while not self._queue:
+            if self.overflowed:
+                raise SlowSubscriberError(f"Subscriber for lab {self.lab_id} overflowed")
+            if self.closed:
+                return None
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        if self.overflowed:
+            raise SlowSubscriberError(f"Subscriber for lab {self.lab_id} overflowed")
+        return self._queue.popleft()
+
+
+class StateFanoutHub:
+    """Shares one Redis pattern subscription across all lab subscribers."""
+
+    def __init__(
+        self,
+        get_redis: Callable[[], Awaitable],
+        channel_prefix: str = "lab_state:",
+        queue_size: int | None = None,
+    ):
+        self._get_redis = get_redis
+        self._channel_prefix = channel_prefix
+        self._queue_size = queue_size if queue_size is not None else settings.state_ws_queue_size
+        self._subscribers: dict[str, set[_Subscriber]] = {}
+        self._subscriber_count = 0
+        self._reader: asyncio.Task | None = None
+        # Set while the Redis pattern subscription is confirmed
+        self._psubscribed = asyncio.Event()
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._subscriber_count
+
+    async def subscribe(
+        self,
+        lab_id: str,
+        subscribed: asyncio.Event | None = None,
+    ) -> AsyncGenerator[dict, None]:
+        """Yield messages published for a lab until the consumer stops.
+
+        ``subscribed``, if given, is set once Redis has confirmed the
+        pattern subscription, i.e. from when no published message is missed.
+
+        Raises:
+            SlowSubscriberError: The consumer fell behind and must resync.
+        """
+        subscriber = _Subscriber(lab_id, self._queue_size)
+        self._add(subscriber)
+        self._ensure_reader()
+        try:
+            if subscribed is not None:
+                await self._psubscribed.wait()
+                subscribed.set()
+            while (message := await subscriber.get()) is not None:
+                yield message
+        finally:
+            self._remove(subscriber)
+
+    def _add(self, subscriber: _Subscriber) -> None:
+        self._subscribers.setdefault(subscriber.lab_id, set()).add(subscriber)
+        self._subscriber_count += 1
+        set_state_ws_subscribers(self._subscriber_count)
+
+    def _remove(self, subscriber: _Subscriber) -> None:
+        subscribers = self._subscribers.get(subscriber.lab_id)
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[subscriber.lab_id]
+        self._subscriber_count -= 1
+        set_state_ws_subscribers(self._subscriber_count)
+
+    def dispatch(self, channel: str, raw: str) -> int:
+        """Deliver one published message to the lab's subscribers.
+
+        The payload is parsed once regardless of subscriber count. Returns
+        the number of subscribers it was queued for.
+        """
+        if not channel.startswith(self._channel_prefix):
+            return 0
+        subscribers = self._subscribers.get(channel[len(self._channel_prefix):])
+        if not subscribers:
+            return 0
+        try:
+            message = json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            logger.warning(f"Invalid JSON in message: {raw}")
+            return 0
+
+        delivered = 0
+        for subscriber in list(subscribers):
+            reason = subscriber.offer(message)
+            if reason is None:
+                if not subscriber.overflowed:
+                    delivered += 1
+                    record_state_ws_delivery(len(subscriber))
+            else:
+                record_state_ws_drop(reason)
+                if reason == "overflow":
+                    logger.warning(
+                        f"Dropping slow WebSocket subscriber for lab {subscriber.lab_id} "
+                        f"({subscriber.maxsize} messages pending)"
+                    )
+        return delivered
+
+    def _ensure_reader(self) -> None:
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        while True:
+            try:
+                await self._pump()
+            except asyncio.CancelledError:
+                # Nothing will feed the queues any more
+                for subscribers in self._subscribers.values():
+                    for subscriber in subscribers:
+                        subscriber.close()
+                raise
+            except Exception as e:
+                logger.warning(f"State fan-out subscription error, reconnecting: {e}")
+                await asyncio.sleep(1.0)
+            # No await between this check and returning, so a subscriber added
+            # concurrently always sees either a live reader or a finished task
+            if not self._subscribers:
+                return
+
+    async def _pump(self) -> None:
+        redis = await self._get_redis()
+        pubsub = redis.pubsub()
+        pattern = f"{self._channel_prefix}*"
+        try:
+            await pubsub.psubscribe(pattern)
+            logger.info(f"Subscribed to pattern {pattern}")
+            while self._subscribers:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=False,
+                    timeout=1.0,
+                )
+                if message is None:
+                    continue
+                if message["type"] == "pmessage":
+                    self.dispatch(message["channel"], message["data"])
+                elif message["type"] == "psubscribe":
+                    self._psubscribed.set()
+        finally:
+            self._psubscribed.clear()
+            try:
+                await pubsub.punsubscribe(pattern)
+                await pubsub.close()
+            except Exception:
+                pass
+            logger.info(f"Unsubscribed from pattern {pattern}")
+
+    async def close(self) -> None:
+        """Stop the reader task."""
+        if self._reader is not None and not self._reader.done():
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+        self._reader = None
@@ -25,6 +25,7 @@ from app.image_store import (
     load_manifest,
     save_manifest,
 )
+from app.image_store.snapshot import mark_catalog_changed
 from app.utils.image_integrity import compute_sha256
 
 logger = logging.getLogger(__name__)
@@ -698,6 +699,10 @@ def _verify_docker_archives() -> int:
             row.archive_error = None
             verified += 1
 
+        # Every row was updated (failed or re-stamped); cached catalog
+        # snapshots must not keep serving the old archive state
+        if rows:
+            mark_catalog_changed(session)
         session.commit()
 
     return verified
@@ -271,7 +271,7 @@ async def _retry_job(session, old_job: models.Job, exclude_agent: str | None = N
             old_job.status = "cancelled"
             old_job.completed_at = utcnow()
             old_job.superseded_by_id = existing_job.id
-            old_job.log_path = (old_job.log_path or "") + f"\n\n--- Cancelled: duplicate of job {existing_job.id} ---"
+            old_job.append_log(f"\n\n--- Cancelled: duplicate of job {existing_job.id} ---")
             session.commit()
             return
 
@@ -303,7 +303,7 @@ async def _retry_job(session, old_job: models.Job, exclude_agent: str | None = N
             pass
     elif old_job.log_path:
         # log_path contains inline content, append to it
-        old_job.log_path = f"{old_job.log_path}\n\n--- {timeout_msg} ---"
+        old_job.append_log(f"\n\n--- {timeout_msg} ---")
     else:
         old_job.log_path = timeout_msg
 
@@ -339,7 +339,7 @@ async def _retry_job(session, old_job: models.Job, exclude_agent: str | None = N
             child.completed_at = utcnow()
             child.superseded_by_id = new_job.id
             if child.log_path:
-                child.log_path = f"{child.log_path}\n\n--- Cancelled: parent job retried ---"
+                child.append_log("\n\n--- Cancelled: parent job retried ---")
             else:
                 child.log_path = "Cancelled: parent job retried"
 
@@ -448,7 +448,7 @@ async def _fail_job(session, job: models.Job, reason: str):
             pass
     elif job.log_path:
         # log_path contains inline content, append to it
-        job.log_path = f"{job.log_path}\n\n--- Job failed: {reason} ---"
+        job.append_log(f"\n\n--- Job failed: {reason} ---")
     else:
         job.log_path = reason
 
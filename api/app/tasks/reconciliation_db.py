@@ -11,6 +11,8 @@ import logging
 from collections import defaultdict
 from datetime import datetime, timezone
 
+from sqlalchemy import or_
+
 from app import agent_client, models
 from app.config import settings
 from app.metrics import (
@@ -33,6 +35,7 @@ from app.state import (
     NodeDesiredState,
 )
 from app.services.state_machine import LabStateMachine
+from app.tasks.reconciliation_refresh import agent_query_slot, prefetched_lab_status
 from app.utils.db import release_db_transaction_for_io as _release_db_transaction_for_io
 from app.utils.time import utcnow
 
@@ -685,10 +688,36 @@ async def _do_reconcile_lab(session, lab, lab_id: str) -> int:
             host_to_agent[agent_id] = agent
             agents_to_query.append((agent_id, agent))
 
+        # Status prefetched in bulk at the start of the sweep is only used
+        # if no job for this lab was created or finished since the fetch.
+        prefetched_by_agent: dict[str, dict] = {}
+        for aid, _ag in agents_to_query:
+            prefetched = prefetched_lab_status(aid, lab_id)
+            if prefetched is not None:
+                prefetched_by_agent[aid] = prefetched
+        if prefetched_by_agent:
+            oldest_fetch = min(fetched_at for fetched_at, _ in prefetched_by_agent.values())
+            recent_job = (
+                session.query(models.Job.id)
+                .filter(
+                    models.Job.lab_id == lab_id,
+                    or_(
+                        models.Job.created_at >= oldest_fetch,
+                        models.Job.completed_at >= oldest_fetch,
+                    ),
+                )
+                .first()
+            )
+            if recent_job is not None:
+                prefetched_by_agent = {}
+
         async def _query_agent(aid: str, ag: models.Host):
             """Query a single agent for lab status."""
+            if aid in prefetched_by_agent:
+                return aid, ag, prefetched_by_agent[aid][1], None
             try:
-                result = await agent_client.get_lab_status_from_agent(ag, lab_id)
+                async with agent_query_slot(aid):
+                    result = await agent_client.get_lab_status_from_agent(ag, lab_id)
                 return aid, ag, result, None
             except Exception as e:
                 return aid, ag, None, e
@@ -9,11 +9,19 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
-from datetime import timedelta, timezone
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 
 from app import agent_client, models
 from app.config import settings
-from app.metrics import nlm_phase_duration, record_reconciliation_cycle
+from app.metrics import (
+    nlm_phase_duration,
+    record_reconciliation_cycle,
+    record_reconciliation_lab,
+    record_reconciliation_scan,
+)
 from app.db import get_session
 
 from app.services.broadcaster import broadcast_node_state_change
@@ -43,10 +51,7 @@ async def refresh_states_from_agents():
     to reflect the actual state. For enforcement of desired state, see
     state_enforcement.py.
     """
-    from app.tasks.reconciliation_db import (
-        _maybe_cleanup_labless_containers,
-        _reconcile_single_lab,
-    )
+    from app.tasks.reconciliation_db import _maybe_cleanup_labless_containers
 
     _cycle_start = time.monotonic()
     _labs_checked = 0
@@ -54,188 +59,22 @@ async def refresh_states_from_agents():
 
     with get_session() as session:
         try:
-            # Find labs that need reconciliation:
-            # - Labs in transitional states (starting, stopping, unknown)
-            # - Labs where state has been stuck for too long
-            now = utcnow()
-            transitional_threshold = now - timedelta(seconds=settings.stale_starting_threshold)
-
-            transitional_labs = (
-                session.query(models.Lab)
-                .filter(
-                    models.Lab.state.in_([LabState.STARTING.value, LabState.STOPPING.value, LabState.UNKNOWN.value]),
-                    models.Lab.state_updated_at < transitional_threshold,
-                )
-                .all()
-            )
-
-            # Also find labs with nodes in "pending" state for too long
-            pending_threshold = now - timedelta(seconds=settings.stale_pending_threshold)
-            stale_pending_nodes = (
-                session.query(models.NodeState)
-                .filter(
-                    models.NodeState.actual_state == NodeActualState.PENDING.value,
-                    models.NodeState.updated_at < pending_threshold,
-                )
-                .all()
-            )
-
-            # Find running nodes that haven't completed boot readiness check
-            unready_running_nodes = (
-                session.query(models.NodeState)
-                .filter(
-                    models.NodeState.actual_state == NodeActualState.RUNNING.value,
-                    models.NodeState.is_ready.is_(False),
-                )
-                .all()
+            labs_to_reconcile, stable_lab_ids, unready_running_nodes = (
+                _scan_reconciliation_candidates(session)
             )
 
-            # Find nodes in error state - they may have recovered
-            error_nodes = (
-                session.query(models.NodeState)
-                .filter(models.NodeState.actual_state == NodeActualState.ERROR.value)
-                .all()
-            )
-
-            # Find nodes where desired=running but actual=stopped/undeployed
-            # These may have been started by state enforcement and need reconciliation
-            stale_stopped_nodes = (
-                session.query(models.NodeState)
-                .filter(
-                    models.NodeState.desired_state == NodeDesiredState.RUNNING.value,
-                    models.NodeState.actual_state.in_([NodeActualState.STOPPED.value, NodeActualState.UNDEPLOYED.value, NodeActualState.EXITED.value]),
-                )
-                .all()
-            )
-
-            # Find running nodes that are missing NodePlacement records
-            # This handles cases where deploy jobs failed after containers were created
-            from sqlalchemy.sql import select
-
-            placement_exists_subquery = (
-                select(models.NodePlacement.id)
-                .where(
-                    models.NodePlacement.lab_id == models.NodeState.lab_id,
-                    models.NodePlacement.node_name == models.NodeState.node_name,
-                )
-                .exists()
-            )
-
-            running_nodes_without_placement = (
-                session.query(models.NodeState)
-                .filter(
-                    models.NodeState.actual_state == NodeActualState.RUNNING.value,
-                    ~placement_exists_subquery,
-                )
-                .all()
-            )
-
-            # Find labs with orphan placements (placement exists but node was deleted from topology)
-            # NodePlacement.node_definition_id has ondelete=SET NULL, so it becomes NULL when the
-            # Node is deleted — we must check by name against the nodes table instead of using the FK.
-            node_exists_by_name = (
-                select(models.Node.id)
-                .where(
-                    models.Node.lab_id == models.NodePlacement.lab_id,
-                    models.Node.container_name == models.NodePlacement.node_name,
-                )
-                .exists()
-            )
-            orphan_placements = (
-                session.query(models.NodePlacement)
-                .filter(~node_exists_by_name)
-                .all()
-            )
-
-            # Find labs with inconsistent state (lab.state doesn't match computed state from nodes)
-            # This catches cases like lab="running" but all nodes are "stopped"
-            from sqlalchemy import func
-            inconsistent_labs = []
-            stable_labs = (
-                session.query(models.Lab)
-                .filter(
-                    models.Lab.state.in_([LabState.RUNNING.value, LabState.STOPPED.value, LabState.ERROR.value]),
-                )
-                .all()
-            )
-            for lab in stable_labs:
-                # Aggregate node states for this lab
-                state_counts = (
-                    session.query(
-                        models.NodeState.actual_state,
-                        func.count(models.NodeState.id).label('count')
-                    )
-                    .filter(models.NodeState.lab_id == lab.id)
-                    .group_by(models.NodeState.actual_state)
-                    .all()
-                )
-                counts = {state: count for state, count in state_counts}
-                running = counts.get(NodeActualState.RUNNING.value, 0)
-                stopped = counts.get(NodeActualState.STOPPED.value, 0)
-                undeployed = counts.get(NodeActualState.UNDEPLOYED.value, 0)
-                error = counts.get(NodeActualState.ERROR.value, 0)
-                pending = counts.get(NodeActualState.PENDING.value, 0)
-                starting = counts.get(NodeActualState.STARTING.value, 0)
-                stopping = counts.get(NodeActualState.STOPPING.value, 0)
-                exited = counts.get(NodeActualState.EXITED.value, 0)
-
-                # Compute expected state
-                expected_state = LabStateMachine.compute_lab_state(
-                    running_count=running,
-                    stopped_count=stopped + exited,
-                    undeployed_count=undeployed,
-                    error_count=error,
-                    pending_count=pending,
-                    starting_count=starting,
-                    stopping_count=stopping,
-                )
-
-                if lab.state != expected_state.value:
-                    inconsistent_labs.append(lab)
-                    logger.info(
-                        f"Lab {lab.id} has inconsistent state: current={lab.state}, "
-                        f"expected={expected_state.value} (running={running}, stopped={stopped}, "
-                        f"undeployed={undeployed}, error={error})"
-                    )
-
-            # Collect unique lab IDs that need reconciliation
-            labs_to_reconcile = set()
-            for lab in transitional_labs:
-                labs_to_reconcile.add(lab.id)
-            for node in stale_pending_nodes:
-                labs_to_reconcile.add(node.lab_id)
-            for node in unready_running_nodes:
-                labs_to_reconcile.add(node.lab_id)
-            for node in error_nodes:
-                labs_to_reconcile.add(node.lab_id)
-            for node in running_nodes_without_placement:
-                labs_to_reconcile.add(node.lab_id)
-            for node in stale_stopped_nodes:
-                labs_to_reconcile.add(node.lab_id)
-            for placement in orphan_placements:
-                labs_to_reconcile.add(placement.lab_id)
-                logger.info(f"Lab {placement.lab_id} has orphan placement for deleted node: {placement.node_name}")
-            for lab in inconsistent_labs:
-                labs_to_reconcile.add(lab.id)
-
             # Periodic full sweep: verify all deployed labs match agent reality.
             # Catches state drift where DB says "running" but container is stopped.
             _sweep_counter = getattr(refresh_states_from_agents, '_sweep_counter', 0) + 1
             refresh_states_from_agents._sweep_counter = _sweep_counter
 
             if _sweep_counter % 10 == 0:
-                deployed_labs = (
-                    session.query(models.Lab)
-                    .filter(models.Lab.state.in_([
-                        LabState.RUNNING.value, LabState.ERROR.value,
-                        LabState.STOPPED.value,
-                    ]))
-                    .all()
-                )
+                # Deployed labs are exactly the stable labs already aggregated
+                # by the candidate scan, so the sweep costs no extra query.
                 sweep_count = 0
-                for lab in deployed_labs:
-                    if lab.id not in labs_to_reconcile:
-                        labs_to_reconcile.add(lab.id)
+                for lab_id in stable_lab_ids:
+                    if lab_id not in labs_to_reconcile:
+                        labs_to_reconcile.add(lab_id)
                         sweep_count += 1
                 if sweep_count:
                     logger.info(f"Full sweep: adding {sweep_count} deployed lab(s) to reconciliation")
@@ -249,8 +88,14 @@ async def refresh_states_from_agents():
                 logger.info(f"Reconciling state for {len(labs_to_reconcile)} lab(s)")
                 _labs_checked = len(labs_to_reconcile)
 
-                for lab_id in labs_to_reconcile:
-                    _state_changes += await _reconcile_single_lab(session, lab_id)
+                # Each lab runs in its own session; don't hold this one's
+                # transaction open while the fan-out is in flight.
+                _release_db_transaction_for_io(
+                    session,
+                    context="reconciliation lab fan-out",
+                    table="labs",
+                )
+                _state_changes += await _reconcile_labs(labs_to_reconcile)
 
             # Periodic global orphan cleanup: remove containers from deleted labs
             # Runs less frequently than per-lab reconciliation since it scans ALL
@@ -264,6 +109,362 @@ async def refresh_states_from_agents():
             record_reconciliation_cycle(elapsed, _labs_checked, _state_changes)
 
 
+_STABLE_LAB_STATES = (LabState.RUNNING.value, LabState.STOPPED.value, LabState.ERROR.value)
+
+
+def _scan_reconciliation_candidates(session) -> tuple[set[str], list[str], list]:
+    """Find labs needing reconciliation with a fixed number of queries.
+
+    Returns ``(labs_to_reconcile, stable_lab_ids, unready_running_nodes)``.
+    The scan issues three statements regardless of how many labs exist:
+
+    1. One UNION ALL of column-only selects for node/placement/lab triggers
+       (stale pending, error, stale stopped, running without placement,
+       orphan placements, stuck transitional labs).
+    2. One GROUP BY (lab, actual_state) over all stable labs, from which
+       the expected lab state is computed in memory.
+    3. The unready running NodeStates, which readiness checks need as ORM
+       objects.
+    """
+    from sqlalchemy import String, cast, event, func, literal, null, select, union_all
+
+    scan_start = time.monotonic()
+    query_count = 0
+    lab_states: dict[str, str] = {}
+
+    def _count_query(_orm_execute_state):
+        nonlocal query_count
+        query_count += 1
+
+    event.listen(session, "do_orm_execute", _count_query)
+    try:
+        now = utcnow()
+        transitional_threshold = now - timedelta(seconds=settings.stale_starting_threshold)
+        pending_threshold = now - timedelta(seconds=settings.stale_pending_threshold)
+        ns = models.NodeState
+        placement = models.NodePlacement
+
+        placement_exists = (
+            select(placement.id)
+            .where(placement.lab_id == ns.lab_id, placement.node_name == ns.node_name)
+            .exists()
+        )
+        # NodePlacement.node_definition_id has ondelete=SET NULL, so it becomes
+        # NULL when the Node is deleted; match by name against nodes instead.
+        node_exists_by_name = (
+            select(models.Node.id)
+            .where(
+                models.Node.lab_id == placement.lab_id,
+                models.Node.container_name == placement.node_name,
+            )
+            .exists()
+        )
+
+        def _node_trigger(reason: str, *criteria):
+            return select(
+                literal(reason).label("reason"),
+                ns.lab_id.label("lab_id"),
+                ns.node_name.label("node_name"),
+            ).where(*criteria)
+
+        triggers = union_all(
+            # Nodes in "pending" state for too long
+            _node_trigger(
+                "stale_pending",
+                ns.actual_state == NodeActualState.PENDING.value,
+                ns.updated_at < pending_threshold,
+            ),
+            # Nodes in error state - they may have recovered
+            _node_trigger("error", ns.actual_state == NodeActualState.ERROR.value),
+            # desired=running but actual=stopped/undeployed; these may have been
+            # started by state enforcement and need reconciliation
+            _node_trigger(
+                "stale_stopped",
+                ns.desired_state == NodeDesiredState.RUNNING.value,
+                ns.actual_state.in_([
+                    NodeActualState.STOPPED.value,
+                    NodeActualState.UNDEPLOYED.value,
+                    NodeActualState.EXITED.value,
+                ]),
+            ),
+            # Running nodes missing NodePlacement records (deploy job failed
+            # after containers were created)
+            _node_trigger(
+                "missing_placement",
+                ns.actual_state == NodeActualState.RUNNING.value,
+                ~placement_exists,
+            ),
+            # Orphan placements (node deleted from topology)
+            select(
+                literal("orphan_placement").label("reason"),
+                placement.lab_id.label("lab_id"),
+                placement.node_name.label("node_name"),
+            ).where(~node_exists_by_name),
+            # Labs stuck in transitional states
+            select(
+                literal("transitional").label("reason"),
+                models.Lab.id.label("lab_id"),
+                cast(null(), String).label("node_name"),
+            ).where(
+                models.Lab.state.in_([
+                    LabState.STARTING.value, LabState.STOPPING.value, LabState.UNKNOWN.value,
+                ]),
+                models.Lab.state_updated_at < transitional_threshold,
+            ),
+        )
+
+        labs_to_reconcile: set[str] = set()
+        for reason, lab_id, node_name in session.execute(triggers):
+            labs_to_reconcile.add(lab_id)
+            if reason == "orphan_placement":
+                logger.info(f"Lab {lab_id} has orphan placement for deleted node: {node_name}")
+
+        # Labs whose stored state doesn't match the state computed from their
+        # nodes (e.g. lab="running" but all nodes are "stopped")
+        state_rows = session.execute(
+            select(models.Lab.id, models.Lab.state, ns.actual_state, func.count(ns.id))
+            .select_from(models.Lab)
+            .outerjoin(ns, ns.lab_id == models.Lab.id)
+            .where(models.Lab.state.in_(_STABLE_LAB_STATES))
+            .group_by(models.Lab.id, models.Lab.state, ns.actual_state)
+        ).all()
+
+        counts_by_lab: dict[str, dict[str, int]] = {}
+        for lab_id, lab_state, actual_state, count in state_rows:
+            lab_states[lab_id] = lab_state
+            counts = counts_by_lab.setdefault(lab_id, {})
+            if actual_state is not None:
+                counts[actual_state] = count
+
+        for lab_id, lab_state in lab_states.items():
+            counts = counts_by_lab[lab_id]
+            running = counts.get(NodeActualState.RUNNING.value, 0)
+            stopped = counts.get(NodeActualState.STOPPED.value, 0)
+            undeployed = counts.get(NodeActualState.UNDEPLOYED.value, 0)
+            error = counts.get(NodeActualState.ERROR.value, 0)
+            expected_state = LabStateMachine.compute_lab_state(
+                running_count=running,
+                stopped_count=stopped + counts.get(NodeActualState.EXITED.value, 0),
+                undeployed_count=undeployed,
+                error_count=error,
+                pending_count=counts.get(NodeActualState.PENDING.value, 0),
+                starting_count=counts.get(NodeActualState.STARTING.value, 0),
+                stopping_count=counts.get(NodeActualState.STOPPING.value, 0),
+            )
+            if lab_state != expected_state.value:
+                labs_to_reconcile.add(lab_id)
+                logger.info(
+                    f"Lab {lab_id} has inconsistent state: current={lab_state}, "
+                    f"expected={expected_state.value} (running={running}, stopped={stopped}, "
+                    f"undeployed={undeployed}, error={error})"
+                )
+
+        # Running nodes that haven't completed the boot readiness check
+        unready_running_nodes = (
+            session.query(ns)
+            .filter(
+                ns.actual_state == NodeActualState.RUNNING.value,
+                ns.is_ready.is_(False),
+            )
+            .all()
+        )
+        labs_to_reconcile.update(node.lab_id for node in unready_running_nodes)
+    finally:
+        event.remove(session, "do_orm_execute", _count_query)
+        record_reconciliation_scan(time.monotonic() - scan_start, query_count, len(lab_states))
+
+    return labs_to_reconcile, list(lab_states), unready_running_nodes
+
+
+# Per-agent status query semaphores for the sweep in progress (None outside
+# of a sweep, in which case agent queries are not limited).
+_agent_query_limits: ContextVar[dict[str, asyncio.Semaphore] | None] = ContextVar(
+    "reconciliation_agent_query_limits", default=None
+)
+
+
+# Labs that must share an agent in one sweep before one bulk status request
+# replaces their per-lab requests
+_BULK_STATUS_MIN_LABS = 2
+
+
+@dataclass
+class _PrefetchedStatus:
+    """Bulk lab status fetched from one agent at the start of a sweep."""
+
+    fetched_at: datetime
+    labs: dict[str, dict]
+    error: str | None = None
+
+
+# agent_id -> bulk status for the sweep in progress
+_prefetched_lab_status: ContextVar[dict[str, _PrefetchedStatus] | None] = ContextVar(
+    "reconciliation_prefetched_lab_status", default=None
+)
+
+
+@asynccontextmanager
+async def agent_query_slot(agent_id: str):
+    """Hold one of an agent's status query slots for the current sweep.
+
+    Concurrent labs frequently share an agent; this caps how many of their
+    status queries land on that agent at once.
+    """
+    limits = _agent_query_limits.get()
+    if limits is None:
+        yield
+        return
+    semaphore = limits.get(agent_id)
+    if semaphore is None:
+        semaphore = limits[agent_id] = asyncio.Semaphore(
+            max(1, settings.reconciliation_per_agent_concurrency)
+        )
+    async with semaphore:
+        yield
+
+
+async def _reconcile_labs(lab_ids: set[str]) -> int:
+    """Reconcile labs concurrently, each in its own DB session.
+
+    Concurrency is bounded by ``reconciliation_concurrency``; each lab gets
+    ``reconciliation_lab_timeout`` seconds so one slow agent cannot stall
+    the sweep. Returns the total number of node state changes.
+    """
+    from app.tasks.reconciliation_db import _reconcile_single_lab
+
+    semaphore = asyncio.Semaphore(max(1, settings.reconciliation_concurrency))
+
+    async def _run(lab_id: str) -> int:
+        async with semaphore:
+            started = time.monotonic()
+            outcome = "success"
+            try:
+                with get_session() as lab_session:
+                    return await asyncio.wait_for(
+                        _reconcile_single_lab(lab_session, lab_id),
+                        timeout=settings.reconciliation_lab_timeout,
+                    )
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                logger.warning(
+                    f"Reconciliation of lab {lab_id} exceeded "
+                    f"{settings.reconciliation_lab_timeout}s budget; deferring to next cycle"
+                )
+                return 0
+            except Exception as e:
+                outcome = "error"
+                logger.error(f"Error reconciling lab {lab_id}: {e}")
+                return 0
+            finally:
+                record_reconciliation_lab(time.monotonic() - started, outcome)
+
+    limits_token = _agent_query_limits.set({})
+    try:
+        prefetched = await _prefetch_bulk_lab_status(lab_ids)
+        prefetch_token = _prefetched_lab_status.set(prefetched)
+        try:
+            # Tasks copy the current context, so every lab sees the same
+            # limits and prefetched status
+            results = await asyncio.gather(*(_run(lab_id) for lab_id in sorted(lab_ids)))
+        finally:
+            _prefetched_lab_status.reset(prefetch_token)
+    finally:
+        _agent_query_limits.reset(limits_token)
+    return sum(results)
+
+
+async def _prefetch_bulk_lab_status(lab_ids: set[str]) -> dict[str, _PrefetchedStatus]:
+    """Fetch status once per agent that hosts several of the sweep's labs.
+
+    Agents are found from placements and lab default agents. Agents that
+    fail (or predate the bulk endpoint) are left out, and their labs fall
+    back to per-lab status requests.
+    """
+    labs_by_agent: dict[str, set[str]] = {}
+    with get_session() as session:
+        placement_rows = (
+            session.query(models.NodePlacement.host_id, models.NodePlacement.lab_id)
+            .filter(
+                models.NodePlacement.lab_id.in_(lab_ids),
+                models.NodePlacement.host_id.is_not(None),
+            )
+            .distinct()
+            .all()
+        )
+        default_rows = (
+            session.query(models.Lab.agent_id, models.Lab.id)
+            .filter(models.Lab.id.in_(lab_ids), models.Lab.agent_id.is_not(None))
+            .all()
+        )
+        for agent_id, lab_id in [*placement_rows, *default_rows]:
+            labs_by_agent.setdefault(agent_id, set()).add(lab_id)
+
+        shared_agent_ids = [
+            agent_id for agent_id, labs in labs_by_agent.items()
+            if len(labs) >= _BULK_STATUS_MIN_LABS
+        ]
+        if not shared_agent_ids:
+            return {}
+        agents = [
+            host
+            for host in session.query(models.Host).filter(models.Host.id.in_(shared_agent_ids)).all()
+            if agent_client.is_agent_online(host)
+        ]
+        if not agents:
+            return {}
+
+        _release_db_transaction_for_io(
+            session,
+            context="reconciliation bulk status query",
+            table="hosts",
+        )
+
+        async def _fetch(agent: models.Host):
+            agent_id = agent.id
+            async with agent_query_slot(agent_id):
+                # Stamped before sending: jobs that change state while the
+                # request is in flight must count as newer than the snapshot
+                fetched_at = utcnow()
+                try:
+                    payload = await agent_client.get_all_lab_status_from_agent(agent)
+                except Exception as e:
+                    logger.debug(
+                        f"Bulk status unavailable from agent {agent_id}, "
+                        f"using per-lab queries: {e}"
+                    )
+                    return agent_id, None
+            return agent_id, _PrefetchedStatus(
+                fetched_at=fetched_at,
+                labs={lab["lab_id"]: lab for lab in payload.get("labs") or [] if lab.get("lab_id")},
+                error=payload.get("error"),
+            )
+
+        results = await asyncio.gather(*(_fetch(agent) for agent in agents))
+
+    prefetched = {agent_id: status for agent_id, status in results if status is not None}
+    if prefetched:
+        logger.debug(f"Prefetched bulk lab status from {len(prefetched)} agent(s)")
+    return prefetched
+
+
+def prefetched_lab_status(agent_id: str, lab_id: str) -> tuple[datetime, dict] | None:
+    """Return ``(fetched_at, status)`` prefetched for this sweep, if any.
+
+    A lab absent from an agent's bulk response has no runtimes there; it is
+    reported the same way the per-lab status endpoint would report it.
+    """
+    prefetched = _prefetched_lab_status.get()
+    if not prefetched:
+        return None
+    status = prefetched.get(agent_id)
+    if status is None:
+        return None
+    result = status.labs.get(lab_id)
+    if result is None:
+        result = {"lab_id": lab_id, "nodes": [], "error": status.error}
+    return status.fetched_at, result
+
+
 async def _check_readiness_for_nodes(session, nodes: list):
     """Check boot readiness for running nodes.
 
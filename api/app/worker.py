@@ -8,6 +8,7 @@ from redis import Redis
 from rq import SimpleWorker, Worker
 
 from app.config import settings
+from app.image_store import start_catalog_invalidation_listener
 from app.logging_config import setup_logging
 
 setup_logging()
@@ -37,6 +38,7 @@ def _start_metrics_server() -> None:
 
 def main() -> None:
     _start_metrics_server()
+    start_catalog_invalidation_listener()
     redis_conn = Redis.from_url(settings.redis_url)
     # RQ's default Worker forks child processes for jobs. Prometheus counters
     # updated in those children are not visible to the parent metrics server.
@@ -297,6 +297,31 @@ class TestDiscoverLabsOnAgent:
             assert result["labs"] == ["lab1"]
 
 
+class TestGetAllLabStatusFromAgent:
+    @pytest.mark.asyncio
+    async def test_reuses_cached_payload_on_304(self):
+        from app.agent_client import node_ops
+
+        agent = _make_agent()
+        payload = {"etag": '"abc"', "labs": [{"lab_id": "lab1", "nodes": []}], "error": None}
+        first = MagicMock(status_code=200, headers={"ETag": '"abc"'})
+        first.json.return_value = payload
+        second = MagicMock(status_code=304, headers={"ETag": '"abc"'})
+        mock_client = MagicMock()
+        mock_client.get = AsyncMock(side_effect=[first, second])
+
+        node_ops._bulk_lab_status_cache.pop(agent.id, None)
+        with patch("app.agent_client.node_ops.get_agent_url", return_value=AGENT_URL), \
+             patch("app.agent_client.node_ops.get_http_client", return_value=mock_client):
+            assert await node_ops.get_all_lab_status_from_agent(agent) == payload
+            assert await node_ops.get_all_lab_status_from_agent(agent) == payload
+
+        second_headers = mock_client.get.await_args_list[1].kwargs["headers"]
+        assert second_headers["If-None-Match"] == '"abc"'
+        second.raise_for_status.assert_not_called()
+        node_ops._bulk_lab_status_cache.pop(agent.id, None)
+
+
 class TestCleanupOrphansOnAgent:
     @pytest.mark.asyncio
     async def test_success(self):
@@ -32,8 +32,8 @@ def mock_redis():
 def mock_pubsub():
     """Create a mock PubSub client."""
     mock = MagicMock()
-    mock.subscribe = AsyncMock()
-    mock.unsubscribe = AsyncMock()
+    mock.psubscribe = AsyncMock()
+    mock.punsubscribe = AsyncMock()
     mock.close = AsyncMock()
     return mock
 
@@ -234,7 +234,7 @@ class TestStateBroadcasterSubscribe:
 
         # Set up message sequence
         messages = [
-            {"type": "message", "data": json.dumps(test_message)},
+            {"type": "pmessage", "channel": "lab_state:lab-123", "data": json.dumps(test_message)},
             None,  # Timeout
         ]
         call_count = [0]
@@ -273,8 +273,8 @@ class TestStateBroadcasterSubscribe:
         }
 
         messages = [
-            {"type": "message", "data": "not valid json"},
-            {"type": "message", "data": json.dumps(valid_message)},
+            {"type": "pmessage", "channel": "lab_state:lab-123", "data": "not valid json"},
+            {"type": "pmessage", "channel": "lab_state:lab-123", "data": json.dumps(valid_message)},
         ]
         call_count = [0]
 
@@ -441,3 +441,156 @@ class TestBroadcasterClose:
 
         mock_redis.close.assert_called_once()
         assert broadcaster._redis is None
+
+
+class TestSequencedReplay:
+    """Tests for per-lab sequence numbers and ring-buffer replay."""
+
+    @staticmethod
+    def _entries(*seqs: int) -> list:
+        return [
+            (f"{i}-0", {"seq": str(seq), "data": json.dumps({"seq": seq, "type": "node_state"})})
+            for i, seq in enumerate(seqs)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_publish_sends_sequenced_payload(self, mock_redis):
+        """Published payload should be the one stamped by the sequence script."""
+        sequenced = json.dumps({"seq": 7, "type": "lab_state"})
+        script = AsyncMock(return_value=sequenced)
+        mock_redis.register_script = MagicMock(return_value=script)
+        broadcaster = StateBroadcaster("redis://localhost")
+        broadcaster._redis = mock_redis
+
+        await broadcaster.publish_lab_state(lab_id="lab-123", state="running")
+
+        _, kwargs = script.call_args
+        assert kwargs["keys"] == ["lab_state:lab-123:seq", "lab_state:lab-123:log"]
+        assert mock_redis.publish.call_args[0][1] == sequenced
+
+    @pytest.mark.asyncio
+    async def test_publish_falls_back_when_sequencing_fails(self, mock_redis):
+        """Live delivery should not depend on the ring buffer."""
+        mock_redis.register_script = MagicMock(
+            return_value=AsyncMock(side_effect=RuntimeError("NOSCRIPT"))
+        )
+        broadcaster = StateBroadcaster("redis://localhost")
+        broadcaster._redis = mock_redis
+
+        result = await broadcaster.publish_lab_state(lab_id="lab-123", state="running")
+
+        assert result == 1
+        message = json.loads(mock_redis.publish.call_args[0][1])
+        assert "seq" not in message
+
+    @pytest.mark.asyncio
+    async def test_replay_returns_only_missed_events(self, mock_redis):
+        mock_redis.xrange = AsyncMock(return_value=self._entries(5, 6, 7, 8))
+        broadcaster = StateBroadcaster("redis://localhost")
+        broadcaster._redis = mock_redis
+
+        events = await broadcaster.replay("lab-123", 6)
+
+        assert [e["seq"] for e in events] == [7, 8]
+
+    @pytest.mark.asyncio
+    async def test_replay_gap_too_old_needs_snapshot(self, mock_redis):
+        mock_redis.xrange = AsyncMock(return_value=self._entries(5, 6, 7))
+        broadcaster = StateBroadcaster("redis://localhost")
+        broadcaster._redis = mock_redis
+
+        assert await broadcaster.replay("lab-123", 3) is None
+        assert await broadcaster.replay("lab-123", 4) is not None
+        # Ahead of the newest event (sequence reset) also needs a snapshot
+        assert await broadcaster.replay("lab-123", 9) is None
+
+    @pytest.mark.asyncio
+    async def test_replay_empty_buffer(self, mock_redis):
+        mock_redis.xrange = AsyncMock(return_value=[])
+        mock_redis.get = AsyncMock(return_value="12")
+        broadcaster = StateBroadcaster("redis://localhost")
+        broadcaster._redis = mock_redis
+
+        assert await broadcaster.replay("lab-123", 12) == []
+        assert await broadcaster.replay("lab-123", 10) is None
+
+
+class TestCoalescedPublish:
+    """Tests for per-lab coalescing of node and link updates."""
+
+    @staticmethod
+    def _coalescing(mock_redis, window: float = 0.01) -> StateBroadcaster:
+        broadcaster = StateBroadcaster("redis://localhost", coalesce_window=window)
+        broadcaster._redis = mock_redis
+        return broadcaster
+
+    @staticmethod
+    async def _node(broadcaster, node_id: str, actual_state: str, lab_id: str = "lab-123"):
+        await broadcaster.publish_node_state(
+            lab_id=lab_id,
+            node_id=node_id,
+            node_name=f"router-{node_id}",
+            desired_state="running",
+            actual_state=actual_state,
+        )
+
+    @pytest.mark.asyncio
+    async def test_updates_merged_into_one_batch_frame(self, mock_redis):
+        broadcaster = self._coalescing(mock_redis)
+
+        await self._node(broadcaster, "n1", "pending")
+        await self._node(broadcaster, "n2", "pending")
+        await self._node(broadcaster, "n1", "running")
+        mock_redis.publish.assert_not_called()
+
+        await asyncio.sleep(0.05)
+
+        mock_redis.publish.assert_called_once()
+        channel, payload = mock_redis.publish.call_args[0]
+        assert channel == "lab_state:lab-123"
+        frame = json.loads(payload)
+        assert frame["type"] == "node_states"
+        assert [(n["node_id"], n["actual_state"]) for n in frame["data"]["nodes"]] == [
+            ("n2", "pending"),
+            ("n1", "running"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_single_update_keeps_plain_frame(self, mock_redis):
+        broadcaster = self._coalescing(mock_redis)
+
+        await broadcaster.publish_link_state(
+            lab_id="lab-123",
+            link_name="R1:eth1-R2:eth1",
+            desired_state="up",
+            actual_state="up",
+            source_node="R1",
+            target_node="R2",
+        )
+        await asyncio.sleep(0.05)
+
+        frame = json.loads(mock_redis.publish.call_args[0][1])
+        assert frame["type"] == "link_state"
+        assert frame["data"]["link_name"] == "R1:eth1-R2:eth1"
+
+    @pytest.mark.asyncio
+    async def test_other_messages_flush_pending_first(self, mock_redis):
+        broadcaster = self._coalescing(mock_redis, window=10.0)
+
+        await self._node(broadcaster, "n1", "running")
+        await broadcaster.publish_lab_state(lab_id="lab-123", state="running")
+
+        types = [json.loads(c[0][1])["type"] for c in mock_redis.publish.call_args_list]
+        assert types == ["node_state", "lab_state"]
+        assert not broadcaster._flush_tasks
+
+    @pytest.mark.asyncio
+    async def test_labs_batched_separately_and_flushed_on_close(self, mock_redis):
+        broadcaster = self._coalescing(mock_redis, window=10.0)
+
+        await self._node(broadcaster, "n1", "running", lab_id="lab-1")
+        await self._node(broadcaster, "n1", "running", lab_id="lab-2")
+        await broadcaster.close()
+
+        channels = sorted(c[0][0] for c in mock_redis.publish.call_args_list)
+        assert channels == ["lab_state:lab-1", "lab_state:lab-2"]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from contextlib import contextmanager
 import json
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -539,10 +540,13 @@ def test_verify_docker_archives_marks_missing_file_failed(test_db, monkeypatch)
     test_db.commit()
 
     monkeypatch.setattr(image_reconciliation, "get_session", lambda: _session_ctx(test_db))
+    mark_changed = MagicMock()
+    monkeypatch.setattr(image_reconciliation, "mark_catalog_changed", mark_changed)
 
     verified = image_reconciliation._verify_docker_archives()
 
     assert verified == 0
+    mark_changed.assert_called_once_with(test_db)
     test_db.refresh(image)
     assert image.archive_status == "failed"
     assert image.archive_error == "Archive file not found"
@@ -0,0 +1,138 @@
+"""Tests for app.image_store.snapshot — indexed catalog snapshot and revision bumps."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.image_store import snapshot as snapshot_mod
+from app.image_store.aliases import image_matches_device
+from app.image_store.manifest import find_image_by_id, find_image_by_reference, load_manifest
+from app.image_store.snapshot import CatalogManifest, CatalogSnapshot
+
+
+IMAGES = [
+    {"id": "docker:ceos:4.30", "reference": "ceos:4.30", "device_id": "ceos", "compatible_devices": ["ceos"]},
+    {"id": "docker:ceos:4.31", "reference": "ceos:4.31", "device_id": "eos", "compatible_devices": []},
+    {"id": "qcow2:vios.qcow2", "reference": "/images/vios.qcow2", "device_id": "iosv", "compatible_devices": ["iosv"]},
+    {"id": "docker:linux:latest", "reference": "alpine:latest", "device_id": None, "compatible_devices": ["linux"]},
+]
+
+
+@pytest.fixture(autouse=True)
+def _reset_snapshot(monkeypatch):
+    monkeypatch.setattr(snapshot_mod, "_snapshot", None)
+    monkeypatch.setattr(snapshot_mod, "_listener", None)
+
+
+def _catalog(monkeypatch, images):
+    calls = []
+
+    def _list(_session, **_kwargs):
+        calls.append(1)
+        return list(images)
+
+    monkeypatch.setattr("app.services.catalog_service.catalog_is_seeded", lambda _session: True)
+    monkeypatch.setattr("app.services.catalog_service.list_catalog_library_images", _list)
+    return calls
+
+
+class TestCatalogSnapshot:
+    def test_indexes_by_id_and_reference(self):
+        snap = CatalogSnapshot.build([dict(i) for i in IMAGES])
+        assert snap.get("qcow2:vios.qcow2")["reference"] == "/images/vios.qcow2"
+        assert snap.find_by_reference("alpine:latest")["id"] == "docker:linux:latest"
+        assert snap.get("missing") is None
+        assert snap.find_by_reference("missing") is None
+
+    @pytest.mark.parametrize("device_id", ["ceos", "eos", "iosv", "linux", "unknown"])
+    def test_images_for_device_matches_linear_scan(self, device_id):
+        snap = CatalogSnapshot.build([dict(i) for i in IMAGES])
+        expected = [img for img in snap.images if image_matches_device(img, device_id)]
+        assert snap.images_for_device(device_id) == expected
+
+    def test_lookup_rejects_modified_list(self):
+        snap = CatalogSnapshot.build([dict(i) for i in IMAGES])
+        images = list(snap.images)
+        assert snap.lookup(images, "id", "docker:ceos:4.31") is images[1]
+
+        images.pop(0)
+        assert snap.lookup(images, "id", "docker:ceos:4.31") is None
+
+
+class TestLoadManifest:
+    def test_returns_indexed_manifest_from_catalog(self, monkeypatch):
+        _catalog(monkeypatch, IMAGES)
+
+        manifest = load_manifest()
+
+        assert isinstance(manifest, CatalogManifest)
+        assert manifest == {"images": IMAGES}
+        assert find_image_by_id(manifest, "docker:ceos:4.31") is IMAGES[1]
+        assert find_image_by_reference(manifest, "ceos:4.30") is IMAGES[0]
+
+    def test_find_falls_back_after_list_mutation(self, monkeypatch):
+        _catalog(monkeypatch, IMAGES)
+        manifest = load_manifest()
+        added = {"id": "docker:new:1", "reference": "new:1", "device_id": "linux"}
+        manifest["images"].insert(0, added)
+
+        assert find_image_by_id(manifest, "docker:new:1") is added
+        assert find_image_by_id(manifest, "docker:ceos:4.30") is IMAGES[0]
+
+    def test_unchanged_catalog_reuses_indexes(self, monkeypatch):
+        _catalog(monkeypatch, IMAGES)
+        first = load_manifest().snapshot
+        second = load_manifest().snapshot
+        assert second.positions_by_id is first.positions_by_id
+
+    def test_healthy_listener_skips_database(self, monkeypatch):
+        calls = _catalog(monkeypatch, IMAGES)
+        listener = SimpleNamespace(healthy=True, revision=7, is_alive=lambda: True)
+        monkeypatch.setattr(snapshot_mod, "_listener", listener)
+
+        load_manifest()
+        load_manifest()
+        assert len(calls) == 1
+
+        listener.revision = 8
+        load_manifest()
+        assert len(calls) == 2
+
+    def test_unseeded_catalog_reads_file(self, monkeypatch, tmp_path):
+        monkeypatch.setattr("app.services.catalog_service.catalog_is_seeded", lambda _session: False)
+        monkeypatch.setattr("app.image_store.manifest.manifest_path", lambda: tmp_path / "manifest.json")
+
+        manifest = load_manifest()
+
+        assert manifest == {"images": []}
+        assert not isinstance(manifest, CatalogManifest)
+
+
+class TestRevisionBump:
+    def test_mark_changed_bumps_once_after_commit(self, test_db, monkeypatch):
+        bumps = []
+        monkeypatch.setattr(snapshot_mod, "bump_catalog_revision", lambda: bumps.append(1))
+
+        snapshot_mod.mark_catalog_changed(test_db)
+        snapshot_mod.mark_catalog_changed(test_db)
+        assert bumps == []
+
+        test_db.commit()
+        assert bumps == [1]
+
+        test_db.commit()
+        assert bumps == [1]
+
+    def test_bump_drops_snapshot_and_publishes(self, monkeypatch):
+        from app import db
+
+        monkeypatch.setattr(snapshot_mod, "_snapshot", CatalogSnapshot.build([]))
+        redis = db.get_redis()
+        redis.incr.return_value = 3
+
+        snapshot_mod.bump_catalog_revision()
+
+        assert snapshot_mod._snapshot is None
+        redis.incr.assert_called_once_with(snapshot_mod.CATALOG_REVISION_KEY)
+        redis.publish.assert_called_once_with(snapshot_mod.CATALOG_INVALIDATION_CHANNEL, 3)
@@ -187,6 +187,107 @@ class TestAgentHeartbeat:
         assert syncing.status == "syncing"
 
 
+class TestDeltaHeartbeat:
+    """Tests for the delta heartbeat protocol and normalized host inventory."""
+
+    @staticmethod
+    def _post(test_client, host_id, headers, resource_usage, resource_delta=None):
+        payload = {"agent_id": host_id, "status": "online", "resource_usage": resource_usage}
+        if resource_delta is not None:
+            payload["resource_delta"] = resource_delta
+        response = test_client.post(f"/agents/{host_id}/heartbeat", json=payload, headers=headers)
+        assert response.status_code == 200
+        return response.json()
+
+    @staticmethod
+    def _container(name: str, status: str = "running", lab_prefix: str = "lab1") -> dict:
+        return {
+            "name": name, "status": status, "lab_prefix": lab_prefix,
+            "is_system": False, "vcpus": 2, "memory_mb": 1024,
+        }
+
+    def test_full_snapshot_then_delta_updates_entries(
+        self, test_client: TestClient, test_db: Session, sample_host: models.Host, agent_auth_headers: dict
+    ):
+        data = self._post(
+            test_client, sample_host.id, agent_auth_headers,
+            {"cpu_percent": 10.0, "container_details": [self._container("c1"), self._container("c2")]},
+            {"seq": 1, "full": True},
+        )
+        assert data["resource_seq"] == 1
+
+        test_db.refresh(sample_host)
+        usage = json.loads(sample_host.resource_usage)
+        assert "container_details" not in usage
+        assert usage["containers_running"] == 2
+        assert usage["allocated_vcpus"] == 4
+        assert sample_host.resource_seq == 1
+
+        data = self._post(
+            test_client, sample_host.id, agent_auth_headers,
+            {"cpu_percent": 20.0},
+            {
+                "seq": 2, "base_seq": 1, "full": False,
+                "containers_upsert": [self._container("c2", status="exited"), self._container("c3")],
+                "containers_removed": ["c1"],
+            },
+        )
+        assert data["resource_seq"] == 2
+
+        entries = {
+            e.name: e.status
+            for e in test_db.query(models.HostResourceEntry).filter_by(host_id=sample_host.id)
+        }
+        assert entries == {"c2": "exited", "c3": "running"}
+        test_db.refresh(sample_host)
+        usage = json.loads(sample_host.resource_usage)
+        assert usage["cpu_percent"] == 20.0
+        assert usage["containers_total"] == 2
+        assert usage["containers_running"] == 1
+
+    def test_delta_with_stale_base_requests_full_snapshot(
+        self, test_client: TestClient, test_db: Session, sample_host: models.Host, agent_auth_headers: dict
+    ):
+        self._post(
+            test_client, sample_host.id, agent_auth_headers,
+            {"container_details": [self._container("c1")]},
+            {"seq": 5, "full": True},
+        )
+        data = self._post(
+            test_client, sample_host.id, agent_auth_headers,
+            {"cpu_percent": 1.0},
+            {"seq": 9, "base_seq": 8, "full": False, "containers_removed": ["c1"]},
+        )
+
+        assert data["resource_seq"] is None
+        test_db.refresh(sample_host)
+        assert sample_host.resource_seq == 5
+        assert test_db.query(models.HostResourceEntry).filter_by(name="c1").count() == 1
+        assert json.loads(sample_host.resource_usage)["containers_total"] == 1
+
+    def test_legacy_full_payload_is_normalized(
+        self, test_client: TestClient, test_db: Session, sample_host: models.Host, agent_auth_headers: dict
+    ):
+        data = self._post(
+            test_client, sample_host.id, agent_auth_headers,
+            {"container_details": [self._container("c1")], "vm_details": [
+                {"name": "vm1", "status": "running", "lab_prefix": "lab1", "vcpus": 4, "memory_mb": 8192},
+            ]},
+        )
+
+        assert data["resource_seq"] is None
+        test_db.refresh(sample_host)
+        assert sample_host.resource_seq == 0
+        usage = json.loads(sample_host.resource_usage)
+        assert usage["vms_running"] == 1
+        assert usage["allocated_memory_mb"] == 1024 + 8192
+
+        from app.services.host_inventory import get_host_details
+        details = get_host_details(test_db, [sample_host])[sample_host.id]
+        assert [c["name"] for c in details["container_details"]] == ["c1"]
+        assert [v["name"] for v in details["vm_details"]] == ["vm1"]
+
+
 class TestListAgents:
     """Tests for agent listing endpoints."""
 
@@ -111,7 +111,7 @@ class TestLoadImage:
         mock_rm.check_disk_pressure.return_value = PressureLevel.NORMAL
 
         data = _make_tar_bytes()
-        with patch("app.routers.images._load_image_background"):
+        with patch("app.routers.images.upload_docker._load_image_background_from_archive"):
             resp = test_client.post(
                 "/images/load?background=true",
                 files={"file": ("test.tar", io.BytesIO(data), "application/x-tar")},
@@ -122,6 +122,27 @@ class TestLoadImage:
         assert "upload_id" in result
         assert result["status"] == "started"
 
+    @patch("app.routers.images.upload_docker.ResourceMonitor")
+    def test_load_stream_mode_cleans_up_unstarted_stream(self, mock_rm):
+        """The spooled upload is removed even if the stream is never iterated."""
+        import asyncio
+
+        from app.routers.images import upload_docker
+        from app.services.resource_monitor import PressureLevel
+        mock_rm.check_disk_pressure.return_value = PressureLevel.NORMAL
+
+        upload = MagicMock(filename="test.tar", file=io.BytesIO(_make_docker_tar_bytes()))
+        resp = upload_docker.load_image(
+            file=upload, current_user=MagicMock(), stream=True, background=False,
+        )
+        archive_path = Path(resp.background.args[0])
+        assert archive_path.exists()
+
+        # What Starlette runs after the response, including on disconnect
+        asyncio.run(resp.background())
+
+        assert not archive_path.exists()
+
 
 # ---------------------------------------------------------------------------
 # POST /images/qcow2
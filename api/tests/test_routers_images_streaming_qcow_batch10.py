@@ -55,9 +55,16 @@ class _ImportProc:
         return self._stdout, self._stderr
 
 
-def test_load_image_background_decompress_and_docker_load_paths(monkeypatch):
+def _spooled(tmp_path, filename: str, content: bytes) -> str:
+    """Stage an upload on disk the way ``/images/load`` spools it."""
+    path = tmp_path / filename
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_load_image_background_decompress_and_docker_load_paths(monkeypatch, tmp_path):
     upload_id = "bg-xz"
-    img._load_image_background(upload_id, "image.tar.xz", b"not-real-xz")
+    img._load_image_background_from_archive(upload_id, "image.tar.xz", _spooled(tmp_path, "image.tar.xz", b"not-real-xz"))
     progress = img._get_progress(upload_id)
     assert progress is not None
     assert progress["phase"] == "error"
@@ -70,7 +77,7 @@ def test_load_image_background_decompress_and_docker_load_paths(monkeypatch):
         "run",
         Mock(side_effect=subprocess.TimeoutExpired(cmd=["docker", "load"], timeout=600)),
     )
-    img._load_image_background(upload_id, "image.tar", b"docker-archive")
+    img._load_image_background_from_archive(upload_id, "image.tar", _spooled(tmp_path, "image.tar", b"docker-archive"))
     progress = img._get_progress(upload_id)
     assert progress is not None
     assert "timed out" in progress["message"].lower()
@@ -81,14 +88,14 @@ def test_load_image_background_decompress_and_docker_load_paths(monkeypatch):
         "run",
         lambda *_args, **_kwargs: SimpleNamespace(returncode=1, stdout="", stderr="load failed"),
     )
-    img._load_image_background(upload_id, "image.tar", b"docker-archive")
+    img._load_image_background_from_archive(upload_id, "image.tar", _spooled(tmp_path, "image.tar", b"docker-archive"))
     progress = img._get_progress(upload_id)
     assert progress is not None
     assert progress["phase"] == "error"
     assert "load failed" in progress["message"]
 
 
-def test_load_image_background_import_and_duplicate_paths(monkeypatch):
+def test_load_image_background_import_and_duplicate_paths(monkeypatch, tmp_path):
     monkeypatch.setattr(img, "_is_docker_image_tar", lambda _path: False)
 
     # Import timeout branch.
@@ -97,14 +104,14 @@ def test_load_image_background_import_and_duplicate_paths(monkeypatch):
         "run",
         Mock(side_effect=subprocess.TimeoutExpired(cmd=["docker", "import"], timeout=600)),
     )
-    img._load_image_background("bg-import-timeout", "rootfs.tar", b"rootfs")
+    img._load_image_background_from_archive("bg-import-timeout", "rootfs.tar", _spooled(tmp_path, "rootfs.tar", b"rootfs"))
     timeout_progress = img._get_progress("bg-import-timeout")
     assert timeout_progress is not None
     assert "timed out" in timeout_progress["message"].lower()
 
     # Import exception branch.
     monkeypatch.setattr(img.subprocess, "run", Mock(side_effect=RuntimeError("import crash")))
-    img._load_image_background("bg-import-exc", "rootfs.tar", b"rootfs")
+    img._load_image_background_from_archive("bg-import-exc", "rootfs.tar", _spooled(tmp_path, "rootfs.tar", b"rootfs"))
     exc_progress = img._get_progress("bg-import-exc")
     assert exc_progress is not None
     assert "import failed" in exc_progress["message"].lower()
@@ -114,13 +121,13 @@ def test_load_image_background_import_and_duplicate_paths(monkeypatch):
     monkeypatch.setattr(img, "load_manifest", lambda: {"images": [{"id": "docker:rootfs:imported"}]})
     monkeypatch.setattr(img, "find_image_by_id", lambda *_args, **_kwargs: {"id": "docker:rootfs:imported"})
 
-    img._load_image_background("bg-import-dup", "rootfs.tar", b"rootfs")
+    img._load_image_background_from_archive("bg-import-dup", "rootfs.tar", _spooled(tmp_path, "rootfs.tar", b"rootfs"))
     dup_progress = img._get_progress("bg-import-dup")
     assert dup_progress is not None
     assert "already exists" in dup_progress["message"].lower()
 
 
-def test_load_image_background_success_paths(monkeypatch):
+def test_load_image_background_success_paths(monkeypatch, tmp_path):
     # Docker load success path.
     monkeypatch.setattr(img, "_is_docker_image_tar", lambda _path: True)
     monkeypatch.setattr(
@@ -144,7 +151,7 @@ def test_load_image_background_success_paths(monkeypatch):
     save_manifest = Mock()
     monkeypatch.setattr(img, "save_manifest", save_manifest)
 
-    img._load_image_background("bg-docker-ok", "image.tar", b"docker-archive")
+    img._load_image_background_from_archive("bg-docker-ok", "image.tar", _spooled(tmp_path, "image.tar", b"docker-archive"))
     ok_progress = img._get_progress("bg-docker-ok")
     assert ok_progress is not None
     assert ok_progress["phase"] == "complete"
@@ -157,7 +164,7 @@ def test_load_image_background_success_paths(monkeypatch):
     monkeypatch.setattr(img.subprocess, "run", lambda *_args, **_kwargs: SimpleNamespace(returncode=0))
     manifest2 = {"images": []}
     monkeypatch.setattr(img, "load_manifest", lambda: manifest2)
-    img._load_image_background("bg-import-ok", "rootfs.tar", b"rootfs")
+    img._load_image_background_from_archive("bg-import-ok", "rootfs.tar", _spooled(tmp_path, "rootfs.tar", b"rootfs"))
     import_ok = img._get_progress("bg-import-ok")
     assert import_ok is not None
     assert import_ok["phase"] == "complete"
@@ -165,7 +172,7 @@ def test_load_image_background_success_paths(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_load_image_streaming_docker_load_success(monkeypatch):
+async def test_load_image_streaming_docker_load_success(monkeypatch, tmp_path):
     monkeypatch.setattr(img, "_is_docker_image_tar", lambda _path: True)
 
     async def _create_subprocess_exec(*cmd, **_kwargs):  # noqa: ARG001
@@ -193,7 +200,7 @@ async def test_load_image_streaming_docker_load_success(monkeypatch):
     monkeypatch.setattr(img, "save_manifest", Mock())
 
     events = []
-    async for event in img._load_image_streaming("image.tar", b"docker-archive"):
+    async for event in img._load_image_streaming("image.tar", archive_path=_spooled(tmp_path, "image.tar", b"docker-archive")):
         events.append(event)
 
     joined = "".join(events)
@@ -203,7 +210,7 @@ async def test_load_image_streaming_docker_load_success(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_load_image_streaming_import_paths(monkeypatch):
+async def test_load_image_streaming_import_paths(monkeypatch, tmp_path):
     monkeypatch.setattr(img, "_is_docker_image_tar", lambda _path: False)
 
     async def _import_ok(*cmd, **_kwargs):  # noqa: ARG001
@@ -218,7 +225,7 @@ async def test_load_image_streaming_import_paths(monkeypatch):
     monkeypatch.setattr(img, "save_manifest", Mock())
 
     events = []
-    async for event in img._load_image_streaming("rootfs.tar", b"rootfs"):
+    async for event in img._load_image_streaming("rootfs.tar", archive_path=_spooled(tmp_path, "rootfs.tar", b"rootfs")):
         events.append(event)
     joined = "".join(events)
     assert "event: progress" in joined
@@ -230,7 +237,7 @@ async def test_load_image_streaming_import_paths(monkeypatch):
 
     monkeypatch.setattr(img.asyncio, "create_subprocess_exec", _import_fail)
     fail_events = []
-    async for event in img._load_image_streaming("rootfs.tar", b"rootfs"):
+    async for event in img._load_image_streaming("rootfs.tar", archive_path=_spooled(tmp_path, "rootfs.tar", b"rootfs")):
         fail_events.append(event)
     assert "event: error" in "".join(fail_events)
 
@@ -10,7 +10,6 @@ Targets:
 from __future__ import annotations
 
 from contextlib import contextmanager
-from io import BytesIO
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
@@ -90,35 +89,18 @@ class TestExecuteSyncJobDocker:
     """Tests for _execute_sync_job with docker images."""
 
     @pytest.mark.asyncio
-    async def test_docker_sync_success(self, test_db: Session, sample_host):
-        """Full happy-path: docker inspect, docker save, POST to agent succeeds."""
+    async def test_docker_sync_success(self, test_db: Session, sample_host, tmp_path):
+        """Full happy-path: archive from the save cache, POST to agent succeeds."""
         from app.routers.images.sync import _execute_sync_job
+        from app.services.docker_save_cache import CachedArchive
 
         job = _make_sync_job(test_db, sample_host.id, job_id="docker-ok")
         image = MOCK_MANIFEST[0]  # docker kind
-
-        # Mock docker inspect returning size
-        inspect_proc = AsyncMock()
-        inspect_proc.communicate = AsyncMock(return_value=(b"12345\n", b""))
-        inspect_proc.returncode = 0
-
-        # Mock docker save writing chunks
-        save_proc = AsyncMock()
-        save_proc.stdout = AsyncMock()
-        save_proc.stdout.read = AsyncMock(side_effect=[b"chunk1", b"chunk2", b""])
-        save_proc.communicate = AsyncMock(return_value=(b"", b""))
-        save_proc.returncode = 0
-
-        call_count = {"n": 0}
-
-        async def fake_subprocess(*args, **kwargs):
-            call_count["n"] += 1
-            if call_count["n"] == 1:
-                return inspect_proc
-            return save_proc
-
-        async def fake_wait_for(coro, timeout):
-            return await coro
+        archive_path = tmp_path / "cached.tar"
+        archive_path.write_bytes(b"chunk1chunk2")
+        materialize = AsyncMock(
+            return_value=CachedArchive(key="k", path=archive_path, size=len(b"chunk1chunk2"))
+        )
 
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -132,68 +114,37 @@ class TestExecuteSyncJobDocker:
 
         with (
             patch("app.db.get_session", lambda: _fake_session_ctx(test_db)),
-            patch("asyncio.create_subprocess_exec", side_effect=fake_subprocess),
-            patch("asyncio.wait_for", side_effect=fake_wait_for),
+            patch("app.routers.images.sync.materialize_docker_archive", materialize),
             patch("httpx.AsyncClient", return_value=mock_client),
             patch("app.agent_client._get_agent_auth_headers", return_value={}),
             patch("app.agent_client.http._get_agent_auth_headers", return_value={}),
-            patch("tempfile.mkstemp", return_value=(99, "/tmp/fake.tar")),
-            patch("os.fdopen", return_value=MagicMock(
-                __enter__=MagicMock(return_value=BytesIO()),
-                __exit__=MagicMock(return_value=False),
-            )),
-            patch("builtins.open", return_value=BytesIO(b"tardata")),
-            patch("os.unlink"),
         ):
             await _execute_sync_job("docker-ok", "docker:ceos:4.28.0F", image, sample_host)
 
         test_db.refresh(job)
         assert job.status == "completed"
         assert job.progress_percent == 100
+        assert job.total_bytes == len(b"chunk1chunk2")
+        materialize.assert_awaited_once_with("ceos:4.28.0F")
+        params = mock_client.post.call_args.kwargs["params"]
+        assert params["total_bytes"] == str(len(b"chunk1chunk2"))
 
     @pytest.mark.asyncio
     async def test_docker_save_failure_marks_job_failed(self, test_db: Session, sample_host):
-        """When docker save returns non-zero, job should be marked failed."""
+        """When docker save fails, job should be marked failed."""
         from app.routers.images.sync import _execute_sync_job
 
         job = _make_sync_job(test_db, sample_host.id, job_id="docker-fail")
         image = MOCK_MANIFEST[0]
 
-        # inspect subprocess
-        inspect_proc = AsyncMock()
-        inspect_proc.communicate = AsyncMock(return_value=(b"999\n", b""))
-        inspect_proc.returncode = 0
-
-        # docker save fails
-        save_proc = AsyncMock()
-        save_proc.stdout = AsyncMock()
-        save_proc.stdout.read = AsyncMock(side_effect=[b""])  # immediate EOF
-        save_proc.communicate = AsyncMock(return_value=(b"", b"docker save error msg"))
-        save_proc.returncode = 1
-
-        call_count = {"n": 0}
-
-        async def fake_subprocess(*args, **kwargs):
-            call_count["n"] += 1
-            if call_count["n"] == 1:
-                return inspect_proc
-            return save_proc
-
-        async def fake_wait_for(coro, timeout):
-            return await coro
-
         with (
             patch("app.db.get_session", lambda: _fake_session_ctx(test_db)),
-            patch("asyncio.create_subprocess_exec", side_effect=fake_subprocess),
-            patch("asyncio.wait_for", side_effect=fake_wait_for),
+            patch(
+                "app.routers.images.sync.materialize_docker_archive",
+                AsyncMock(side_effect=ValueError("docker save error msg")),
+            ),
             patch("httpx.AsyncClient") as mock_client_cls,
             patch("app.agent_client.http._get_agent_auth_headers", return_value={}),
-            patch("tempfile.mkstemp", return_value=(99, "/tmp/fail.tar")),
-            patch("os.fdopen", return_value=MagicMock(
-                __enter__=MagicMock(return_value=BytesIO()),
-                __exit__=MagicMock(return_value=False),
-            )),
-            patch("os.unlink"),
         ):
             mock_client = AsyncMock()
             mock_client.__aenter__ = AsyncMock(return_value=mock_client)
@@ -486,13 +437,13 @@ class TestExecuteSyncJobHttpErrors:
 class TestStreamImageDeep:
     """Test stream_image beyond basic 404/400 validation."""
 
-    def test_stream_success_with_content_length(
+    def test_stream_produces_then_serves_cached_archive(
         self, test_client: TestClient, auth_headers: dict
     ):
-        """Successful stream returns tar content-type and content-length header."""
-        # Mock docker inspect for content-length
+        """First pull streams docker save output; the next is served from the cache."""
+        # Mock docker inspect for the cache key
         inspect_proc = AsyncMock()
-        inspect_proc.communicate = AsyncMock(return_value=(b"54321\n", b""))
+        inspect_proc.communicate = AsyncMock(return_value=(b"sha256:54321\n", b""))
         inspect_proc.returncode = 0
 
         # Mock docker save for streaming
@@ -502,11 +453,11 @@ class TestStreamImageDeep:
         save_proc.communicate = AsyncMock(return_value=(b"", b""))
         save_proc.returncode = 0
 
-        call_count = {"n": 0}
+        commands = []
 
         async def fake_subprocess(*args, **kwargs):
-            call_count["n"] += 1
-            if call_count["n"] == 1:
+            commands.append(args[:2])
+            if args[:2] == ("docker", "image"):
                 return inspect_proc
             return save_proc
 
@@ -519,15 +470,30 @@ class TestStreamImageDeep:
             patch("asyncio.create_subprocess_exec", side_effect=fake_subprocess),
             patch("asyncio.wait_for", side_effect=fake_wait_for),
         ):
-            resp = test_client.get(
+            first = test_client.get(
+                "/images/library/docker:ceos:4.28.0F/stream",
+                headers=auth_headers,
+            )
+            second = test_client.get(
                 "/images/library/docker:ceos:4.28.0F/stream",
                 headers=auth_headers,
             )
+            not_modified = test_client.get(
+                "/images/library/docker:ceos:4.28.0F/stream",
+                headers={**auth_headers, "If-None-Match": second.headers["etag"]},
+            )
 
-        assert resp.status_code == 200
-        assert resp.headers["content-type"] == "application/x-tar"
-        assert resp.headers.get("content-length") == "54321"
-        assert resp.content == b"tar-data-chunk"
+        assert first.status_code == 200
+        assert first.headers["content-type"] == "application/x-tar"
+        assert "content-length" not in first.headers
+        assert first.content == b"tar-data-chunk"
+
+        assert second.status_code == 200
+        assert second.headers["content-length"] == str(len(b"tar-data-chunk"))
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.content == b"tar-data-chunk"
+        assert not_modified.status_code == 304
+        assert commands.count(("docker", "save")) == 1
 
     def test_stream_without_content_length_on_inspect_failure(
         self, test_client: TestClient, auth_headers: dict
@@ -597,6 +563,41 @@ class TestStreamImageDeep:
         assert resp.headers["content-length"] == str(len(b"qcow2-stream"))
         assert resp.content == b"qcow2-stream"
 
+    def test_stream_file_based_image_range(self, test_client: TestClient, auth_headers: dict, tmp_path):
+        """Complete files serve byte ranges, guarded by If-Range."""
+        file_path = tmp_path / "sonic-vs.img"
+        file_path.write_bytes(b"qcow2-stream")
+        manifest = [{"id": "qcow2:sonic-vs.img", "reference": str(file_path), "kind": "qcow2"}]
+
+        with (
+            patch("app.routers.images.sync.load_manifest", return_value=manifest),
+            patch("app.routers.images.sync.find_image_by_id", side_effect=lambda _m, _i: manifest[0]),
+        ):
+            full = test_client.get("/images/library/qcow2:sonic-vs.img/stream", headers=auth_headers)
+            etag = full.headers["etag"]
+            partial = test_client.get(
+                "/images/library/qcow2:sonic-vs.img/stream",
+                headers={**auth_headers, "Range": "bytes=6-", "If-Range": etag},
+            )
+            stale = test_client.get(
+                "/images/library/qcow2:sonic-vs.img/stream",
+                headers={**auth_headers, "Range": "bytes=6-", "If-Range": '"other"'},
+            )
+            past_end = test_client.get(
+                "/images/library/qcow2:sonic-vs.img/stream",
+                headers={**auth_headers, "Range": "bytes=99-"},
+            )
+
+        assert full.headers["accept-ranges"] == "bytes"
+        assert partial.status_code == 206
+        assert partial.headers["content-range"] == "bytes 6-11/12"
+        assert partial.headers["content-length"] == "6"
+        assert partial.content == b"stream"
+        assert stale.status_code == 200
+        assert stale.content == b"qcow2-stream"
+        assert past_end.status_code == 416
+        assert past_end.headers["content-range"] == "bytes */12"
+
     def test_stream_prefers_ready_archive(self, test_client: TestClient, auth_headers: dict, tmp_path):
         """Docker stream uses ready archive file instead of docker save."""
         archive_path = tmp_path / "docker-ceos.tar"
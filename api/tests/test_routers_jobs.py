@@ -12,8 +12,11 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
 
 from app import models
 from app.state import NodeActualState, NodeDesiredState
@@ -555,6 +558,165 @@ class TestJobLog:
         assert response.status_code == 404
 
 
+class TestJobLogChunks:
+    """Tests for append-only job log chunks and offset reads."""
+
+    def _make_job(self, test_db: Session, lab: models.Lab, user: models.User, **kwargs) -> models.Job:
+        job = models.Job(lab_id=lab.id, user_id=user.id, action="up", status="running", **kwargs)
+        test_db.add(job)
+        test_db.commit()
+        return job
+
+    def test_extending_log_appends_only_delta(
+        self,
+        test_db: Session,
+        sample_lab: models.Lab,
+        test_user: models.User,
+    ):
+        job = self._make_job(test_db, sample_lab, test_user, log_path="phase 1\n")
+        job.log_path = "phase 1\nphase 2 é\n"
+        test_db.commit()
+
+        chunks = (
+            test_db.query(models.JobLogChunk)
+            .filter(models.JobLogChunk.job_id == job.id)
+            .order_by(models.JobLogChunk.offset)
+            .all()
+        )
+        assert [(c.offset, c.content) for c in chunks] == [(0, "phase 1\n"), (8, "phase 2 é\n")]
+        assert job.log_base == 0
+        assert job.log_size == len("phase 1\nphase 2 é\n".encode("utf-8"))
+
+    def test_chunked_log_is_stored_once_and_read_from_chunks(
+        self,
+        test_db: Session,
+        sample_lab: models.Lab,
+        test_user: models.User,
+    ):
+        job = self._make_job(test_db, sample_lab, test_user, log_path="phase 1\n")
+        job.append_log("phase 2\n")
+        test_db.commit()
+
+        raw = test_db.execute(
+            select(models.Job.__table__.c.log_path).where(models.Job.__table__.c.id == job.id)
+        ).scalar_one()
+        assert raw is None
+        test_db.expire_all()
+        assert job.log_path == "phase 1\nphase 2\n"
+        offsets = test_db.execute(
+            select(models.JobLogChunk.offset)
+            .where(models.JobLogChunk.job_id == job.id)
+            .order_by(models.JobLogChunk.offset)
+        ).scalars().all()
+        assert offsets == [0, 8]
+
+    def test_stale_writer_cannot_reuse_an_offset(
+        self,
+        test_db: Session,
+        test_engine,
+        sample_lab: models.Lab,
+        test_user: models.User,
+    ):
+        job = self._make_job(test_db, sample_lab, test_user, log_path="start\n")
+        other = sessionmaker(bind=test_engine)()
+        try:
+            stale = other.get(models.Job, job.id)
+            job.append_log("writer 1\n")
+            test_db.commit()
+
+            stale.append_log("writer 2\n")
+            with pytest.raises(IntegrityError):
+                other.commit()
+        finally:
+            other.close()
+
+    def test_offset_read_returns_new_bytes_only(
+        self,
+        test_client: TestClient,
+        test_db: Session,
+        sample_lab: models.Lab,
+        test_user: models.User,
+        auth_headers: dict,
+    ):
+        job = self._make_job(test_db, sample_lab, test_user, log_path="line 1\n")
+        url = f"/labs/{sample_lab.id}/jobs/{job.id}/log"
+
+        first = test_client.get(f"{url}?offset=0", headers=auth_headers).json()
+        assert first["log"] == "line 1\n"
+        assert first["next_offset"] == 7
+
+        job.log_path = "line 1\nline 2\n"
+        test_db.commit()
+
+        second = test_client.get(f"{url}?offset={first['next_offset']}", headers=auth_headers).json()
+        assert second["log"] == "line 2\n"
+        assert second["next_offset"] == 14
+        assert second["reset"] is False
+        assert second["status"] == "running"
+
+    def test_rewritten_log_resets_reader(
+        self,
+        test_client: TestClient,
+        test_db: Session,
+        sample_lab: models.Lab,
+        test_user: models.User,
+        auth_headers: dict,
+    ):
+        job = self._make_job(test_db, sample_lab, test_user, log_path="attempt 1\n")
+        job.log_path = "attempt 2\n"
+        test_db.commit()
+
+        data = test_client.get(
+            f"/labs/{sample_lab.id}/jobs/{job.id}/log?offset=0", headers=auth_headers
+        ).json()
+        assert data["reset"] is True
+        assert data["log"] == "attempt 2\n"
+        assert data["offset"] == 10
+
+    def test_offset_read_of_legacy_job(
+        self,
+        test_client: TestClient,
+        test_db: Session,
+        sample_lab: models.Lab,
+        test_user: models.User,
+        auth_headers: dict,
+    ):
+        job = self._make_job(test_db, sample_lab, test_user)
+        # Simulate a row written before chunked storage existed
+        test_db.execute(
+            update(models.Job).where(models.Job.id == job.id).values(log_path="old output")
+        )
+        test_db.commit()
+
+        data = test_client.get(
+            f"/labs/{sample_lab.id}/jobs/{job.id}/log?offset=4&limit=3", headers=auth_headers
+        ).json()
+        assert data["log"] == "out"
+        assert data["next_offset"] == 7
+
+    def test_stream_sends_log_then_complete(
+        self,
+        test_client: TestClient,
+        test_db: Session,
+        sample_lab: models.Lab,
+        test_user: models.User,
+        auth_headers: dict,
+    ):
+        job = self._make_job(test_db, sample_lab, test_user, log_path="deploying\ndone\n")
+        job.status = "completed"
+        test_db.commit()
+
+        response = test_client.get(
+            f"/labs/{sample_lab.id}/jobs/{job.id}/log/stream?offset=10", headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [block for block in response.text.split("\n\n") if block]
+        assert events[0].startswith("event: log")
+        assert '"log": "done\\n"' in events[0]
+        assert events[1].startswith("event: complete")
+
+
 class TestCancelJob:
     """Tests for job cancellation."""
 
@@ -330,6 +330,144 @@ class TestPollNodesReady:
         assert data["all_ready"] is True
 
 
+    def test_poll_wakes_on_node_state_event(
+        self, test_client: TestClient, auth_headers: dict, test_db: Session,
+        test_user: models.User,
+    ):
+        """A node_state broadcast completes the poll without waiting an interval."""
+        import asyncio
+        import time
+
+        from app.services.broadcaster import get_broadcaster
+
+        lab = make_lab(test_db, test_user, state=LabState.RUNNING)
+        make_node(test_db, lab, name="r1")
+        ns = make_node_state(
+            test_db, lab, "r1",
+            actual_state=NodeActualState.RUNNING,
+            desired_state=NodeDesiredState.RUNNING,
+            is_ready=False,
+        )
+
+        async def events(_lab_id, subscribed=None):
+            subscribed.set()
+            await asyncio.sleep(0.2)
+            # The reconciler commits readiness, then broadcasts it
+            ns.is_ready = True
+            test_db.commit()
+            yield {"type": "node_state", "data": {
+                "node_id": ns.node_id, "node_name": "r1",
+                "desired_state": "running", "actual_state": "running", "is_ready": True,
+            }}
+            await asyncio.Event().wait()
+
+        get_broadcaster().subscribe = events
+        start = time.monotonic()
+        with patch(
+            "app.routers.labs.get_online_agent_for_lab", AsyncMock(return_value=None),
+        ):
+            resp = test_client.get(
+                f"/labs/{lab.id}/nodes/ready/poll?timeout=30&interval=5",
+                headers=auth_headers,
+            )
+
+        assert resp.status_code == 200
+        assert resp.headers["X-Readiness-Status"] == "complete"
+        assert resp.json()["all_ready"] is True
+        assert time.monotonic() - start < 5
+
+    def test_poll_wakes_on_coalesced_node_states_frame(
+        self, test_client: TestClient, auth_headers: dict, test_db: Session,
+        test_user: models.User,
+    ):
+        """A batched node_states frame (coalesced updates) completes the poll."""
+        import asyncio
+        import time
+
+        from app.services.broadcaster import get_broadcaster
+
+        lab = make_lab(test_db, test_user, state=LabState.RUNNING)
+        make_node(test_db, lab, name="r1")
+        make_node(test_db, lab, name="r2")
+        states = [
+            make_node_state(
+                test_db, lab, name,
+                actual_state=NodeActualState.RUNNING,
+                desired_state=NodeDesiredState.RUNNING,
+                is_ready=False,
+            )
+            for name in ("r1", "r2")
+        ]
+
+        async def events(_lab_id, subscribed=None):
+            subscribed.set()
+            await asyncio.sleep(0.2)
+            for ns in states:
+                ns.is_ready = True
+            test_db.commit()
+            yield {"type": "node_states", "data": {"nodes": [
+                {
+                    "node_id": ns.node_id, "node_name": ns.node_name,
+                    "desired_state": "running", "actual_state": "running", "is_ready": True,
+                }
+                for ns in states
+            ]}}
+            await asyncio.Event().wait()
+
+        get_broadcaster().subscribe = events
+        start = time.monotonic()
+        with patch(
+            "app.routers.labs.get_online_agent_for_lab", AsyncMock(return_value=None),
+        ):
+            resp = test_client.get(
+                f"/labs/{lab.id}/nodes/ready/poll?timeout=30&interval=5",
+                headers=auth_headers,
+            )
+
+        assert resp.status_code == 200
+        assert resp.headers["X-Readiness-Status"] == "complete"
+        assert resp.json()["all_ready"] is True
+        assert time.monotonic() - start < 5
+
+    def test_poll_probe_persists_agent_readiness(
+        self, test_client: TestClient, auth_headers: dict, test_db: Session,
+        test_user: models.User,
+    ):
+        """The shared agent sweep commits readiness and broadcasts it."""
+        from app.services.broadcaster import get_broadcaster
+
+        host = make_host(test_db)
+        lab = make_lab(test_db, test_user, state=LabState.RUNNING, agent_id=host.id)
+        make_node(test_db, lab, name="r1")
+        ns = make_node_state(
+            test_db, lab, "r1",
+            actual_state=NodeActualState.RUNNING,
+            desired_state=NodeDesiredState.RUNNING,
+            is_ready=False,
+        )
+        test_db.refresh(host)
+
+        with patch(
+            "app.routers.labs.get_online_agent_for_lab", AsyncMock(return_value=host),
+        ), patch("app.routers.labs.agent_client") as mock_ac:
+            mock_ac.check_node_readiness = AsyncMock(return_value={
+                "is_ready": True, "progress_percent": 100, "message": "Boot complete",
+            })
+            resp = test_client.get(
+                f"/labs/{lab.id}/nodes/ready/poll?timeout=10&interval=5",
+                headers=auth_headers,
+            )
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["all_ready"] is True
+        assert data["nodes"][0]["message"] == "Boot complete"
+        mock_ac.check_node_readiness.assert_awaited_once()
+        test_db.expire_all()
+        assert test_db.get(models.NodeState, ns.id).is_ready is True
+        get_broadcaster().publish_node_state.assert_called()
+
+
 # ---------------------------------------------------------------------------
 # GET /labs/{lab_id}/nodes/{node_id}/interfaces — get_node_interfaces
 # ---------------------------------------------------------------------------
@@ -14,6 +14,7 @@ from __future__ import annotations
 import json
 from unittest.mock import AsyncMock, MagicMock
 
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app import models
@@ -344,6 +345,100 @@ class TestGetLabLogs:
         resp = test_client.get("/labs/missing/logs", headers=auth_headers)
         assert resp.status_code == 404
 
+    def test_logs_indexed_incrementally_on_append(
+        self, test_client, auth_headers, sample_lab, test_db, test_user
+    ):
+        """Appended lines are parsed once, keeping host sections across appends."""
+        job = models.Job(
+            lab_id=sample_lab.id,
+            user_id=test_user.id,
+            action="up",
+            status="running",
+            log_path="=== Host: agent-a (host-a) ===\nDeploy started",
+        )
+        test_db.add(job)
+        test_db.commit()
+        job.log_path = job.log_path + "\nERROR: node r1 failed"
+        test_db.commit()
+
+        entries = (
+            test_db.query(models.JobLogEntry)
+            .filter(models.JobLogEntry.job_id == job.id)
+            .order_by(models.JobLogEntry.seq)
+            .all()
+        )
+        assert [(e.seq, e.level, e.host_name) for e in entries] == [
+            (0, "info", "agent-a"),
+            (1, "error", "agent-a"),
+        ]
+
+        resp = test_client.get(
+            f"/labs/{sample_lab.id}/logs?level=error&search=r1", headers=auth_headers
+        )
+        data = resp.json()
+        assert data["total_count"] == 1
+        assert data["entries"][0]["message"] == "ERROR: node r1 failed"
+        assert data["entries"][0]["host_id"] == "host-a"
+        assert "agent-a" in data["hosts"]
+
+    def test_logs_keyset_pagination(
+        self, test_client, auth_headers, sample_lab, test_db, test_user
+    ):
+        """next_cursor walks every entry exactly once."""
+        job = models.Job(
+            lab_id=sample_lab.id,
+            user_id=test_user.id,
+            action="up",
+            status="completed",
+            log_path="\n".join(f"step {i}" for i in range(5)),
+        )
+        test_db.add(job)
+        test_db.commit()
+
+        messages = []
+        cursor = None
+        while True:
+            url = f"/labs/{sample_lab.id}/logs?limit=2"
+            if cursor:
+                url += f"&cursor={cursor}"
+            data = test_client.get(url, headers=auth_headers).json()
+            assert data["total_count"] == 5
+            messages.extend(e["message"] for e in data["entries"])
+            cursor = data["next_cursor"]
+            if not data["has_more"]:
+                break
+        assert messages == [f"step {i}" for i in range(5)]
+
+    def test_logs_invalid_cursor(self, test_client, auth_headers, sample_lab):
+        resp = test_client.get(
+            f"/labs/{sample_lab.id}/logs?cursor=not-a-cursor", headers=auth_headers
+        )
+        assert resp.status_code == 400
+
+    def test_logs_backfills_legacy_job(
+        self, test_client, auth_headers, sample_lab, test_db, test_user
+    ):
+        """Jobs logged before indexing existed are indexed on first view."""
+        job = models.Job(
+            lab_id=sample_lab.id,
+            user_id=test_user.id,
+            action="up",
+            status="completed",
+        )
+        test_db.add(job)
+        test_db.commit()
+        # Simulate a row written before chunked storage existed
+        test_db.execute(
+            update(models.Job)
+            .where(models.Job.id == job.id)
+            .values(log_path="legacy line one\nlegacy line two")
+        )
+        test_db.commit()
+
+        data = test_client.get(f"/labs/{sample_lab.id}/logs", headers=auth_headers).json()
+        assert [e["message"] for e in data["entries"]] == ["legacy line one", "legacy line two"]
+        assert test_db.query(models.JobLogEntry).count() == 2
+
 
 # ============================================================================
 # GET /labs/{lab_id}/nodes/{node_id}/interfaces
@@ -1,7 +1,9 @@
 """Coverage tests for app.routers.images.upload_docker — helpers, endpoints, error paths."""
 from __future__ import annotations
 
+import hashlib
 import io
+import os
 import subprocess
 import tarfile
 from datetime import datetime, timezone
@@ -16,11 +18,11 @@ from app.routers.images._shared import (
     _chunk_upload_lock,
     _chunk_upload_sessions,
     _get_progress,
+    _spool_upload_to_tempfile,
     _update_progress,
 )
 from app.routers.images.upload_docker import (
     _archive_docker_image,
-    _load_image_background,
     _load_image_background_from_archive,
     _run_docker_with_progress,
 )
@@ -153,6 +155,32 @@ class TestLoadImageEndpoint:
         assert "upload_id" in data
         assert data["status"] == "started"
 
+    def test_background_mode_hands_off_spooled_archive(self, test_client, admin_auth_headers, monkeypatch):
+        """The upload is staged on disk and the worker gets its path and digest."""
+        monkeypatch.setattr(
+            "app.routers.images.upload_docker.ResourceMonitor.check_disk_pressure",
+            lambda: PressureLevel.NORMAL,
+        )
+        started = []
+        monkeypatch.setattr(img.threading, "Thread", lambda **kw: MagicMock(start=lambda: started.append(kw)))
+        tar_data = _make_tar_bytes(["rootfs/bin"])
+        resp = test_client.post(
+            "/images/load?background=true",
+            headers=admin_auth_headers,
+            files={"file": ("image.tar", io.BytesIO(tar_data), "application/x-tar")},
+        )
+        assert resp.status_code == 200
+        (kw,) = started
+        assert kw["target"] is _load_image_background_from_archive
+        upload_id, filename, archive_path = kw["args"]
+        assert upload_id == resp.json()["upload_id"]
+        assert filename == "image.tar"
+        try:
+            assert Path(archive_path).read_bytes() == tar_data
+            assert kw["kwargs"]["sha256"] == hashlib.sha256(tar_data).hexdigest()
+        finally:
+            os.unlink(archive_path)
+
     def test_requires_admin(self, test_client, auth_headers):
         """Regular user cannot upload images."""
         tar_data = _make_tar_bytes(["rootfs/bin"])
@@ -164,6 +192,43 @@ class TestLoadImageEndpoint:
         assert resp.status_code == 403
 
 
+class TestSpoolUpload:
+    """Tests for _spool_upload_to_tempfile."""
+
+    def test_copies_in_bounded_reads_and_hashes(self, monkeypatch):
+        monkeypatch.setattr("app.routers.images._shared.UPLOAD_SPOOL_BUFFER_SIZE", 4096)
+        data = os.urandom(4096 * 5 + 17)
+        source = io.BytesIO(data)
+        reads = []
+        real_read = source.read
+
+        def tracking_read(size=-1):
+            reads.append(size)
+            return real_read(size)
+
+        source.read = tracking_read
+
+        path, size, digest = _spool_upload_to_tempfile(source, ".tar")
+        try:
+            assert Path(path).read_bytes() == data
+            assert size == len(data)
+            assert digest == hashlib.sha256(data).hexdigest()
+            assert set(reads) == {4096}
+        finally:
+            os.unlink(path)
+
+    def test_read_error_removes_partial_file(self, monkeypatch, tmp_path):
+        monkeypatch.setattr("app.routers.images._shared.tempfile.tempdir", str(tmp_path))
+
+        class BrokenStream:
+            def read(self, _size):
+                raise OSError("client went away")
+
+        with pytest.raises(OSError):
+            _spool_upload_to_tempfile(BrokenStream(), ".tar")
+        assert list(tmp_path.iterdir()) == []
+
+
 # ---------------------------------------------------------------------------
 # 4. init_chunk_upload endpoint
 # ---------------------------------------------------------------------------
@@ -315,17 +380,16 @@ class TestCancelAndStatus:
 
 
 # ---------------------------------------------------------------------------
-# 7. _load_image_background — unit tests (mocked subprocess)
+# 7. _load_image_background_from_archive — docker load (mocked subprocess)
 # ---------------------------------------------------------------------------
 
 class TestLoadImageBackground:
-    """Unit tests for _load_image_background helper."""
+    """Docker load branches of _load_image_background_from_archive."""
 
     def test_docker_load_success(self, tmp_path, monkeypatch):
         """Successful docker load updates progress to complete."""
         tar_path = tmp_path / "docker.tar"
         _make_tar_file(tar_path, ["manifest.json"])
-        content = tar_path.read_bytes()
 
         fake_result = MagicMock(
             returncode=0,
@@ -354,7 +418,7 @@ class TestLoadImageBackground:
             "app.routers.images.upload_docker.save_manifest", lambda m: None,
         )
 
-        _load_image_background("bg-1", "docker.tar", content)
+        _load_image_background_from_archive("bg-1", "docker.tar", str(tar_path))
 
         progress = _get_progress("bg-1")
         assert progress is not None
@@ -365,7 +429,6 @@ class TestLoadImageBackground:
         """Subprocess timeout sets error progress."""
         tar_path = tmp_path / "docker.tar"
         _make_tar_file(tar_path, ["manifest.json"])
-        content = tar_path.read_bytes()
 
         monkeypatch.setattr(
             "app.routers.images.upload_docker._is_docker_image_tar", lambda p: True,
@@ -375,7 +438,7 @@ class TestLoadImageBackground:
             MagicMock(side_effect=subprocess.TimeoutExpired(cmd="docker", timeout=600)),
         )
 
-        _load_image_background("bg-timeout", "docker.tar", content)
+        _load_image_background_from_archive("bg-timeout", "docker.tar", str(tar_path))
 
         progress = _get_progress("bg-timeout")
         assert progress is not None
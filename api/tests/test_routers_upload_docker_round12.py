@@ -22,7 +22,6 @@ from app.routers.images._shared import (
     _get_progress,
 )
 from app.routers.images.upload_docker import (
-    _load_image_background,
     _load_image_background_from_archive,
 )
 from app.services.resource_monitor import PressureLevel
@@ -66,7 +65,7 @@ def _clear_chunk_state(monkeypatch):
 
 
 # ---------------------------------------------------------------------------
-# 1. _load_image_background — XZ decompression failure (LZMAError)
+# 1. _load_image_background_from_archive — XZ decompression failure (LZMAError)
 # ---------------------------------------------------------------------------
 
 class TestLoadImageBackgroundXzFailure:
@@ -77,14 +76,13 @@ class TestLoadImageBackgroundXzFailure:
         # Create a file pretending to be .tar.xz but with invalid content
         bad_xz = tmp_path / "bad.tar.xz"
         bad_xz.write_bytes(b"not-valid-xz-data")
-        content = bad_xz.read_bytes()
 
         # _is_docker_image_tar should not be reached, but mock it anyway
         monkeypatch.setattr(
             "app.routers.images.upload_docker._is_docker_image_tar", lambda p: True,
         )
 
-        _load_image_background("xz-fail-1", "bad.tar.xz", content)
+        _load_image_background_from_archive("xz-fail-1", "bad.tar.xz", str(bad_xz))
 
         progress = _get_progress("xz-fail-1")
         assert progress is not None
@@ -93,7 +91,7 @@ class TestLoadImageBackgroundXzFailure:
 
 
 # ---------------------------------------------------------------------------
-# 2. _load_image_background — non-docker tar (docker import) success
+# 2. _load_image_background_from_archive — non-docker tar (docker import) success
 # ---------------------------------------------------------------------------
 
 class TestLoadImageBackgroundDockerImport:
@@ -104,7 +102,6 @@ class TestLoadImageBackgroundDockerImport:
         tar_path = tmp_path / "ceos-lab.tar"
         # No manifest.json → not a docker image → import path
         _make_tar_file(tar_path, ["rootfs/bin/sh"])
-        content = tar_path.read_bytes()
 
         monkeypatch.setattr(
             "app.routers.images.upload_docker._is_docker_image_tar", lambda p: False,
@@ -153,7 +150,7 @@ class TestLoadImageBackgroundDockerImport:
             "app.routers.images.upload_docker.save_manifest", lambda m: None,
         )
 
-        _load_image_background("import-ok-1", "ceos-lab.tar", content)
+        _load_image_background_from_archive("import-ok-1", "ceos-lab.tar", str(tar_path))
 
         progress = _get_progress("import-ok-1")
         assert progress is not None
@@ -164,7 +161,6 @@ class TestLoadImageBackgroundDockerImport:
         """docker import timeout sets error progress."""
         tar_path = tmp_path / "big.tar"
         _make_tar_file(tar_path, ["rootfs/bin/sh"])
-        content = tar_path.read_bytes()
 
         monkeypatch.setattr(
             "app.routers.images.upload_docker._is_docker_image_tar", lambda p: False,
@@ -174,7 +170,7 @@ class TestLoadImageBackgroundDockerImport:
             MagicMock(side_effect=subprocess.TimeoutExpired(cmd="docker", timeout=600)),
         )
 
-        _load_image_background("import-timeout-1", "big.tar", content)
+        _load_image_background_from_archive("import-timeout-1", "big.tar", str(tar_path))
 
         progress = _get_progress("import-timeout-1")
         assert progress is not None
@@ -185,7 +181,6 @@ class TestLoadImageBackgroundDockerImport:
         """docker import non-zero exit sets error progress."""
         tar_path = tmp_path / "bad.tar"
         _make_tar_file(tar_path, ["rootfs/bin/sh"])
-        content = tar_path.read_bytes()
 
         monkeypatch.setattr(
             "app.routers.images.upload_docker._is_docker_image_tar", lambda p: False,
@@ -193,7 +188,7 @@ class TestLoadImageBackgroundDockerImport:
         fake_result = MagicMock(returncode=1)
         monkeypatch.setattr(subprocess, "run", lambda *a, **kw: fake_result)
 
-        _load_image_background("import-fail-1", "bad.tar", content)
+        _load_image_background_from_archive("import-fail-1", "bad.tar", str(tar_path))
 
         progress = _get_progress("import-fail-1")
         assert progress is not None
@@ -201,7 +196,7 @@ class TestLoadImageBackgroundDockerImport:
 
 
 # ---------------------------------------------------------------------------
-# 3. _load_image_background — no images detected
+# 3. _load_image_background_from_archive — no images detected
 # ---------------------------------------------------------------------------
 
 class TestLoadImageBackgroundNoImages:
@@ -210,7 +205,6 @@ class TestLoadImageBackgroundNoImages:
     def test_no_images_detected_sets_error(self, tmp_path, monkeypatch):
         tar_path = tmp_path / "empty.tar"
         _make_tar_file(tar_path, ["manifest.json"])
-        content = tar_path.read_bytes()
 
         monkeypatch.setattr(
             "app.routers.images.upload_docker._is_docker_image_tar", lambda p: True,
@@ -219,7 +213,7 @@ class TestLoadImageBackgroundNoImages:
         fake_result = MagicMock(returncode=0, stdout="Nothing happened\n", stderr="")
         monkeypatch.setattr(subprocess, "run", lambda *a, **kw: fake_result)
 
-        _load_image_background("no-img-1", "empty.tar", content)
+        _load_image_background_from_archive("no-img-1", "empty.tar", str(tar_path))
 
         progress = _get_progress("no-img-1")
         assert progress is not None
@@ -228,7 +222,7 @@ class TestLoadImageBackgroundNoImages:
 
 
 # ---------------------------------------------------------------------------
-# 4. _load_image_background — duplicate image in manifest
+# 4. _load_image_background_from_archive — duplicate image in manifest
 # ---------------------------------------------------------------------------
 
 class TestLoadImageBackgroundDuplicate:
@@ -237,7 +231,6 @@ class TestLoadImageBackgroundDuplicate:
     def test_duplicate_image_sets_error(self, tmp_path, monkeypatch):
         tar_path = tmp_path / "dup.tar"
         _make_tar_file(tar_path, ["manifest.json"])
-        content = tar_path.read_bytes()
 
         monkeypatch.setattr(
             "app.routers.images.upload_docker._is_docker_image_tar", lambda p: True,
@@ -256,7 +249,7 @@ class TestLoadImageBackgroundDuplicate:
             lambda m, i: {"id": i},
         )
 
-        _load_image_background("dup-1", "dup.tar", content)
+        _load_image_background_from_archive("dup-1", "dup.tar", str(tar_path))
 
         progress = _get_progress("dup-1")
         assert progress is not None
@@ -0,0 +1,192 @@
+"""Tests for app.services.docker_layer_delta and layer-delta Docker syncs."""
+from __future__ import annotations
+
+import io
+import json
+import tarfile
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.docker_layer_delta import (
+    iter_layer_delta,
+    plan_layer_delta,
+    read_archive_layers,
+)
+
+
+def _add(archive: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    archive.addfile(info, io.BytesIO(data))
+
+
+def _write_save_archive(path, layers: list[tuple[str, bytes]], *, link_last_to_first: bool = False):
+    """Write a legacy-layout ``docker save`` archive with the given (diff_id, data) layers."""
+    members = []
+    with tarfile.open(path, "w") as archive:
+        for index, (_diff_id, data) in enumerate(layers):
+            name = f"layer{index}/layer.tar"
+            if link_last_to_first and index == len(layers) - 1:
+                info = tarfile.TarInfo(name)
+                info.type = tarfile.SYMTYPE
+                info.linkname = "../layer0/layer.tar"
+                archive.addfile(info)
+            else:
+                _add(archive, name, data)
+            members.append(name)
+        config = {"rootfs": {"type": "layers", "diff_ids": [d for d, _ in layers]}}
+        _add(archive, "config.json", json.dumps(config).encode())
+        manifest = [{"Config": "config.json", "RepoTags": ["ceos:4.32.2F"], "Layers": members}]
+        _add(archive, "manifest.json", json.dumps(manifest).encode())
+    return path
+
+
+def _delta_members(delta) -> dict[str, bytes]:
+    data = b"".join(iter_layer_delta(delta, 4096))
+    assert len(data) == delta.size
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        return {
+            m.name: (archive.extractfile(m).read() if m.isfile() else m.linkname)
+            for m in archive.getmembers()
+        }
+
+
+LAYERS = [("sha256:base", b"b" * 5000), ("sha256:mid", b"m" * 3000), ("sha256:top", b"t" * 700)]
+
+
+class TestLayerDelta:
+    def test_reads_layers_in_manifest_order(self, tmp_path):
+        layers = read_archive_layers(_write_save_archive(tmp_path / "img.tar", LAYERS))
+        assert layers.diff_ids == ["sha256:base", "sha256:mid", "sha256:top"]
+        assert layers.layer_members == ["layer0/layer.tar", "layer1/layer.tar", "layer2/layer.tar"]
+
+    def test_rejects_non_archive(self, tmp_path):
+        path = tmp_path / "img.tar"
+        path.write_bytes(b"not a tar")
+        with pytest.raises(ValueError):
+            read_archive_layers(path)
+
+    def test_delta_omits_present_layers_only(self, tmp_path):
+        layers = read_archive_layers(_write_save_archive(tmp_path / "img.tar", LAYERS))
+
+        delta = plan_layer_delta(layers, 2)
+        members = _delta_members(delta)
+
+        assert set(members) == {"layer2/layer.tar", "config.json", "manifest.json"}
+        assert members["layer2/layer.tar"] == b"t" * 700
+        assert json.loads(members["manifest.json"])[0]["Layers"] == layers.layer_members
+        assert delta.bytes_saved >= 8000
+
+    def test_full_delta_keeps_everything(self, tmp_path):
+        layers = read_archive_layers(_write_save_archive(tmp_path / "img.tar", LAYERS))
+        assert len(_delta_members(plan_layer_delta(layers, 0))) == 5
+
+    def test_link_target_of_kept_layer_is_kept(self, tmp_path):
+        path = _write_save_archive(
+            tmp_path / "img.tar", LAYERS + [("sha256:base", b"")], link_last_to_first=True,
+        )
+        layers = read_archive_layers(path)
+
+        members = _delta_members(plan_layer_delta(layers, 2))
+
+        assert members["layer0/layer.tar"] == b"b" * 5000
+        assert "layer1/layer.tar" not in members
+        assert members["layer3/layer.tar"] == "../layer0/layer.tar"
+
+
+# ---------------------------------------------------------------------------
+# _execute_sync_job with layer deltas
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def _fake_session_ctx(test_db):
+    yield test_db
+
+
+def _agent_client(present_layers: int, load_result: dict, received: list[bytes]):
+    async def fake_post(url, **kwargs):
+        response = MagicMock()
+        response.raise_for_status = MagicMock()
+        if url.endswith("/images/layers/missing"):
+            response.json.return_value = {"present_layers": present_layers, "missing": []}
+        elif url.endswith("/images/load-stream"):
+            received.append(b"".join([chunk async for chunk in kwargs["content"]]))
+            response.json.return_value = load_result
+        else:
+            response.json.return_value = {"success": True}
+        return response
+
+    client = AsyncMock()
+    client.post = AsyncMock(side_effect=fake_post)
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=False)
+    return client
+
+
+async def _run_sync(test_db, sample_host, tmp_path, client, job_id):
+    from app.routers.images.sync import _execute_sync_job
+
+    job = models.ImageSyncJob(id=job_id, image_id="docker:ceos:4.32.2F", host_id=sample_host.id, status="pending")
+    test_db.add(job)
+    test_db.commit()
+    archive = _write_save_archive(tmp_path / "ceos.tar", LAYERS)
+    image = {
+        "id": "docker:ceos:4.32.2F",
+        "reference": "ceos:4.32.2F",
+        "kind": "docker",
+        "archive_status": "ready",
+        "archive_path": str(archive),
+    }
+    with (
+        patch("app.db.get_session", lambda: _fake_session_ctx(test_db)),
+        patch("httpx.AsyncClient", return_value=client),
+        patch("app.agent_client._get_agent_auth_headers", return_value={}),
+    ):
+        await _execute_sync_job(job_id, image["id"], image, sample_host)
+    test_db.refresh(job)
+    return job, archive
+
+
+async def test_sync_sends_only_missing_layers(test_db: Session, sample_host, tmp_path):
+    received: list[bytes] = []
+    client = _agent_client(2, {"success": True}, received)
+
+    job, archive = await _run_sync(test_db, sample_host, tmp_path, client, "delta-ok")
+
+    assert job.status == "completed"
+    urls = [call.args[0] for call in client.post.call_args_list]
+    assert not any(url.endswith("/images/receive") for url in urls)
+    with tarfile.open(fileobj=io.BytesIO(received[0])) as sent:
+        assert "layer0/layer.tar" not in sent.getnames()
+        assert "layer2/layer.tar" in sent.getnames()
+    assert job.bytes_transferred == len(received[0])
+    assert job.bytes_saved == archive.stat().st_size - len(received[0])
+    assert job.bytes_saved > 0
+
+
+async def test_failed_delta_load_falls_back_to_full_archive(test_db: Session, sample_host, tmp_path):
+    received: list[bytes] = []
+    client = _agent_client(2, {"success": False, "error": "layer not found"}, received)
+
+    job, archive = await _run_sync(test_db, sample_host, tmp_path, client, "delta-fallback")
+
+    assert job.status == "completed"
+    assert client.post.call_args_list[-1].args[0].endswith("/images/receive")
+    assert job.bytes_saved == 0
+    assert job.total_bytes == archive.stat().st_size
+
+
+async def test_agent_without_layers_gets_full_archive(test_db: Session, sample_host, tmp_path):
+    received: list[bytes] = []
+    client = _agent_client(0, {"success": True}, received)
+
+    job, _archive = await _run_sync(test_db, sample_host, tmp_path, client, "delta-none")
+
+    assert job.status == "completed"
+    assert received == []
+    assert client.post.call_args_list[-1].args[0].endswith("/images/receive")
@@ -0,0 +1,128 @@
+"""Tests for app.services.docker_save_cache — shared docker save producer and LRU cache."""
+from __future__ import annotations
+
+import asyncio
+import os
+
+import pytest
+
+from app.config import settings
+from app.services import docker_save_cache as cache
+
+
+class _SlowStream:
+    def __init__(self, chunks: list[bytes]):
+        self._chunks = list(chunks)
+
+    async def read(self, _size: int) -> bytes:
+        await asyncio.sleep(0.01)
+        return self._chunks.pop(0) if self._chunks else b""
+
+
+class _SaveProc:
+    def __init__(self, chunks: list[bytes], returncode: int = 0):
+        self.stdout = _SlowStream(chunks)
+        self.returncode = None
+        self._final = returncode
+
+    async def communicate(self):
+        self.returncode = self._final
+        return b"", b"" if self._final == 0 else b"save exploded"
+
+    def kill(self):
+        pass
+
+
+class _InspectProc:
+    returncode = 0
+
+    async def communicate(self):
+        return b"sha256:abc\n", b""
+
+
+@pytest.fixture(autouse=True)
+def _cache_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "workspace", str(tmp_path))
+    monkeypatch.setattr(settings, "qcow2_store", None, raising=False)
+    monkeypatch.setattr(cache, "_productions", {})
+    monkeypatch.setattr(cache, "_TAIL_POLL_SECONDS", 0.001)
+
+
+def _fake_docker(monkeypatch, chunks: list[bytes], returncode: int = 0) -> list[tuple]:
+    calls = []
+
+    async def fake_exec(*args, **_kwargs):
+        calls.append(args)
+        if args[:2] == ("docker", "image"):
+            return _InspectProc()
+        return _SaveProc(chunks, returncode)
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    return calls
+
+
+async def _collect(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+async def test_concurrent_readers_share_one_save(monkeypatch):
+    chunks = [b"aa", b"bb", b"cc"]
+    calls = _fake_docker(monkeypatch, chunks)
+    key = await cache.docker_save_cache_key("ceos:4.30")
+
+    results = await asyncio.gather(
+        *(_collect(cache.stream_docker_archive("ceos:4.30", key)) for _ in range(5))
+    )
+
+    assert results == [b"aabbcc"] * 5
+    assert sum(1 for c in calls if c[:2] == ("docker", "save")) == 1
+    archive = cache.get_cached_archive(key)
+    assert archive is not None and archive.size == 6
+    assert archive.path.read_bytes() == b"aabbcc"
+    assert not list(archive.path.parent.glob("*.partial"))
+
+
+async def test_materialize_reuses_cached_archive(monkeypatch):
+    calls = _fake_docker(monkeypatch, [b"data"])
+
+    first, second = await asyncio.gather(
+        cache.materialize_docker_archive("ceos:4.30"),
+        cache.materialize_docker_archive("ceos:4.30"),
+    )
+    third = await cache.materialize_docker_archive("ceos:4.30")
+
+    assert first.path == second.path == third.path
+    assert third.size == 4
+    assert sum(1 for c in calls if c[:2] == ("docker", "save")) == 1
+
+
+async def test_failed_save_is_not_cached(monkeypatch):
+    _fake_docker(monkeypatch, [b"part"], returncode=1)
+
+    with pytest.raises(ValueError, match="save exploded"):
+        await cache.materialize_docker_archive("ceos:4.30")
+
+    key = await cache.docker_save_cache_key("ceos:4.30")
+    assert cache.get_cached_archive(key) is None
+    assert not list(cache.ensure_docker_save_cache_root().iterdir())
+
+
+def test_evicts_least_recently_used_first():
+    root = cache.ensure_docker_save_cache_root()
+    for age, name in enumerate(["newest", "middle", "oldest"]):
+        path = root / f"{name}.tar"
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (1000 - age * 100, 1000 - age * 100))
+
+    assert cache.evict_docker_save_cache(max_bytes=15) == 2
+    assert [p.name for p in root.iterdir()] == ["newest.tar"]
+
+
+def test_eviction_keeps_named_entry():
+    root = cache.ensure_docker_save_cache_root()
+    (root / "old.tar").write_bytes(b"x" * 10)
+    os.utime(root / "old.tar", (1, 1))
+
+    cache.evict_docker_save_cache(max_bytes=0, keep="old")
+
+    assert (root / "old.tar").exists()
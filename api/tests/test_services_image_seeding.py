@@ -0,0 +1,230 @@
+"""Tests for app.services.image_seeding and peer-seeded image syncs."""
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.image_seeding import (
+    CONTROLLER_SOURCE,
+    assign_image_source,
+    pick_image_source,
+    seed_url,
+)
+
+IMAGE_ID = "qcow2:/var/lib/archetype/images/veos.qcow2"
+REFERENCE = "/var/lib/archetype/images/veos.qcow2"
+
+
+def _host(db: Session, host_id: str, *, seed: bool = True, status: str = "online") -> models.Host:
+    features = ["console", "status"] + (["image_seed"] if seed else [])
+    host = models.Host(
+        id=host_id,
+        name=host_id,
+        address=f"127.0.0.1:{8100 + len(host_id)}",
+        status=status,
+        capabilities=json.dumps({"providers": ["docker"], "features": features}),
+    )
+    db.add(host)
+    db.commit()
+    return host
+
+
+def _synced(db: Session, host_id: str, image_id: str = IMAGE_ID) -> None:
+    db.add(models.ImageHost(image_id=image_id, host_id=host_id, reference=REFERENCE, status="synced"))
+    db.commit()
+
+
+def _uploading(db: Session, host_id: str, source: str, image_id: str = IMAGE_ID) -> models.ImageSyncJob:
+    job = models.ImageSyncJob(image_id=image_id, host_id=host_id, status="transferring", source=source)
+    db.add(job)
+    db.commit()
+    return job
+
+
+class TestPickImageSource:
+    def test_controller_serves_first_copy(self, test_db: Session):
+        _host(test_db, "target")
+        assert pick_image_source(test_db, IMAGE_ID, "target") == CONTROLLER_SOURCE
+
+    def test_prefers_least_busy_synced_peer(self, test_db: Session):
+        for host_id in ("a", "b", "target", "other"):
+            _host(test_db, host_id)
+        _synced(test_db, "a")
+        _synced(test_db, "b")
+        _uploading(test_db, "other", "a")
+
+        assert pick_image_source(test_db, IMAGE_ID, "target") == "b"
+
+    def test_skips_peers_that_cannot_seed(self, test_db: Session):
+        _host(test_db, "old-agent", seed=False)
+        _host(test_db, "offline", status="offline")
+        _host(test_db, "target")
+        _synced(test_db, "old-agent")
+        _synced(test_db, "offline")
+
+        assert pick_image_source(test_db, IMAGE_ID, "target") == CONTROLLER_SOURCE
+
+    def test_busy_peer_slots_count_every_image(self, test_db: Session, monkeypatch):
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "image_seed_max_uploads_per_source", 1)
+        for host_id in ("a", "target", "other"):
+            _host(test_db, host_id)
+        _synced(test_db, "a")
+        _uploading(test_db, "other", "a", image_id="docker:ceos:4.32.2F")
+
+        assert pick_image_source(test_db, IMAGE_ID, "target") == CONTROLLER_SOURCE
+
+    def test_waits_when_every_source_is_busy(self, test_db: Session):
+        for host_id in ("t1", "t2", "target"):
+            _host(test_db, host_id)
+        _uploading(test_db, "t1", CONTROLLER_SOURCE)
+        _uploading(test_db, "t2", CONTROLLER_SOURCE)
+
+        assert pick_image_source(test_db, IMAGE_ID, "target") is None
+        # Controller slots are per image
+        assert pick_image_source(test_db, "docker:other", "target") == CONTROLLER_SOURCE
+
+    def test_distribution_fans_out_as_a_tree(self, test_db: Session):
+        """30 agents sync in 4 rounds instead of the 15 the controller alone needs."""
+        targets = [f"agent-{i:02d}" for i in range(30)]
+        for host_id in targets:
+            _host(test_db, host_id)
+
+        waiting = list(targets)
+        rounds = 0
+        while waiting:
+            rounds += 1
+            started = []
+            for host_id in list(waiting):
+                source = pick_image_source(test_db, IMAGE_ID, host_id)
+                if source is not None:
+                    started.append(_uploading(test_db, host_id, source))
+                    waiting.remove(host_id)
+            assert started, "no source was available"
+            for job in started:
+                job.status = "completed"
+                _synced(test_db, job.host_id)
+            test_db.commit()
+
+        assert rounds == 4
+
+
+def test_seed_url_quotes_reference(test_db: Session):
+    host = _host(test_db, "peer")
+    url = seed_url(host, REFERENCE)
+    assert url == f"http://{host.address}/images/seed?reference=%2Fvar%2Flib%2Farchetype%2Fimages%2Fveos.qcow2"
+
+
+async def test_source_wait_releases_the_transaction(test_db: Session, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "image_seed_enabled", True)
+    monkeypatch.setattr(settings, "image_seed_source_wait", 60)
+    for host_id in ("t1", "t2", "target"):
+        _host(test_db, host_id)
+    busy = _uploading(test_db, "t1", CONTROLLER_SOURCE)
+    _uploading(test_db, "t2", CONTROLLER_SOURCE)
+    job = models.ImageSyncJob(image_id=IMAGE_ID, host_id="target", status="pending")
+    test_db.add(job)
+    test_db.commit()
+
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        # No transaction (and pooled connection) is held across the wait
+        assert not test_db.in_transaction()
+        sleeps.append(seconds)
+        busy.status = "completed"
+        test_db.commit()
+
+    with patch("app.services.image_seeding.asyncio.sleep", side_effect=fake_sleep):
+        assert await assign_image_source(test_db, job, "target") is None
+
+    assert len(sleeps) == 1
+    assert job.source == CONTROLLER_SOURCE
+
+
+# ---------------------------------------------------------------------------
+# _execute_sync_job with a seeding peer
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def _fake_session_ctx(test_db):
+    yield test_db
+
+
+def _agent_client(progress: list[dict]):
+    async def fake_post(url, **kwargs):
+        response = MagicMock()
+        response.raise_for_status = MagicMock()
+        response.json.return_value = {"job_id": f"pull-{len(progress)}"}
+        return response
+
+    async def fake_get(url, **kwargs):
+        response = MagicMock()
+        response.raise_for_status = MagicMock()
+        response.json.return_value = progress.pop(0)
+        return response
+
+    client = AsyncMock()
+    client.post = AsyncMock(side_effect=fake_post)
+    client.get = AsyncMock(side_effect=fake_get)
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=False)
+    return client
+
+
+async def _run_sync(test_db: Session, tmp_path, client) -> models.ImageSyncJob:
+    from app.routers.images.sync import _execute_sync_job
+
+    source_file = tmp_path / "veos.qcow2"
+    source_file.write_bytes(b"q" * 64)
+    image = {"id": IMAGE_ID, "reference": str(source_file), "kind": "qcow2", "sha256": "abc"}
+    _host(test_db, "target")
+    peer = _host(test_db, "peer")
+    test_db.add(models.ImageHost(image_id=IMAGE_ID, host_id=peer.id, reference=str(source_file), status="synced"))
+    job = models.ImageSyncJob(id="seeded", image_id=IMAGE_ID, host_id="target", status="pending")
+    test_db.add(job)
+    test_db.commit()
+    with (
+        patch("app.db.get_session", lambda: _fake_session_ctx(test_db)),
+        patch("httpx.AsyncClient", return_value=client),
+        patch("app.agent_client._get_agent_auth_headers", return_value={}),
+    ):
+        await _execute_sync_job(job.id, IMAGE_ID, image, "target")
+    test_db.refresh(job)
+    return job
+
+
+async def test_sync_pulls_from_assigned_peer(test_db: Session, tmp_path):
+    client = _agent_client([{"status": "completed", "progress_percent": 100, "bytes_transferred": 64}])
+
+    job = await _run_sync(test_db, tmp_path, client)
+
+    assert job.status == "completed"
+    assert job.source == "peer"
+    pull = client.post.call_args_list[0]
+    assert pull.args[0].endswith("/images/pull")
+    assert pull.kwargs["json"]["source_url"].startswith("http://127.0.0.1:8104/images/seed?reference=")
+    assert pull.kwargs["json"]["sha256"] == "abc"
+    assert client.post.await_count == 1
+
+
+async def test_failed_peer_transfer_falls_back_to_controller(test_db: Session, tmp_path):
+    client = _agent_client([
+        {"status": "failed", "error": "127.0.0.1:8104 returned 503"},
+        {"status": "completed", "progress_percent": 100, "bytes_transferred": 64},
+    ])
+
+    job = await _run_sync(test_db, tmp_path, client)
+
+    assert job.status == "completed"
+    assert job.source == CONTROLLER_SOURCE
+    fallback = client.post.call_args_list[1].kwargs["json"]
+    assert "source_url" not in fallback
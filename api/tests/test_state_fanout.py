@@ -0,0 +1,207 @@
+"""Tests for the per-process lab state fan-out hub (app/services/state_fanout.py)."""
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.state_fanout import SlowSubscriberError, StateFanoutHub, _Subscriber
+
+
+def _node(node_id: str, state: str) -> dict:
+    return {"type": "node_state", "data": {"node_id": node_id, "actual_state": state}}
+
+
+def _hub(queue_size: int = 8) -> StateFanoutHub:
+    return StateFanoutHub(AsyncMock(), queue_size=queue_size)
+
+
+class TestSubscriberQueue:
+    """Tests for the bounded per-client queue."""
+
+    @pytest.mark.asyncio
+    async def test_messages_delivered_in_order(self):
+        sub = _Subscriber("lab-1", maxsize=4)
+        sub.offer(_node("n1", "pending"))
+        sub.offer(_node("n2", "running"))
+
+        assert (await sub.get())["data"]["node_id"] == "n1"
+        assert (await sub.get())["data"]["node_id"] == "n2"
+
+    @pytest.mark.asyncio
+    async def test_full_queue_coalesces_same_node(self):
+        sub = _Subscriber("lab-1", maxsize=2)
+        sub.offer(_node("n1", "pending"))
+        sub.offer(_node("n2", "pending"))
+
+        assert sub.offer(_node("n1", "running")) == "coalesced"
+        assert len(sub) == 2
+        first = await sub.get()
+        assert first["data"] == {"node_id": "n1", "actual_state": "running"}
+
+    @pytest.mark.asyncio
+    async def test_full_queue_overflows_on_uncoalescable_message(self):
+        sub = _Subscriber("lab-1", maxsize=1)
+        sub.offer(_node("n1", "pending"))
+
+        assert sub.offer({"type": "job_progress", "data": {"job_id": "j1"}}) == "overflow"
+        assert sub.overflowed
+        with pytest.raises(SlowSubscriberError):
+            await sub.get()
+
+
+class TestDispatch:
+    """Tests for routing published messages to subscribers."""
+
+    def test_routes_by_lab_and_parses_once(self):
+        hub = _hub()
+        a = _Subscriber("lab-1", 8)
+        b = _Subscriber("lab-1", 8)
+        other = _Subscriber("lab-2", 8)
+        for sub in (a, b, other):
+            hub._add(sub)
+
+        delivered = hub.dispatch("lab_state:lab-1", json.dumps(_node("n1", "running")))
+
+        assert delivered == 2
+        assert len(a) == 1 and len(b) == 1
+        assert len(other) == 0
+        assert hub.subscriber_count == 3
+
+    def test_ignores_invalid_json_and_unknown_labs(self):
+        hub = _hub()
+        sub = _Subscriber("lab-1", 8)
+        hub._add(sub)
+
+        assert hub.dispatch("lab_state:lab-1", "not valid json") == 0
+        assert hub.dispatch("lab_state:lab-9", json.dumps(_node("n1", "running"))) == 0
+        assert hub.dispatch("other:lab-1", json.dumps(_node("n1", "running"))) == 0
+        assert len(sub) == 0
+
+    def test_remove_updates_count(self):
+        hub = _hub()
+        sub = _Subscriber("lab-1", 8)
+        hub._add(sub)
+        hub._remove(sub)
+        hub._remove(sub)
+
+        assert hub.subscriber_count == 0
+        assert "lab-1" not in hub._subscribers
+
+
+class TestSharedSubscription:
+    """Tests that many subscribers share one Redis pattern subscription."""
+
+    @pytest.mark.asyncio
+    async def test_single_psubscribe_for_many_subscribers(self):
+        pubsub = MagicMock()
+        pubsub.psubscribe = AsyncMock()
+        pubsub.punsubscribe = AsyncMock()
+        pubsub.close = AsyncMock()
+        published = [
+            {
+                "type": "pmessage",
+                "channel": "lab_state:lab-1",
+                "data": json.dumps(_node("n1", "running")),
+            }
+        ]
+
+        async def get_message(**kwargs):
+            if published:
+                return published.pop(0)
+            await asyncio.sleep(0.01)
+            return None
+
+        pubsub.get_message = get_message
+        redis = MagicMock()
+        redis.pubsub.return_value = pubsub
+        hub = StateFanoutHub(AsyncMock(return_value=redis), queue_size=8)
+
+        gens = [hub.subscribe("lab-1") for _ in range(3)]
+        received = await asyncio.wait_for(
+            asyncio.gather(*(gen.__anext__() for gen in gens)),
+            timeout=2.0,
+        )
+
+        assert [msg["data"]["node_id"] for msg in received] == ["n1"] * 3
+        redis.pubsub.assert_called_once()
+        pubsub.psubscribe.assert_awaited_once_with("lab_state:*")
+
+        for gen in gens:
+            await gen.aclose()
+        assert hub.subscriber_count == 0
+        await hub.close()
+
+    @pytest.mark.asyncio
+    async def test_subscribed_event_set_on_psubscribe_confirmation(self):
+        pubsub = MagicMock()
+        pubsub.psubscribe = AsyncMock()
+        pubsub.punsubscribe = AsyncMock()
+        pubsub.close = AsyncMock()
+        published = [
+            {"type": "psubscribe", "channel": "lab_state:*", "data": 1},
+            {
+                "type": "pmessage",
+                "channel": "lab_state:lab-1",
+                "data": json.dumps(_node("n1", "running")),
+            },
+        ]
+
+        async def get_message(**kwargs):
+            await asyncio.sleep(0.01)
+            if published:
+                return published.pop(0)
+            return None
+
+        pubsub.get_message = get_message
+        redis = MagicMock()
+        redis.pubsub.return_value = pubsub
+        hub = StateFanoutHub(AsyncMock(return_value=redis), queue_size=8)
+        subscribed = asyncio.Event()
+
+        gen = hub.subscribe("lab-1", subscribed)
+        received = await asyncio.wait_for(gen.__anext__(), timeout=2.0)
+
+        assert subscribed.is_set()
+        assert received["data"]["node_id"] == "n1"
+        await gen.aclose()
+        await hub.close()
+
+    @pytest.mark.asyncio
+    async def test_close_ends_subscriptions_after_queued_messages(self):
+        pubsub = MagicMock()
+        pubsub.psubscribe = AsyncMock()
+        pubsub.punsubscribe = AsyncMock()
+        pubsub.close = AsyncMock()
+        published = [
+            {
+                "type": "pmessage",
+                "channel": "lab_state:lab-1",
+                "data": json.dumps(_node("n1", "running")),
+            }
+        ]
+
+        async def get_message(**kwargs):
+            if published:
+                return published.pop(0)
+            await asyncio.sleep(0.01)
+            return None
+
+        pubsub.get_message = get_message
+        redis = MagicMock()
+        redis.pubsub.return_value = pubsub
+        hub = StateFanoutHub(AsyncMock(return_value=redis), queue_size=8)
+
+        async def consume():
+            return [msg async for msg in hub.subscribe("lab-1")]
+
+        consumer = asyncio.create_task(consume())
+        while published:
+            await asyncio.sleep(0.01)
+        await hub.close()
+        received = await asyncio.wait_for(consumer, timeout=2.0)
+
+        assert [msg["data"]["node_id"] for msg in received] == ["n1"]
+        assert hub.subscriber_count == 0
@@ -4,6 +4,7 @@ Tests the real-time state update WebSocket at /ws/labs/{lab_id}/state.
 """
 from __future__ import annotations
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi.testclient import TestClient
@@ -110,6 +111,90 @@ class TestWebSocketConnection:
                 data = ws.receive_json()
                 assert data["type"] == "initial_state"
 
+    def test_reconnect_with_last_seq_replays_missed_events(
+        self,
+        test_client: TestClient,
+        sample_lab: models.Lab,
+        ws_token: str,
+    ):
+        """Reconnect with last_seq should get only missed events, no snapshot."""
+        missed = [
+            {"type": "node_state", "seq": 8, "data": {"node_id": "n1"}},
+            {"type": "link_state", "seq": 9, "data": {"link_name": "R1:eth1-R2:eth1"}},
+        ]
+        with patch("app.routers.state_ws.get_broadcaster") as mock_broadcaster:
+            mock_instance = MagicMock()
+            mock_instance.subscribe = AsyncMock(return_value=self._empty_async_gen())
+            mock_instance.replay = AsyncMock(return_value=missed)
+            mock_broadcaster.return_value = mock_instance
+
+            with test_client.websocket_connect(
+                f"/ws/labs/{sample_lab.id}/state?token={ws_token}&last_seq=7"
+            ) as ws:
+                data = ws.receive_json()
+                assert data["type"] == "resume"
+                assert data["data"] == {"last_seq": 7, "count": 2}
+                assert ws.receive_json()["seq"] == 8
+                assert ws.receive_json()["seq"] == 9
+
+            mock_instance.replay.assert_awaited_once_with(sample_lab.id, 7)
+
+    def test_reconnect_with_expired_last_seq_sends_snapshot(
+        self,
+        test_client: TestClient,
+        sample_lab: models.Lab,
+        ws_token: str,
+    ):
+        """A gap older than the ring buffer should fall back to the snapshot."""
+        with patch("app.routers.state_ws.get_broadcaster") as mock_broadcaster:
+            mock_instance = MagicMock()
+            mock_instance.subscribe = AsyncMock(return_value=self._empty_async_gen())
+            mock_instance.replay = AsyncMock(return_value=None)
+            mock_instance.current_seq = AsyncMock(return_value=120)
+            mock_broadcaster.return_value = mock_instance
+
+            with test_client.websocket_connect(
+                f"/ws/labs/{sample_lab.id}/state?token={ws_token}&last_seq=3"
+            ) as ws:
+                assert ws.receive_json()["type"] == "lab_state"
+                data = ws.receive_json()
+                assert data["type"] == "initial_state"
+                assert data["data"]["seq"] == 120
+
+    def test_live_events_during_replay_follow_it_without_duplicates(
+        self,
+        test_client: TestClient,
+        sample_lab: models.Lab,
+        ws_token: str,
+    ):
+        """Live events are held until the replay is sent, minus those it covered."""
+        async def subscribe(lab_id, subscribed=None):
+            subscribed.set()
+            yield {"type": "node_state", "seq": 9, "data": {"node_id": "n1"}}
+            yield {"type": "node_state", "seq": 10, "data": {"node_id": "n2"}}
+
+        async def replay(lab_id, last_seq):
+            # Let the live events reach the subscriber first
+            await asyncio.sleep(0.05)
+            return [
+                {"type": "node_state", "seq": 8, "data": {"node_id": "n0"}},
+                {"type": "node_state", "seq": 9, "data": {"node_id": "n1"}},
+            ]
+
+        with patch("app.routers.state_ws.get_broadcaster") as mock_broadcaster:
+            mock_instance = MagicMock()
+            mock_instance.subscribe = subscribe
+            mock_instance.replay = replay
+            mock_broadcaster.return_value = mock_instance
+
+            with test_client.websocket_connect(
+                f"/ws/labs/{sample_lab.id}/state?token={ws_token}&last_seq=7"
+            ) as ws:
+                assert ws.receive_json()["type"] == "resume"
+                assert [ws.receive_json()["seq"] for _ in range(3)] == [8, 9, 10]
+                ws.send_json({"type": "ping"})
+                assert ws.receive_json()["type"] == "pong"
+
     @staticmethod
     async def _empty_async_gen():
         """Empty async generator for mocking subscribe."""
@@ -44,7 +44,7 @@ class TestNodeStateChangeFlow:
 
         messages_received = []
 
-        async def mock_subscribe(lab_id):
+        async def mock_subscribe(lab_id, subscribed=None):
             """Mock subscribe that yields one state update message."""
             yield state_update_message
 
@@ -93,7 +93,7 @@ class TestNodeStateChangeFlow:
 
         received_messages = []
 
-        async def mock_subscribe(lab_id):
+        async def mock_subscribe(lab_id, subscribed=None):
             """Mock subscribe that yields job progress."""
             yield job_progress_message
 
@@ -857,6 +857,87 @@ class TestMultiAgentReconciliation:
         mock_status.assert_called_once()
 
 
+    @pytest.mark.asyncio
+    async def test_prefetched_bulk_status_replaces_per_lab_query(self, test_db, sample_lab, sample_host):
+        """Status prefetched for the sweep is used instead of a per-lab request."""
+        from app.tasks import reconciliation_refresh
+        from app.tasks.reconciliation_db import _reconcile_single_lab
+
+        sample_lab.state = "running"
+        sample_lab.agent_id = sample_host.id
+        n1 = make_node(test_db, sample_lab.id, "R1")
+        make_node_state(
+            test_db, sample_lab.id, n1,
+            node_name="R1", desired="running", actual="undeployed",
+        )
+        make_placement(test_db, sample_lab.id, n1, sample_host.id, status="deployed")
+        test_db.commit()
+
+        prefetched = {
+            sample_host.id: reconciliation_refresh._PrefetchedStatus(
+                fetched_at=datetime.now(timezone.utc),
+                labs={sample_lab.id: {"lab_id": sample_lab.id, "nodes": [{"name": "R1", "status": "running"}]}},
+            )
+        }
+        token = reconciliation_refresh._prefetched_lab_status.set(prefetched)
+        try:
+            with patch(
+                "app.tasks.reconciliation_db.agent_client.get_lab_status_from_agent",
+                new_callable=AsyncMock,
+            ) as mock_status:
+                changes = await _reconcile_single_lab(test_db, sample_lab.id)
+        finally:
+            reconciliation_refresh._prefetched_lab_status.reset(token)
+
+        mock_status.assert_not_called()
+        assert changes >= 1
+
+    @pytest.mark.asyncio
+    async def test_prefetched_status_ignored_after_newer_job(
+        self, test_db, sample_lab, sample_host, test_user
+    ):
+        """A job created after the bulk fetch forces a live per-lab query."""
+        from app.tasks import reconciliation_refresh
+        from app.tasks.reconciliation_db import _reconcile_single_lab
+
+        sample_lab.state = "running"
+        sample_lab.agent_id = sample_host.id
+        n1 = make_node(test_db, sample_lab.id, "R1")
+        make_node_state(
+            test_db, sample_lab.id, n1,
+            node_name="R1", desired="running", actual="running",
+        )
+        make_placement(test_db, sample_lab.id, n1, sample_host.id, status="deployed")
+        fetched_at = datetime.now(timezone.utc) - timedelta(seconds=30)
+        test_db.add(models.Job(
+            id=str(uuid4()),
+            lab_id=sample_lab.id,
+            user_id=test_user.id,
+            action="sync:node:R1",
+            status="completed",
+            agent_id=sample_host.id,
+            created_at=datetime.now(timezone.utc),
+            completed_at=datetime.now(timezone.utc),
+        ))
+        test_db.commit()
+
+        prefetched = {
+            sample_host.id: reconciliation_refresh._PrefetchedStatus(fetched_at=fetched_at, labs={})
+        }
+        token = reconciliation_refresh._prefetched_lab_status.set(prefetched)
+        try:
+            with patch(
+                "app.tasks.reconciliation_db.agent_client.get_lab_status_from_agent",
+                new_callable=AsyncMock,
+            ) as mock_status:
+                mock_status.return_value = {"nodes": [{"name": "R1", "status": "running"}]}
+                await _reconcile_single_lab(test_db, sample_lab.id)
+        finally:
+            reconciliation_refresh._prefetched_lab_status.reset(token)
+
+        mock_status.assert_called_once()
+
+
 # ===================================================================
 #  Link state reconciliation
 # ===================================================================
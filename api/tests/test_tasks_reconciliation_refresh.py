@@ -1,6 +1,7 @@
 """Tests for app/tasks/reconciliation_refresh.py - Agent refresh and boot-readiness checks."""
 from __future__ import annotations
 
+import asyncio
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from unittest.mock import AsyncMock, patch
@@ -837,4 +838,215 @@ class TestReadinessChecks:
             ) as mock_check:
                 await refresh_states_from_agents()
 
-                mock_check.assert_not_called()
\ No newline at end of file
+                mock_check.assert_not_called()
+
+class TestCandidateScanCost:
+    """Tests for the batched candidate scan."""
+
+    def test_scan_query_count_does_not_grow_with_lab_count(
+        self, test_db: Session, test_user: models.User
+    ):
+        """The candidate scan should issue a fixed number of statements."""
+        from app.tasks.reconciliation_refresh import _scan_reconciliation_candidates
+
+        def _scan_queries() -> int:
+            with patch("app.tasks.reconciliation_refresh.record_reconciliation_scan") as mock_record:
+                _scan_reconciliation_candidates(test_db)
+            return mock_record.call_args.args[1]
+
+        make_lab(test_db, test_user, state=LabState.RUNNING.value)
+        baseline = _scan_queries()
+
+        inconsistent = []
+        for _ in range(15):
+            lab = make_lab(test_db, test_user, state=LabState.RUNNING.value)
+            make_node_state(
+                test_db, lab.id,
+                node_name="R1",
+                actual_state=NodeActualState.STOPPED.value,
+                desired_state=NodeDesiredState.STOPPED.value,
+            )
+            inconsistent.append(lab.id)
+
+        with patch("app.tasks.reconciliation_refresh.record_reconciliation_scan") as mock_record:
+            labs, stable_lab_ids, unready = _scan_reconciliation_candidates(test_db)
+
+        assert mock_record.call_args.args[1] == baseline
+        assert set(inconsistent) <= labs
+        assert len(stable_lab_ids) == 16
+        assert unready == []
+
+    def test_scan_collects_node_and_placement_triggers(
+        self, test_db: Session, test_user: models.User
+    ):
+        """Error nodes and orphan placements are found by the combined query."""
+        from app.tasks.reconciliation_refresh import _scan_reconciliation_candidates
+
+        error_lab = make_lab(test_db, test_user, state=LabState.ERROR.value)
+        make_node_state(
+            test_db, error_lab.id,
+            node_name="R1",
+            actual_state=NodeActualState.ERROR.value,
+            desired_state=NodeDesiredState.RUNNING.value,
+        )
+        orphan_lab = make_lab(test_db, test_user, state=LabState.STOPPED.value)
+        make_placement(test_db, orphan_lab.id, "deleted-node", "dummy-host")
+        quiet_lab = make_lab(test_db, test_user, state=LabState.STOPPED.value)
+
+        labs, _stable, _unready = _scan_reconciliation_candidates(test_db)
+
+        assert error_lab.id in labs
+        assert orphan_lab.id in labs
+        assert quiet_lab.id not in labs
+
+
+class TestConcurrentLabReconciliation:
+    """Tests for the bounded per-lab reconciliation executor."""
+
+    @pytest.mark.asyncio
+    async def test_labs_run_concurrently_up_to_limit(self, test_db: Session, monkeypatch):
+        """No more than reconciliation_concurrency labs run at once."""
+        from app.tasks import reconciliation_refresh
+
+        monkeypatch.setattr(reconciliation_refresh.settings, "reconciliation_concurrency", 3)
+        in_flight = 0
+        peak = 0
+
+        async def _reconcile(_session, _lab_id):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return 1
+
+        with patch(
+            "app.tasks.reconciliation_refresh.get_session",
+            _override_get_session(test_db),
+        ), patch("app.tasks.reconciliation_db._reconcile_single_lab", _reconcile):
+            changes = await reconciliation_refresh._reconcile_labs({f"lab-{i}" for i in range(10)})
+
+        assert changes == 10
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_slow_lab_times_out_without_blocking_others(self, test_db: Session, monkeypatch):
+        """A lab exceeding its time budget is abandoned; other labs still count."""
+        from app.tasks import reconciliation_refresh
+
+        monkeypatch.setattr(reconciliation_refresh.settings, "reconciliation_lab_timeout", 0.05)
+
+        async def _reconcile(_session, lab_id):
+            if lab_id == "slow":
+                await asyncio.sleep(5)
+            if lab_id == "broken":
+                raise RuntimeError("boom")
+            return 2
+
+        with patch(
+            "app.tasks.reconciliation_refresh.get_session",
+            _override_get_session(test_db),
+        ), patch(
+            "app.tasks.reconciliation_db._reconcile_single_lab", _reconcile
+        ), patch("app.tasks.reconciliation_refresh.record_reconciliation_lab") as mock_record:
+            changes = await reconciliation_refresh._reconcile_labs({"slow", "broken", "fast"})
+
+        assert changes == 2
+        outcomes = sorted(call.args[1] for call in mock_record.call_args_list)
+        assert outcomes == ["error", "success", "timeout"]
+
+    @pytest.mark.asyncio
+    async def test_agent_query_slots_are_limited_per_agent(self, test_db: Session, monkeypatch):
+        """Status queries against the same agent are capped during a sweep."""
+        from app.tasks import reconciliation_refresh
+
+        monkeypatch.setattr(reconciliation_refresh.settings, "reconciliation_per_agent_concurrency", 2)
+        in_flight: dict[str, int] = {}
+        peak: dict[str, int] = {}
+
+        async def _reconcile(_session, lab_id):
+            agent_id = "agent-a" if lab_id.startswith("a") else "agent-b"
+            async with reconciliation_refresh.agent_query_slot(agent_id):
+                in_flight[agent_id] = in_flight.get(agent_id, 0) + 1
+                peak[agent_id] = max(peak.get(agent_id, 0), in_flight[agent_id])
+                await asyncio.sleep(0.01)
+                in_flight[agent_id] -= 1
+            return 0
+
+        with patch(
+            "app.tasks.reconciliation_refresh.get_session",
+            _override_get_session(test_db),
+        ), patch("app.tasks.reconciliation_db._reconcile_single_lab", _reconcile):
+            await reconciliation_refresh._reconcile_labs(
+                {"a1", "a2", "a3", "a4", "a5", "b1", "b2"}
+            )
+
+        assert peak == {"agent-a": 2, "agent-b": 2}
+
+    @pytest.mark.asyncio
+    async def test_labs_sharing_an_agent_use_one_bulk_status_request(
+        self, test_db: Session, test_user: models.User, sample_host: models.Host
+    ):
+        """Labs on the same agent are served from a single bulk status call."""
+        from app.tasks import reconciliation_refresh
+
+        lab_a = make_lab(test_db, test_user, state=LabState.RUNNING.value, agent_id=sample_host.id)
+        lab_b = make_lab(test_db, test_user, state=LabState.RUNNING.value, agent_id=sample_host.id)
+        lab_solo = make_lab(test_db, test_user, state=LabState.RUNNING.value)
+        payload = {
+            "etag": '"x"',
+            "labs": [{"lab_id": lab_a.id, "nodes": [{"name": "R1", "status": "running"}], "error": None}],
+            "error": None,
+        }
+        seen: dict[str, object] = {}
+
+        async def _reconcile(_session, lab_id):
+            seen[lab_id] = reconciliation_refresh.prefetched_lab_status(sample_host.id, lab_id)
+            seen[f"{lab_id}-other"] = reconciliation_refresh.prefetched_lab_status("other-agent", lab_id)
+            return 0
+
+        with patch(
+            "app.tasks.reconciliation_refresh.get_session",
+            _override_get_session(test_db),
+        ), patch(
+            "app.tasks.reconciliation_db._reconcile_single_lab", _reconcile
+        ), patch(
+            "app.tasks.reconciliation_refresh.agent_client.get_all_lab_status_from_agent",
+            new_callable=AsyncMock,
+            return_value=payload,
+        ) as mock_bulk:
+            await reconciliation_refresh._reconcile_labs({lab_a.id, lab_b.id, lab_solo.id})
+
+        mock_bulk.assert_awaited_once()
+        assert seen[lab_a.id][1]["nodes"][0]["name"] == "R1"
+        # Lab absent from the bulk response has no runtimes on that agent
+        assert seen[lab_b.id][1] == {"lab_id": lab_b.id, "nodes": [], "error": None}
+        assert seen[f"{lab_solo.id}-other"] is None
+        assert reconciliation_refresh.prefetched_lab_status(sample_host.id, lab_a.id) is None
+
+    @pytest.mark.asyncio
+    async def test_bulk_status_stamped_before_request(
+        self, test_db: Session, test_user: models.User, sample_host: models.Host
+    ):
+        """fetched_at precedes the agent's snapshot, so in-flight jobs count as newer."""
+        from app.tasks import reconciliation_refresh
+
+        lab_a = make_lab(test_db, test_user, state=LabState.RUNNING.value, agent_id=sample_host.id)
+        lab_b = make_lab(test_db, test_user, state=LabState.RUNNING.value, agent_id=sample_host.id)
+        sent_at: list[datetime] = []
+
+        async def _bulk(_agent):
+            sent_at.append(datetime.now(timezone.utc))
+            await asyncio.sleep(0.05)
+            return {"labs": [], "error": None}
+
+        with patch(
+            "app.tasks.reconciliation_refresh.get_session",
+            _override_get_session(test_db),
+        ), patch(
+            "app.tasks.reconciliation_refresh.agent_client.get_all_lab_status_from_agent",
+            _bulk,
+        ):
+            prefetched = await reconciliation_refresh._prefetch_bulk_lab_status({lab_a.id, lab_b.id})
+
+        assert prefetched[sample_host.id].fetched_at <= sent_at[0]
@@ -269,6 +269,85 @@ describe("useLabStateWS", () => {
     });
   });
 
+  describe("Sequenced Resume", () => {
+    it("reconnects with the highest seq seen", async () => {
+      renderHook(() => useLabStateWS("test-lab"));
+
+      const ws = MockWebSocket.getLastInstance();
+      expect(ws?.url).not.toContain("last_seq=");
+      act(() => {
+        ws?.simulateOpen();
+        ws?.simulateMessage({
+          type: "initial_state",
+          timestamp: new Date().toISOString(),
+          data: { nodes: [], seq: 40 },
+        });
+        ws?.simulateMessage({
+          type: "node_state",
+          seq: 42,
+          timestamp: new Date().toISOString(),
+          data: { node_id: "n1", node_name: "R1", desired_state: "running", actual_state: "running" },
+        });
+        ws?.simulateClose();
+      });
+
+      act(() => {
+        vi.advanceTimersByTime(1000);
+      });
+
+      expect(MockWebSocket.getLastInstance()?.url).toContain("last_seq=42");
+    });
+
+    it("does not resume when the snapshot had no seq", async () => {
+      renderHook(() => useLabStateWS("test-lab"));
+
+      const ws = MockWebSocket.getLastInstance();
+      act(() => {
+        ws?.simulateOpen();
+        ws?.simulateMessage({
+          type: "initial_state",
+          timestamp: new Date().toISOString(),
+          data: { nodes: [], seq: null },
+        });
+        ws?.simulateClose();
+      });
+
+      act(() => {
+        vi.advanceTimersByTime(1000);
+      });
+
+      expect(MockWebSocket.getLastInstance()?.url).not.toContain("last_seq=");
+    });
+
+    it("ignores events at or below the last applied seq", async () => {
+      const { result } = renderHook(() => useLabStateWS("test-lab"));
+
+      const ws = MockWebSocket.getLastInstance();
+      act(() => {
+        ws?.simulateOpen();
+        ws?.simulateMessage({
+          type: "initial_state",
+          timestamp: new Date().toISOString(),
+          data: { nodes: [], seq: 40 },
+        });
+        ws?.simulateMessage({
+          type: "node_state",
+          seq: 42,
+          timestamp: new Date().toISOString(),
+          data: { node_id: "n1", node_name: "R1", desired_state: "running", actual_state: "running" },
+        });
+        ws?.simulateMessage({
+          type: "node_state",
+          seq: 41,
+          timestamp: new Date().toISOString(),
+          data: { node_id: "n1", node_name: "R1", desired_state: "running", actual_state: "stopped" },
+        });
+      });
+
+      expect(result.current.nodeStates.get("n1")?.actual_state).toBe("running");
+    });
+  });
+
   describe("Reconnect Attempts Counter", () => {
     it("increments counter on each reconnection attempt", async () => {
       const { result } = renderHook(() => useLabStateWS("test-lab"));
@@ -501,6 +580,32 @@ describe("useLabStateWS", () => {
       expect(onNodeStateChange).toHaveBeenCalledWith("n1", expect.any(Object));
     });
 
+    it("applies every node in a node_states batch", async () => {
+      const onNodeStateChange = vi.fn();
+      const { result } = renderHook(() =>
+        useLabStateWS("test-lab", { onNodeStateChange })
+      );
+
+      const ws = MockWebSocket.getLastInstance();
+      act(() => {
+        ws?.simulateOpen();
+        ws?.simulateMessage({
+          type: "node_states",
+          timestamp: new Date().toISOString(),
+          data: {
+            nodes: [
+              { node_id: "n1", node_name: "R1", desired_state: "running", actual_state: "running" },
+              { node_id: "n2", node_name: "R2", desired_state: "running", actual_state: "pending" },
+            ],
+          },
+        });
+      });
+
+      expect(result.current.nodeStates.get("n1")?.actual_state).toBe("running");
+      expect(result.current.nodeStates.get("n2")?.actual_state).toBe("pending");
+      expect(onNodeStateChange).toHaveBeenCalledTimes(2);
+    });
+
     it("updates link states on link_state message", async () => {
       const onLinkStateChange = vi.fn();
       const { result } = renderHook(() =>
@@ -5,6 +5,7 @@
  * for state changes, eliminating the need for polling. It includes:
  * - Automatic reconnection with exponential backoff
  * - Initial state snapshot on connect
+ * - Delta resume on reconnect (only events after the last seen `seq`)
  * - Incremental updates for nodes, links, and jobs
  *
  * Usage:
@@ -87,9 +88,11 @@ export interface ScenarioStepData {
 }
 
 interface WSMessage {
-  type: 'node_state' | 'link_state' | 'lab_state' | 'job_progress' | 'test_result' | 'scenario_step' | 'initial_state' | 'initial_links' | 'heartbeat' | 'pong' | 'error';
+  type: 'node_state' | 'node_states' | 'link_state' | 'link_states' | 'lab_state' | 'job_progress' | 'test_result' | 'scenario_step' | 'initial_state' | 'initial_links' | 'resume' | 'heartbeat' | 'pong' | 'error';
   timestamp: string;
   data: unknown;
+  /** Per-lab event sequence number (published events only) */
+  seq?: number;
 }
 
 export interface UseLabStateWSOptions {
@@ -157,6 +160,8 @@ export function useLabStateWS(
   const reconnectTimeoutRef = useRef<number | null>(null);
   const pingIntervalRef = useRef<number | null>(null);
   const reconnectAttemptsRef = useRef(0);
+  // Highest event sequence applied; sent on reconnect to resume from it
+  const lastSeqRef = useRef<number | null>(null);
 
   // Store callbacks in refs to avoid recreating connect/handleMessage on callback changes
   const onNodeStateChangeRef = useRef(onNodeStateChange);
@@ -186,8 +191,12 @@ export function useLabStateWS(
     }
 
     const wsUrl = `${baseUrl}/ws/labs/${labId}/state`;
+    const params = new URLSearchParams();
     const token = localStorage.getItem('token');
-    return token ? `${wsUrl}?token=${encodeURIComponent(token)}` : wsUrl;
+    if (token) params.set('token', token);
+    if (lastSeqRef.current !== null) params.set('last_seq', String(lastSeqRef.current));
+    const query = params.toString();
+    return query ? `${wsUrl}?${query}` : wsUrl;
   }, [labId]);
 
   // Handle incoming messages - uses refs for callbacks so this doesn't change identity
@@ -195,10 +204,18 @@ export function useLabStateWS(
     try {
       const message: WSMessage = JSON.parse(event.data);
 
+      if (typeof message.seq === 'number') {
+        // Already applied from a replay or covered by the snapshot
+        if (lastSeqRef.current !== null && message.seq <= lastSeqRef.current) return;
+        lastSeqRef.current = message.seq;
+      }
+
       switch (message.type) {
         case 'initial_state': {
           // Batch update of all node states
-          const data = message.data as { nodes: NodeStateData[] };
+          const data = message.data as { nodes: NodeStateData[]; seq?: number | null };
+          // A snapshot restarts the sequence the client has caught up to
+          lastSeqRef.current = typeof data.seq === 'number' ? data.seq : null;
           const newStates = new Map<string, NodeStateData>();
           data.nodes.forEach((node) => {
             newStates.set(node.node_id, node);
@@ -229,6 +246,18 @@ export function useLabStateWS(
           break;
         }
 
+        case 'node_states': {
+          // Coalesced batch of node updates from one broadcast window
+          const data = message.data as { nodes: NodeStateData[] };
+          setNodeStates((prev) => {
+            const newMap = new Map(prev);
+            data.nodes.forEach((node) => newMap.set(node.node_id, node));
+            return newMap;
+          });
+          data.nodes.forEach((node) => onNodeStateChangeRef.current?.(node.node_id, node));
+          break;
+        }
+
         case 'link_state': {
           const data = message.data as LinkStateData;
           setLinkStates((prev) => {
@@ -240,6 +269,18 @@ export function useLabStateWS(
           break;
         }
 
+        case 'link_states': {
+          // Coalesced batch of link updates from one broadcast window
+          const data = message.data as { links: LinkStateData[] };
+          setLinkStates((prev) => {
+            const newMap = new Map(prev);
+            data.links.forEach((link) => newMap.set(link.link_name, link));
+            return newMap;
+          });
+          data.links.forEach((link) => onLinkStateChangeRef.current?.(link.link_name, link));
+          break;
+        }
+
         case 'lab_state': {
           const data = message.data as LabStateData;
           setLabState(data);
@@ -265,6 +306,10 @@ export function useLabStateWS(
           break;
         }
 
+        case 'resume':
+          // Missed events follow as regular messages
+          break;
+
         case 'heartbeat':
         case 'pong':
           // Connection is alive, nothing to do
@@ -363,6 +408,8 @@ export function useLabStateWS(
         wsRef.current.close(1000, 'Component unmounting');
         wsRef.current = null;
       }
+      // Sequence numbers are per lab; the next connection starts from a snapshot
+      lastSeqRef.current = null;
     };
   }, [connect]);
 